@@ -1,13 +1,21 @@
 # backend/app/api/v1/admin.py
+from datetime import date, datetime
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from app.schemas.user import UserResponse
-from app.schemas.admin import GenerationStatsResponse
+from app.schemas.admin import (
+    GenerationStatsResponse,
+    OrderStatusEventResponse,
+    StatusDurationDailyStats,
+    StatusDurationStats
+)
 from app.core.webhooks import webhook_manager
 from app.core.dependencies import (
     AdminDep,
     GenerationServiceDep,
-    AdminServiceDep
+    AdminServiceDep,
+    OrderAnalyticsServiceDep
 )
 from app.services.admin import AdminService
 from app.services.generation import GenerationService
@@ -61,3 +69,73 @@ async def generation_stats(
     service: GenerationService = Depends(GenerationServiceDep),
 ):
     return await service.get_stats()
+
+
+@router.get(
+    "/orders/status-durations",
+    response_model=list[StatusDurationDailyStats],
+    summary="Daily Time-in-Status Statistics",
+    description="Daily time-in-status percentiles from the rollup table (Admin only)",
+    responses=STANDARD_RESPONSES
+)
+async def order_status_durations(
+    admin: AdminDep,
+    service: OrderAnalyticsServiceDep,
+    since: date,
+    until: date,
+    status: Optional[str] = None,
+    factory_id: Optional[UUID] = None,
+):
+    try:
+        return await service.get_daily_stats(since, until, status, factory_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/orders/status-durations/percentiles",
+    response_model=list[StatusDurationStats],
+    summary="Time-in-Status Percentiles",
+    description="Exact time-in-status percentiles for an arbitrary period from raw events (Admin only)",
+    responses=STANDARD_RESPONSES
+)
+async def order_status_percentiles(
+    admin: AdminDep,
+    service: OrderAnalyticsServiceDep,
+    since: datetime,
+    until: datetime,
+    status: Optional[str] = None,
+    factory_id: Optional[UUID] = None,
+):
+    try:
+        return await service.get_time_in_status(since, until, status, factory_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/orders/status-durations/refresh",
+    summary="Refresh Time-in-Status Rollups",
+    description="Incrementally refresh daily rollups since the last watermark (Admin only)",
+    responses=STANDARD_RESPONSES
+)
+async def refresh_order_status_durations(
+    admin: AdminDep,
+    service: OrderAnalyticsServiceDep,
+):
+    written = await service.refresh_rollups()
+    return {"status": "skipped" if written is None else "refreshed", "rows": written or 0}
+
+
+@router.get(
+    "/orders/{order_id}/status-history",
+    response_model=list[OrderStatusEventResponse],
+    summary="Order Status History",
+    responses=STANDARD_RESPONSES
+)
+async def order_status_history(
+    order_id: UUID,
+    admin: AdminDep,
+    service: OrderAnalyticsServiceDep,
+):
+    return await service.get_order_timeline(order_id)
@@ -1,19 +1,31 @@
+from typing import Annotated, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import UUID4
 from app.core.order_status import OrderStatus 
 from app.core.dependencies import (
     CurrentUserDep,
+    DesignerDep,
     MarketplaceServiceDep,
     PaymentServiceDep
 )
 from app.schemas.marketplace import (
+    CartItem,
     CartItemAdd,
+    CheckoutResponse,
     DirectOrderResponse, 
+    ImportReport,
     MarketItem, 
+    MarketItemDetails,
+    MarketItemPage,
     MarketFilters,
+    SearchSuggestion,
 )
+from app.schemas.pagination import CursorPage
+from app.schemas.review import ReviewResponse
+from app.services.autocomplete import autocomplete
+from app.services.catalog_import import IMPORT_FORMATS
 
 
 router = APIRouter(
@@ -26,24 +38,31 @@ router = APIRouter(
 
 @router.get(
     "/items",
-    response_model=list[MarketItem],
+    response_model=MarketItemPage,
     summary="Browse marketplace items",
     description="""
-    Get a list of available advertising designs in the marketplace.
+    Get a page of available advertising designs in the marketplace.
     
     ### Filters:
     - Filter by type (banner, standee, etc.)
     - Price range filtering
     - Minimum rating
-    - Search by title
+    - Full-text search by title and description
+    - Spec predicates: spec=key:value, repeatable, nested keys via dots
+      (spec=size:3x6&spec=print.color:red); all must match
+
+    ### Paging:
+    - sort: relevance (with search), newest, price_asc, price_desc, rating, popularity
+    - limit / cursor: pass next_cursor from the previous page
+    - facets (counts by type, price band and rating band) come with the first page
     """,
     responses={
-        200: {"description": "List of marketplace items"},
-        400: {"description": "Invalid filter parameters"}
+        200: {"description": "Page of marketplace items with facets"},
+        400: {"description": "Invalid filter parameters or cursor"}
     }
 )
 async def list_market_items(
-        filters: MarketFilters,
+        filters: Annotated[MarketFilters, Query()],
         service: MarketplaceServiceDep
 ):
     """Get filtered marketplace items"""
@@ -56,6 +75,146 @@ async def list_market_items(
         )
 
 
+@router.get(
+    "/items/top",
+    response_model=List[MarketItem],
+    summary="Top marketplace items",
+    description="""
+    Most popular items right now: views, cart adds and orders
+    with exponential time decay (half-life POPULARITY_HALF_LIFE).
+    """
+)
+async def list_top_items(
+        service: MarketplaceServiceDep,
+        limit: int = Query(20, ge=1, le=100)
+):
+    """Get top items by popularity"""
+    return await service.get_top_items(limit)
+
+
+@router.post(
+    "/items/import",
+    response_model=ImportReport,
+    summary="Bulk import marketplace items",
+    description="""
+    Publish many items at once. The request body is the file itself,
+    streamed (not multipart):
+
+    - `Content-Type: application/x-ndjson` — one JSON object per line
+    - `Content-Type: text/csv` — header row; `specs` column holds JSON
+
+    Fields: title, description, item_type, price (kopecks), preview_url, specs.
+    Valid rows are imported, invalid ones are skipped and listed in the report.
+    Designers and admins only; items are published under the caller.
+    """,
+    responses={
+        200: {"description": "Import report with per-row errors"},
+        400: {"description": "Malformed file"},
+        403: {"description": "Designer access required"},
+        415: {"description": "Unsupported content type"}
+    }
+)
+async def import_market_items(
+        request: Request,
+        user: DesignerDep,
+        service: MarketplaceServiceDep
+):
+    """Bulk import items from an NDJSON or CSV stream"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = IMPORT_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Expected one of: {', '.join(IMPORT_FORMATS)}"
+        )
+    try:
+        return await service.import_items(user.id, request.stream(), fmt)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+
+
+@router.get(
+    "/autocomplete",
+    response_model=List[SearchSuggestion],
+    summary="Search autocomplete",
+    description="""
+    Suggestions for a search prefix: item titles (from any word)
+    and tags, ranked by popularity. Served from an in-memory index
+    rebuilt in the background, without database queries.
+    """
+)
+async def search_autocomplete(
+        q: str = Query(..., min_length=1, max_length=100),
+        limit: int = Query(8, ge=1, le=10)
+):
+    """Get search suggestions for a prefix"""
+    return autocomplete.suggest(q, limit)
+
+
+@router.get(
+    "/items/{item_id}",
+    response_model=MarketItemDetails,
+    summary="Get marketplace item",
+    description="""
+    Item card with precomputed rating (average, count, 1-5 histogram)
+    and the first page of reviews; further pages via /items/{item_id}/reviews.
+    """,
+    responses={
+        200: {"description": "Marketplace item"},
+        404: {"description": "Item not found"}
+    }
+)
+async def get_market_item(
+        item_id: UUID,
+        service: MarketplaceServiceDep
+):
+    """Get a single marketplace item"""
+    return await service.view_item(item_id)
+
+
+@router.get(
+    "/items/{item_id}/similar",
+    response_model=List[MarketItem],
+    summary="Similar items",
+    description="""
+    "You might also like": nearest items by type, specs, price band,
+    designer and co-purchases (precomputed, refreshed in the background).
+    """
+)
+async def list_similar_items(
+        item_id: UUID,
+        service: MarketplaceServiceDep,
+        limit: int = Query(8, ge=1, le=12)
+):
+    """Get items similar to the given one"""
+    return await service.get_similar_items(item_id, limit)
+
+
+@router.get(
+    "/items/{item_id}/reviews",
+    response_model=CursorPage[ReviewResponse],
+    summary="List item reviews",
+    responses={
+        200: {"description": "Page of reviews, newest first"},
+        400: {"description": "Invalid cursor"}
+    }
+)
+async def list_item_reviews(
+        item_id: UUID,
+        service: MarketplaceServiceDep,
+        limit: int = Query(10, ge=1, le=50),
+        cursor: Optional[str] = None
+):
+    """Get a page of reviews for a marketplace item"""
+    try:
+        return await service.get_item_reviews(item_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post(
     "/items/{item_id}/cart",
     summary="Add item to cart",
@@ -152,6 +311,7 @@ async def create_direct_order(
 
 @router.post(
     "/cart/items",
+    response_model=CartItem,
     summary="Add to Cart",
     description="Add item to user's shopping cart",
     responses={
@@ -160,6 +320,69 @@ async def create_direct_order(
         404: {"description": "Item not found"}
     }
 )
+async def add_cart_item(
+        item: CartItemAdd,
+        service: MarketplaceServiceDep,
+        user: CurrentUserDep
+):
+    """Add item to user's cart; returns the new quantity"""
+    return await service.add_to_cart(user.id, item.item_id, item.quantity)
+
+
+@router.get(
+    "/cart",
+    response_model=List[CartItem],
+    summary="Get cart"
+)
+async def get_cart(
+        service: MarketplaceServiceDep,
+        user: CurrentUserDep
+):
+    """Get user's cart"""
+    return await service.get_cart(user.id)
+
+
+@router.delete(
+    "/cart/items/{item_id}",
+    status_code=204,
+    summary="Remove from cart",
+    responses={404: {"description": "Item not in cart"}}
+)
+async def remove_cart_item(
+        item_id: UUID,
+        service: MarketplaceServiceDep,
+        user: CurrentUserDep
+):
+    """Remove item from user's cart"""
+    await service.remove_from_cart(user.id, item_id)
+
+
+@router.post(
+    "/cart/checkout",
+    response_model=CheckoutResponse,
+    status_code=201,
+    summary="Checkout cart",
+    description="""
+    Turn the whole cart into orders in one transaction.
+
+    - One order per cart line, created with a single multi-row insert
+    - One combined payment for the total amount
+    - Checked-out quantities are removed from the cart after commit
+    """,
+    responses={
+        201: {"description": "Orders and payment created"},
+        400: {"description": "Cart is empty or items are unavailable"}
+    }
+)
+async def checkout_cart(
+        service: MarketplaceServiceDep,
+        user: CurrentUserDep
+):
+    """Checkout user's cart"""
+    try:
+        return await service.checkout(user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post(
@@ -0,0 +1,85 @@
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, BackgroundTasks, Depends, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.dependencies import AdminDep, CurrentUserDep, NotificationServiceDep, get_db
+from app.core.notification_bus import notification_hub
+from app.schemas.notifications import NotificationAnnouncement, NotificationResponse
+from app.services.notifications import announce
+
+router = APIRouter(
+    # prefix="/notifications",
+    prefix="",
+    tags=["Notifications"],
+)
+
+
+@router.get("", response_model=List[NotificationResponse])
+async def list_notifications(
+    user: CurrentUserDep,
+    service: NotificationServiceDep,
+    unread_only: bool = False,
+    limit: int = 100
+):
+    """
+    Current user's notifications, newest first
+    GET /notifications
+    """
+    return await service.get_user_notifications(user.id, unread_only=unread_only, limit=limit)
+
+
+@router.get("/stream")
+async def stream_notifications(
+    user: CurrentUserDep,
+    session: AsyncSession = Depends(get_db)
+):
+    """
+    Server-Sent Events stream of new notifications
+    GET /notifications/stream
+
+    Missed notifications (while disconnected) are loaded via GET /notifications.
+    """
+    # Соединение с БД на всё время потока не нужно
+    await session.close()
+
+    async def events():
+        async with notification_hub.subscribe(user.id) as queue:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    data = await asyncio.wait_for(queue.get(), timeout=settings.NOTIFICATION_SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: notification\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/announce", status_code=status.HTTP_202_ACCEPTED)
+async def announce_notification(
+    announcement: NotificationAnnouncement,
+    background_tasks: BackgroundTasks,
+    admin: AdminDep
+):
+    """
+    Sends a notification to all users (or one role) as a background job (admin only)
+    POST /notifications/announce
+    """
+    background_tasks.add_task(
+        announce,
+        announcement.title,
+        announcement.message,
+        notification_type=announcement.type,
+        payload=announcement.payload,
+        role=announcement.role
+    )
+    return {"status": "scheduled"}
@@ -1,10 +1,12 @@
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from app.core.dependencies import (
     CurrentUserDep,
     OrderServiceDep,
 )
 from app.schemas.order import OrderResponse, OrderCreate, OrderUpdate, ChatMessageSchema, ChatMessageCreate
+from app.schemas.pagination import CursorPage
 from app.services.order import OrderService
 
 router = APIRouter(
@@ -36,28 +38,35 @@ async def create_order(
 
 @router.get(
     "",
-    response_model=list[OrderResponse],
+    response_model=CursorPage[OrderResponse],
     summary="Get User Orders",
-    description="Get list of all orders for current user with optional filtering",
+    description="Get a page of user orders (newest first) with optional status filtering",
     responses={
-        200: {"description": "List of user orders"},
+        200: {"description": "Page of user orders with next_cursor"},
+        400: {"description": "Invalid status or cursor"},
         401: {"description": "Unauthorized"}
     }
 )
 async def list_orders(
     user: CurrentUserDep,
-    status: str = None,
-    limit: int = 100,
-    offset: int = 0,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     service: OrderService = Depends(OrderServiceDep)
 ):
-    """Get paginated list of user orders with optional status filter"""
-    return await service.get_user_orders(
-        user_id=user.id,
-        status=status,
-        limit=limit,
-        offset=offset
-    )
+    """Get cursor-paginated list of user orders with optional status filter"""
+    try:
+        return await service.get_user_orders(
+            user_id=user.id,
+            status=status_filter,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 @router.get(
     "/{order_id}",
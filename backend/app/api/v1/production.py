@@ -1,8 +1,9 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
-from app.services.production import ProductionService
-from app.core.dependencies import get_db, ProductionServiceDep
+from fastapi import APIRouter, HTTPException, Query
+from app.core.dependencies import AdminDep, FactoryDep, ProductionServiceDep
+from app.schemas.order import OrderResponse
+from app.schemas.production import ProductionPlanResult, ProductionStatusBatch, ProductionStatusBatchResult
 
 router = APIRouter(
     # prefix="/production",
@@ -13,8 +14,8 @@ router = APIRouter(
 @router.post("/orders/{order_id}/assign")
 async def assign_order(
     order_id: UUID,
-    factory_id: Optional[UUID] = None,
-    service: ProductionService = Depends(ProductionServiceDep)
+    service: ProductionServiceDep,
+    factory_id: Optional[UUID] = None
 ):
     """
     Assigns order to factory (RESTful design)
@@ -26,11 +27,55 @@ async def assign_order(
 async def update_order_status(
     order_id: UUID,
     status: str,
-    notes: Optional[str] = None,
-    service: ProductionService = Depends(ProductionServiceDep)
+    service: ProductionServiceDep,
+    notes: Optional[str] = None
 ):
     """
     Updates production status (RESTful partial update)
     PATCH /production/orders/{order_id}/status
     """
     return await service.update_production_status(order_id, status, notes)
+
+@router.post("/status:batch", response_model=ProductionStatusBatchResult)
+async def update_statuses_batch(
+    batch: ProductionStatusBatch,
+    factory: FactoryDep,
+    service: ProductionServiceDep
+):
+    """
+    Bulk production status report from a factory
+    POST /production/status:batch
+
+    Authenticated with X-Factory-Id / X-Factory-Key headers. Only orders
+    assigned to the calling factory are updated; each update is checked
+    against the allowed status transitions and reported individually.
+    """
+    return await service.update_statuses_batch(factory.id, batch.updates)
+
+@router.get("/queue/{product_type}", response_model=List[OrderResponse])
+async def get_assignment_queue(
+    product_type: str,
+    admin: AdminDep,
+    service: ProductionServiceDep,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Paid orders of a product type awaiting factory assignment (admin only)
+    GET /production/queue/{product_type}
+    """
+    return await service.get_assignment_queue(product_type, limit)
+
+@router.post("/plan", response_model=ProductionPlanResult)
+async def plan_production(
+    admin: AdminDep,
+    service: ProductionServiceDep
+):
+    """
+    Runs the batch production planner now (admin only)
+    POST /production/plan
+
+    All paid orders without a factory are assigned at once as a min-cost
+    problem over lead time, deadline slack, load, rating and service level.
+    The same planner runs periodically (PRODUCTION_PLAN_INTERVAL).
+    """
+    return await service.plan_production()
@@ -0,0 +1,250 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Iterable, Optional, TypeVar
+
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logger.logger import logger
+from app.core.monitoring.monitoring import CACHE_METRICS
+from app.core.redis import redis_client
+
+T = TypeVar("T")
+
+# Запись значения только если версии тегов не изменились с начала загрузки.
+# KEYS: ключ значения, затем n множеств тегов, затем n счётчиков версий
+# ARGV: значение, ttl, n, затем n ожидаемых версий
+_SET_IF_FRESH = """
+local n = tonumber(ARGV[3])
+for i = 1, n do
+    if (redis.call('GET', KEYS[1 + n + i]) or '0') ~= ARGV[3 + i] then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+for i = 1, n do
+    redis.call('SADD', KEYS[1 + i], KEYS[1])
+    redis.call('EXPIRE', KEYS[1 + i], ARGV[2])
+end
+return 1
+"""
+
+# Инвалидация: поднимает версию тега и удаляет все ключи с этим тегом.
+# KEYS: пары (множество тега, счётчик версии)
+_INVALIDATE = """
+local removed = 0
+for i = 1, #KEYS, 2 do
+    redis.call('INCR', KEYS[i + 1])
+    local members = redis.call('SMEMBERS', KEYS[i])
+    for _, key in ipairs(members) do
+        removed = removed + redis.call('DEL', key)
+    end
+    redis.call('DEL', KEYS[i])
+end
+return removed
+"""
+
+
+class TaggedCache:
+    """
+    Read-through кэш в Redis с инвалидацией по тегам и защитой от stampede.
+
+    Каждая запись помечается тегами (например, item:<id>, type:banner);
+    invalidate(*tags) удаляет ровно записи с этими тегами. Гонка «загрузка
+    из БД до записи — инвалидация — запись устаревшего значения» закрыта
+    версиями тегов: значение не сохраняется, если версия тега изменилась
+    с начала загрузки.
+
+    Промах обрабатывается одним загрузчиком: внутри процесса — общим
+    future, между процессами — коротким lock-ключом (SET NX). Остальные
+    ждут значение до lock_timeout и только потом грузят сами.
+
+    При недоступности Redis кэш прозрачно отдаёт данные из загрузчика.
+
+    Пример использования:
+         cache = TaggedCache("catalog", ttl=300)
+         page = await cache.get_or_load(
+             key, adapter, lambda: service.load_page(...), tags=["type:banner"]
+         )
+         await cache.invalidate("item:42", "type:banner")
+    """
+
+    def __init__(self, namespace: str, ttl: int = 300, lock_timeout: float = 5.0):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._set_if_fresh = redis_client.client.register_script(_SET_IF_FRESH)
+        self._invalidate = redis_client.client.register_script(_INVALIDATE)
+
+    async def get_or_load(
+            self,
+            key: str,
+            adapter: TypeAdapter[T],
+            loader: Callable[[], Awaitable[T]],
+            tags: Iterable[str] = ()
+    ) -> T:
+        """Возвращает значение из кэша или загружает и кэширует его.
+
+        Args:
+            key: Ключ внутри пространства имён кэша
+            adapter: TypeAdapter для (де)сериализации значения
+            loader: Загрузчик значения из источника
+            tags: Теги записи (известны до загрузки: их версии фиксируются
+                до обращения к источнику)
+
+        Returns:
+            T: Значение
+        """
+        full_key = self._key(key)
+        cached = await self._get(full_key)
+        if cached is not None:
+            CACHE_METRICS['requests'].labels(namespace=self.namespace, result="hit").inc()
+            return adapter.validate_json(cached)
+        CACHE_METRICS['requests'].labels(namespace=self.namespace, result="miss").inc()
+
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await self._load(full_key, adapter, loader, tags)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # помечаем как полученное, если ожидающих нет
+            raise
+        finally:
+            del self._inflight[full_key]
+
+    async def refresh(
+            self,
+            key: str,
+            adapter: TypeAdapter[T],
+            loader: Callable[[], Awaitable[T]],
+            tags: Iterable[str] = ()
+    ) -> T:
+        """Загружает значение из источника и перезаписывает запись (refresh-ahead).
+
+        В отличие от get_or_load не читает кэш: живая запись заменяется
+        свежей с новым TTL, поэтому прогреваемые ключи не остывают.
+        Параллельная инвалидация по-прежнему отменяет запись.
+        """
+        return await self._fetch(self._key(key), adapter, loader, tags)
+
+    async def invalidate(self, *tags: str) -> int:
+        """Удаляет все записи с указанными тегами.
+
+        Returns:
+            int: Количество удалённых записей
+        """
+        if not tags:
+            return 0
+        keys = []
+        for tag in tags:
+            keys += [self._tag_key(tag), self._version_key(tag)]
+        try:
+            removed = await self._invalidate(keys=keys)
+        except RedisError as e:
+            logger.error(f"Cache invalidation failed for {tags}: {e}")
+            return 0
+        CACHE_METRICS['invalidations'].labels(namespace=self.namespace).inc(len(tags))
+        return removed
+
+    async def _load(
+            self,
+            full_key: str,
+            adapter: TypeAdapter[T],
+            loader: Callable[[], Awaitable[T]],
+            tags: Iterable[str]
+    ) -> T:
+        lock_key = f"{full_key}:lock"
+        try:
+            locked = await redis_client.client.set(lock_key, "1", nx=True, ex=int(self.lock_timeout) + 1)
+        except RedisError:
+            return await loader()
+
+        if not locked:
+            # Значение уже пересчитывает другой процесс — ждём его результат
+            cached = await self._wait_for(full_key)
+            if cached is not None:
+                return adapter.validate_json(cached)
+
+        try:
+            return await self._fetch(full_key, adapter, loader, tags)
+        finally:
+            if locked:
+                await self._delete(lock_key)
+
+    async def _fetch(
+            self,
+            full_key: str,
+            adapter: TypeAdapter[T],
+            loader: Callable[[], Awaitable[T]],
+            tags: Iterable[str]
+    ) -> T:
+        """Загрузка и запись при неизменных с начала загрузки версиях тегов."""
+        tag_list = list(tags)
+        versions = await self._versions(tag_list)
+        value = await loader()
+        if versions is not None:
+            await self._store(full_key, adapter.dump_json(value).decode(), tag_list, versions)
+        return value
+
+    async def _wait_for(self, full_key: str) -> Optional[str]:
+        delay, waited = 0.02, 0.0
+        while waited < self.lock_timeout:
+            await asyncio.sleep(delay)
+            waited += delay
+            cached = await self._get(full_key)
+            if cached is not None:
+                return cached
+            delay = min(delay * 2, 0.25)
+        return None
+
+    async def _store(self, full_key: str, payload: str, tags: list, versions: list) -> None:
+        try:
+            await self._set_if_fresh(
+                keys=[full_key, *map(self._tag_key, tags), *map(self._version_key, tags)],
+                args=[payload, self.ttl, len(tags), *versions]
+            )
+        except RedisError as e:
+            logger.error(f"Cache write failed for {full_key}: {e}")
+
+    async def _versions(self, tags: list) -> Optional[list]:
+        if not tags:
+            return []
+        try:
+            values = await redis_client.client.mget([self._version_key(t) for t in tags])
+        except RedisError:
+            return None
+        return [v or "0" for v in values]
+
+    async def _get(self, full_key: str) -> Optional[str]:
+        try:
+            return await redis_client.client.get(full_key)
+        except RedisError as e:
+            logger.warning(f"Cache read failed for {full_key}: {e}")
+            return None
+
+    async def _delete(self, key: str) -> None:
+        try:
+            await redis_client.client.delete(key)
+        except RedisError:
+            pass
+
+    def _key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"cache:{self.namespace}:tag:{tag}"
+
+    def _version_key(self, tag: str) -> str:
+        return f"cache:{self.namespace}:tagver:{tag}"
+
+
+# Кэш каталога маркетплейса (см. MarketplaceService.get_items / get_item_details)
+catalog_cache = TaggedCache("catalog", ttl=settings.CATALOG_CACHE_TTL)
@@ -108,6 +108,118 @@ class Settings(BaseSettings):
         ge=10, le=16  # Минимум 10, максимум 16
     )
 
+    # Order analytics
+    ORDER_STATUS_ROLLUP_INTERVAL: int = Field(
+        default=300,
+        description="Интервал инкрементального пересчёта агрегатов статусов заказов (сек)"
+    )
+
+    # Marketplace catalog cache
+    CATALOG_CACHE_TTL: int = Field(
+        default=300,
+        description="Время жизни страниц и карточек каталога в Redis (сек)"
+    )
+    CATALOG_CACHE_WARM_INTERVAL: int = Field(
+        default=240,
+        description="Интервал прогрева популярных страниц каталога (сек), меньше TTL"
+    )
+
+    # Marketplace cart
+    CART_TTL: int = Field(
+        default=7 * 24 * 3600,
+        description="Время жизни корзины в Redis с последнего изменения (сек)"
+    )
+
+    # Marketplace popularity
+    POPULARITY_HALF_LIFE: int = Field(
+        default=7 * 24 * 3600,
+        description="Период полураспада очков популярности товаров (сек)"
+    )
+    POPULARITY_SNAPSHOT_INTERVAL: int = Field(
+        default=600,
+        description="Интервал сохранения популярности из Redis в market_items.popularity (сек)"
+    )
+
+    # Marketplace recommendations
+    RECOMMENDATIONS_REBUILD_INTERVAL: int = Field(
+        default=3600,
+        description="Интервал инкрементального пересчёта похожих товаров (сек)"
+    )
+
+    # Marketplace search autocomplete
+    AUTOCOMPLETE_REBUILD_INTERVAL: int = Field(
+        default=300,
+        description="Интервал пересборки индекса автодополнения в памяти (сек)"
+    )
+
+    # Factory assignment
+    FACTORY_LOAD_REFRESH_INTERVAL: int = Field(
+        default=30,
+        description="Интервал сверки индекса загрузки фабрик с БД (сек)"
+    )
+
+    # Production planning
+    PRODUCTION_PLAN_INTERVAL: int = Field(
+        default=300,
+        description="Интервал пакетного назначения оплаченных заказов на фабрики (сек)"
+    )
+
+    # Factory dispatch
+    FACTORY_DISPATCH_BATCH_SIZE: int = Field(
+        default=50,
+        description="Заказов в одной пакетной отправке на фабрику"
+    )
+    FACTORY_DISPATCH_MAX_DELAY: float = Field(
+        default=0.5,
+        description="Максимальное ожидание пачки перед отправкой на фабрику (сек)"
+    )
+    FACTORY_DISPATCH_MAX_IN_FLIGHT: int = Field(
+        default=4,
+        description="Одновременных запросов к API одной фабрики"
+    )
+    FACTORY_DISPATCH_REDELIVERY_INTERVAL: int = Field(
+        default=60,
+        description="Интервал повторной отправки заданий, не дошедших до фабрик (сек)"
+    )
+
+    # Production SLA
+    SLA_AT_RISK_HOURS: int = Field(
+        default=24,
+        description="За сколько часов до production_deadline заказ считается под угрозой"
+    )
+    SLA_TICK_INTERVAL: float = Field(
+        default=1.0,
+        description="Шаг колеса таймеров SLA (сек)"
+    )
+    SLA_REFILL_INTERVAL: int = Field(
+        default=300,
+        description="Интервал загрузки следующего окна дедлайнов в колесо таймеров (сек)"
+    )
+
+    # Factory health
+    FACTORY_CIRCUIT_FAILURES: int = Field(
+        default=5,
+        description="Ошибок API фабрики подряд до размыкания цепи"
+    )
+    FACTORY_CIRCUIT_COOLDOWN: float = Field(
+        default=60.0,
+        description="Пауза вызовов фабрики с разомкнутой цепью до пробного запроса (сек)"
+    )
+
+    # Notifications
+    NOTIFICATION_PUSH_QUEUE_SIZE: int = Field(
+        default=100,
+        description="Недоставленных push-уведомлений на одно подключение (старые вытесняются)"
+    )
+    NOTIFICATION_SSE_KEEPALIVE: float = Field(
+        default=15.0,
+        description="Интервал keepalive-комментариев в SSE-потоке уведомлений (сек)"
+    )
+    NOTIFICATION_ANNOUNCE_CHUNK_SIZE: int = Field(
+        default=10000,
+        description="Получателей рассылки на одну транзакцию"
+    )
+
     @validator('ALLOWED_ORIGINS', pre=True)
     def parse_allowed_origins(cls, v):
         if isinstance(v, str):
@@ -1,26 +1,33 @@
 import uuid
+from secrets import compare_digest
 from typing import Annotated
 from app.repositories.chat import ChatRepository
 from fastapi import Request
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.errors import NotFoundError
 from app.core.webhooks import WebhookManager
+from app.core.unit_of_work import UnitOfWork
 from app.core.database import async_session
 from app.core.config import settings
 from app.core.rate_limiter import RateLimiter
 from app.core.redis import redis_client
 from app.core.websocket_manager import ws_manager, ConnectionManager
 
+from app.models.factory import Factory
+from app.repositories.cart import CartRepository
 from app.repositories.factory import FactoryRepository
 from app.repositories.generation import GenerationRepository
+from app.repositories.load_profiles import AUTH_PRINCIPAL
 from app.repositories.marketplace import MarketplaceRepository
 from app.repositories.notification import NotificationRepository
 from app.repositories.order import OrderRepository
+from app.repositories.order_status_event import OrderStatusEventRepository
 from app.repositories.payment import PaymentRepository
+from app.repositories.review import ReviewRepository
 from app.repositories.subscription import SubscriptionRepository
 from app.repositories.user import UserRepository
 
@@ -32,6 +39,7 @@ from app.services.kandinsky import KandinskyAPI
 from app.services.marketplace import MarketplaceService
 from app.services.notifications import NotificationService
 from app.services.order import OrderService
+from app.services.order_analytics import OrderAnalyticsService
 from app.services.payment import PaymentService
 from app.services.subscription import SubscriptionService
 from app.services.admin import AdminService
@@ -48,15 +56,14 @@ async def get_db() -> AsyncSession:
         AsyncSession: Асинхронная сессия SQLAlchemy
 
     Ensures:
+        Один COMMIT на запрос (UnitOfWork): сервисы и репозитории
+        только flush'ат, при исключении транзакция откатывается.
         Сессия будет закрыта после использования
     """
     async with async_session() as session:
         try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
+            async with UnitOfWork.of(session):
+                yield session
         finally:
             await session.close()
 
@@ -92,7 +99,11 @@ async def get_current_user(
         raise credentials_exception
 
     user_repo = UserRepository(session)
-    user = await user_repo.get(uuid.UUID(user_id), include_deleted=False)
+    user = await user_repo.get(
+        uuid.UUID(user_id),
+        include_deleted=False,
+        options=AUTH_PRINCIPAL
+    )
     if user is None:
         raise credentials_exception
     return UserResponse.model_validate(user)
@@ -185,6 +196,15 @@ async def get_admin_user(user: UserResponse = Depends(get_current_user)):
     return user
 
 
+async def get_designer_user(user: UserResponse = Depends(get_current_user)):
+    if user.role not in ("designer", "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Designer access required"
+        )
+    return user
+
+
 async def get_notification_service(
         session: AsyncSession = Depends(get_db)
 ) -> NotificationService:
@@ -201,7 +221,13 @@ async def get_marketplace_service(
         await get_notification_service(session)
     )
     user_repo = UserRepository(session)
-    return MarketplaceService(marketplace_repo, user_repo)
+    return MarketplaceService(
+        marketplace_repo,
+        user_repo,
+        ReviewRepository(session),
+        OrderRepository(session),
+        CartRepository()
+    )
 
 async def get_rate_limiter(request: Request) -> RateLimiter:
     """Dependency that checks rate limits"""
@@ -220,10 +246,17 @@ async def get_admin_service(session: AsyncSession = Depends(get_db)) -> AdminSer
     user_repo = UserRepository(session)
     return AdminService(user_repo)
 
+async def get_order_analytics_service(
+        session: AsyncSession = Depends(get_db)
+) -> OrderAnalyticsService:
+    return OrderAnalyticsService(OrderStatusEventRepository(session))
+
 
 # Dependency type annotations
 AdminDep = Annotated[UserResponse, Depends(get_admin_user)]
+DesignerDep = Annotated[UserResponse, Depends(get_designer_user)]
 AdminServiceDep = Annotated[AdminService, Depends(get_admin_service)]
+OrderAnalyticsServiceDep = Annotated[OrderAnalyticsService, Depends(get_order_analytics_service)]
 PaymentServiceDep = Annotated[PaymentService, Depends(get_payment_service)]
 AuthServiceDep = Annotated[AuthService, Depends(get_auth_service)]
 MarketplaceServiceDep = Annotated[MarketplaceService, Depends(get_marketplace_service)]
@@ -266,6 +299,33 @@ StorageDep = Annotated[StorageService, Depends(get_storage_service)]
 async def get_production_service(
     session: AsyncSession = Depends(get_db)
 ) -> ProductionService:
-    return ProductionService(session)
+    return ProductionService(
+        session,
+        OrderRepository(session),
+        FactoryRepository(session)
+    )
 
 ProductionServiceDep = Annotated[ProductionService, Depends(get_production_service)]
+
+
+async def get_current_factory(
+        x_factory_id: uuid.UUID = Header(...),
+        x_factory_key: str = Header(...),
+        session: AsyncSession = Depends(get_db)
+) -> Factory:
+    """Фабрика, вызывающая API: X-Factory-Id и её api_key в X-Factory-Key."""
+    factory = await FactoryRepository(session).get(x_factory_id)
+    if (
+            factory is None
+            or not factory.is_active
+            or not factory.api_key
+            or not compare_digest(factory.api_key.encode(), x_factory_key.encode())
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid factory credentials"
+        )
+    return factory
+
+
+FactoryDep = Annotated[Factory, Depends(get_current_factory)]
@@ -1,33 +1,140 @@
+from typing import Any, List, Optional
+
 from app.models.factory import Factory
 from app.models.order import Order
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential
 from app.core.errors import APIError
 
+# Ответы фабрики без пакетного приёма заказов
+_NO_BATCH_STATUSES = {404, 405, 501}
+
+
+class BatchNotSupportedError(Exception):
+    """API фабрики не поддерживает пакетную отправку заказов."""
+
+
+class FactoryAPIError(APIError):
+    """Ошибка вызова API фабрики.
+
+    factory_status — HTTP-статус ответа фабрики; None, если ответа не было
+    (таймаут, обрыв соединения).
+    """
+
+    def __init__(self, message: str, factory_status: Optional[int] = None, details: Any = None):
+        super().__init__(message=message, code="factory_api_error", details=details)
+        self.factory_status = factory_status
+
+    @property
+    def retryable(self) -> bool:
+        """Повтор имеет смысл только при сетевой ошибке или 5xx."""
+        return self.factory_status is None or self.factory_status >= 500
+
+    @classmethod
+    def of(cls, error: httpx.HTTPError) -> "FactoryAPIError":
+        status = error.response.status_code if isinstance(error, httpx.HTTPStatusError) else None
+        return cls("Factory API communication failed", status, str(error))
+
+
+def order_payload(order: Order) -> dict:
+    """Производственное задание для API фабрики."""
+    specs = order.design_specs or {}
+    return {
+        "order_id": str(order.id),
+        "product_type": specs.get("product_type"),
+        "specs": specs,
+        "deadline": order.production_deadline.isoformat() if order.production_deadline else None,
+        "priority": "high" if specs.get("urgent", False) else "normal"
+    }
+
+
 class FactoryAPIClient:
+    """
+    Клиент API фабрик с общим пулом соединений.
+
+    Один httpx.AsyncClient на процесс: соединения с фабриками
+    переиспользуются между запросами (keep-alive).
+    """
+
+    _client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def http(cls) -> httpx.AsyncClient:
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        return cls._client
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @staticmethod
+    def _headers(api_key: Optional[str], idempotency_key: Optional[str] = None) -> Optional[dict]:
+        headers = {}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+        return headers or None
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10)
     )
     async def submit_order(self, factory: Factory, order: Order) -> dict:
         """Standardized interface for factory communication"""
+        return await self.post_order(factory.api_url, factory.api_key, order_payload(order))
+
+    async def post_order(self, api_url: str, api_key: Optional[str], payload: dict) -> dict:
+        """Отправляет одно задание (POST {api_url}/orders), без повторов."""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                resp = await client.post(
-                    f"{factory.api_url}/orders",
-                    json={
-                        "order_id": str(order.id),
-                        "specs": order.design_specs,
-                        "deadline": order.production_deadline.isoformat()
-                    },
-                    headers={"Authorization": f"Bearer {factory.api_key}"} if factory.api_key else None
-                )
-                resp.raise_for_status()
-                return resp.json()
+            resp = await self.http().post(
+                f"{api_url}/orders",
+                json=payload,
+                headers=self._headers(api_key)
+            )
+            resp.raise_for_status()
+            return resp.json()
         except httpx.HTTPError as e:
-            raise APIError(
-                message="Factory API communication failed",
-                code="factory_api_error",
-                details=str(e),
+            raise FactoryAPIError.of(e)
+
+    async def post_batch(
+            self,
+            api_url: str,
+            api_key: Optional[str],
+            payloads: List[dict],
+            idempotency_key: Optional[str] = None
+    ) -> List[dict]:
+        """Отправляет пачку заданий (POST {api_url}/orders/batch), без повторов.
+
+        Повторы одной пачки должны передавать тот же idempotency_key
+        (заголовок Idempotency-Key): фабрика, уже принявшая пачку, не
+        запустит заказы в производство второй раз.
+
+        Returns:
+            List[dict]: Ответы фабрики по заказам в порядке payloads
+
+        Raises:
+            BatchNotSupportedError: Если у фабрики нет пакетного эндпоинта
+            FactoryAPIError: При сетевой ошибке или ошибке фабрики
+        """
+        try:
+            resp = await self.http().post(
+                f"{api_url}/orders/batch",
+                json={"orders": payloads},
+                headers=self._headers(api_key, idempotency_key)
             )
-        
\ No newline at end of file
+            if resp.status_code in _NO_BATCH_STATUSES:
+                raise BatchNotSupportedError(api_url)
+            resp.raise_for_status()
+            results = resp.json().get("orders")
+        except httpx.HTTPError as e:
+            raise FactoryAPIError.of(e)
+        if not isinstance(results, list) or len(results) != len(payloads):
+            raise FactoryAPIError("Factory batch response does not match the request", resp.status_code)
+        return results
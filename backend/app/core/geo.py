@@ -0,0 +1,191 @@
+"""
+Офлайн-геокодирование по встроенной таблице городов и расчёт расстояний.
+
+Factory.location и адрес доставки заказа — свободный текст ("г. Казань,
+ул. Баумана 1"), поэтому координатами считается центр первого найденного
+в тексте города. Точности до города достаточно для оценки стоимости и
+сроков доставки крупноформатной продукции.
+"""
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+Coordinates = Tuple[float, float]
+
+# Центры городов: название (нижний регистр, ё -> е) -> (широта, долгота)
+CITIES: Dict[str, Coordinates] = {
+    "москва": (55.7558, 37.6173),
+    "санкт-петербург": (59.9343, 30.3351),
+    "новосибирск": (55.0084, 82.9357),
+    "екатеринбург": (56.8389, 60.6057),
+    "казань": (55.7961, 49.1064),
+    "нижний новгород": (56.2965, 43.9361),
+    "челябинск": (55.1644, 61.4368),
+    "красноярск": (56.0153, 92.8932),
+    "самара": (53.1959, 50.1002),
+    "уфа": (54.7388, 55.9721),
+    "ростов-на-дону": (47.2357, 39.7015),
+    "омск": (54.9885, 73.3242),
+    "краснодар": (45.0355, 38.9753),
+    "воронеж": (51.6720, 39.1843),
+    "пермь": (58.0105, 56.2502),
+    "волгоград": (48.7080, 44.5133),
+    "саратов": (51.5336, 46.0343),
+    "тюмень": (57.1522, 65.5272),
+    "тольятти": (53.5078, 49.4204),
+    "ижевск": (56.8526, 53.2045),
+    "барнаул": (53.3548, 83.7698),
+    "ульяновск": (54.3142, 48.4031),
+    "иркутск": (52.2870, 104.3050),
+    "хабаровск": (48.4802, 135.0719),
+    "ярославль": (57.6261, 39.8845),
+    "владивосток": (43.1155, 131.8855),
+    "махачкала": (42.9849, 47.5047),
+    "томск": (56.4846, 84.9476),
+    "оренбург": (51.7682, 55.0970),
+    "кемерово": (55.3547, 86.0873),
+    "новокузнецк": (53.7557, 87.1099),
+    "рязань": (54.6269, 39.6916),
+    "астрахань": (46.3479, 48.0336),
+    "набережные челны": (55.7436, 52.3958),
+    "пенза": (53.1959, 45.0183),
+    "киров": (58.6036, 49.6680),
+    "липецк": (52.6031, 39.5708),
+    "чебоксары": (56.1439, 47.2489),
+    "калининград": (54.7104, 20.4522),
+    "тула": (54.1931, 37.6173),
+    "курск": (51.7304, 36.1926),
+    "ставрополь": (45.0428, 41.9734),
+    "сочи": (43.5855, 39.7231),
+    "новороссийск": (44.7239, 37.7688),
+    "тверь": (56.8587, 35.9176),
+    "иваново": (57.0004, 40.9739),
+    "брянск": (53.2521, 34.3717),
+    "белгород": (50.5955, 36.5873),
+    "сургут": (61.2540, 73.3962),
+    "владимир": (56.1290, 40.4066),
+    "архангельск": (64.5393, 40.5170),
+    "калуга": (54.5293, 36.2754),
+    "смоленск": (54.7826, 32.0453),
+    "мурманск": (68.9585, 33.0827),
+    "вологда": (59.2181, 39.8886),
+    "петрозаводск": (61.7849, 34.3469),
+    "кострома": (57.7665, 40.9269),
+    "великий новгород": (58.5215, 31.2755),
+    "псков": (57.8194, 28.3318),
+    "орел": (52.9703, 36.0635),
+    "тамбов": (52.7212, 41.4523),
+    "саранск": (54.1874, 45.1839),
+    "йошкар-ола": (56.6388, 47.8908),
+    "сыктывкар": (61.6688, 50.8364),
+    "курган": (55.4410, 65.3411),
+    "нальчик": (43.4853, 43.6071),
+    "владикавказ": (43.0367, 44.6678),
+    "грозный": (43.3178, 45.6982),
+    "симферополь": (44.9521, 34.1024),
+    "севастополь": (44.6166, 33.5254),
+    "якутск": (62.0355, 129.6755),
+    "улан-удэ": (51.8335, 107.5841),
+    "чита": (52.0340, 113.4994),
+    "благовещенск": (50.2907, 127.5272),
+    "абакан": (53.7212, 91.4424),
+    "южно-сахалинск": (46.9591, 142.7380),
+    "петропавловск-камчатский": (53.0370, 158.6559),
+    "магадан": (59.5680, 150.8085),
+    "минск": (53.9006, 27.5590),
+    "алматы": (43.2220, 76.8512),
+    "астана": (51.1694, 71.4491),
+}
+
+# Сокращения и латинские написания
+CITY_ALIASES: Dict[str, str] = {
+    "мск": "москва",
+    "moscow": "москва",
+    "спб": "санкт-петербург",
+    "питер": "санкт-петербург",
+    "петербург": "санкт-петербург",
+    "saint petersburg": "санкт-петербург",
+    "st petersburg": "санкт-петербург",
+    "st-petersburg": "санкт-петербург",
+    "новгород": "великий новгород",
+    "нск": "новосибирск",
+    "novosibirsk": "новосибирск",
+    "ekaterinburg": "екатеринбург",
+    "yekaterinburg": "екатеринбург",
+    "екб": "екатеринбург",
+    "kazan": "казань",
+    "nizhny novgorod": "нижний новгород",
+    "ростов": "ростов-на-дону",
+    "rostov-on-don": "ростов-на-дону",
+    "krasnodar": "краснодар",
+    "samara": "самара",
+    "ufa": "уфа",
+    "perm": "пермь",
+    "voronezh": "воронеж",
+    "vladivostok": "владивосток",
+    "челны": "набережные челны",
+}
+
+_NAMES: Dict[str, Coordinates] = {
+    **CITIES,
+    **{alias: CITIES[city] for alias, city in CITY_ALIASES.items()},
+}
+# Самое длинное название в словах: столько слов подряд проверяется в тексте
+_MAX_WORDS = max(len(name.split()) for name in _NAMES)
+_WORD = re.compile(r"[a-zа-я0-9]+(?:-[a-zа-я0-9]+)*")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower().replace("ё", "е"))
+
+
+def geocode(text: Optional[str]) -> Optional[Coordinates]:
+    """Координаты первого города, упомянутого в тексте.
+
+    Пример:
+         geocode("г. Нижний Новгород, ул. Рождественская 1")  # (56.2965, 43.9361)
+
+    Returns:
+        Optional[Coordinates]: (широта, долгота) или None, если город не найден
+    """
+    words = _words(text or "")
+    for start in range(len(words)):
+        for size in range(min(_MAX_WORDS, len(words) - start), 0, -1):
+            coordinates = _NAMES.get(" ".join(words[start:start + size]))
+            if coordinates is not None:
+                return coordinates
+    return None
+
+
+def resolve(
+        latitude: Optional[float],
+        longitude: Optional[float],
+        address: Optional[str]
+) -> Optional[Coordinates]:
+    """Явные координаты, если заданы, иначе геокодирование адреса."""
+    if latitude is not None and longitude is not None:
+        return latitude, longitude
+    return geocode(address)
+
+
+def unit_vectors(points: Iterable[Coordinates]) -> np.ndarray:
+    """Точки на единичной сфере (N x 3): хорда монотонна расстоянию по поверхности."""
+    coordinates = np.radians(np.asarray(list(points), dtype=np.float64).reshape(-1, 2))
+    lat, lon = coordinates[:, 0], coordinates[:, 1]
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def chord_to_km(chord):
+    """Расстояние по поверхности Земли для хорды единичной сферы."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.asarray(chord) / 2))
+
+
+def distance_km(a: Coordinates, b: Coordinates) -> float:
+    """Расстояние по большому кругу между двумя точками (км)."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
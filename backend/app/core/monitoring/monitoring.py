@@ -1,6 +1,6 @@
 from time import time
 from fastapi import Request, Response, HTTPException
-from prometheus_client import Counter, Histogram, generate_latest, REGISTRY
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, REGISTRY
 
 # Unified metric definitions
 PAYMENT_METRICS = {
@@ -26,6 +26,94 @@ ORDER_METRICS = {
         'order_status_transitions_total',
         'Order status transitions',
         ['from', 'to']
+    ),
+    'sla_events': Counter(
+        'order_sla_events_total',
+        'Production deadline events (at_risk, overdue)',
+        ['kind']
+    )
+}
+
+CACHE_METRICS = {
+    'requests': Counter(
+        'cache_requests_total',
+        'Cache lookups by result',
+        ['namespace', 'result']
+    ),
+    'invalidations': Counter(
+        'cache_tag_invalidations_total',
+        'Invalidated cache tags',
+        ['namespace']
+    )
+}
+
+FACTORY_METRICS = {
+    'reservations': Counter(
+        'factory_reservations_total',
+        'Factory capacity reservations by result',
+        ['result']
+    ),
+    'dispatch_latency': Histogram(
+        'factory_dispatch_latency_seconds',
+        'Time from queueing an order to factory acknowledgement',
+        ['mode'],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    ),
+    'dispatch_batch_size': Histogram(
+        'factory_dispatch_batch_size',
+        'Orders per factory dispatch',
+        buckets=(1, 2, 5, 10, 20, 50, 100)
+    ),
+    'dispatch_failures': Counter(
+        'factory_dispatch_failures_total',
+        'Orders not delivered to a factory after retries',
+        ['mode']
+    ),
+    'in_flight': Gauge(
+        'factory_dispatch_in_flight',
+        'In-flight factory API requests',
+        ['factory']
+    ),
+    'health_latency': Gauge(
+        'factory_health_latency_seconds',
+        'EWMA latency of factory API calls',
+        ['factory']
+    ),
+    'health_error_rate': Gauge(
+        'factory_health_error_rate',
+        'EWMA share of failed factory API calls',
+        ['factory']
+    ),
+    'health_penalty': Gauge(
+        'factory_health_penalty',
+        'Health penalty added to factory selection rank',
+        ['factory']
+    ),
+    'circuit_state': Gauge(
+        'factory_circuit_state',
+        'Factory circuit breaker state (0 closed, 1 half-open, 2 open)',
+        ['factory']
+    ),
+    'last_success': Gauge(
+        'factory_last_success_timestamp_seconds',
+        'Unix time of the last successful factory API call',
+        ['factory']
+    )
+}
+
+NOTIFICATION_METRICS = {
+    'created': Counter(
+        'notifications_created_total',
+        'Notifications written to the database',
+        ['type']
+    ),
+    'published': Counter(
+        'notifications_published_total',
+        'Notifications published to user push channels'
+    ),
+    'push_subscribers': Gauge(
+        'notification_push_subscribers',
+        'Open notification push connections in this process'
     )
 }
 
@@ -0,0 +1,140 @@
+"""
+Доставка уведомлений в реальном времени через Redis Pub/Sub.
+
+После COMMIT уведомления публикуются в персональные каналы
+notifications:{user_id} (пачками через pipeline — один round trip на
+NOTIFICATION_PUBLISH_CHUNK сообщений). Каждый процесс API держит одно
+PubSub-соединение и подписан только на каналы пользователей, подключённых
+к нему (SSE): первое подключение пользователя подписывает канал,
+последнее отключение — отписывает. Сообщения раздаются по очередям
+подключений; очередь ограничена, при переполнении (медленный клиент)
+вытесняются самые старые сообщения.
+
+Pub/Sub не хранит сообщения: клиент, переподключившись, догружает
+пропущенное через список уведомлений.
+"""
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.logger.logger import logger
+from app.core.monitoring.monitoring import NOTIFICATION_METRICS
+from app.core.redis import redis_client
+
+CHANNEL_PREFIX = "notifications:"
+NOTIFICATION_PUBLISH_CHUNK = 1000
+
+
+def user_channel(user_id: UUID) -> str:
+    """Канал Pub/Sub пользователя."""
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+async def publish_many(messages: Iterable[Tuple[UUID, str]]) -> int:
+    """Публикует сообщения (user_id, JSON) в каналы получателей.
+
+    Returns:
+        int: Количество опубликованных сообщений
+    """
+    published = 0
+    pipe = redis_client.client.pipeline(transaction=False)
+    for user_id, data in messages:
+        pipe.publish(user_channel(user_id), data)
+        published += 1
+        if len(pipe) >= NOTIFICATION_PUBLISH_CHUNK:
+            await pipe.execute()
+    if len(pipe):
+        await pipe.execute()
+    NOTIFICATION_METRICS['published'].inc(published)
+    return published
+
+
+class NotificationHub:
+    """
+    Раздача push-уведомлений подключениям текущего процесса.
+
+    Пример использования:
+         async with notification_hub.subscribe(user.id) as queue:
+             while True:
+                 data = await queue.get()  # JSON уведомления
+                 ...
+    """
+
+    def __init__(self, queue_size: int = settings.NOTIFICATION_PUSH_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._queues: Dict[str, Set[asyncio.Queue]] = {}
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: UUID) -> AsyncIterator[asyncio.Queue]:
+        """Очередь уведомлений пользователя на время подключения."""
+        channel = user_channel(user_id)
+        first, queue = self._attach(channel)
+        try:
+            if first:
+                if self._pubsub is None:
+                    self._pubsub = redis_client.client.pubsub()
+                await self._pubsub.subscribe(channel)
+            if self._listener is None or self._listener.done():
+                self._listener = asyncio.create_task(self._listen())
+            yield queue
+        finally:
+            if self._detach(channel, queue) and self._pubsub is not None:
+                with suppress(Exception):
+                    await self._pubsub.unsubscribe(channel)
+
+    async def close(self) -> None:
+        """Останавливает приём сообщений (при остановке приложения)."""
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    def _attach(self, channel: str) -> Tuple[bool, asyncio.Queue]:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        queues = self._queues.setdefault(channel, set())
+        queues.add(queue)
+        NOTIFICATION_METRICS['push_subscribers'].inc()
+        return len(queues) == 1, queue
+
+    def _detach(self, channel: str, queue: asyncio.Queue) -> bool:
+        """Убирает очередь; True, если у канала не осталось подписчиков."""
+        queues = self._queues.get(channel)
+        if queues is None or queue not in queues:
+            return False
+        queues.discard(queue)
+        NOTIFICATION_METRICS['push_subscribers'].dec()
+        if queues:
+            return False
+        del self._queues[channel]
+        return True
+
+    def _deliver(self, channel: str, data: str) -> None:
+        for queue in self._queues.get(channel, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(data)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Переподключение и повторную подписку выполняет redis-py
+                logger.error(f"Notification pubsub failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if message is not None:
+                self._deliver(message["channel"], message["data"])
+
+
+notification_hub = NotificationHub()
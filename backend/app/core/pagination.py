@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+
+class InvalidCursorError(ValueError):
+    """Курсор пагинации повреждён или выдан для другого запроса."""
+
+
+def encode_cursor(*values: Any) -> str:
+    """Кодирует ключ последней строки страницы в непрозрачный курсор.
+
+    Args:
+        values: Значения ключа сортировки (datetime, UUID, числа, строки)
+
+    Returns:
+        str: base64url-строка без паддинга
+    """
+    payload = [
+        v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, UUID) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> List[Any]:
+    """Декодирует курсор и приводит значения к ожидаемым типам.
+
+    Args:
+        cursor: Курсор из ответа API
+        types: Типы значений ключа (datetime, UUID, int, float, str)
+
+    Returns:
+        List[Any]: Значения ключа сортировки
+
+    Raises:
+        InvalidCursorError: Если курсор нельзя разобрать
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise InvalidCursorError("Malformed cursor")
+        return [
+            None if value is None
+            else datetime.fromisoformat(value) if type_ is datetime
+            else type_(value)
+            for value, type_ in zip(payload, types)
+        ]
+    except InvalidCursorError:
+        raise
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+
+
+def split_page(rows: Sequence[Any], limit: int) -> tuple[Sequence[Any], bool]:
+    """Отделяет лишнюю (limit + 1) строку, запрошенную для проверки следующей страницы.
+
+    Returns:
+        tuple: (строки страницы, есть ли следующая страница)
+    """
+    return rows[:limit], len(rows) > limit
+
+
+def optional_cursor(cursor: Optional[str], types: Sequence[type]) -> Optional[List[Any]]:
+    """decode_cursor() для необязательного параметра запроса."""
+    return decode_cursor(cursor, types) if cursor else None
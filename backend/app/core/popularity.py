@@ -0,0 +1,127 @@
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Set
+from uuid import UUID
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logger.logger import logger
+from app.core.redis import redis_client
+
+# Начало отсчёта логарифмических очков (2025-01-01 UTC)
+EPOCH = 1735689600
+
+# Вес событий в популярности товара
+EVENT_WEIGHTS = {
+    "view": 1.0,
+    "cart": 3.0,
+    "order": 10.0,
+}
+
+# Товары с затухшим очком ниже порога удаляются из рейтинга
+MIN_SCORE = 0.01
+
+# score := log(exp(score) + exp(x)) без переполнения.
+# KEYS: рейтинг; ARGV: товар, x
+_LOG_ADD = """
+local x = tonumber(ARGV[2])
+local old = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if old then
+    old = tonumber(old)
+    local hi, lo = math.max(old, x), math.min(old, x)
+    x = hi + math.log(1 + math.exp(lo - hi))
+end
+redis.call('ZADD', KEYS[1], x, ARGV[1])
+return tostring(x)
+"""
+
+
+def decay_rate(half_life: float) -> float:
+    """Скорость экспоненциального затухания (1/сек) для периода полураспада."""
+    return math.log(2) / half_life
+
+
+def event_log_score(weight: float, at: float, rate: float) -> float:
+    """Логарифм вклада события: ln(weight * e^(rate * (at - EPOCH))).
+
+    Вместо затухания всех накопленных очков новые события «инфлируются»
+    на e^(rate * t): порядок товаров тот же, что у затухающей суммы, а
+    хранение в логарифмах не переполняется со временем.
+    """
+    return rate * (at - EPOCH) + math.log(weight)
+
+
+def decayed_score(log_score: float, now: float, rate: float) -> float:
+    """Затухшее к моменту now значение: Σ weight * e^(-rate * (now - at))."""
+    return math.exp(log_score - rate * (now - EPOCH))
+
+
+class PopularityTracker:
+    """
+    Рейтинг популярности товаров с экспоненциальным затуханием в Redis ZSET.
+
+    Каждое событие (просмотр, добавление в корзину, заказ) прибавляет
+    вклад одним атомарным Lua-вызовом; затухание не требует переписывать
+    очки всех товаров (см. event_log_score). Топ товаров — ZREVRANGE.
+
+    Ошибки Redis при учёте событий логируются и не прерывают запрос.
+
+    Пример использования:
+         await popularity_tracker.bump(item_id, "view")
+         top = await popularity_tracker.top(limit=20)
+    """
+
+    def __init__(self, half_life: float, key: str = "popularity:market_items"):
+        self.rate = decay_rate(half_life)
+        self.key = key
+        self.redis = redis_client.client
+        self._log_add = self.redis.register_script(_LOG_ADD)
+
+    async def bump(self, item_id: UUID, event: str, count: int = 1, at: Optional[float] = None) -> None:
+        """Учитывает событие по товару.
+
+        Args:
+            item_id: ID товара
+            event: Тип события (view, cart, order)
+            count: Количество событий (например, товаров в заказе)
+            at: Момент события, unix time (по умолчанию — сейчас)
+        """
+        x = event_log_score(EVENT_WEIGHTS[event] * count, at or time.time(), self.rate)
+        try:
+            await self._log_add(keys=[self.key], args=[str(item_id), repr(x)])
+        except RedisError as e:
+            logger.warning(f"Popularity bump failed for {item_id}: {e}")
+
+    async def top(self, limit: int = 20, offset: int = 0) -> List[UUID]:
+        """Самые популярные товары (ZREVRANGE), начиная с позиции offset."""
+        ids = await self.redis.zrevrange(self.key, offset, offset + limit - 1)
+        return [UUID(item_id) for item_id in ids]
+
+    async def count(self) -> int:
+        """Число товаров в рейтинге (ZCARD)."""
+        return await self.redis.zcard(self.key)
+
+    async def ranked(self, item_ids: Sequence[UUID]) -> Set[UUID]:
+        """Товары из item_ids, которые есть в рейтинге (ZMSCORE)."""
+        if not item_ids:
+            return set()
+        scores = await self.redis.zmscore(self.key, [str(item_id) for item_id in item_ids])
+        return {item_id for item_id, score in zip(item_ids, scores) if score is not None}
+
+    async def snapshot(self, now: Optional[float] = None) -> Dict[UUID, float]:
+        """Затухшие к текущему моменту очки всех товаров рейтинга.
+
+        Товары с очком ниже MIN_SCORE удаляются из рейтинга.
+        """
+        now = now or time.time()
+        threshold = self.rate * (now - EPOCH) + math.log(MIN_SCORE)
+        await self.redis.zremrangebyscore(self.key, "-inf", f"({threshold!r}")
+        entries = await self.redis.zrange(self.key, 0, -1, withscores=True)
+        return {
+            UUID(item_id): decayed_score(score, now, self.rate)
+            for item_id, score in entries
+        }
+
+
+popularity_tracker = PopularityTracker(half_life=settings.POPULARITY_HALF_LIFE)
@@ -0,0 +1,30 @@
+"""
+Общий пул процессов для CPU-задач фоновых пересчётов.
+
+Чистые вычисления на Python/NumPy (рекомендации, индекс автодополнения)
+держат GIL; в отдельном процессе они не останавливают event loop.
+Пул создаётся при первой задаче и закрывается в lifespan приложения.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+async def run_cpu(func: Callable[..., T], *args: Any) -> T:
+    """Выполняет func(*args) в пуле процессов (аргументы и результат pickle'ятся)."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=1)
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+def shutdown() -> None:
+    """Останавливает пул (при остановке приложения)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -15,9 +15,14 @@ class RetryManager:
         self, 
         func: Callable[..., Awaitable], 
         *args, 
+        retry_if: Optional[Callable[[Exception], bool]] = None,
         **kwargs
     ) -> Optional[any]:
-        """Execute async function with retry logic"""
+        """Execute async function with retry logic.
+
+        retry_if decides whether an error is worth retrying; errors it
+        rejects are raised immediately. By default every error is retried.
+        """
         retry_count = 0
         current_delay = self.delay
         
@@ -25,6 +30,8 @@ class RetryManager:
             try:
                 return await func(*args, **kwargs)
             except Exception as e:
+                if retry_if is not None and not retry_if(e):
+                    raise
                 retry_count += 1
                 if retry_count > self.max_retries:
                     logger.error(
@@ -0,0 +1,89 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List
+
+from app.core.logger.logger import logger
+from app.core.redis import redis_client
+
+LOCK_PREFIX = "scheduler:lock:"
+
+
+@dataclass
+class PeriodicTask:
+    """Фоновая задача, выполняемая с фиксированным интервалом."""
+    name: str
+    interval: float
+    func: Callable[[], Awaitable[None]]
+    run_on_start: bool = False
+    exclusive: bool = False
+
+
+class Scheduler:
+    """
+    Простой планировщик периодических задач внутри процесса приложения.
+
+    Задачи регистрируются до старта приложения и запускаются в lifespan.
+    Ошибка в задаче логируется и не останавливает цикл.
+
+    Задача с exclusive=True выполняется одним процессом на интервал:
+    запуск берёт в Redis ключ scheduler:lock:{name} (SET NX) на interval
+    секунд и не освобождает его, остальные процессы до истечения ключа
+    запуск пропускают.
+
+    Пример использования:
+         scheduler.add("rollups", 300, refresh_rollups)
+         await scheduler.start()
+         ...
+         await scheduler.stop()
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, PeriodicTask] = {}
+        self._running: List[asyncio.Task] = []
+
+    def add(
+            self,
+            name: str,
+            interval: float,
+            func: Callable[[], Awaitable[None]],
+            run_on_start: bool = False,
+            exclusive: bool = False
+    ) -> None:
+        """Регистрирует задачу (повторная регистрация заменяет старую)."""
+        self._tasks[name] = PeriodicTask(name, interval, func, run_on_start, exclusive)
+
+    async def start(self) -> None:
+        for task in self._tasks.values():
+            self._running.append(
+                asyncio.create_task(self._loop(task), name=f"periodic:{task.name}")
+            )
+        logger.info(f"Scheduler started with {len(self._running)} tasks")
+
+    async def stop(self) -> None:
+        for running in self._running:
+            running.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+        self._running.clear()
+        logger.info("Scheduler stopped")
+
+    @staticmethod
+    async def _loop(task: PeriodicTask) -> None:
+        if not task.run_on_start:
+            await asyncio.sleep(task.interval)
+        while True:
+            try:
+                if not task.exclusive or await redis_client.client.set(
+                        f"{LOCK_PREFIX}{task.name}", "1", nx=True, ex=max(int(task.interval), 1)
+                ):
+                    await task.func()
+                else:
+                    logger.info(f"Periodic task {task.name} skipped: ran on another worker")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Periodic task {task.name} failed: {e}", exc_info=True)
+            await asyncio.sleep(task.interval)
+
+
+# Global instance
+scheduler = Scheduler()
@@ -0,0 +1,123 @@
+"""
+Иерархическое колесо таймеров.
+
+Время делится на тики (resolution секунд). Уровень 0 — sizes[0] слотов по
+одному тику, каждый следующий уровень — sizes[i] слотов размером с полный
+оборот предыдущего. Таймер кладётся на самый нижний уровень, оборот
+которого его вмещает; когда стрелка доходит до слота верхнего уровня,
+его таймеры перекладываются ниже (cascade). Постановка и отмена — O(1),
+продвижение — O(1) на тик плюс число сработавших таймеров.
+
+Таймеры дальше полного оборота всех уровней ждут в overflow и
+раскладываются при каждом обороте верхнего уровня.
+"""
+import math
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+
+# Слотов на уровнях: 60 секунд, 60 минут, 24 часа, 8 суток
+DEFAULT_SIZES = (60, 60, 24, 8)
+
+_DUE = -1
+_OVERFLOW = -2
+
+
+class TimerWheel:
+    """
+    Колесо таймеров с ключами (повторная постановка ключа заменяет таймер).
+
+    Пример использования:
+         wheel = TimerWheel(resolution=1.0, start=time.time())
+         wheel.schedule(("overdue", order_id), deadline.timestamp(), order_id)
+         for key, payload in wheel.advance(time.time()):
+             ...
+    """
+
+    def __init__(self, resolution: float = 1.0, sizes: Sequence[int] = DEFAULT_SIZES, start: float = 0.0):
+        self.resolution = resolution
+        self.sizes = tuple(sizes)
+        # spans[i] — тиков в одном слоте уровня i; spans[-1] — горизонт колеса
+        self.spans = [math.prod(self.sizes[:i]) for i in range(len(self.sizes) + 1)]
+        self._tick = math.floor(start / resolution)
+        self._levels: List[List[Dict[Hashable, Tuple[int, Any]]]] = [
+            [{} for _ in range(size)] for size in self.sizes
+        ]
+        self._due: Dict[Hashable, Tuple[int, Any]] = {}
+        self._overflow: Dict[Hashable, Tuple[int, Any]] = {}
+        self._where: Dict[Hashable, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    @property
+    def now(self) -> float:
+        """Время, до которого колесо продвинуто."""
+        return self._tick * self.resolution
+
+    def schedule(self, key: Hashable, when: float, payload: Any = None) -> None:
+        """Ставит таймер key на момент when (секунды той же шкалы, что и advance)."""
+        self.cancel(key)
+        self._place(key, math.ceil(when / self.resolution), payload)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Снимает таймер; False, если его нет."""
+        where = self._where.pop(key, None)
+        if where is None:
+            return False
+        self._bucket(*where).pop(key, None)
+        return True
+
+    def advance(self, now: float) -> List[Tuple[Hashable, Any]]:
+        """Продвигает стрелку до now и возвращает сработавшие таймеры (key, payload) по времени."""
+        fired = self._pop(self._due)
+        target = math.floor(now / self.resolution)
+        while self._tick < target:
+            self._tick += 1
+            self._cascade()
+            fired.extend(self._pop(self._levels[0][self._tick % self.sizes[0]]))
+            # Таймеры, переложенные ровно на текущий тик
+            fired.extend(self._pop(self._due))
+        return fired
+
+    def _place(self, key: Hashable, ticks: int, payload: Any) -> None:
+        delta = ticks - self._tick
+        if delta <= 0:
+            where = (_DUE, 0)
+        elif delta >= self.spans[-1]:
+            where = (_OVERFLOW, 0)
+        else:
+            level = next(i for i in range(len(self.sizes)) if delta < self.spans[i + 1])
+            where = (level, (ticks // self.spans[level]) % self.sizes[level])
+        self._bucket(*where)[key] = (ticks, payload)
+        self._where[key] = where
+
+    def _bucket(self, level: int, slot: int) -> Dict[Hashable, Tuple[int, Any]]:
+        if level == _DUE:
+            return self._due
+        if level == _OVERFLOW:
+            return self._overflow
+        return self._levels[level][slot]
+
+    def _cascade(self) -> None:
+        """Перекладывает слоты верхних уровней, чей момент наступил."""
+        for level in range(1, len(self.sizes) + 1):
+            if self._tick % self.spans[level]:
+                break
+            if level == len(self.sizes):
+                entries, self._overflow = self._overflow, {}
+            else:
+                slot = (self._tick // self.spans[level]) % self.sizes[level]
+                entries, self._levels[level][slot] = self._levels[level][slot], {}
+            for key, (ticks, payload) in entries.items():
+                self._place(key, ticks, payload)
+
+    def _pop(self, bucket: Dict[Hashable, Tuple[int, Any]]) -> List[Tuple[Hashable, Any]]:
+        if not bucket:
+            return []
+        entries = sorted(bucket.items(), key=lambda item: item[1][0])
+        bucket.clear()
+        for key, _ in entries:
+            self._where.pop(key, None)
+        return [(key, payload) for key, (_, payload) in entries]
@@ -0,0 +1,130 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger.logger import logger
+
+_SESSION_KEY = "unit_of_work"
+
+
+class UnitOfWork:
+    """
+    Единица работы поверх AsyncSession: один COMMIT на бизнес-операцию.
+
+    Репозитории только flush'ат изменения, а фиксирует транзакцию самый
+    внешний блок `async with uow`. Вложенные блоки (сервис внутри запроса,
+    сервис внутри сервиса) присоединяются к внешнему без лишних запросов:
+    исключение, покинувшее вложенный блок, отменяет его on_commit-действия,
+    а изменения откатываются вместе со всей транзакцией. Если исключение
+    перехватывается и работа продолжается, изменения блока нужно изолировать
+    явным `uow.savepoint()` — только он выполняет SAVEPOINT.
+
+    Экземпляр привязан к сессии (хранится в session.info), получать его
+    нужно через UnitOfWork.of(session).
+
+    Пример использования:
+         async with UnitOfWork.of(session) as uow:
+             order = await order_repo.create(...)
+             async with uow.savepoint():
+                 await notification_repo.create(...)  # ошибка откатит только это
+             uow.on_commit(lambda: ws_manager.broadcast(...))
+
+    Отложенный flush (opt-in): внутри `async with uow.deferred_flush()`
+    репозитории не flush'ат после каждого вызова, а новые объекты пишутся
+    одним flush на выходе из блока — SQLAlchemy объединяет INSERT'ы одной
+    таблицы в executemany. Первичный ключ и Python-умолчания колонок
+    заполняются сразу (BaseRepository.create), серверные значения доступны
+    только после выхода из блока. Запрос внутри блока вызывает autoflush
+    накопленного.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._depth = 0
+        self._deferred_depth = 0
+        # Число on_commit-действий на входе в каждый открытый блок
+        self._marks: List[int] = []
+        self._on_commit: List[Callable[[], Awaitable[None]]] = []
+
+    @classmethod
+    def of(cls, session: AsyncSession) -> "UnitOfWork":
+        """Возвращает единицу работы сессии (создаёт при первом обращении)."""
+        uow = session.info.get(_SESSION_KEY)
+        if uow is None:
+            uow = session.info[_SESSION_KEY] = cls(session)
+        return uow
+
+    @property
+    def deferred(self) -> bool:
+        """Включён ли отложенный flush."""
+        return self._deferred_depth > 0
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._marks.append(len(self._on_commit))
+        self._depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._depth -= 1
+        mark = self._marks.pop()
+        if self._depth:
+            if exc_type is not None:
+                del self._on_commit[mark:]
+            return
+        if exc_type is None:
+            await self.commit()
+        else:
+            await self.rollback()
+
+    async def flush(self) -> None:
+        """Отправляет накопленные изменения в БД (если flush не отложен)."""
+        if not self.deferred:
+            await self.session.flush()
+
+    async def commit(self) -> None:
+        """Фиксирует транзакцию и выполняет отложенные до коммита действия."""
+        await self.session.commit()
+        callbacks, self._on_commit = self._on_commit, []
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"on_commit callback failed: {e}", exc_info=True)
+
+    async def rollback(self) -> None:
+        """Откатывает транзакцию и отменяет действия, ожидавшие коммита."""
+        self._on_commit.clear()
+        await self.session.rollback()
+
+    @asynccontextmanager
+    async def savepoint(self) -> AsyncIterator["UnitOfWork"]:
+        """SAVEPOINT внутри текущей транзакции.
+
+        Исключение внутри блока откатывает только изменения блока и его
+        on_commit-действия.
+        """
+        mark = len(self._on_commit)
+        try:
+            async with self.session.begin_nested():
+                yield self
+        except BaseException:
+            del self._on_commit[mark:]
+            raise
+
+    @asynccontextmanager
+    async def deferred_flush(self) -> AsyncIterator["UnitOfWork"]:
+        """Откладывает flush репозиториев до выхода из блока."""
+        self._deferred_depth += 1
+        try:
+            yield self
+        finally:
+            self._deferred_depth -= 1
+        await self.flush()
+
+    def on_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Регистрирует действие, выполняемое только после успешного COMMIT.
+
+        Ошибка в действии логируется и не влияет на уже зафиксированные данные.
+        """
+        self._on_commit.append(callback)
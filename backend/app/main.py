@@ -14,7 +14,18 @@ from app.core.errors import APIError, api_error_handler
 from app.core.monitoring import setup_monitoring
 from app.core.webhooks import webhook_manager
 from app.services.order import handle_order_webhook
+from app.services.production import redeliver_failed_dispatches, run_production_planner
 from app.core.redis import redis_client 
+from app.core.notification_bus import notification_hub
+from app.core import process_pool
+from app.core.scheduler import scheduler
+from app.services.marketplace import snapshot_popularity, warm_catalog_cache
+from app.services.order_analytics import refresh_order_status_rollups
+from app.services.autocomplete import rebuild_autocomplete
+from app.services.factory_assignment import refresh_factory_loads
+from app.services.factory_dispatch import dispatch_queue
+from app.services.recommendations import rebuild_recommendations
+from app.services.sla_monitor import sla_monitor
 
 YooKassaConfig.setup(settings)
 
@@ -51,8 +62,76 @@ async def lifespan(app: FastAPI):
     # Import and register the webhook handler
 
     webhook_manager.register("order.created")(handle_order_webhook)
-    
+
+    scheduler.add(
+        "order_status_rollups",
+        settings.ORDER_STATUS_ROLLUP_INTERVAL,
+        refresh_order_status_rollups,
+        run_on_start=True
+    )
+    scheduler.add(
+        "catalog_cache_warmup",
+        settings.CATALOG_CACHE_WARM_INTERVAL,
+        warm_catalog_cache,
+        run_on_start=True,
+        exclusive=True
+    )
+    scheduler.add(
+        "popularity_snapshot",
+        settings.POPULARITY_SNAPSHOT_INTERVAL,
+        snapshot_popularity,
+        exclusive=True
+    )
+    scheduler.add(
+        "recommendations_rebuild",
+        settings.RECOMMENDATIONS_REBUILD_INTERVAL,
+        rebuild_recommendations,
+        run_on_start=True,
+        exclusive=True
+    )
+    scheduler.add(
+        "autocomplete_rebuild",
+        settings.AUTOCOMPLETE_REBUILD_INTERVAL,
+        rebuild_autocomplete,
+        run_on_start=True
+    )
+    scheduler.add(
+        "factory_load_refresh",
+        settings.FACTORY_LOAD_REFRESH_INTERVAL,
+        refresh_factory_loads,
+        run_on_start=True
+    )
+    scheduler.add(
+        "factory_dispatch_redelivery",
+        settings.FACTORY_DISPATCH_REDELIVERY_INTERVAL,
+        redeliver_failed_dispatches,
+        exclusive=True
+    )
+    scheduler.add(
+        "production_planner",
+        settings.PRODUCTION_PLAN_INTERVAL,
+        run_production_planner,
+        exclusive=True
+    )
+    scheduler.add(
+        "sla_refill",
+        settings.SLA_REFILL_INTERVAL,
+        sla_monitor.refill,
+        run_on_start=True
+    )
+    scheduler.add(
+        "sla_tick",
+        settings.SLA_TICK_INTERVAL,
+        sla_monitor.tick
+    )
+    await scheduler.start()
+
     yield
+
+    await scheduler.stop()
+    await dispatch_queue.close()
+    await notification_hub.close()
+    process_pool.shutdown()
     
 
 app = FastAPI(
@@ -26,6 +26,11 @@ from .chat import ChatMessage
 from .order import Order
 from .subscription import Subscription
 from .notifications import Notification
+from .order_status_event import (
+    OrderStatusEvent,
+    OrderStatusDurationRollup,
+    OrderStatusRollupState
+)
 
 __all__ = [
     "User", 
@@ -37,5 +42,8 @@ __all__ = [
     "Payment",
     "Review",
     "ChatMessage",
-    "Notification"
+    "Notification",
+    "OrderStatusEvent",
+    "OrderStatusDurationRollup",
+    "OrderStatusRollupState"
 ]
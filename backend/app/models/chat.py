@@ -60,5 +60,5 @@ class ChatMessage(Base):
     )
 
     # Связи с другими моделями
-    order: Mapped["Order"] = relationship(back_populates="chat_messages")
-    sender: Mapped["User"] = relationship()
+    order: Mapped["Order"] = relationship(back_populates="chat_messages", lazy="raise")
+    sender: Mapped["User"] = relationship(lazy="raise")
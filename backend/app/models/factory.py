@@ -26,6 +26,9 @@ class Factory(Base):
     id: Mapped[UUID] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100))
     location: Mapped[str] = mapped_column(String(200))
+    # Координаты; если не заданы, берутся по городу из location (см. app.core.geo)
+    latitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    longitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     specialization: Mapped[str] = mapped_column(String(100))
     rating: Mapped[float] = mapped_column(Float)
     contact_email: Mapped[str] = mapped_column(String(100))
@@ -42,5 +45,5 @@ class Factory(Base):
     orders: Mapped[list["Order"]] = relationship(
         "Order",
         back_populates="factory",
-        lazy="dynamic"
+        lazy="raise"
     )
@@ -47,11 +47,11 @@ class Generation(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     external_task_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     is_liked: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
-    user: Mapped["User"] = relationship(back_populates="generation_tasks")
+    user: Mapped["User"] = relationship(back_populates="generation_tasks", lazy="raise")
     orders: Mapped[List["Order"]] = relationship(
         "Order",
         back_populates="generation_task",
-        lazy="selectin"
+        lazy="raise"
     )
         
 
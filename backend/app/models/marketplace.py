@@ -5,11 +5,13 @@
 - Factory: производственные предприятия
 """
 from __future__ import annotations 
+from datetime import datetime
 from uuid import UUID
 
 # from app.models.order import Order
 # from app.models.user import User
-from sqlalchemy import Integer, String, ForeignKey, JSON, Float, CheckConstraint
+from sqlalchemy import Integer, String, ForeignKey, Float, CheckConstraint, Computed, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -23,6 +25,17 @@ from app.models.base import Base
 #     DIGITAL = "digital"  # Цифровые продукты
 
 
+# Конфигурации полнотекстового поиска каталога
+SEARCH_CONFIGS = ("russian", "english")
+
+# Генерируемый tsvector: название (вес A) и описание (вес B) во всех конфигурациях
+SEARCH_VECTOR_SQL = " || ".join(
+    f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+    for column, weight in (("title", "A"), ("description", "B"))
+    for config in SEARCH_CONFIGS
+)
+
+
 class MarketItem(Base):
     """Модель товара на маркетплейсе"""
     __tablename__ = "market_items"
@@ -31,6 +44,29 @@ class MarketItem(Base):
             "item_type IN ('BANNER', 'STANDEE', 'BILLBOARD', 'DIGITAL')",
             name="check_product_type"
         ),
+        Index("ix_market_items_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_market_items_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"}
+        ),
+        # Фильтры по спецификациям: specs @> '{...}' (см. spec_condition)
+        Index(
+            "ix_market_items_specs",
+            "specs",
+            postgresql_using="gin",
+            postgresql_ops={"specs": "jsonb_path_ops"}
+        ),
+        # Keyset-пагинация каталога: ключ сортировки + id (см. MarketplaceRepository.browse_items)
+        Index("ix_market_items_price_id", "price", "id"),
+        Index("ix_market_items_rating_id", text("rating DESC"), text("id DESC")),
+        Index("ix_market_items_created_id", text("created_at DESC"), text("id DESC")),
+        Index("ix_market_items_popularity_id", text("popularity DESC"), text("id DESC")),
+        Index(
+            "ix_market_items_type_created_id",
+            "item_type", text("created_at DESC"), text("id DESC")
+        ),
     )
 
     # Основные характеристики товара
@@ -40,10 +76,33 @@ class MarketItem(Base):
     item_type: Mapped[str] = mapped_column(String(50))
     price: Mapped[int] = mapped_column(Integer)
     preview_url: Mapped[str] = mapped_column(String(500))
-    specs: Mapped[dict] = mapped_column(JSON)
+    specs: Mapped[dict] = mapped_column(JSONB)
     rating: Mapped[float] = mapped_column(Float, default=0.0)
     designer_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.now,
+        server_default=func.now()
+    )
+    popularity: Mapped[float] = mapped_column(Float, default=0.0, server_default="0")
+
+    # Агрегаты отзывов, поддерживаются ReviewRepository; rating = rating_sum / rating_count.
+    # rating_histogram[i] — число отзывов с оценкой i (индексы 1..5, как в PostgreSQL)
+    rating_sum: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    rating_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    rating_histogram: Mapped[list[int]] = mapped_column(
+        ARRAY(Integer),
+        default=lambda: [0] * 5,
+        server_default="{0,0,0,0,0}"
+    )
+
+    # Поисковый вектор (см. app.repositories.catalog_search); не загружается по умолчанию
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(SEARCH_VECTOR_SQL, persisted=True),
+        deferred=True
+    )
 
     # Связи
-    designer: Mapped["User"] = relationship()
-    orders: Mapped[list["Order"]] = relationship(back_populates="market_item")
+    designer: Mapped["User"] = relationship(lazy="raise")
+    orders: Mapped[list["Order"]] = relationship(back_populates="market_item", lazy="raise")
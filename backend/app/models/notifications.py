@@ -72,7 +72,7 @@ class Notification(Base):
     read_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     # Связи
-    user: Mapped["User"] = relationship(back_populates="notifications")
+    user: Mapped["User"] = relationship(back_populates="notifications", lazy="raise")
 
     def __repr__(self):
         return f"<Notification {self.id} ({self.type}) for user {self.user_id}>"
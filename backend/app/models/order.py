@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, Dict, List
 
 from app.core.order_status import OrderStatus
-from sqlalchemy import UUID, Integer, String, ForeignKey, JSON, Float, CheckConstraint
+from sqlalchemy import UUID, Integer, String, ForeignKey, Computed, Float, CheckConstraint, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from app.models.base import Base
@@ -36,18 +36,53 @@ class Order(Base):
     )
 
     amount: Mapped[int] = mapped_column(Integer, nullable=False)
+    design_specs: Mapped[Dict] = mapped_column(JSONB, nullable=False, default=dict)
+    # Тип продукта для маршрутизации на фабрики: вычисляется PostgreSQL из design_specs.
+    # left() — длинное значение из design_specs не должно ронять INSERT ("value too long")
+    product_type: Mapped[Optional[str]] = mapped_column(
+        String(100),
+        Computed("left(lower(design_specs ->> 'product_type'), 100)", persisted=True)
+    )
     created_at: Mapped[datetime] = mapped_column(default=datetime.now)
     production_deadline: Mapped[Optional[datetime]] = mapped_column(nullable=True)
 
+    # Доставка: город или адрес и его координаты (см. app.core.geo)
+    delivery_city: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    latitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    longitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    # Последнее событие контроля сроков: at_risk / overdue (см. SLAMonitor)
+    sla_state: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+
+    # Ход производства на фабрике (pending, in_progress, completed, failed, shipped;
+    # dispatch_failed — задание не дошло до фабрики и ждёт повторной отправки)
+    # и причина отмены; время переходов статуса — в order_status_events
+    production_status: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    production_notes: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    cancellation_reason: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # Платёж, которым оплачивается заказ (один платёж на все заказы оформления корзины).
+    # use_alter: payments.order_id ссылается обратно на orders
+    payment_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("payments.id", use_alter=True, name="fk_orders_payment_id"),
+        nullable=True,
+        index=True
+    )
+
     # Связи
-    user: Mapped["User"] = relationship(back_populates="orders")
+    user: Mapped["User"] = relationship(back_populates="orders", lazy="raise")
     generation_task: Mapped["Generation"] = relationship(
         "Generation",
         foreign_keys="[Order.generation_id]",
         back_populates="orders",
-        lazy="selectin"
+        lazy="raise"
+    )
+    payment: Mapped[Optional["Payment"]] = relationship(
+        foreign_keys="[Order.payment_id]",
+        back_populates="orders",
+        lazy="raise"
     )
-    payment: Mapped["Payment"] = relationship(back_populates="order")
 
     # Производственные данные
     factory_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("factories.id"), nullable=True)
@@ -57,18 +92,35 @@ class Order(Base):
     chat_messages: Mapped[List["ChatMessage"]] = relationship(
         back_populates="order",
         cascade="all, delete-orphan",
-        order_by="ChatMessage.created_at"
+        order_by="ChatMessage.created_at",
+        lazy="raise"
     )
 
     # Связи с производством
-    factory: Mapped[Optional["Factory"]] = relationship(back_populates="orders")
-    market_item: Mapped[Optional["MarketItem"]] = relationship(back_populates="orders")
-    review: Mapped[Optional["Review"]] = relationship(back_populates="order")
+    factory: Mapped[Optional["Factory"]] = relationship(back_populates="orders", lazy="raise")
+    market_item: Mapped[Optional["MarketItem"]] = relationship(back_populates="orders", lazy="raise")
+    review: Mapped[Optional["Review"]] = relationship(back_populates="order", lazy="raise")
 
     __table_args__ = (
         CheckConstraint(
             "status IN ('created', 'paid', 'production', 'shipped', 'completed', 'cancelled')",
             name="check_valid_order_status"
         ),
+        # Keyset-пагинация заказов пользователя (см. OrderRepository.get_by_user_page)
+        Index("ix_orders_user_created_id", "user_id", text("created_at DESC"), text("id DESC")),
+        Index(
+            "ix_orders_user_status_created_id",
+            "user_id", "status", text("created_at DESC"), text("id DESC")
+        ),
+        # Отзывы товара маркетплейса (см. ReviewRepository.get_item_page)
+        Index("ix_orders_market_item_id", "market_item_id"),
+        # Очереди заказов по типу продукта (см. OrderRepository.list_awaiting_assignment)
+        Index("ix_orders_product_type_status", "product_type", "status"),
+        # Пополнение таймеров SLA (см. OrderRepository.get_production_deadlines)
+        Index(
+            "ix_orders_production_deadline",
+            "production_deadline",
+            postgresql_where=text("status = 'production'")
+        ),
     )
     
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Модели истории статусов заказов.
+
+Содержит:
+- OrderStatusEvent: append-only журнал переходов статусов (партиционирован по месяцам)
+- OrderStatusDurationRollup: дневные агрегаты времени пребывания в статусе
+- OrderStatusRollupState: водяной знак инкрементального пересчёта агрегатов
+"""
+from __future__ import annotations
+import uuid
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import UUID, Boolean, Date, DateTime, Float, Index, Integer, String, false
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class OrderStatusEvent(Base):
+    """Событие смены статуса заказа.
+
+    Таблица только дополняется (без UPDATE/DELETE) и партиционирована
+    по месяцам по полю created_at. Поэтому первичный ключ составной:
+    PostgreSQL требует, чтобы ключ партиционирования входил в PK.
+
+    Атрибуты:
+        id: Идентификатор события
+        created_at: Момент перехода (ключ партиционирования)
+        order_id: ID заказа
+        factory_id: ID фабрики на момент перехода (если назначена)
+        from_status: Предыдущий статус (None для создания заказа)
+        to_status: Новый статус
+        backfilled: Событие восстановлено миграцией (момент перехода неизвестен,
+            интервал не учитывается в статистике)
+    """
+    __tablename__ = "order_status_events"
+    __table_args__ = (
+        Index("ix_order_status_events_order_created", "order_id", "created_at"),
+        Index(
+            "ix_order_status_events_factory_created",
+            "factory_id",
+            "created_at",
+            postgresql_where="factory_id IS NOT NULL"
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        primary_key=True,
+        default=datetime.now
+    )
+    order_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    factory_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), nullable=True)
+    from_status: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    to_status: Mapped[str] = mapped_column(String(50), nullable=False)
+    backfilled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
+
+
+class OrderStatusDurationRollup(Base):
+    """Дневной агрегат времени пребывания заказов в статусе.
+
+    Строка описывает все интервалы статуса status, закрытые в день day
+    (по фабрике factory_id). Длительности хранятся в секундах.
+    """
+    __tablename__ = "order_status_duration_rollups"
+    __table_args__ = (
+        Index("ix_order_status_duration_rollups_day_status", "day", "status"),
+        Index("ix_order_status_duration_rollups_factory_day", "factory_id", "day"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    status: Mapped[str] = mapped_column(String(50), nullable=False)
+    factory_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), nullable=True)
+    transitions: Mapped[int] = mapped_column(Integer, nullable=False)
+    avg_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    p50_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    p90_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    p95_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    max_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class OrderStatusRollupState(Base):
+    """Водяной знак пересчёта агрегатов (одна строка на агрегат)."""
+    __tablename__ = "order_status_rollup_state"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    watermark: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
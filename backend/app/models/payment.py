@@ -4,12 +4,12 @@
 Содержит:
 - Данные платежа
 - Статусы оплаты
-- Связь с заказом
+- Связь с оплачиваемыми заказами
 """
 from __future__ import annotations 
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 # from app.models.order import Order
 from sqlalchemy import UUID, Integer, String, ForeignKey, JSON, Numeric, CheckConstraint
@@ -47,5 +47,10 @@ class Payment(Base):
     payment_metadata: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.now)
 
-    # Связи
-    order: Mapped["Order"] = relationship(back_populates="payment")
+    # Связи: order — заказ, для которого создан платёж, orders — все оплачиваемые им заказы
+    order: Mapped["Order"] = relationship(foreign_keys=[order_id], lazy="raise")
+    orders: Mapped[List["Order"]] = relationship(
+        foreign_keys="[Order.payment_id]",
+        back_populates="payment",
+        lazy="raise"
+    )
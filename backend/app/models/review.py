@@ -46,4 +46,4 @@ class Review(Base):
     )
 
     # Связь с заказом (каскадное удаление не нужно)
-    order: Mapped["Order"] = relationship(back_populates="review")
+    order: Mapped["Order"] = relationship(back_populates="review", lazy="raise")
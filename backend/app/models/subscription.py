@@ -52,4 +52,5 @@ class Subscription(Base):
     # Связи
     user: Mapped["User"] = relationship(
         back_populates="subscription",
+        lazy="raise"
     )
@@ -54,17 +54,19 @@ class User(Base):
     # Связи с другими моделями (используем строковые ссылки)
     generation_tasks: Mapped[List["GenerationTask"]] = relationship(
         back_populates="user",
-        lazy="selectin"
+        lazy="raise"
     )
-    orders: Mapped[List["Order"]] = relationship(back_populates="user")
+    orders: Mapped[List["Order"]] = relationship(back_populates="user", lazy="raise")
     subscription: Mapped["Subscription"] = relationship(
         back_populates="user",
-        uselist=False
+        uselist=False,
+        lazy="raise"
     )
     notifications: Mapped[List["Notification"]] = relationship(
         back_populates="user",
         cascade="all, delete-orphan",
-        order_by="Notification.created_at.desc()"
+        order_by="Notification.created_at.desc()",
+        lazy="raise"
     )
     is_guest: Mapped[bool] = mapped_column(default=False)
     device_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
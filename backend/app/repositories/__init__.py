@@ -3,6 +3,7 @@ from .generation import GenerationRepository
 from .marketplace import MarketplaceRepository
 from .order import OrderRepository
 from .payment import PaymentRepository
+from .review import ReviewRepository
 from .subscription import SubscriptionRepository
 from .user import UserRepository
 
@@ -13,5 +14,6 @@ __all__ = [
     'PaymentRepository',
     'SubscriptionRepository',
     'MarketplaceRepository',
-    'FactoryRepository'
+    'FactoryRepository',
+    'ReviewRepository'
 ]
@@ -1,15 +1,28 @@
+import json
 from datetime import datetime
-from typing import TypeVar, Generic, Optional, Sequence, Any, Union
+from typing import TYPE_CHECKING, TypeVar, Generic, Iterable, List, Mapping, Optional, Sequence, Any, Union
 from uuid import UUID
 
-from sqlalchemy import update, delete, select, and_
+from sqlalchemy import JSON, Column, update, delete, insert, select, and_, column, values
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.interfaces import ORMOption
 from sqlalchemy.sql.expression import Select
 
+from app.core.unit_of_work import UnitOfWork
 from app.models.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Размер пачки для многострочных VALUES (лимит asyncpg — 32767 параметров)
+BULK_CHUNK_SIZE = 1000
+# Начиная с этого числа строк bulk_create без RETURNING идёт через COPY
+COPY_THRESHOLD = 5000
+
+if TYPE_CHECKING:
+    from app.repositories.projection import Projection, SchemaType
+
 
 class BaseRepository(Generic[ModelType]):
     """
@@ -26,6 +39,8 @@ class BaseRepository(Generic[ModelType]):
     2. Работает с SQLAlchemy async session
     3. Поддерживает Generic типы для работы с любой моделью
     4. Обрабатывает базовые ошибки БД
+    5. Не коммитит: изменения только flush'атся, транзакцию фиксирует
+       UnitOfWork (один COMMIT на запрос или сервисную операцию)
 
     Примечания:
     - Для мягкого удаления модель должна иметь поля is_deleted и deleted_at
@@ -42,17 +57,28 @@ class BaseRepository(Generic[ModelType]):
         self.model = model
         self.session = session
 
-    async def get(self, id: UUID, include_deleted: bool = False) -> Optional[ModelType]:
+    @property
+    def uow(self) -> UnitOfWork:
+        """Единица работы сессии репозитория."""
+        return UnitOfWork.of(self.session)
+
+    async def get(
+            self,
+            id: UUID,
+            include_deleted: bool = False,
+            options: Sequence[ORMOption] = ()
+    ) -> Optional[ModelType]:
         """Получение одной записи по ID.
 
         Args:
             id: UUID записи
             include_deleted: Включать ли удалённые записи (по умолчанию False)
+            options: Профиль загрузки связей (см. app.repositories.load_profiles)
 
         Returns:
             Optional[ModelType]: Найденная запись или None
         """
-        query = select(self.model).where(self.model.id == id)
+        query = select(self.model).where(self.model.id == id).options(*options)
         if not include_deleted and hasattr(self.model, 'is_deleted'):
             query = query.where(self.model.is_deleted == False)
 
@@ -71,11 +97,18 @@ class BaseRepository(Generic[ModelType]):
         if not isinstance(obj_in, dict):
             obj_in = obj_in.dict()
 
-        db_obj = self.model(**obj_in)
-        self.session.add(db_obj)
-        await self.session.commit()
-        await self.session.refresh(db_obj)
-        return db_obj
+        if self.uow.deferred:
+            # INSERT уйдёт одним executemany с соседними при выходе из
+            # deferred_flush; id и Python-умолчания нужны вызывающему сразу
+            db_obj = self.model(**self._with_defaults(obj_in))
+            self.session.add(db_obj)
+            return db_obj
+
+        # Один round trip: INSERT ... RETURNING вместо flush + refresh
+        result = await self.session.scalars(
+            insert(self.model).values(**obj_in).returning(self.model)
+        )
+        return result.one()
 
     async def update(self, id: UUID, obj_in: Union[dict, Any]) -> Optional[ModelType]:
         """Обновление существующей записи.
@@ -90,13 +123,165 @@ class BaseRepository(Generic[ModelType]):
         if not isinstance(obj_in, dict):
             obj_in = obj_in.dict(exclude_unset=True)
 
-        await self.session.execute(
+        return await self.update_returning(self.model.id == id, obj_in)
+
+    async def update_returning(self, where: Any, values: dict) -> Optional[ModelType]:
+        """UPDATE ... RETURNING: обновляет запись и возвращает её за один запрос.
+
+        Args:
+            where: Условие отбора (например, Model.id == id)
+            values: Новые значения полей
+
+        Returns:
+            Optional[ModelType]: Обновлённая запись или None если не найдена
+        """
+        result = await self.session.scalars(
             update(self.model)
-            .where(self.model.id == id)
-            .values(**obj_in)
+            .where(where)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        return result.first()
+
+    async def bulk_create(
+            self,
+            rows: Sequence[Mapping[str, Any]],
+            returning: bool = True
+    ) -> Sequence[ModelType]:
+        """Массовая вставка.
+
+        С returning=True — многострочный INSERT ... RETURNING (SQLAlchemy
+        разбивает его на пачки insertmanyvalues). Без RETURNING наборы от
+        COPY_THRESHOLD строк загружаются через COPY.
+
+        Args:
+            rows: Значения колонок для каждой строки
+            returning: Вернуть созданные записи
+
+        Returns:
+            Sequence[ModelType]: Созданные записи (пусто при returning=False)
+        """
+        if not rows:
+            return []
+        if returning:
+            result = await self.session.scalars(
+                insert(self.model).returning(self.model), rows
+            )
+            return result.all()
+        if len(rows) >= COPY_THRESHOLD:
+            await self._copy_rows(rows)
+        else:
+            await self.session.execute(insert(self.model), rows)
+        return []
+
+    async def bulk_update(
+            self,
+            rows: Sequence[Mapping[str, Any]],
+            key: str = "id"
+    ) -> int:
+        """Массовое обновление: UPDATE ... FROM (VALUES ...) пачками по BULK_CHUNK_SIZE.
+
+        Все строки должны содержать одинаковый набор полей. Объекты в
+        identity map не синхронизируются — метод для пакетных задач.
+
+        Args:
+            rows: Значения полей по именам атрибутов модели; каждая строка
+                содержит ключ key
+            key: Атрибут, по которому сопоставляются строки
+
+        Returns:
+            int: Количество обновлённых строк
+        """
+        if not rows:
+            return 0
+
+        table = self.model.__table__
+        names = [key, *(name for name in rows[0] if name != key)]
+        key_column, *columns = self._columns(names)
+        updated = 0
+        for chunk in _chunks(rows, BULK_CHUNK_SIZE):
+            data = values(
+                *(column(c.name, c.type) for c in (key_column, *columns)),
+                name="data"
+            ).data([tuple(row[name] for name in names) for row in chunk])
+            result = await self.session.execute(
+                update(table)
+                .where(table.c[key_column.name] == data.c[key_column.name])
+                .values({c.name: data.c[c.name] for c in columns})
+            )
+            updated += result.rowcount
+        return updated
+
+    async def upsert(
+            self,
+            rows: Sequence[Mapping[str, Any]],
+            conflict_columns: Sequence[str],
+            update_columns: Optional[Sequence[str]] = None
+    ) -> Sequence[ModelType]:
+        """INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+
+        Args:
+            rows: Значения колонок для каждой строки
+            conflict_columns: Колонки уникального ограничения
+            update_columns: Колонки, перезаписываемые при конфликте
+                (по умолчанию все переданные, кроме conflict_columns)
+
+        Returns:
+            Sequence[ModelType]: Вставленные или обновлённые записи
+        """
+        if not rows:
+            return []
+
+        stmt = pg_insert(self.model)
+        if update_columns is None:
+            update_columns = [name for name in rows[0] if name not in conflict_columns]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[c.name for c in self._columns(conflict_columns)],
+            set_={c.name: stmt.excluded[c.name] for c in self._columns(update_columns)}
+        )
+        result = await self.session.scalars(
+            stmt.returning(self.model).execution_options(populate_existing=True),
+            rows
+        )
+        return result.all()
+
+    def _columns(self, names: Iterable[str]) -> List[Column]:
+        """Колонки таблицы по именам атрибутов модели (имя колонки может отличаться)."""
+        attrs = sa_inspect(self.model).column_attrs
+        table = self.model.__table__
+        return [attrs[name].columns[0] if name in attrs else table.c[name] for name in names]
+
+    def _with_defaults(self, obj_in: Mapping[str, Any]) -> dict:
+        """Значения строки, дополненные Python-умолчаниями колонок (default=...)."""
+        values = dict(obj_in)
+        mapper = sa_inspect(self.model)
+        for c in self.model.__table__.columns:
+            key = mapper.get_property_by_column(c).key
+            if key not in values and _has_python_default(c):
+                values[key] = _default_value(c)
+        return values
+
+    async def _copy_rows(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        """Загружает строки через COPY (asyncpg), заполняя Python-умолчания колонок."""
+        table = self.model.__table__
+        mapper = sa_inspect(self.model)
+        keys = {c.name: mapper.get_property_by_column(c).key for c in table.columns}
+        columns = [c for c in table.columns if keys[c.name] in rows[0] or _has_python_default(c)]
+
+        def value(c, row):
+            v = row[keys[c.name]] if keys[c.name] in row else _default_value(c)
+            # asyncpg-кодек SQLAlchemy для json/jsonb принимает строку
+            return json.dumps(v) if isinstance(c.type, JSON) and v is not None else v
+
+        records = [tuple(value(c, row) for c in columns) for row in rows]
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            records=records,
+            columns=[c.name for c in columns]
         )
-        await self.session.commit()
-        return await self.get(id, include_deleted=True)
 
     async def delete(self, id: UUID) -> bool:
         """Физическое удаление записи из БД.
@@ -110,7 +295,6 @@ class BaseRepository(Generic[ModelType]):
         result = await self.session.execute(
             delete(self.model).where(self.model.id == id)
         )
-        await self.session.commit()
         return result.rowcount > 0
 
     async def soft_delete(self, id: UUID) -> bool:
@@ -202,6 +386,23 @@ class BaseRepository(Generic[ModelType]):
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def fetch_projected(
+            self,
+            projection: "Projection[SchemaType]",
+            query: Select
+    ) -> List["SchemaType"]:
+        """Выполняет колоночный запрос и строит схемы ответа без ORM-гидратации.
+
+        Args:
+            projection: Проекция (см. app.repositories.projection)
+            query: Запрос, построенный от projection.select()
+
+        Returns:
+            List[SchemaType]: Схемы ответа в порядке строк результата
+        """
+        result = await self.session.execute(query)
+        return projection.validate(result.all())
+
     def _apply_filters(self, query: Select, filters: Optional[dict] = None) -> Select:
         """Применяет дополнительные фильтры к запросу.
 
@@ -227,3 +428,16 @@ class BaseRepository(Generic[ModelType]):
             query = query.where(and_(*conditions))
 
         return query
+
+
+def _chunks(rows: Sequence[Any], size: int) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _has_python_default(c: Column) -> bool:
+    return c.default is not None and (c.default.is_scalar or c.default.is_callable)
+
+
+def _default_value(c: Column) -> Any:
+    return c.default.arg(None) if c.default.is_callable else c.default.arg
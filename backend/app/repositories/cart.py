@@ -0,0 +1,95 @@
+from typing import Dict, Mapping
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+# Максимальное количество одного товара в корзине (см. CartItemAdd)
+MAX_ITEM_QUANTITY = 10
+
+# Изменение количества с ограничением [0, max] и продлением TTL корзины.
+# KEYS: корзина; ARGV: товар, приращение, максимум, ttl
+_ADD = """
+local quantity = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+local max = tonumber(ARGV[3])
+if quantity > max then
+    redis.call('HSET', KEYS[1], ARGV[1], max)
+    quantity = max
+elseif quantity <= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    quantity = 0
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return quantity
+"""
+
+# Списание оформленных количеств: добавленное после снимка корзины остаётся.
+# KEYS: корзина; ARGV: пары (товар, количество)
+_DISCARD = """
+for i = 1, #ARGV, 2 do
+    if redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[i + 1])) <= 0 then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+return redis.call('HLEN', KEYS[1])
+"""
+
+
+class CartRepository:
+    """
+    Корзина пользователя в Redis.
+
+    Корзина — hash cart:<user_id> (товар -> количество) с TTL, который
+    продлевается при каждом изменении. Изменения количества атомарны
+    (Lua-скрипты), поэтому параллельные запросы не теряют обновлений.
+
+    Пример использования:
+         await cart_repo.add(user_id, item_id, 2)
+         cart = await cart_repo.get(user_id)  # {item_id: 2}
+         await cart_repo.discard(user_id, cart)  # после оформления заказа
+    """
+
+    def __init__(self, ttl: int = settings.CART_TTL):
+        self.ttl = ttl
+        self.redis = redis_client.client
+        self._add = self.redis.register_script(_ADD)
+        self._discard = self.redis.register_script(_DISCARD)
+
+    async def add(self, user_id: UUID, item_id: UUID, quantity: int = 1) -> int:
+        """Изменяет количество товара (отрицательное quantity уменьшает).
+
+        Returns:
+            int: Новое количество (0 — товар удалён из корзины)
+        """
+        return await self._add(
+            keys=[self._key(user_id)],
+            args=[str(item_id), quantity, MAX_ITEM_QUANTITY, self.ttl]
+        )
+
+    async def get(self, user_id: UUID) -> Dict[UUID, int]:
+        """Содержимое корзины: товар -> количество."""
+        raw = await self.redis.hgetall(self._key(user_id))
+        return {UUID(item_id): int(quantity) for item_id, quantity in raw.items()}
+
+    async def remove(self, user_id: UUID, item_id: UUID) -> bool:
+        """Удаляет товар из корзины.
+
+        Returns:
+            bool: False, если товара в корзине не было
+        """
+        return await self.redis.hdel(self._key(user_id), str(item_id)) > 0
+
+    async def discard(self, user_id: UUID, items: Mapping[UUID, int]) -> int:
+        """Атомарно списывает из корзины оформленные количества.
+
+        Returns:
+            int: Число позиций, оставшихся в корзине
+        """
+        args = []
+        for item_id, quantity in items.items():
+            args += [str(item_id), quantity]
+        return await self._discard(keys=[self._key(user_id)], args=args)
+
+    @staticmethod
+    def _key(user_id: UUID) -> str:
+        return f"cart:{user_id}"
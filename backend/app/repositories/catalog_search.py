@@ -0,0 +1,50 @@
+"""
+Полнотекстовый поиск по каталогу маркетплейса.
+
+market_items.search_vector — генерируемая (STORED) колонка tsvector:
+название с весом A и описание с весом B, каждое в конфигурациях
+russian и english. Колонка покрыта GIN-индексом, title — GIN-индексом
+pg_trgm для устойчивости к опечаткам (см. миграцию d91a4c7e2f60).
+
+Совпадение: tsquery по любой конфигурации ИЛИ триграммное сходство
+названия. Ранг: ts_rank, смешанный со сходством названия и рейтингом.
+"""
+from sqlalchemy import func, literal, or_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.marketplace import SEARCH_CONFIGS, MarketItem
+
+# Вклад компонентов в итоговый ранг (в сумме 1)
+TEXT_RANK_WEIGHT = 0.6
+TRIGRAM_RANK_WEIGHT = 0.25
+RATING_RANK_WEIGHT = 0.15
+
+def search_tsquery(text: str) -> ColumnElement:
+    """websearch_to_tsquery по всем конфигурациям, объединённые через ||."""
+    queries = [
+        func.websearch_to_tsquery(literal(config).cast(REGCONFIG), text)
+        for config in SEARCH_CONFIGS
+    ]
+    query = queries[0]
+    for other in queries[1:]:
+        query = query.op("||")(other)
+    return query
+
+
+def search_condition(text: str) -> ColumnElement:
+    """Условие совпадения: полнотекстовое или триграммное (опечатки)."""
+    return or_(
+        MarketItem.search_vector.op("@@")(search_tsquery(text)),
+        MarketItem.title.op("%")(text),
+    )
+
+
+def search_rank(text: str) -> ColumnElement:
+    """Ранг результата: ts_rank + сходство названия + рейтинг (0..5 -> 0..1)."""
+    return (
+        func.ts_rank(MarketItem.search_vector, search_tsquery(text)) * TEXT_RANK_WEIGHT
+        + func.similarity(MarketItem.title, text) * TRIGRAM_RANK_WEIGHT
+        + MarketItem.rating / 5.0 * RATING_RANK_WEIGHT
+    )
+
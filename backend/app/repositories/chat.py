@@ -77,5 +77,4 @@ class ChatRepository(BaseRepository[ChatMessage]):
             .values(is_read=True)
             .returning(ChatMessage.id)
         )
-        await self.session.commit()
         return len(result.scalars().all())
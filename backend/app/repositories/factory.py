@@ -1,7 +1,7 @@
-from typing import Optional, Sequence
+from typing import Any, Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy import update
+from sqlalchemy import Row, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -15,7 +15,7 @@ class FactoryRepository(BaseRepository[Factory]):
 
     Основная функциональность:
     - Поиск фабрик по специализации
-    - Управление загрузкой фабрик (increment/decrement_load)
+    - Управление загрузкой фабрик (reserve/release_capacity — атомарно)
     - Подбор оптимальной фабрики для заказа
 
     Бизнес-логика:
@@ -88,6 +88,93 @@ class FactoryRepository(BaseRepository[Factory]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def load_snapshot(self) -> Sequence[Row[Any]]:
+        """Загрузка активных фабрик для FactoryLoadIndex.
+
+        Returns:
+            Sequence[Row]: (id, specialization, current_load, production_capacity,
+                rating, service_level, latitude, longitude, location)
+        """
+        result = await self.session.execute(
+            select(
+                Factory.id,
+                Factory.specialization,
+                Factory.current_load,
+                Factory.production_capacity,
+                Factory.rating,
+                Factory.service_level,
+                Factory.latitude,
+                Factory.longitude,
+                Factory.location
+            ).where(Factory.is_active.is_(True), Factory.production_capacity > 0)
+        )
+        return result.all()
+
+    async def get_for_planning(self) -> Sequence[Factory]:
+        """Активные фабрики для пакетного планирования (без блокировки).
+
+        Загрузка может измениться, пока решается план; перед записью
+        фабрики плана блокируются в lock_loads.
+        """
+        result = await self.session.scalars(
+            select(Factory)
+            .where(Factory.is_active.is_(True), Factory.production_capacity > 0)
+            .order_by(Factory.id)
+        )
+        return result.all()
+
+    async def lock_loads(self, factory_ids: Sequence[UUID]) -> Sequence[Row[Any]]:
+        """Блокирует (FOR UPDATE) фабрики плана до конца транзакции и читает их загрузку.
+
+        Пока план записывается, reserve_capacity по этим фабрикам ждёт его
+        COMMIT, поэтому план и одиночные назначения не превышают мощность вместе.
+
+        Returns:
+            Sequence[Row]: (id, current_load, production_capacity) активных фабрик
+        """
+        result = await self.session.execute(
+            select(Factory.id, Factory.current_load, Factory.production_capacity)
+            .where(Factory.id.in_(factory_ids), Factory.is_active.is_(True))
+            .order_by(Factory.id)
+            .with_for_update()
+        )
+        return result.all()
+
+    async def reserve_capacity(self, factory_id: UUID) -> Optional[int]:
+        """Атомарно занимает единицу мощности фабрики.
+
+        Проверка мощности и увеличение загрузки — один UPDATE, поэтому
+        параллельные назначения не могут превысить production_capacity.
+
+        Returns:
+            Optional[int]: Новая загрузка или None, если фабрика заполнена или неактивна
+        """
+        result = await self.session.execute(
+            update(Factory)
+            .where(
+                Factory.id == factory_id,
+                Factory.is_active.is_(True),
+                Factory.current_load < Factory.production_capacity
+            )
+            .values(current_load=Factory.current_load + 1)
+            .returning(Factory.current_load)
+        )
+        return result.scalar_one_or_none()
+
+    async def release_capacity(self, factory_id: UUID, count: int = 1) -> Optional[int]:
+        """Освобождает count единиц мощности фабрики (загрузка не уходит ниже нуля).
+
+        Returns:
+            Optional[int]: Новая загрузка или None, если освобождать нечего
+        """
+        result = await self.session.execute(
+            update(Factory)
+            .where(Factory.id == factory_id, Factory.current_load > 0)
+            .values(current_load=func.greatest(Factory.current_load - count, 0))
+            .returning(Factory.current_load)
+        )
+        return result.scalar_one_or_none()
+
     async def increment_load(self, factory_id: UUID) -> None:
         """Увеличивает текущую загрузку фабрики"""
         await self.session.execute(
@@ -95,7 +182,6 @@ class FactoryRepository(BaseRepository[Factory]):
             .where(Factory.id == factory_id)
             .values(current_load=Factory.current_load + 1)
         )
-        await self.session.commit()
 
     async def decrement_load(self, factory_id: UUID) -> None:
         """Уменьшает текущую загрузку фабрики"""
@@ -104,4 +190,3 @@ class FactoryRepository(BaseRepository[Factory]):
             .where(Factory.id == factory_id)
             .values(current_load=Factory.current_load - 1)
         )
-        await self.session.commit()
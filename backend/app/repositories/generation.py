@@ -7,6 +7,7 @@ from sqlalchemy.future import select
 
 from app.models.generation import Generation
 from .base import BaseRepository
+from .projection import GENERATION_LIST
 from ..schemas import GenerationResponse
 
 
@@ -100,14 +101,32 @@ class GenerationRepository(BaseRepository[Generation]):
             return False
         return True
 
-    # async def get_user_generations(
-    #         self,
-    #         user_id: uuid.UUID,
-    #         limit: int = 100
-    # ) -> List[GenerationResponse]:
-    #     """Получает список генераций пользователя."""
-    #     generations = await self.generation_repo.get_by_user(user_id, limit=limit)
-    #     return [GenerationResponse.model_validate(g) for g in generations]
+    async def get_user_generations(
+            self,
+            user_id: uuid.UUID,
+            limit: int = 100,
+            offset: int = 0
+    ) -> List[GenerationResponse]:
+        """Получает историю генераций пользователя (новые первыми).
+
+        Выбирает только колонки GenerationResponse, без ORM-гидратации.
+
+        Args:
+            user_id: UUID пользователя
+            limit: Лимит записей
+            offset: Смещение
+
+        Returns:
+            List[GenerationResponse]: Генерации пользователя
+        """
+        query = (
+            GENERATION_LIST.select()
+            .where(Generation.user_id == user_id)
+            .order_by(Generation.created_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        return await self.fetch_projected(GENERATION_LIST, query)
 
     async def get_by_user(
         self,
@@ -0,0 +1,57 @@
+"""
+Именованные профили загрузки связей ORM-моделей.
+
+Все связи моделей объявлены с lazy="raise": неявная подгрузка запрещена,
+и запрос загружает только то, что перечислено в профиле. Профиль — это
+кортеж опций загрузчика, который репозитории передают в .options():
+
+    order = await order_repo.get(order_id, options=ORDER_DETAIL)
+
+Добавляя обращение к связи в сервисе, нужно расширить соответствующий
+профиль (или завести новый), иначе SQLAlchemy выбросит InvalidRequestError.
+"""
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from app.models.chat import ChatMessage
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.user import User
+from app.schemas.order import OrderResponse
+
+# Пользователь текущего запроса (get_current_user): только поля UserResponse
+AUTH_PRINCIPAL = (
+    load_only(
+        User.id,
+        User.email,
+        User.role,
+        User.telegram_id,
+        User.created_at,
+    ),
+)
+
+# Карточка заказа: платёж (для возврата) и переписка
+ORDER_DETAIL = (
+    joinedload(Order.payment),
+    selectinload(Order.chat_messages),
+)
+
+# Список заказов: только колонки OrderResponse, без связей. Набор берётся
+# из полей схемы (как в проекции ORDER_RESPONSE_LIST): новое поле ответа
+# не останется незагруженным (MissingGreenlet при сериализации)
+ORDER_LIST = (
+    load_only(*(
+        getattr(Order, name) for name in OrderResponse.model_fields
+        if name in inspect(Order).columns
+    )),
+)
+
+# Сообщение чата с владельцем заказа (проверка прав)
+MESSAGE_WITH_ORDER = (
+    joinedload(ChatMessage.order).load_only(Order.id, Order.user_id),
+)
+
+# Платёж со статусами всех оплачиваемых заказов (проверка перехода в paid)
+PAYMENT_WITH_ORDERS = (
+    selectinload(Payment.orders).load_only(Order.id, Order.status),
+)
@@ -1,20 +1,133 @@
 from __future__ import annotations
 
-from typing import Optional, Any, Sequence
-from uuid import UUID
+import json
+import math
+from typing import Optional, Any, Iterable, List, Mapping, Sequence
+from uuid import UUID, uuid4
 
 
-from sqlalchemy import Row, RowMapping, delete
+from sqlalchemy import (
+    Column, Integer, MetaData, Row, RowMapping, String, Table,
+    all_, and_, case, delete, func, insert, literal, or_, tuple_, update
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.sql.expression import Select
 
+from app.core.order_status import OrderStatus
 from app.models.marketplace import MarketItem
 from app.models.order import Order
 from .base import BaseRepository
-from ..schemas import CartItem
-
+from .load_profiles import ORDER_DETAIL
+from .order import OrderRepository
+from .catalog_search import search_condition, search_rank
+from .projection import MARKET_ITEM_DETAILS, MARKET_ITEM_LIST
+from ..core.cache import catalog_cache
+from ..core.pagination import split_page
+from ..schemas.marketplace import (
+    FacetCount, MarketFacets, MarketItemDetails, MarketItemImport, MarketItem as MarketItemSchema
+)
+
+from ..schemas.notifications import NotificationBase
 from ..services.notifications import NotificationService
 
+# Порядок каталога -> (ключ сортировки, по возрастанию); id добавляется для уникальности
+SORT_KEYS = {
+    "newest": (MarketItem.created_at, False),
+    "price_asc": (MarketItem.price, True),
+    "price_desc": (MarketItem.price, False),
+    "rating": (MarketItem.rating, False),
+    "popularity": (MarketItem.popularity, False),
+}
+
+# Ценовые фасеты: верхняя граница в копейках (не включительно) и подпись в рублях
+PRICE_BANDS = (
+    (100_000, "0-999"),
+    (500_000, "1000-4999"),
+    (2_000_000, "5000-19999"),
+)
+PRICE_BAND_TOP = "20000+"
+# Рейтинговые фасеты шириной 1; 5.0 попадает в "4-5"
+RATING_BAND_MAX = 4
+
+# Тег страниц каталога без фильтра по типу: их затрагивает запись любого товара
+ALL_TYPES_TAG = "type:*"
+
+# Staging-таблица пакетной загрузки: живёт до конца транзакции (ON COMMIT DROP)
+IMPORT_STAGING = Table(
+    "market_items_import",
+    MetaData(),
+    Column("id", PG_UUID(as_uuid=True)),
+    Column("title", String(100)),
+    Column("description", String(1000)),
+    Column("item_type", String(50)),
+    Column("price", Integer),
+    Column("preview_url", String(500)),
+    Column("specs", JSONB),
+    Column("designer_id", PG_UUID(as_uuid=True)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def _id_array(ids: Iterable[UUID]):
+    """Список ID одним параметром-массивом (для = ANY / != ALL без лимита параметров)."""
+    return literal(list(ids), ARRAY(PG_UUID(as_uuid=True)))
+
+
+def item_card_tags(item_id: UUID) -> List[str]:
+    """Теги карточки товара: её сбрасывает только запись самого товара."""
+    return [f"item:{item_id}"]
+
+
+def item_cache_tags(item_id: UUID, item_type: Optional[str] = None) -> List[str]:
+    """Теги кэша, затрагиваемые записью товара (карточка и страницы его типа)."""
+    tags = [*item_card_tags(item_id), ALL_TYPES_TAG]
+    if item_type:
+        tags.append(f"type:{item_type.upper()}")
+    return tags
+
+
+def page_cache_tags(item_type: Optional[str]) -> List[str]:
+    """Теги страницы каталога: по типу товара из фильтра или все типы."""
+    return [f"type:{item_type.upper()}"] if item_type else [ALL_TYPES_TAG]
+
+
+def spec_condition(predicates: Sequence[str]) -> ColumnElement[bool]:
+    """Условие по спецификациям: каждый предикат key:value — containment specs @> ...
+
+    Ключ может быть вложенным (print.color:red -> {"print": {"color": "red"}}).
+    Значение сравнивается как строка и, если разбирается как конечное
+    JSON-число или bool, ещё и как это значение; совпадает и элемент массива (tags:outdoor).
+    Все варианты — операторы @>, которые обслуживает GIN-индекс jsonb_path_ops.
+    """
+    conditions = []
+    for predicate in predicates:
+        key, _, raw = predicate.partition(":")
+        values: List[Any] = [raw]
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            parsed = None
+        # NaN и Infinity Python разбирает, но в jsonb их нет: такие значения — только строки
+        if isinstance(parsed, float) and not math.isfinite(parsed):
+            parsed = None
+        if isinstance(parsed, (int, float, bool)):
+            values.append(parsed)
+
+        variants = []
+        for value in values:
+            for leaf in (value, [value]):
+                document: Any = leaf
+                for part in reversed(key.split(".")):
+                    document = {part: document}
+                variants.append(MarketItem.specs.contains(document))
+        conditions.append(or_(*variants))
+    return and_(*conditions)
+
 
 class MarketplaceRepository(BaseRepository[MarketItem]):
     """
@@ -22,7 +135,7 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
 
     Основная функциональность:
     - Управление товарами маркетплейса
-    - Работа с корзиной пользователя
+    - Каталог: фильтры, keyset-пагинация, фасеты
     - Создание заказов из товаров
 
     Сложная логика:
@@ -30,10 +143,9 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
        - Валидация спецификаций
        - Создание платежа
        - Уведомления участникам
-       - Очистка корзины
 
     2. Фильтрация товаров:
-       - По типу, цене, рейтингу
+       - По типу, цене, рейтингу, спецификациям (JSONB @>)
        - Поиск по названию
        - Сортировка по популярности
 
@@ -57,6 +169,122 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
         self.payment_service = payment_service
         self.notification_service = notification_service
 
+    async def create(self, obj_in: Any) -> MarketItem:
+        """Создаёт товар; кэш каталога сбрасывается после COMMIT."""
+        item = await super().create(obj_in)
+        self._invalidate_on_commit(item_cache_tags(item.id, item.item_type))
+        return item
+
+    async def update_returning(self, where: Any, values: dict) -> Optional[MarketItem]:
+        """Обновляет товар и сбрасывает его карточку и страницы его типа."""
+        # При смене типа товар уходит со страниц старого типа — их тоже сбрасываем
+        old_types = []
+        if "item_type" in values:
+            old_types = (await self.session.scalars(select(MarketItem.item_type).where(where))).all()
+
+        item = await super().update_returning(where, values)
+        if item is not None:
+            tags = item_cache_tags(item.id, item.item_type)
+            tags += [f"type:{t}" for t in old_types if t != item.item_type]
+            self._invalidate_on_commit(tags)
+        return item
+
+    async def bulk_create(self, rows: Sequence[Mapping[str, Any]], returning: bool = True) -> Sequence[MarketItem]:
+        """Массовая вставка товаров со сбросом страниц затронутых типов."""
+        items = await super().bulk_create(rows, returning)
+        self._invalidate_on_commit(
+            [ALL_TYPES_TAG, *{f"type:{row['item_type'].upper()}" for row in rows}]
+            + [f"item:{item.id}" for item in items]
+        )
+        return items
+
+    async def bulk_update(self, rows: Sequence[Mapping[str, Any]], key: str = "id") -> int:
+        """Массовое обновление товаров со сбросом кэша каталога."""
+        # Типы обновлённых товаров заранее не известны — сбрасываем страницы всех типов
+        updated = await super().bulk_update(rows, key)
+        self._invalidate_on_commit(
+            [ALL_TYPES_TAG, *(f"type:{t}" for t in await self._item_types())]
+            + ([f"item:{row['id']}" for row in rows] if key == "id" else [])
+        )
+        return updated
+
+    async def upsert(
+            self,
+            rows: Sequence[Mapping[str, Any]],
+            conflict_columns: Sequence[str],
+            update_columns: Optional[Sequence[str]] = None
+    ) -> Sequence[MarketItem]:
+        """Upsert товаров со сбросом кэша каталога."""
+        items = await super().upsert(rows, conflict_columns, update_columns)
+        self._invalidate_on_commit(
+            [ALL_TYPES_TAG, *(f"type:{t}" for t in await self._item_types())]
+            + [f"item:{item.id}" for item in items]
+        )
+        return items
+
+    async def delete(self, id: UUID) -> bool:
+        """Удаляет товар; карточка и страницы его типа сбрасываются после COMMIT."""
+        result = await self.session.execute(
+            delete(MarketItem).where(MarketItem.id == id).returning(MarketItem.item_type)
+        )
+        item_type = result.scalar_one_or_none()
+        if item_type is None:
+            return False
+        self._invalidate_on_commit(item_cache_tags(id, item_type))
+        return True
+
+    def _invalidate_on_commit(self, tags: Iterable[str]) -> None:
+        """Сбрасывает кэш каталога по тегам после COMMIT текущей единицы работы."""
+        tags = list(dict.fromkeys(tags))
+        self.uow.on_commit(lambda: catalog_cache.invalidate(*tags))
+
+    async def _item_types(self) -> Sequence[str]:
+        """Все типы товаров, присутствующие в каталоге."""
+        result = await self.session.scalars(select(MarketItem.item_type).distinct())
+        return result.all()
+
+    async def stage_import(self, designer_id: UUID, items: Sequence[MarketItemImport]) -> None:
+        """Загружает пачку проверенных строк в staging-таблицу через COPY.
+
+        Таблица создаётся при первой пачке в транзакции; в market_items
+        строки переносит merge_import.
+        """
+        await self.session.execute(CreateTable(IMPORT_STAGING, if_not_exists=True))
+        records = [
+            (
+                uuid4(), item.title, item.description, item.item_type.upper(),
+                item.price, item.preview_url, json.dumps(item.specs), designer_id
+            )
+            for item in items
+        ]
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            IMPORT_STAGING.name,
+            records=records,
+            columns=[c.name for c in IMPORT_STAGING.columns]
+        )
+
+    async def merge_import(self) -> int:
+        """Переносит staging-таблицу в market_items одним INSERT ... SELECT.
+
+        Returns:
+            int: Количество добавленных товаров
+        """
+        staged = IMPORT_STAGING.c
+        item_types = (await self.session.scalars(select(staged.item_type).distinct())).all()
+        columns = [c.name for c in IMPORT_STAGING.columns]
+        result = await self.session.execute(
+            insert(MarketItem).from_select(
+                [*columns, "rating"],
+                select(*IMPORT_STAGING.columns, literal(0.0)),
+                include_defaults=False
+            )
+        )
+        await self.session.execute(delete(IMPORT_STAGING))
+        self._invalidate_on_commit([ALL_TYPES_TAG, *(f"type:{t}" for t in item_types)])
+        return result.rowcount
+
     async def get_item(self, item_id: UUID) -> Optional[MarketItem]:
         """Получает товар по ID."""
         result = await self.session.execute(
@@ -72,8 +300,194 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
             rating: Optional[float] = None,
             search: Optional[str] = None
     ) -> Sequence[Row[Any] | RowMapping | Any]:
-        query = select(MarketItem)
+        query = self._filter_items(
+            select(MarketItem), item_type, min_price, max_price, rating, search
+        )
+        if search:
+            query = query.order_by(search_rank(search).desc())
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def list_items(
+            self,
+            item_type: Optional[str] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            rating: Optional[float] = None,
+            search: Optional[str] = None
+    ) -> List[MarketItemSchema]:
+        """Каталог товаров с фильтрами, собранный из колонок без ORM-гидратации.
+
+        Args:
+            item_type: Тип товара (banner, standee, ...)
+            min_price: Минимальная цена
+            max_price: Максимальная цена
+            rating: Минимальный рейтинг
+            search: Поисковый запрос (название и описание, с учётом опечаток)
+
+        Returns:
+            List[MarketItemSchema]: Товары каталога
+        """
+        query = self._filter_items(
+            MARKET_ITEM_LIST.select(), item_type, min_price, max_price, rating, search
+        )
+        if search:
+            query = query.order_by(search_rank(search).desc())
+        return await self.fetch_projected(MARKET_ITEM_LIST, query)
+
+    async def get_items_by_ids(self, item_ids: Sequence[UUID]) -> dict[UUID, MarketItem]:
+        """Товары по списку ID одним запросом (отсутствующие не возвращаются)."""
+        result = await self.session.scalars(
+            select(MarketItem).where(MarketItem.id.in_(item_ids))
+        )
+        return {item.id: item for item in result}
+
+    async def get_cards(self, item_ids: Sequence[UUID]) -> List[MarketItemSchema]:
+        """Товары каталога по списку ID в порядке списка (отсутствующие пропускаются)."""
+        items = await self.fetch_projected(
+            MARKET_ITEM_LIST, MARKET_ITEM_LIST.select().where(MarketItem.id.in_(item_ids))
+        )
+        by_id = {item.id: item for item in items}
+        return [by_id[item_id] for item_id in item_ids if item_id in by_id]
+
+    async def save_popularity(self, scores: Mapping[UUID, float]) -> int:
+        """Сохраняет снимок популярности; товары вне снимка получают 0.
+
+        Кэш каталога не сбрасывается: страницы по популярности обновляет
+        прогрев (warm_catalog_cache).
+
+        Returns:
+            int: Количество обновлённых товаров
+        """
+        reset = await self.session.execute(
+            update(MarketItem)
+            .where(MarketItem.popularity > 0, MarketItem.id != all_(_id_array(scores)))
+            .values(popularity=0)
+        )
+        updated = await super().bulk_update(
+            [{"id": item_id, "popularity": score} for item_id, score in scores.items()]
+        )
+        return updated + reset.rowcount
+
+    async def get_unranked_ids(self, limit: int, after: Optional[UUID] = None) -> List[UUID]:
+        """ID товаров вне снимка популярности (popularity = 0) по возрастанию id.
+
+        Keyset по id идёт по индексу (popularity, id), поэтому глубина
+        страницы не влияет на стоимость запроса.
+        """
+        query = select(MarketItem.id).where(MarketItem.popularity == 0)
+        if after:
+            query = query.where(MarketItem.id > after)
+        result = await self.session.scalars(query.order_by(MarketItem.id).limit(limit))
+        return list(result)
+
+    async def get_item_details(self, item_id: UUID) -> Optional[MarketItemDetails]:
+        """Карточка товара с агрегатами рейтинга (без отзывов и ORM-гидратации)."""
+        items = await self.fetch_projected(
+            MARKET_ITEM_DETAILS, MARKET_ITEM_DETAILS.select().where(MarketItem.id == item_id)
+        )
+        return items[0] if items else None
+
+    async def browse_items(
+            self,
+            sort: str,
+            limit: int = 20,
+            after: Optional[Sequence[Any]] = None,
+            **filters: Any
+    ) -> tuple[List[MarketItemSchema], Optional[list]]:
+        """Страница каталога с keyset-пагинацией.
+
+        Строки упорядочены по (ключ сортировки, id) в одном направлении,
+        поэтому каждому порядку соответствует один составной индекс
+        (price, rating, created_at, popularity — см. модель MarketItem).
+
+        Args:
+            sort: Порядок (relevance, newest, price_asc, price_desc, rating, popularity)
+            limit: Размер страницы
+            after: Ключ (значение сортировки, id) последнего товара предыдущей страницы
+            filters: Фильтры каталога (item_type, min_price, max_price, rating, search, specs)
 
+        Returns:
+            tuple: Товары страницы и ключ для следующей страницы (None на последней)
+        """
+        key, ascending = self._sort_key(sort, filters.get("search"))
+        query = self._filter_items(
+            MARKET_ITEM_LIST.select().add_columns(key.label("sort_key")), **filters
+        )
+
+        if after:
+            position = tuple_(key, MarketItem.id)
+            query = query.where(position > tuple_(*after) if ascending else position < tuple_(*after))
+        order = (key.asc(), MarketItem.id.asc()) if ascending else (key.desc(), MarketItem.id.desc())
+        query = query.order_by(*order).limit(limit + 1)
+
+        result = await self.session.execute(query)
+        rows, has_more = split_page(result.all(), limit)
+        next_key = [rows[-1].sort_key, rows[-1].id] if has_more else None
+        return MARKET_ITEM_LIST.validate(rows), next_key
+
+    async def item_facets(self, **filters: Any) -> MarketFacets:
+        """Фасеты каталога одним запросом (GROUPING SETS по типу, цене и рейтингу).
+
+        Args:
+            filters: Фильтры каталога (item_type, min_price, max_price, rating, search, specs)
+
+        Returns:
+            MarketFacets: Количество товаров по значениям каждого фасета
+        """
+        price_band = case(
+            *((MarketItem.price < upper, label) for upper, label in PRICE_BANDS),
+            else_=PRICE_BAND_TOP
+        )
+        banded = self._filter_items(
+            select(
+                func.lower(MarketItem.item_type).label("item_type"),
+                price_band.label("price_band"),
+                func.least(func.floor(MarketItem.rating), RATING_BAND_MAX).label("rating_band"),
+            ),
+            **filters
+        ).subquery()
+
+        result = await self.session.execute(
+            select(banded.c.item_type, banded.c.price_band, banded.c.rating_band, func.count())
+            .group_by(func.grouping_sets(banded.c.item_type, banded.c.price_band, banded.c.rating_band))
+        )
+
+        facets = MarketFacets()
+        for item_type, band, rating_band, count in result.all():
+            if item_type is not None:
+                facets.item_type.append(FacetCount(value=item_type, count=count))
+            elif band is not None:
+                facets.price_band.append(FacetCount(value=band, count=count))
+            elif rating_band is not None:
+                lower = int(rating_band)
+                facets.rating_band.append(FacetCount(value=f"{lower}-{lower + 1}", count=count))
+        return facets
+
+    @staticmethod
+    def _sort_key(sort: str, search: Optional[str]) -> tuple[ColumnElement, bool]:
+        """Выражение ключа сортировки и направление (True — по возрастанию)."""
+        if sort == "relevance":
+            if not search:
+                raise ValueError("Sort 'relevance' requires a search query")
+            return search_rank(search), False
+        return SORT_KEYS[sort]
+
+    @staticmethod
+    def _filter_items(
+            query: Select,
+            item_type: Optional[str] = None,
+            min_price: Optional[float] = None,
+            max_price: Optional[float] = None,
+            rating: Optional[float] = None,
+            search: Optional[str] = None,
+            specs: Optional[Sequence[str]] = None
+    ) -> Select:
+        """Применяет фильтры каталога к запросу по market_items.
+
+        Поиск идёт по индексам (tsvector + pg_trgm), фильтры по
+        спецификациям — по GIN-индексу specs (см. spec_condition).
+        """
         if item_type:
             query = query.where(MarketItem.item_type == item_type)
         if min_price:
@@ -83,27 +497,10 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
         if rating:
             query = query.where(MarketItem.rating >= rating)
         if search:
-            query = query.where(MarketItem.title.ilike(f"%{search}%"))
-
-        result = await self.session.execute(query)
-        return result.scalars().all()
-
-    async def add_to_user_cart(
-            self,
-            user_id: UUID,
-            item_id: UUID,
-            quantity: int
-    ) -> CartItem:
-        """Добавляет товар в корзину пользователя."""
-        cart_item = await self.get_cart_item(user_id, item_id)
-        if cart_item:
-            cart_item.quantity += quantity
-        else:
-            cart_item = CartItem(user_id=user_id, item_id=item_id, quantity=quantity)
-            self.session.add(cart_item)
-
-        await self.session.commit()
-        return cart_item
+            query = query.where(search_condition(search))
+        if specs:
+            query = query.where(spec_condition(specs))
+        return query
 
     async def create_order(
             self,
@@ -127,7 +524,9 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
             ValueError: Если товар не найден
         """
         try:
-            async with self.session.begin():
+            # Ошибка превращается в ValueError ниже: частичные записи
+            # откатываются SAVEPOINT'ом, а не уходят в COMMIT запроса
+            async with self.uow, self.uow.savepoint():
                 # Получаем товар
                 item = await self.get_item(item_id)
                 if not item:
@@ -147,39 +546,8 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
 
 
         except Exception as e:
-            await self.session.rollback()
             raise ValueError(f"Failed to create order: {str(e)}")
 
-    async def get_cart_item(
-            self,
-            user_id: UUID,
-            item_id: UUID
-    ) -> Optional[CartItem]:
-        """Получает товар из корзины пользователя."""
-        result = await self.session.execute(
-            select(CartItem)
-            .where(
-                CartItem.user_id == user_id,
-                CartItem.item_id == item_id
-            )
-        )
-        return result.scalar_one_or_none()
-
-    async def remove_from_cart(
-            self,
-            user_id: UUID,
-            item_id: UUID
-    ) -> None:
-        """Удаляет товар из корзины пользователя."""
-        await self.session.execute(
-            delete(CartItem)
-            .where(
-                CartItem.user_id == user_id,
-                CartItem.item_id == item_id
-            )
-        )
-        await self.session.commit()
-
     def _validate_specs(self, specs: dict, item: MarketItem) -> None:
         """Валидирует спецификации заказа."""
         if not isinstance(specs, dict):
@@ -202,9 +570,9 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
                 raise ValueError(f"Field {field} must be {field_type.__name__}")
 
     async def cancel_order(self, order_id: UUID, user_id: UUID) -> None:
-        """Отменяет заказ и возвращает средства."""
-        async with self.session.begin():
-            order = await self.session.get(Order, order_id)
+        """Отменяет неоплаченный заказ."""
+        async with self.uow:
+            order = await self.session.get(Order, order_id, options=ORDER_DETAIL)
             if not order:
                 raise ValueError("Order not found")
 
@@ -214,15 +582,10 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
             if order.status not in [OrderStatus.CREATED, "pending"]:
                 raise ValueError("Order cannot be canceled in current status")
 
-            # Возврат платежа
-            if order.payment:
-                await self.payment_service.refund_payment(order.payment.id)
+            # Заказ ещё не оплачен: если общий платёж корзины пройдёт позже,
+            # сумма отменённого заказа вернётся при его обработке (PaymentService)
+            await OrderRepository(self.session).update(order_id, {"status": OrderStatus.CANCELLED})
 
-            # Обновление статуса
-            order.status = "canceled"
-            await self.session.commit()
-
-            # Уведомление
             await self.notification_service.send(
                 user_id=user_id,
                 title="Order canceled",
@@ -230,34 +593,15 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
                 notification_type="order"
             )
 
-            # После создания заказа:
-            await self.notification_service.send(
-                user_id=user_id,
-                title="Order created",
-                message=f"Your order #{order.id} has been created",
-                notification_type="order"
-            )
-
-            # Для продавца (если у товара есть designer_id):
-            if item.designer_id:
-                await self.notification_service.send(
-                    user_id=item.designer_id,
-                    title="New order for your item",
-                    message=f"Item {item.title} has been ordered",
-                    notification_type="order"
-                )
-
     async def _create_order_and_payment(self, user_id, item_id, amount, specs, item_title):
         """Создает заказ и платеж в транзакции."""
-        order = Order(
-            user_id=user_id,
-            market_item_id=item_id,
-            amount=amount,
-            design_specs=specs,
-            status="created"
-        )
-        self.session.add(order)
-        await self.session.flush()
+        order = await OrderRepository(self.session).create({
+            "user_id": user_id,
+            "market_item_id": item_id,
+            "amount": amount,
+            "design_specs": specs,
+            "status": OrderStatus.CREATED
+        })
 
         payment = await self.payment_service.create_payment(
             order_id=order.id,
@@ -270,24 +614,23 @@ class MarketplaceRepository(BaseRepository[MarketItem]):
 
     async def _post_order_actions(self, user_id, item_id, buyer_id, item, order_id):
         """Выполняет действия после создания заказа."""
-        await self.remove_from_cart(user_id, item_id)
-
-        # Уведомление покупателю
-        await self.notification_service.send(
-            user_id=buyer_id,
-            title="Order created",
-            message=f"Your order #{order_id} has been created",
-            notification_type="order"
-        )
-
-        # Уведомление продавцу
+        # Уведомления покупателю и продавцу — одной вставкой
+        notifications = [
+            NotificationBase(
+                user_id=buyer_id,
+                type="order",
+                title="Order created",
+                message=f"Your order #{order_id} has been created"
+            )
+        ]
         if item.designer_id:
-            await self.notification_service.send(
+            notifications.append(NotificationBase(
                 user_id=item.designer_id,
+                type="order",
                 title="New order for your item",
-                message=f"Item {item.title} has been ordered (Order #{order_id})",
-                notification_type="order"
-            )
+                message=f"Item {item.title} has been ordered (Order #{order_id})"
+            ))
+        await self.notification_service.send_many(notifications)
 
     def _validate_order_creation(self, user_id, item, amount, specs):
         """Валидация данных перед созданием заказа."""
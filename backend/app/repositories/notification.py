@@ -55,7 +55,6 @@ class NotificationRepository(BaseRepository[Notification]):
             .values(status="read", read_at=datetime.now())
             .returning(Notification.id)
         )
-        await self.session.commit()
         return len(result.scalars().all())
 
     async def get_user_notifications(
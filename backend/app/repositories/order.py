@@ -2,15 +2,20 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta
 from os.path import exists
-from typing import Any, Sequence, Optional
+from typing import Any, List, Mapping, Sequence, Optional, Tuple, Union
 from uuid import UUID
 
-from sqlalchemy import Row, RowMapping
+from sqlalchemy import Row, RowMapping, column, tuple_, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.order_status import OrderStatus
 from app.models.order import Order
+from app.schemas.order import OrderResponse
 from .base import BaseRepository
+from .load_profiles import ORDER_LIST
+from .projection import ORDER_RESPONSE_LIST
+from .order_status_event import OrderStatusEventRepository
 
 
 class OrderRepository(BaseRepository[Order]):
@@ -35,10 +40,72 @@ class OrderRepository(BaseRepository[Order]):
     Интеграции:
     - Работает со всеми сервисами, связанными с заказами
     - Основной репозиторий для ProductionService
+    - Каждый переход статуса пишется в order_status_events
+      в той же транзакции (см. OrderStatusEventRepository)
     """
 
     def __init__(self, session: AsyncSession):
         super().__init__(Order, session)
+        self.status_events = OrderStatusEventRepository(session)
+
+    async def create(self, obj_in: Union[dict, Any]) -> Order:
+        """Создаёт заказ и фиксирует начальный статус в истории."""
+        order = await super().create(obj_in)
+        await self.status_events.record(order.id, None, order.status, order.factory_id)
+        return order
+
+    async def bulk_create(
+            self,
+            rows: Sequence[Mapping[str, Any]],
+            returning: bool = True
+    ) -> Sequence[Order]:
+        """Создаёт заказы массовой вставкой и фиксирует начальные статусы.
+
+        С returning=False заказы не гидратируются: id и статус берутся из
+        строк (с Python-умолчаниями колонок), история пишется той же
+        массовой вставкой без RETURNING.
+        """
+        if returning:
+            orders = await super().bulk_create(rows, returning=True)
+            created = [(order.id, order.status, order.factory_id) for order in orders]
+        else:
+            orders = []
+            rows = [self._with_defaults(row) for row in rows]
+            await super().bulk_create(rows, returning=False)
+            created = [(row["id"], row["status"], row.get("factory_id")) for row in rows]
+
+        now = datetime.now()
+        await self.status_events.bulk_create([
+            {
+                "order_id": order_id,
+                "from_status": None,
+                "to_status": status,
+                "factory_id": factory_id,
+                "created_at": now
+            }
+            for order_id, status, factory_id in created
+        ], returning=False)
+        return orders
+
+    async def update(self, id: UUID, obj_in: Union[dict, Any]) -> Optional[Order]:
+        """Обновляет заказ; смена статуса записывается в историю."""
+        if not isinstance(obj_in, dict):
+            obj_in = obj_in.dict(exclude_unset=True)
+
+        if "status" in obj_in:
+            result = await self.session.execute(
+                select(Order.status, Order.factory_id).where(Order.id == id)
+            )
+            current = result.one_or_none()
+            if current and current.status != obj_in["status"]:
+                await self.status_events.record(
+                    id,
+                    current.status,
+                    obj_in["status"],
+                    obj_in.get("factory_id", current.factory_id)
+                )
+
+        return await super().update(id, obj_in)
 
     async def get_by_user(
             self,
@@ -72,10 +139,48 @@ class OrderRepository(BaseRepository[Order]):
         if status:
             query = query.where(Order.status == status)
 
+        query = query.order_by(Order.created_at.desc(), Order.id.desc())
         query = query.offset(skip).limit(limit)
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def get_by_user_page(
+            self,
+            user_id: UUID,
+            limit: int = 20,
+            after: Optional[tuple[datetime, UUID]] = None,
+            status: Optional[str] = None
+    ) -> Sequence[Order]:
+        """
+        Получает страницу заказов пользователя keyset-методом.
+
+        Заказы упорядочены по (created_at DESC, id DESC); следующая страница
+        начинается строго после ключа последней строки предыдущей, поэтому
+        стоимость запроса не зависит от глубины листания. Запрос покрывается
+        индексами ix_orders_user_created_id / ix_orders_user_status_created_id.
+
+        Args:
+            user_id: ID пользователя
+            limit: Размер страницы
+            after: Ключ (created_at, id) последнего заказа предыдущей страницы
+            status: Статус заказа для фильтрации (опционально)
+
+        Returns:
+            Sequence[Order]: До limit + 1 заказов (лишняя строка означает,
+            что есть следующая страница)
+        """
+        query = select(Order).where(Order.user_id == user_id)
+
+        if status:
+            query = query.where(Order.status == status)
+        if after:
+            query = query.where(tuple_(Order.created_at, Order.id) < tuple_(*after))
+
+        query = query.options(*ORDER_LIST)
+        query = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
     async def get_by_status(
             self,
             status: str
@@ -85,6 +190,257 @@ class OrderRepository(BaseRepository[Order]):
         )
         return result.scalars().all()
 
+    async def get_by_ids(self, order_ids: Sequence[UUID]) -> Sequence[Order]:
+        """Заказы по списку ID одним запросом."""
+        result = await self.session.scalars(select(Order).where(Order.id.in_(order_ids)))
+        return result.all()
+
+    async def get_plannable(self, limit: int) -> Sequence[Row[Any]]:
+        """Оплаченные заказы без фабрики для пакетного планирования, старые первыми.
+
+        Строки блокируются FOR UPDATE SKIP LOCKED: заказы, которые сейчас
+        назначаются вручную или другим прогоном, пропускаются.
+
+        Returns:
+            Sequence[Row]: (id, design_specs, created_at, production_deadline,
+                latitude, longitude, delivery_city)
+        """
+        result = await self.session.execute(
+            select(
+                Order.id, Order.design_specs, Order.created_at, Order.production_deadline,
+                Order.latitude, Order.longitude, Order.delivery_city
+            )
+            .where(
+                Order.status == OrderStatus.PAID,
+                Order.factory_id.is_(None),
+                # Заказы без типа продукта не назначаются и не должны занимать лимит прогона
+                Order.product_type.is_not(None)
+            )
+            .order_by(Order.created_at)
+            .limit(limit)
+            .with_for_update(of=Order, skip_locked=True)
+        )
+        return result.all()
+
+    async def bulk_assign(self, assignments: Sequence[Tuple[UUID, UUID, datetime]]) -> int:
+        """Переводит оплаченные заказы в производство одним UPDATE с записью истории.
+
+        Args:
+            assignments: (order_id, factory_id, production_deadline)
+
+        Returns:
+            int: Количество обновлённых заказов
+        """
+        now = datetime.now()
+        await self.status_events.bulk_create([
+            {
+                "order_id": order_id,
+                "from_status": OrderStatus.PAID,
+                "to_status": OrderStatus.PRODUCTION,
+                "factory_id": factory_id,
+                "created_at": now
+            }
+            for order_id, factory_id, _ in assignments
+        ], returning=False)
+        return await self.bulk_update([
+            {
+                "id": order_id,
+                "factory_id": factory_id,
+                "status": OrderStatus.PRODUCTION,
+                "production_status": "pending",
+                "production_deadline": deadline,
+                "sla_state": None
+            }
+            for order_id, factory_id, deadline in assignments
+        ])
+
+    async def mark_paid(self, payment_id: UUID) -> List[UUID]:
+        """Переводит созданные заказы платежа в paid одним UPDATE с записью истории.
+
+        Returns:
+            List[UUID]: Оплаченные заказы (отменённые до оплаты не меняются)
+        """
+        result = await self.session.execute(
+            update(Order)
+            .where(Order.payment_id == payment_id, Order.status == OrderStatus.CREATED)
+            .values(status=OrderStatus.PAID)
+            .returning(Order.id, Order.factory_id)
+        )
+        rows = result.all()
+        now = datetime.now()
+        await self.status_events.bulk_create([
+            {
+                "order_id": order_id,
+                "from_status": OrderStatus.CREATED,
+                "to_status": OrderStatus.PAID,
+                "factory_id": factory_id,
+                "created_at": now
+            }
+            for order_id, factory_id in rows
+        ], returning=False)
+        return [order_id for order_id, _ in rows]
+
+    async def mark_dispatch_failed(self, order_ids: Sequence[UUID]) -> int:
+        """Помечает заказы, задание по которым не дошло до фабрики.
+
+        Меняются только заказы, всё ещё ожидающие отправки в производстве
+        (отменённые и переназначенные за это время не трогаются).
+
+        Returns:
+            int: Количество помеченных заказов
+        """
+        result = await self.session.execute(
+            update(Order)
+            .where(
+                Order.id.in_(order_ids),
+                Order.status == OrderStatus.PRODUCTION,
+                Order.production_status == "pending"
+            )
+            .values(production_status="dispatch_failed")
+        )
+        return result.rowcount
+
+    async def claim_failed_dispatches(self, limit: int) -> Sequence[Order]:
+        """Возвращает в pending заказы с недоставленным заданием для повторной отправки.
+
+        Строки отбираются FOR UPDATE SKIP LOCKED, старые первыми.
+
+        Returns:
+            Sequence[Order]: Заказы, задания по которым нужно отправить снова
+        """
+        claimable = (
+            select(Order.id)
+            .where(
+                Order.status == OrderStatus.PRODUCTION,
+                Order.production_status == "dispatch_failed"
+            )
+            .order_by(Order.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.scalars(
+            update(Order)
+            .where(Order.id.in_(claimable.scalar_subquery()))
+            .values(production_status="pending")
+            .returning(Order)
+            .execution_options(populate_existing=True)
+        )
+        return result.all()
+
+    async def get_production_deadlines(
+            self,
+            since: Optional[datetime],
+            until: datetime
+    ) -> Sequence[Row[Any]]:
+        """Дедлайны заказов в производстве из окна [since, until) для SLAMonitor.
+
+        Использует частичный индекс ix_orders_production_deadline.
+        Заказы с уже зафиксированной просрочкой не возвращаются.
+
+        Returns:
+            Sequence[Row]: (id, production_deadline, sla_state)
+        """
+        query = (
+            select(Order.id, Order.production_deadline, Order.sla_state)
+            .where(
+                Order.status == OrderStatus.PRODUCTION,
+                Order.production_deadline < until,
+                Order.sla_state.is_distinct_from("overdue")
+            )
+        )
+        if since is not None:
+            query = query.where(Order.production_deadline >= since)
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def mark_sla_state(
+            self,
+            order_ids: Sequence[UUID],
+            state: str,
+            deadline_before: datetime
+    ) -> Sequence[Row[Any]]:
+        """Фиксирует событие SLA одним условным UPDATE.
+
+        Строка меняется, только если заказ всё ещё в производстве, его
+        дедлайн не позже deadline_before (срок не переносили) и событие
+        ещё не зафиксировано (overdue может сменить at_risk, но не наоборот).
+
+        Returns:
+            Sequence[Row]: (id, user_id, factory_id, production_deadline) изменённых заказов
+        """
+        not_recorded = (
+            Order.sla_state.is_(None) if state == "at_risk"
+            else Order.sla_state.is_distinct_from("overdue")
+        )
+        result = await self.session.execute(
+            update(Order)
+            .where(
+                Order.id.in_(order_ids),
+                Order.status == OrderStatus.PRODUCTION,
+                Order.production_deadline <= deadline_before,
+                not_recorded
+            )
+            .values(sla_state=state)
+            .returning(Order.id, Order.user_id, Order.factory_id, Order.production_deadline)
+        )
+        return result.all()
+
+    async def lock_factory_orders(
+            self,
+            factory_id: UUID,
+            order_ids: Sequence[UUID]
+    ) -> Sequence[Row[Any]]:
+        """Заказы фабрики из списка, заблокированные (FOR UPDATE) до конца транзакции.
+
+        Returns:
+            Sequence[Row]: (id, status, user_id, factory_id, production_status);
+            чужие и несуществующие заказы отсутствуют
+        """
+        result = await self.session.execute(
+            select(Order.id, Order.status, Order.user_id, Order.factory_id, Order.production_status)
+            .where(Order.id.in_(order_ids), Order.factory_id == factory_id)
+            .with_for_update()
+        )
+        return result.all()
+
+    async def set_factory_statuses(
+            self,
+            factory_id: UUID,
+            changes: Sequence[Tuple[UUID, str, str]]
+    ) -> int:
+        """Меняет статусы заказов фабрики одним UPDATE ... FROM (VALUES ...).
+
+        Строка обновляется, только если заказ принадлежит фабрике и его
+        статус всё ещё равен ожидаемому. История статусов не пишется —
+        события добавляет вызывающий код (status_events.bulk_create).
+
+        Args:
+            factory_id: UUID фабрики
+            changes: (order_id, ожидаемый статус, новый статус)
+
+        Returns:
+            int: Количество обновлённых заказов
+        """
+        if not changes:
+            return 0
+        table = Order.__table__
+        data = values(
+            column("id", table.c.id.type),
+            column("from_status", table.c.status.type),
+            column("to_status", table.c.status.type),
+            name="data"
+        ).data(list(changes))
+        result = await self.session.execute(
+            update(table)
+            .where(
+                table.c.id == data.c.id,
+                table.c.factory_id == factory_id,
+                table.c.status == data.c.from_status
+            )
+            .values(status=data.c.to_status)
+        )
+        return result.rowcount
+
     async def exists(self, order_id: UUID) -> bool:
         result = await self.session.execute(
             select(exists().where(Order.id == order_id)))
@@ -104,6 +460,42 @@ class OrderRepository(BaseRepository[Order]):
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def list_by_factory(
+            self,
+            factory_id: UUID,
+            status: Optional[str] = None
+    ) -> List[OrderResponse]:
+        """Заказы фабрики в виде OrderResponse (колоночная выборка без ORM-гидратации)."""
+        query = ORDER_RESPONSE_LIST.select().where(Order.factory_id == factory_id)
+
+        if status:
+            query = query.where(Order.status == status)
+
+        query = query.order_by(Order.created_at.desc())
+        return await self.fetch_projected(ORDER_RESPONSE_LIST, query)
+
+    async def list_awaiting_assignment(
+            self,
+            product_type: str,
+            limit: int = 100
+    ) -> List[OrderResponse]:
+        """Оплаченные заказы типа продукта без фабрики, старые первыми.
+
+        Фильтр идёт по генерируемой колонке product_type через индекс
+        ix_orders_product_type_status, без загрузки design_specs.
+        """
+        query = (
+            ORDER_RESPONSE_LIST.select()
+            .where(
+                Order.product_type == product_type.lower(),
+                Order.status == OrderStatus.PAID,
+                Order.factory_id.is_(None)
+            )
+            .order_by(Order.created_at)
+            .limit(limit)
+        )
+        return await self.fetch_projected(ORDER_RESPONSE_LIST, query)
+
     async def update_status(
             self,
             order_id: UUID,
@@ -114,8 +506,12 @@ class OrderRepository(BaseRepository[Order]):
         if not order:
             return None
 
+        if order.status != new_status:
+            await self.status_events.record(
+                order.id, order.status, new_status, order.factory_id
+            )
         order.status = new_status
-        await self.session.commit()
+        await self.uow.flush()
         await self.session.refresh(order)
         return order
 
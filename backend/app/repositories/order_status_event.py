@@ -0,0 +1,291 @@
+from datetime import date, datetime, timedelta
+from typing import Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Date, RowMapping, cast, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order_status_event import (
+    OrderStatusEvent,
+    OrderStatusDurationRollup,
+    OrderStatusRollupState
+)
+from .base import BaseRepository
+
+ROLLUP_NAME = "order_status_durations"
+DEFAULT_PERCENTILES = (0.5, 0.9, 0.95)
+
+
+class OrderStatusEventRepository(BaseRepository[OrderStatusEvent]):
+    """
+    Репозиторий истории статусов заказов.
+
+    Основная функциональность:
+    - Запись событий смены статуса (append-only)
+    - Таймлайн заказа
+    - Перцентили времени пребывания в статусе (оконные функции)
+    - Инкрементальный пересчёт дневных агрегатов для админ-панели
+
+    Особенности:
+    - Интервал статуса строится через LEAD() по событиям заказа:
+      статус to_status длится от created_at события до created_at следующего
+    - Интервал относится к фабрике закрывающего события (например,
+      "paid" закрывается назначением на фабрику), иначе к фабрике открывающего
+    - События, восстановленные миграцией (backfilled), не входят в статистику
+    - Агрегаты пересчитываются только за дни начиная с водяного знака,
+      поэтому дашборд не сканирует сырые события
+    """
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(OrderStatusEvent, session)
+
+    async def record(
+            self,
+            order_id: UUID,
+            from_status: Optional[str],
+            to_status: str,
+            factory_id: Optional[UUID] = None,
+            created_at: Optional[datetime] = None
+    ) -> OrderStatusEvent:
+        """Добавляет событие перехода в текущую транзакцию (без commit).
+
+        Args:
+            order_id: UUID заказа
+            from_status: Предыдущий статус (None при создании заказа)
+            to_status: Новый статус
+            factory_id: UUID фабрики на момент перехода
+            created_at: Момент перехода (по умолчанию - сейчас)
+
+        Returns:
+            OrderStatusEvent: Добавленное событие
+        """
+        event = OrderStatusEvent(
+            order_id=order_id,
+            from_status=from_status,
+            to_status=to_status,
+            factory_id=factory_id,
+            created_at=created_at or datetime.now()
+        )
+        self.session.add(event)
+        return event
+
+    async def get_order_history(self, order_id: UUID) -> Sequence[OrderStatusEvent]:
+        """Возвращает события заказа в хронологическом порядке."""
+        result = await self.session.execute(
+            select(OrderStatusEvent)
+            .where(OrderStatusEvent.order_id == order_id)
+            .order_by(OrderStatusEvent.created_at, OrderStatusEvent.id)
+        )
+        return result.scalars().all()
+
+    async def time_in_status_percentiles(
+            self,
+            since: datetime,
+            until: datetime,
+            status: Optional[str] = None,
+            factory_id: Optional[UUID] = None,
+            percentiles: Sequence[float] = DEFAULT_PERCENTILES
+    ) -> Sequence[RowMapping]:
+        """Считает перцентили времени в статусе по сырым событиям.
+
+        Учитываются интервалы, закрытые в диапазоне [since, until).
+        Подходит для произвольных диапазонов; для дашборда следует
+        использовать get_rollups().
+
+        Args:
+            since: Начало диапазона
+            until: Конец диапазона
+            status: Фильтр по статусу (опционально)
+            factory_id: Фильтр по фабрике (опционально)
+            percentiles: Набор перцентилей (0..1)
+
+        Returns:
+            Sequence[RowMapping]: Строки status, transitions, avg_seconds, p<N>_seconds, max_seconds
+        """
+        touched = (
+            select(OrderStatusEvent.order_id)
+            .where(
+                OrderStatusEvent.created_at >= since,
+                OrderStatusEvent.created_at < until
+            )
+        )
+        intervals = self._intervals(
+            OrderStatusEvent.order_id.in_(touched),
+            OrderStatusEvent.created_at < until
+        )
+        seconds = self._seconds(intervals)
+
+        query = (
+            select(
+                intervals.c.status,
+                func.count().label("transitions"),
+                func.avg(seconds).label("avg_seconds"),
+                *[
+                    func.percentile_cont(p).within_group(seconds.asc()).label(
+                        f"p{round(p * 100)}_seconds"
+                    )
+                    for p in percentiles
+                ],
+                func.max(seconds).label("max_seconds")
+            )
+            .where(
+                intervals.c.left_at >= since,
+                intervals.c.left_at < until,
+                intervals.c.backfilled.is_(False)
+            )
+            .group_by(intervals.c.status)
+            .order_by(intervals.c.status)
+        )
+        if status:
+            query = query.where(intervals.c.status == status)
+        if factory_id:
+            query = query.where(intervals.c.factory_id == factory_id)
+
+        result = await self.session.execute(query)
+        return result.mappings().all()
+
+    async def get_rollups(
+            self,
+            since: date,
+            until: date,
+            status: Optional[str] = None,
+            factory_id: Optional[UUID] = None
+    ) -> Sequence[OrderStatusDurationRollup]:
+        """Возвращает дневные агрегаты за диапазон дней [since, until]."""
+        query = (
+            select(OrderStatusDurationRollup)
+            .where(
+                OrderStatusDurationRollup.day >= since,
+                OrderStatusDurationRollup.day <= until
+            )
+            .order_by(OrderStatusDurationRollup.day, OrderStatusDurationRollup.status)
+        )
+        if status:
+            query = query.where(OrderStatusDurationRollup.status == status)
+        if factory_id:
+            query = query.where(OrderStatusDurationRollup.factory_id == factory_id)
+
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def refresh_rollups(self, now: Optional[datetime] = None) -> Optional[int]:
+        """Инкрементально пересчитывает дневные агрегаты.
+
+        Пересчитываются только дни, начиная с дня водяного знака:
+        интервалы, закрытые раньше, уже учтены и не меняются. Строка
+        состояния блокируется с SKIP LOCKED, поэтому параллельные
+        воркеры не выполняют пересчёт одновременно.
+
+        Args:
+            now: Верхняя граница пересчёта (по умолчанию - сейчас)
+
+        Returns:
+            Optional[int]: Количество записанных строк или None,
+            если пересчёт уже выполняется другим воркером
+        """
+        now = now or datetime.now()
+        result = await self.session.execute(
+            select(OrderStatusRollupState)
+            .where(OrderStatusRollupState.name == ROLLUP_NAME)
+            .with_for_update(skip_locked=True)
+        )
+        state = result.scalar_one_or_none()
+        if state is None:
+            return None
+
+        since_day = datetime.combine(
+            (state.watermark or await self._first_event_at() or now).date(),
+            datetime.min.time()
+        )
+
+        await self.session.execute(
+            delete(OrderStatusDurationRollup)
+            .where(OrderStatusDurationRollup.day >= since_day.date())
+        )
+
+        touched = (
+            select(OrderStatusEvent.order_id)
+            .where(
+                OrderStatusEvent.created_at >= since_day,
+                OrderStatusEvent.created_at < now
+            )
+        )
+        intervals = self._intervals(
+            OrderStatusEvent.order_id.in_(touched),
+            OrderStatusEvent.created_at < now
+        )
+        seconds = self._seconds(intervals)
+        day = cast(intervals.c.left_at, Date)
+
+        aggregated = (
+            select(
+                func.gen_random_uuid(),
+                day,
+                intervals.c.status,
+                intervals.c.factory_id,
+                func.count(),
+                func.avg(seconds),
+                func.percentile_cont(0.5).within_group(seconds.asc()),
+                func.percentile_cont(0.9).within_group(seconds.asc()),
+                func.percentile_cont(0.95).within_group(seconds.asc()),
+                func.max(seconds)
+            )
+            .where(intervals.c.left_at >= since_day, intervals.c.backfilled.is_(False))
+            .group_by(day, intervals.c.status, intervals.c.factory_id)
+        )
+        inserted = await self.session.execute(
+            insert(OrderStatusDurationRollup).from_select(
+                [
+                    "id", "day", "status", "factory_id", "transitions",
+                    "avg_seconds", "p50_seconds", "p90_seconds",
+                    "p95_seconds", "max_seconds"
+                ],
+                aggregated
+            )
+        )
+        state.watermark = now
+        await self.session.flush()
+        return inserted.rowcount
+
+    async def ensure_partitions(self, months_ahead: int = 3) -> None:
+        """Создаёт месячные партиции от текущего месяца на months_ahead вперёд."""
+        month = date.today().replace(day=1)
+        for _ in range(months_ahead + 1):
+            await self.session.execute(
+                select(func.order_status_events_ensure_partition(month))
+            )
+            month = (month + timedelta(days=32)).replace(day=1)
+
+    async def _first_event_at(self) -> Optional[datetime]:
+        result = await self.session.execute(select(func.min(OrderStatusEvent.created_at)))
+        return result.scalar()
+
+    @staticmethod
+    def _intervals(*conditions):
+        """Подзапрос интервалов статусов (status, factory_id, entered_at, left_at, backfilled).
+
+        Интервалы backfilled-событий (время входа неизвестно) вызывающие отбрасывают.
+        """
+        window = {
+            "partition_by": OrderStatusEvent.order_id,
+            "order_by": (OrderStatusEvent.created_at, OrderStatusEvent.id)
+        }
+        return (
+            select(
+                OrderStatusEvent.order_id,
+                OrderStatusEvent.to_status.label("status"),
+                func.coalesce(
+                    func.lead(OrderStatusEvent.factory_id).over(**window),
+                    OrderStatusEvent.factory_id
+                ).label("factory_id"),
+                OrderStatusEvent.created_at.label("entered_at"),
+                func.lead(OrderStatusEvent.created_at).over(**window).label("left_at"),
+                OrderStatusEvent.backfilled
+            )
+            .where(*conditions)
+            .subquery("intervals")
+        )
+
+    @staticmethod
+    def _seconds(intervals):
+        return func.extract("epoch", intervals.c.left_at - intervals.c.entered_at)
@@ -2,13 +2,16 @@ from datetime import datetime
 from typing import Optional, Sequence, List
 from uuid import UUID
 
-from sqlalchemy import update
+from sqlalchemy import func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core.unit_of_work import UnitOfWork
 from app.models.payment import Payment
 from .base import BaseRepository
+from .projection import PAYMENT_HISTORY
 from ..models import Order
+from ..schemas.payment import PaymentResponse
 
 
 class PaymentRepository(BaseRepository[Payment]):
@@ -19,6 +22,7 @@ class PaymentRepository(BaseRepository[Payment]):
     - Создание и отслеживание платежей
     - Обновление статусов (pending, succeeded, refunded)
     - Работа с внешними платежными системами (ЮKassa)
+    - Связь платежа с оплачиваемыми заказами (orders.payment_id)
 
     Особенности:
     - Поддерживает все этапы жизненного цикла платежа
@@ -62,7 +66,7 @@ class PaymentRepository(BaseRepository[Payment]):
     ) -> Payment:
         payment = self.model(**payment_data)
         session.add(payment)
-        await session.commit()
+        await UnitOfWork.of(session).flush()
         await session.refresh(payment)
         return payment
 
@@ -83,13 +87,28 @@ class PaymentRepository(BaseRepository[Payment]):
     ) -> List[Payment]:
         result = await self.session.execute(
             select(self.model)
-            .join(Order)
+            .join(Order, Order.id == self.model.order_id)
             .where(Order.user_id == user_id)
             .limit(limit)
             .order_by(self.model.created_at.desc())
         )
         return result.scalars().all()
 
+    async def get_history(
+            self,
+            user_id: UUID,
+            limit: int = 100,
+    ) -> List[PaymentResponse]:
+        """История платежей пользователя (колоночная выборка без ORM-гидратации)."""
+        query = (
+            PAYMENT_HISTORY.select()
+            .join(Order, Order.id == self.model.order_id)
+            .where(Order.user_id == user_id)
+            .order_by(self.model.created_at.desc())
+            .limit(limit)
+        )
+        return await self.fetch_projected(PAYMENT_HISTORY, query)
+
     async def update_by_external_id(
             self,
             session: AsyncSession,
@@ -101,7 +120,33 @@ class PaymentRepository(BaseRepository[Payment]):
             .where(self.model.external_id == external_id)
             .values(**updates)
         )
-        await session.commit()
+
+    async def link_orders(self, payment_id: UUID, order_ids: Sequence[UUID]) -> None:
+        """Привязывает заказы к платежу одним UPDATE."""
+        await self.session.execute(
+            update(Order)
+            .where(Order.id.in_(order_ids))
+            .values(payment_id=payment_id)
+        )
+
+    async def mark_succeeded(self, external_id: str) -> Optional[Payment]:
+        """Переводит ожидающий платёж в succeeded.
+
+        Returns:
+            Optional[Payment]: Платёж или None, если он уже обработан (повторный вебхук)
+        """
+        return await self.update_returning(
+            (self.model.external_id == external_id) & (self.model.status == "pending"),
+            {"status": "succeeded"}
+        )
+
+    async def get_orders_amount(self, payment_id: UUID, status: str) -> int:
+        """Сумма (в копейках) заказов платежа в указанном статусе."""
+        result = await self.session.execute(
+            select(func.coalesce(func.sum(Order.amount), 0))
+            .where(Order.payment_id == payment_id, Order.status == status)
+        )
+        return result.scalar_one()
 
     async def update_status(
             self,
@@ -126,7 +171,7 @@ class PaymentRepository(BaseRepository[Payment]):
         """Получает последние платежи пользователя"""
         result = await self.session.execute(
             select(Payment)
-            .join(Order)
+            .join(Order, Order.id == Payment.order_id)
             .where(Order.user_id == user_id)
             .order_by(Payment.created_at.desc())
             .limit(limit)
@@ -0,0 +1,119 @@
+"""
+Колоночные проекции для списочных эндпоинтов.
+
+Проекция связывает схему ответа с колонками модели: запрос выбирает только
+нужные схеме колонки (select(col, ...) вместо select(Model)), строки не
+гидратируются в ORM-объекты и не попадают в identity map, а ответы
+собираются одним вызовом закэшированного TypeAdapter(list[Schema]).
+
+Колонки берутся по именам полей схемы; если имя поля не совпадает с
+атрибутом модели (или значение нужно преобразовать), источник передаётся
+явно:
+
+    PAYMENT_HISTORY = Projection(
+        PaymentResponse, Payment, metadata=Payment.payment_metadata
+    )
+    payments = await repo.fetch_projected(
+        PAYMENT_HISTORY, PAYMENT_HISTORY.select().where(...)
+    )
+"""
+from typing import Any, Generic, List, Sequence, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import func, inspect, select
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.expression import Select
+
+from app.models.base import Base
+from app.models.generation import Generation
+from app.models.marketplace import MarketItem as MarketItemModel
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.review import Review
+from app.schemas.generation import GenerationResponse
+from app.schemas.marketplace import MarketItem, MarketItemDetails
+from app.schemas.order import OrderResponse
+from app.schemas.payment import PaymentResponse
+from app.schemas.review import ReviewResponse
+
+SchemaType = TypeVar("SchemaType", bound=BaseModel)
+
+
+class Projection(Generic[SchemaType]):
+    """Набор колонок модели, достаточный для построения схемы ответа.
+
+    Attributes:
+        schema: Схема ответа
+        columns: Колонки (с метками по именам полей схемы)
+    """
+
+    def __init__(self, schema: type[SchemaType], model: type[Base], **sources: ColumnElement):
+        """
+        Args:
+            schema: Pydantic-схема ответа
+            model: SQLAlchemy модель-источник
+            sources: Явные источники для полей, не совпадающих с атрибутами модели
+
+        Raises:
+            ValueError: Если обязательному полю схемы не нашлось колонки
+        """
+        mapper_columns = inspect(model).columns
+        columns = []
+        for name, field in schema.model_fields.items():
+            source = sources.get(name)
+            if source is None and name in mapper_columns:
+                source = mapper_columns[name]
+            if source is None:
+                if field.is_required():
+                    raise ValueError(
+                        f"No column for required field {schema.__name__}.{name}"
+                    )
+                continue  # поле получит значение по умолчанию
+            columns.append(source.label(name))
+
+        self.schema = schema
+        self.columns: tuple[ColumnElement, ...] = tuple(columns)
+        self._names = tuple(c.name for c in columns)
+        self._adapter = TypeAdapter(List[schema])
+
+    def select(self) -> Select:
+        """Возвращает SELECT только по колонкам проекции."""
+        return select(*self.columns)
+
+    def validate(self, rows: Sequence[Sequence[Any]]) -> List[SchemaType]:
+        """Строит схемы ответа из строк результата одним вызовом валидатора.
+
+        Строки должны начинаться с колонок проекции (запрос от self.select(),
+        лишние колонки в конце игнорируются). Валидатор получает обычные
+        словари: разбор Row по атрибутам (from_attributes) или RowMapping
+        заметно медленнее (см. benchmarks/projection_benchmark.py).
+        """
+        names = self._names
+        return self._adapter.validate_python([dict(zip(names, row)) for row in rows])
+
+
+GENERATION_LIST = Projection(GenerationResponse, Generation)
+
+PAYMENT_HISTORY = Projection(
+    PaymentResponse,
+    Payment,
+    metadata=Payment.payment_metadata
+)
+
+# В БД тип товара хранится в верхнем регистре (см. check_product_type)
+MARKET_ITEM_LIST = Projection(
+    MarketItem,
+    MarketItemModel,
+    item_type=func.lower(MarketItemModel.item_type)
+)
+
+# Отзывы подставляет сервис (ReviewRepository.get_item_page)
+MARKET_ITEM_DETAILS = Projection(
+    MarketItemDetails,
+    MarketItemModel,
+    item_type=func.lower(MarketItemModel.item_type)
+)
+
+ORDER_RESPONSE_LIST = Projection(OrderResponse, Order)
+
+REVIEW_LIST = Projection(ReviewResponse, Review)
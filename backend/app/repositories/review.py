@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import Any, List, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import Float, cast, delete, func, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.cache import catalog_cache
+from app.models.marketplace import MarketItem
+from app.models.order import Order
+from app.models.review import Review
+from .base import BaseRepository
+from .marketplace import item_cache_tags
+from .projection import REVIEW_LIST
+from ..schemas.review import ReviewResponse
+
+
+class ReviewRepository(BaseRepository[Review]):
+    """
+    Репозиторий отзывов о заказах.
+
+    Каждая запись отзыва в той же транзакции атомарно обновляет агрегаты
+    рейтинга товара маркетплейса (rating_sum, rating_count,
+    rating_histogram и rating) одним UPDATE с приращениями, поэтому
+    параллельные отзывы не теряют обновлений, а карточки и списки
+    читают готовый рейтинг без подсчёта по отзывам.
+
+    Изменения рейтинга сбрасывают кэш каталога товара после COMMIT.
+    """
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(Review, session)
+
+    async def create(self, obj_in: Union[dict, Any]) -> Review:
+        """Создаёт отзыв и добавляет оценку в агрегаты товара."""
+        review = await super().create(obj_in)
+        await self._apply_rating(review.order_id, added=review.rating)
+        return review
+
+    async def update(self, id: UUID, obj_in: Union[dict, Any]) -> Optional[Review]:
+        """Изменяет отзыв; смена оценки переносится в агрегаты товара."""
+        if not isinstance(obj_in, dict):
+            obj_in = obj_in.dict(exclude_unset=True)
+        if obj_in.get("rating") is None:
+            obj_in.pop("rating", None)
+            return await super().update(id, obj_in)
+
+        # Блокировка строки: параллельная правка не увидит ту же старую оценку
+        old_rating = await self.session.scalar(
+            select(Review.rating).where(Review.id == id).with_for_update()
+        )
+        if old_rating is None:
+            return None
+
+        review = await super().update(id, obj_in)
+        if review.rating != old_rating:
+            await self._apply_rating(review.order_id, added=review.rating, removed=old_rating)
+        return review
+
+    async def delete(self, id: UUID) -> bool:
+        """Удаляет отзыв и вычитает оценку из агрегатов товара."""
+        result = await self.session.execute(
+            delete(Review).where(Review.id == id).returning(Review.order_id, Review.rating)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return False
+        await self._apply_rating(row.order_id, removed=row.rating)
+        return True
+
+    async def get_item_page(
+            self,
+            item_id: UUID,
+            limit: int = 10,
+            after: Optional[tuple[datetime, UUID]] = None
+    ) -> List[ReviewResponse]:
+        """Страница отзывов товара маркетплейса keyset-методом.
+
+        Args:
+            item_id: ID товара
+            limit: Размер страницы
+            after: Ключ (created_at, id) последнего отзыва предыдущей страницы
+
+        Returns:
+            List[ReviewResponse]: До limit + 1 отзывов, от новых к старым
+            (лишний означает, что есть следующая страница)
+        """
+        query = (
+            REVIEW_LIST.select()
+            .join(Order, Order.id == Review.order_id)
+            .where(Order.market_item_id == item_id)
+        )
+        if after:
+            query = query.where(tuple_(Review.created_at, Review.id) < tuple_(*after))
+        query = query.order_by(Review.created_at.desc(), Review.id.desc()).limit(limit + 1)
+        return await self.fetch_projected(REVIEW_LIST, query)
+
+    async def _apply_rating(
+            self,
+            order_id: UUID,
+            added: Optional[int] = None,
+            removed: Optional[int] = None
+    ) -> None:
+        """Применяет изменение оценок к агрегатам товара заказа одним UPDATE.
+
+        Заказы не из маркетплейса (без market_item_id) агрегатов не имеют.
+        """
+        sum_delta = (added or 0) - (removed or 0)
+        count_delta = (added is not None) - (removed is not None)
+        new_count = MarketItem.rating_count + count_delta
+
+        values = {
+            MarketItem.rating_sum: MarketItem.rating_sum + sum_delta,
+            MarketItem.rating_count: new_count,
+            MarketItem.rating: func.coalesce(
+                cast(MarketItem.rating_sum + sum_delta, Float) / func.nullif(new_count, 0), 0
+            ),
+        }
+        for star, delta in ((added, 1), (removed, -1)):
+            if star is not None:
+                values[MarketItem.rating_histogram[star]] = MarketItem.rating_histogram[star] + delta
+
+        item_id = select(Order.market_item_id).where(Order.id == order_id).scalar_subquery()
+        result = await self.session.execute(
+            update(MarketItem)
+            .where(MarketItem.id == item_id)
+            .values(values)
+            .returning(MarketItem.id, MarketItem.item_type)
+        )
+        item = result.one_or_none()
+        if item is not None:
+            tags = item_cache_tags(item.id, item.item_type)
+            self.uow.on_commit(lambda: catalog_cache.invalidate(*tags))
@@ -63,7 +63,7 @@ class SubscriptionRepository(BaseRepository[Subscription]):
             raise ValueError("Subscription not found")
 
         subscription.remaining_generations -= 1
-        await self.session.commit()
+        await self.uow.flush()
 
     async def increment_quota(self, user_id: UUID) -> None:
         """Увеличивает квоту генераций в подписке пользователя.
@@ -79,4 +79,4 @@ class SubscriptionRepository(BaseRepository[Subscription]):
             raise ValueError("Subscription not found")
 
         subscription.remaining_generations += 1
-        await self.session.commit()
+        await self.uow.flush()
@@ -91,7 +91,21 @@ class UserRepository(BaseRepository[User]):
             .where(User.id == user_id)
             .values(last_login=datetime.now())
         )
-        await self.session.commit()
+
+    async def get_ids_after(
+            self,
+            after: Optional[uuid.UUID],
+            limit: int,
+            role: Optional[str] = None
+    ) -> Sequence[uuid.UUID]:
+        """Следующая страница id пользователей по возрастанию (keyset по первичному ключу)."""
+        query = select(User.id).order_by(User.id).limit(limit)
+        if after is not None:
+            query = query.where(User.id > after)
+        if role is not None:
+            query = query.where(User.role == role)
+        result = await self.session.execute(query)
+        return result.scalars().all()
 
     async def search(self, query: str, limit: int = 10) -> Sequence[User]:
         """Поиск пользователей по email или имени"""
@@ -132,6 +146,6 @@ class UserRepository(BaseRepository[User]):
         for key, value in updates.items():
             setattr(user, key, value)
         
-        await self.session.commit()
+        await self.uow.flush()
         await self.session.refresh(user)
         return user
\ No newline at end of file
@@ -4,9 +4,17 @@ from .auth import Token, TokenResponse, AuthRequest, UserLoginResponse
 from .errors import HTTPError, ValidationError, ErrorResponse, RateLimitError
 from .generation import GenerationCreate, GenerationResponse, GenerationStatusResponse
 from .marketplace import MarketItem, MarketFilters, CartItem
-from .notifications import NotificationBase, NotificationResponse
+from .notifications import NotificationAnnouncement, NotificationBase, NotificationResponse
 from .order import OrderCreate, OrderResponse, OrderUpdate, ChatMessageSchema, OrderWithMessages
 from .payment import PaymentCreate, PaymentResponse, PaymentNotification
+from .production import (
+    ProductionPlanResult,
+    ProductionStatusBatch,
+    ProductionStatusBatchResult,
+    ProductionStatusResult,
+    ProductionStatusUpdate
+)
+from .review import ReviewCreate, ReviewUpdate, ReviewResponse
 from .subscription import SubscriptionCreate, SubscriptionResponse
 from .user import UserCreate, UserResponse
 
@@ -30,5 +38,10 @@ __all__ = [
     # Marketplace
     'MarketItem', 'MarketFilters', 'CartItem',
     # Notifications
-    'NotificationBase', 'NotificationResponse'
+    'NotificationAnnouncement', 'NotificationBase', 'NotificationResponse',
+    # Reviews
+    'ReviewCreate', 'ReviewUpdate', 'ReviewResponse',
+    # Production
+    'ProductionPlanResult', 'ProductionStatusBatch', 'ProductionStatusBatchResult',
+    'ProductionStatusResult', 'ProductionStatusUpdate'
 ]
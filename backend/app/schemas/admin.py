@@ -1,6 +1,8 @@
-from typing import Dict
+from datetime import date, datetime
+from typing import Dict, Optional
+from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class GenerationStatsResponse(BaseModel):
@@ -45,3 +47,59 @@ class SystemHealthResponse(BaseModel):
     database: bool
     redis: bool
     external_services: Dict[str, str]
+
+
+class OrderStatusEventResponse(BaseModel):
+    """
+    Событие перехода статуса заказа.
+
+    Attributes:
+        order_id (UUID): ID заказа
+        from_status (Optional[str]): Предыдущий статус (None при создании)
+        to_status (str): Новый статус
+        factory_id (Optional[UUID]): Фабрика на момент перехода
+        created_at (datetime): Момент перехода
+    """
+    order_id: UUID
+    from_status: Optional[str] = None
+    to_status: str
+    factory_id: Optional[UUID] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StatusDurationStats(BaseModel):
+    """
+    Перцентили времени пребывания заказов в статусе (в секундах).
+
+    Attributes:
+        status (str): Статус заказа
+        transitions (int): Количество закрытых интервалов статуса
+        avg_seconds (float): Среднее время в статусе
+        p50_seconds (float): Медиана
+        p90_seconds (float): 90-й перцентиль
+        p95_seconds (float): 95-й перцентиль
+        max_seconds (float): Максимум
+    """
+    status: str
+    transitions: int
+    avg_seconds: float
+    p50_seconds: float
+    p90_seconds: float
+    p95_seconds: float
+    max_seconds: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StatusDurationDailyStats(StatusDurationStats):
+    """
+    Дневной агрегат времени в статусе (строка rollup-таблицы).
+
+    Attributes:
+        day (date): День закрытия интервалов
+        factory_id (Optional[UUID]): Фабрика (None - без фабрики)
+    """
+    day: date
+    factory_id: Optional[UUID] = None
@@ -1,9 +1,27 @@
-from typing import Literal, Optional
+import json
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from app.core.order_status import OrderStatus  # Add this import at the top
+from app.schemas.pagination import CursorPage
+from app.schemas.review import ReviewResponse
 ProductTypeValues = Literal["banner", "standee", "billboard", "digital"]
+# relevance доступна только вместе с search и используется для него по умолчанию
+MarketSortValues = Literal["relevance", "newest", "price_asc", "price_desc", "rating", "popularity"]
+# Предикатов по спецификациям в одном запросе каталога
+MAX_SPEC_FILTERS = 10
+# Длина specs.product_type: из него вычисляется orders.product_type (VARCHAR(100))
+MAX_PRODUCT_TYPE_LENGTH = 100
+
+
+def check_product_type(specs: Optional[dict]) -> Optional[dict]:
+    """Проверяет specs.product_type, по которому заказ маршрутизируется на фабрики."""
+    product_type = (specs or {}).get("product_type")
+    if isinstance(product_type, str) and len(product_type) > MAX_PRODUCT_TYPE_LENGTH:
+        raise ValueError(f"specs.product_type must be at most {MAX_PRODUCT_TYPE_LENGTH} characters")
+    return specs
+
 
 class MarketItem(BaseModel):
     """Marketplace item model"""
@@ -47,6 +65,20 @@ class MarketItem(BaseModel):
         }
     )
 
+class MarketItemDetails(MarketItem):
+    """Карточка товара: предрассчитанные агрегаты рейтинга и первая страница отзывов.
+
+    Attributes:
+        rating_count (int): Количество отзывов
+        rating_histogram (List[int]): Количество отзывов с оценкой 1..5
+        reviews (CursorPage[ReviewResponse]): Свежие отзывы (next_cursor — для
+            GET /items/{item_id}/reviews)
+    """
+    rating_count: int = 0
+    rating_histogram: List[int] = Field(default_factory=lambda: [0] * 5)
+    reviews: CursorPage[ReviewResponse] = Field(default_factory=CursorPage[ReviewResponse])
+
+
 class MarketFilters(BaseModel):
     """Marketplace filters"""
     item_type: Optional[ProductTypeValues] = None
@@ -54,6 +86,57 @@ class MarketFilters(BaseModel):
     max_price: Optional[float] = Field(None, gt=0)
     min_rating: Optional[float] = Field(None, ge=0, le=5)
     search: Optional[str] = None
+    spec: Optional[List[str]] = Field(
+        None,
+        max_length=MAX_SPEC_FILTERS,
+        description="Spec predicates key:value (repeatable), e.g. spec=size:3x6&spec=print.color:red"
+    )
+    sort: Optional[MarketSortValues] = Field(
+        None,
+        description="Sort order; defaults to relevance with search, newest otherwise"
+    )
+    limit: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = Field(None, description="next_cursor from the previous page")
+
+    @field_validator("spec")
+    @classmethod
+    def validate_spec(cls, value: Optional[List[str]]) -> Optional[List[str]]:
+        """Проверяет формат предикатов key:value (вложенные ключи через точку)."""
+        for predicate in value or ():
+            key, sep, _ = predicate.partition(":")
+            if not sep or not all(key.split(".")):
+                raise ValueError(f"Spec filter must look like key:value, got {predicate!r}")
+        return value
+
+
+class FacetCount(BaseModel):
+    """Количество товаров с данным значением фасета."""
+    value: str
+    count: int
+
+
+class MarketFacets(BaseModel):
+    """Фасеты каталога по текущим фильтрам.
+
+    Attributes:
+        item_type (List[FacetCount]): По типу товара
+        price_band (List[FacetCount]): По ценовому диапазону (в рублях)
+        rating_band (List[FacetCount]): По диапазону рейтинга
+    """
+    item_type: List[FacetCount] = Field(default_factory=list)
+    price_band: List[FacetCount] = Field(default_factory=list)
+    rating_band: List[FacetCount] = Field(default_factory=list)
+
+
+class MarketItemPage(CursorPage[MarketItem]):
+    """Страница каталога; фасеты возвращаются только на первой странице."""
+    facets: Optional[MarketFacets] = None
+
+class SearchSuggestion(BaseModel):
+    """Подсказка автодополнения поиска."""
+    text: str
+    kind: Literal["item", "tag"]
+    item_id: Optional[UUID] = None
 
 class CartItem(BaseModel):
     """Shopping cart item"""
@@ -97,6 +180,26 @@ class CartItemAdd(BaseModel):
         }
     )
 
+    @field_validator("specs")
+    @classmethod
+    def validate_specs(cls, value):
+        return check_product_type(value)
+
+class CheckoutResponse(BaseModel):
+    """Результат оформления корзины: заказы и общий платёж.
+
+    Attributes:
+        order_ids (List[UUID]): Созданные заказы (по одному на позицию корзины)
+        payment_id (UUID): Платёж на общую сумму
+        amount (int): Общая сумма в копейках
+        payment_url (Optional[str]): URL для оплаты
+    """
+    order_ids: List[UUID]
+    payment_id: UUID
+    amount: int = Field(..., description="Total amount in kopecks")
+    payment_url: Optional[str] = None
+
+
 class DirectOrderResponse(BaseModel):
     """Модель ответа при создании прямого заказа.
 
@@ -139,3 +242,58 @@ class DirectOrderResponse(BaseModel):
             }
         }
     )
+
+
+class MarketItemImport(BaseModel):
+    """Строка пакетной загрузки каталога (объект NDJSON или строка CSV).
+
+    В CSV specs передаётся JSON-строкой; неизвестные колонки — ошибка строки.
+    """
+    title: str = Field(..., min_length=1, max_length=100)
+    description: str = Field("", max_length=1000)
+    item_type: ProductTypeValues
+    price: int = Field(..., gt=0, description="Price in kopecks")
+    preview_url: str = Field(..., min_length=1, max_length=500)
+    specs: dict = Field(default_factory=dict)
+
+    model_config = ConfigDict(extra="forbid")
+
+    @field_validator("item_type", mode="before")
+    @classmethod
+    def normalize_item_type(cls, value):
+        return value.lower() if isinstance(value, str) else value
+
+    @field_validator("specs", mode="before")
+    @classmethod
+    def parse_specs(cls, value):
+        if isinstance(value, str):
+            return json.loads(value) if value.strip() else {}
+        return value
+
+    @field_validator("specs")
+    @classmethod
+    def validate_specs(cls, value):
+        return check_product_type(value)
+
+
+class ImportRowError(BaseModel):
+    """Ошибка строки загрузки (row — номер строки NDJSON или записи CSV, с 1)."""
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    """Итог пакетной загрузки каталога.
+
+    Attributes:
+        received (int): Прочитано строк с данными
+        imported (int): Добавлено товаров
+        failed (int): Строк с ошибками
+        errors (List[ImportRowError]): Первые ошибки (не больше MAX_IMPORT_ERRORS)
+        errors_truncated (bool): Ошибок было больше, чем вошло в отчёт
+    """
+    received: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = Field(default_factory=list)
+    errors_truncated: bool = False
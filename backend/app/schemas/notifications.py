@@ -40,6 +40,24 @@ class NotificationResponse(NotificationBase):
     read_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class NotificationAnnouncement(BaseModel):
+    """
+    Рассылка уведомления всем пользователям.
+
+    Attributes:
+        type (NotificationType): Тип уведомления
+        title (str): Заголовок
+        message (str): Текст
+        payload (Optional[dict]): Дополнительные данные
+        role (Optional[str]): Только пользователям роли (по умолчанию — всем)
+    """
+    type: NotificationTypeValues = "system"
+    title: str = Field(..., max_length=100)
+    message: str = Field(..., max_length=1000)
+    payload: Optional[dict] = None
+    role: Optional[str] = None
     
 
 NotificationType = NotificationTypeValues
@@ -26,6 +26,12 @@ class OrderCreate(BaseModel):
         example="c3d4e5f6-7890-1234-5678-901234567890",
         description="ID товара из маркетплейса (если заказ на готовый продукт)",
     )
+    delivery_city: Optional[str] = Field(
+        default=None,
+        max_length=200,
+        example="Казань, ул. Баумана 1",
+        description="Город или адрес доставки: по нему подбирается ближайшая фабрика",
+    )
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -101,6 +107,14 @@ class OrderResponse(OrderBase):
         example="b2c3d4e5-6789-0123-4567-890123456789",
         description="ID пользователя-заказчика",
     )
+    factory_id: Optional[UUID] = Field(
+        None,
+        description="ID фабрики, если заказ передан в производство",
+    )
+    delivery_city: Optional[str] = Field(
+        None,
+        description="Город или адрес доставки",
+    )
     # links: Dict[str, Any] = Field(
     #     default_factory=lambda: {
     #         "self": {"href": "/orders/{id}"},
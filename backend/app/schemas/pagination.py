@@ -0,0 +1,21 @@
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+ItemType = TypeVar("ItemType")
+
+
+class CursorPage(BaseModel, Generic[ItemType]):
+    """Страница результатов с keyset-пагинацией.
+
+    Attributes:
+        items (List): Элементы страницы
+        next_cursor (Optional[str]): Непрозрачный курсор следующей страницы
+            (None, если страница последняя)
+    """
+    items: List[ItemType] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Opaque cursor for the next page; absent on the last page",
+        example="WyIyMDI1LTAxLTAxVDEyOjAwOjAwIiwiYTFiMmMzZDQiXQ"
+    )
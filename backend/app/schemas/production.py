@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.core.order_status import OrderStatusValues
+
+# Обновлений статуса в одном запросе фабрики
+MAX_STATUS_BATCH = 1000
+
+
+class ProductionPlanResult(BaseModel):
+    """Итог прогона пакетного планирования производства.
+
+    Attributes:
+        planned (int): Рассмотрено оплаченных заказов без фабрики
+        assigned (int): Назначено на фабрики
+        unassigned (int): Осталось без фабрики (нет совместимой свободной мощности)
+        late (int): Назначено с ожидаемым опозданием относительно срока заказа
+    """
+    planned: int = Field(0, example=120)
+    assigned: int = Field(0, example=112)
+    unassigned: int = Field(0, example=8)
+    late: int = Field(0, example=3)
+
+
+class ProductionStatusUpdate(BaseModel):
+    """Обновление статуса заказа от фабрики.
+
+    Attributes:
+        order_id (UUID): ID заказа, назначенного на фабрику
+        status (str): Новый статус заказа
+        timestamp (datetime): Момент смены статуса на стороне фабрики
+    """
+    order_id: UUID
+    status: OrderStatusValues = Field(..., example="shipped")
+    timestamp: datetime
+
+
+class ProductionStatusBatch(BaseModel):
+    """Пакет обновлений статусов от фабрики."""
+    updates: List[ProductionStatusUpdate] = Field(..., min_length=1, max_length=MAX_STATUS_BATCH)
+
+
+class ProductionStatusResult(BaseModel):
+    """Результат обработки одного обновления.
+
+    Attributes:
+        order_id (UUID): ID заказа
+        status (str): Запрошенный статус
+        applied (bool): Обновление применено (или статус уже был таким)
+        from_status (Optional[str]): Статус заказа до обновления
+        error (Optional[str]): Причина отказа
+    """
+    order_id: UUID
+    status: str
+    applied: bool
+    from_status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ProductionStatusBatchResult(BaseModel):
+    """Итог пакетного обновления статусов: результаты в порядке запроса."""
+    applied: int = Field(0, example=198)
+    rejected: int = Field(0, example=2)
+    results: List[ProductionStatusResult] = Field(default_factory=list)
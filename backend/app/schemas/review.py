@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ReviewCreate(BaseModel):
+    """Создание отзыва о выполненном заказе.
+
+    Attributes:
+        order_id (UUID): Заказ, к которому относится отзыв
+        rating (int): Оценка от 1 до 5
+        comment (Optional[str]): Текстовый комментарий
+    """
+    order_id: UUID
+    rating: int = Field(..., ge=1, le=5)
+    comment: Optional[str] = Field(None, max_length=2000)
+
+
+class ReviewUpdate(BaseModel):
+    """Изменение отзыва."""
+    rating: Optional[int] = Field(None, ge=1, le=5)
+    comment: Optional[str] = Field(None, max_length=2000)
+
+
+class ReviewResponse(BaseModel):
+    """Отзыв в ответах API."""
+    id: UUID
+    rating: int = Field(..., ge=1, le=5, example=5)
+    comment: Optional[str] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,155 @@
+"""
+Автодополнение поиска маркетплейса из памяти процесса.
+
+Индекс — отсортированный массив нормализованных ключей (название товара с
+начала каждого слова, теги из specs) с бинарным поиском по префиксу. Для
+«тяжёлых» префиксов (больше HEAVY_PREFIX ключей) top-k подсказок по
+популярности посчитан заранее, поэтому любой запрос просматривает не
+больше HEAVY_PREFIX ключей и отвечает без обращения к PostgreSQL.
+
+Индекс пересобирается в фоне в пуле процессов (сборка — чистый Python и
+держит GIL) и подменяется одной операцией присваивания.
+"""
+import heapq
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.database import async_session
+from app.core.logger.logger import logger
+from app.core.process_pool import run_cpu
+from app.models.marketplace import MarketItem
+from app.schemas.marketplace import SearchSuggestion
+
+TOP_K = 10
+# Префиксы с бо́льшим числом ключей получают заранее посчитанный top-k
+HEAVY_PREFIX = 64
+# Ключи (и запросы) обрезаются до этой длины
+MAX_KEY_LENGTH = 40
+
+
+def normalize(text: str) -> str:
+    """Нормализация для сравнения: нижний регистр, ё -> е, схлопнутые пробелы."""
+    return " ".join(text.lower().replace("ё", "е").split())
+
+
+@dataclass(frozen=True)
+class _Entry:
+    text: str
+    kind: str
+    item_id: Optional[UUID]
+    score: float
+
+
+class AutocompleteIndex:
+    """Неизменяемый префиксный индекс подсказок."""
+
+    def __init__(self, entries: Sequence[_Entry], keyed: Iterable[Tuple[str, int]]):
+        pairs = sorted(keyed)
+        self.entries = entries
+        self.keys = [key for key, _ in pairs]
+        self.owners = [entry for _, entry in pairs]
+        self.top = self._precompute_heavy()
+
+    @classmethod
+    def build(
+            cls,
+            items: Iterable[Tuple[UUID, str, Optional[dict], float]]
+    ) -> "AutocompleteIndex":
+        """Строит индекс по строкам (id, title, specs, popularity)."""
+        entries: List[_Entry] = []
+        keyed: List[Tuple[str, int]] = []
+        tag_scores: Dict[str, float] = {}
+        tag_titles: Dict[str, str] = {}
+
+        for item_id, title, specs, popularity in items:
+            entry = len(entries)
+            entries.append(_Entry(title, "item", item_id, popularity or 0.0))
+            words = normalize(title).split(" ")
+            for start in range(len(words)):
+                keyed.append((" ".join(words[start:])[:MAX_KEY_LENGTH], entry))
+
+            tags = (specs or {}).get("tags") or []
+            for tag in tags if isinstance(tags, list) else []:
+                key = normalize(str(tag))
+                if key:
+                    tag_scores[key] = tag_scores.get(key, 0.0) + (popularity or 0.0) + 1.0
+                    tag_titles.setdefault(key, str(tag))
+
+        for key, score in tag_scores.items():
+            keyed.append((key[:MAX_KEY_LENGTH], len(entries)))
+            entries.append(_Entry(tag_titles[key], "tag", None, score))
+
+        return cls(entries, keyed)
+
+    def suggest(self, prefix: str, limit: int = TOP_K) -> List[_Entry]:
+        """Подсказки для префикса, по убыванию популярности."""
+        prefix = normalize(prefix)[:MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+        top = self.top.get(prefix)
+        if top is None:
+            top = self._top_in_range(*self._range(prefix), TOP_K)
+        return [self.entries[i] for i in top[:limit]]
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.keys, prefix)
+        return lo, bisect_left(self.keys, prefix + "\uffff", lo)
+
+    def _top_in_range(self, lo: int, hi: int, k: int) -> Tuple[int, ...]:
+        owners = set(self.owners[lo:hi])
+        return tuple(heapq.nlargest(k, owners, key=lambda e: (self.entries[e].score, -e)))
+
+    def _precompute_heavy(self) -> Dict[str, Tuple[int, ...]]:
+        # Префикс тяжёлый, если с него начинаются keys[i] и keys[i + HEAVY_PREFIX]
+        # (ключи отсортированы): общий префикс этой пары — тяжёлые префиксы keys[i].
+        # Все префиксы всех ключей не перебираются и не хранятся.
+        heavy = set()
+        for i in range(len(self.keys) - HEAVY_PREFIX):
+            key, other = self.keys[i], self.keys[i + HEAVY_PREFIX]
+            common = 0
+            while common < len(key) and common < len(other) and key[common] == other[common]:
+                common += 1
+            heavy.update(key[:length] for length in range(1, common + 1))
+        return {prefix: self._top_in_range(*self._range(prefix), TOP_K) for prefix in heavy}
+
+
+class Autocomplete:
+    """
+    Держатель текущего индекса автодополнения (по одному на процесс).
+
+    Пример использования:
+         autocomplete.suggest("летн", limit=5)
+         await rebuild_autocomplete()  # периодически, в фоне
+    """
+
+    def __init__(self):
+        self._index = AutocompleteIndex([], [])
+
+    def suggest(self, prefix: str, limit: int = TOP_K) -> List[SearchSuggestion]:
+        return [
+            SearchSuggestion(text=e.text, kind=e.kind, item_id=e.item_id)
+            for e in self._index.suggest(prefix, limit)
+        ]
+
+    def swap(self, index: AutocompleteIndex) -> None:
+        """Атомарно подменяет индекс: запросы видят либо старый, либо новый целиком."""
+        self._index = index
+
+
+autocomplete = Autocomplete()
+
+
+async def rebuild_autocomplete() -> None:
+    """Периодическая задача: пересборка индекса автодополнения из БД."""
+    async with async_session() as session:
+        rows = (await session.execute(
+            select(MarketItem.id, MarketItem.title, MarketItem.specs, MarketItem.popularity)
+        )).all()
+
+    index = await run_cpu(AutocompleteIndex.build, [tuple(row) for row in rows])
+    autocomplete.swap(index)
+    logger.info(f"Autocomplete index rebuilt: {len(index.keys)} keys, {len(index.top)} heavy prefixes")
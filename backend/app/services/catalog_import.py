@@ -0,0 +1,122 @@
+"""
+Потоковый разбор файлов пакетной загрузки каталога (NDJSON и CSV).
+
+Тело запроса читается кусками и разбирается построчно, поэтому память
+не зависит от размера файла: в ней одновременно только текущая строка
+(и пачка проверенных строк в MarketplaceService.import_items).
+"""
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Optional, Tuple
+
+from pydantic import ValidationError
+
+# Content-Type тела запроса -> формат
+IMPORT_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+# Строк в пачке COPY в staging-таблицу
+IMPORT_CHUNK_SIZE = 1000
+# Ошибок строк в отчёте; остальные только считаются
+MAX_IMPORT_ERRORS = 500
+# Защита от файла без переводов строк
+MAX_LINE_LENGTH = 64 * 1024
+
+# (номер строки, данные строки или None, текст ошибки или None)
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Строки UTF-8 из потока байтов (BOM и \\r\\n допускаются).
+
+    Raises:
+        ValueError: Если строка длиннее MAX_LINE_LENGTH
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    tail = ""
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        if len(tail) > MAX_LINE_LENGTH:
+            raise ValueError(f"Line exceeds {MAX_LINE_LENGTH} characters")
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Record]:
+    """Записи файла загрузки по одной.
+
+    Args:
+        chunks: Тело запроса
+        fmt: Формат (ndjson или csv, см. IMPORT_FORMATS)
+
+    Yields:
+        Record: Номер строки, словарь полей или текст ошибки разбора
+    """
+    if fmt == "csv":
+        async for record in _iter_csv(chunks):
+            yield record
+        return
+
+    row = 0
+    async for line in iter_lines(chunks):
+        row += 1
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            continue
+        if isinstance(data, dict):
+            yield row, data, None
+        else:
+            yield row, None, "Expected a JSON object"
+
+
+async def _iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """CSV с заголовком; номер записи считается с первой строки данных.
+
+    Поле в кавычках может содержать переводы строк: физические строки
+    склеиваются, пока число кавычек в записи нечётное (RFC 4180).
+    """
+    header = None
+    row = 0
+    pending = []
+    async for line in iter_lines(chunks):
+        pending.append(line)
+        if sum(part.count('"') for part in pending) % 2:
+            if sum(map(len, pending)) > MAX_LINE_LENGTH:
+                raise ValueError(f"CSV record exceeds {MAX_LINE_LENGTH} characters")
+            continue
+        text, pending = "\n".join(pending), []
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+        else:
+            # Пустые ячейки — «не задано», чтобы сработали умолчания схемы
+            yield row, {k: v for k, v in zip(header, values) if v != ""}, None
+
+    if pending:
+        yield row + 1, None, "Unterminated quoted field"
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    """Ошибки Pydantic одной строкой: 'поле: сообщение; ...'."""
+    return "; ".join(
+        f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
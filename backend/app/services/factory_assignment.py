@@ -0,0 +1,265 @@
+"""
+Назначение заказов на фабрики с учётом свободной мощности.
+
+FactoryLoadIndex держит в памяти процесса по куче (min-heap) на каждую
+специализацию: лучшая фабрика — с наименьшей долей загрузки, затем с
+бо́льшим рейтингом и уровнем сервиса. К доле загрузки добавляется штраф
+здоровья API фабрики (см. factory_health), поэтому сбоящие фабрики
+предлагаются последними. Индекс периодически обновляется из БД и сразу
+отражает собственные назначения процесса. Для заказов с координатами
+доставки кандидаты берутся из пространственного индекса (FactoryGeoIndex):
+ближайшие фабрики нужной специализации со свободной мощностью.
+
+Индекс только предлагает кандидатов: мощность занимается в БД атомарным
+UPDATE ... WHERE current_load < production_capacity (см.
+FactoryRepository.reserve_capacity). Если фабрику успел заполнить другой
+процесс, UPDATE не находит строку и берётся следующий кандидат.
+Заказ занимает мощность, пока он в производстве и фабрика не сообщила о
+его завершении (holds_capacity); переходы, после которых это перестаёт
+выполняться, возвращают мощность через FactoryAssignmentEngine.release.
+"""
+import heapq
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.core.database import async_session
+from app.core.geo import Coordinates, resolve
+from app.core.logger.logger import logger
+from app.core.monitoring.monitoring import FACTORY_METRICS
+from app.core.order_status import OrderStatus
+from app.core.unit_of_work import UnitOfWork
+from app.repositories.factory import FactoryRepository
+from app.services.factory_geo import FactoryGeoIndex
+from app.services.factory_health import factory_health
+
+# Кандидатов, перебираемых за одну попытку назначения
+MAX_CANDIDATES = 5
+# Километров расстояния, равных единице штрафа здоровья при выборе ближайшей фабрики
+HEALTH_PENALTY_KM = 500.0
+
+# Статусы производства, после которых заказ не занимает мощность фабрики
+RELEASED_PRODUCTION_STATUSES = frozenset({"completed", "failed"})
+
+_SPEC_SEPARATORS = re.compile(r"[\s,;/|]+")
+
+
+def specializations(value: Optional[str]) -> List[str]:
+    """Специализации фабрики: 'Banner, standee' -> ['banner', 'standee']."""
+    return [token for token in _SPEC_SEPARATORS.split((value or "").lower()) if token]
+
+
+def holds_capacity(order: Any) -> bool:
+    """Занимает ли заказ (status, production_status, factory_id) единицу мощности фабрики."""
+    return (
+        order.factory_id is not None
+        and order.status == OrderStatus.PRODUCTION
+        and order.production_status not in RELEASED_PRODUCTION_STATUSES
+    )
+
+
+@dataclass
+class FactoryLoad:
+    """Снимок загрузки фабрики в индексе."""
+    id: UUID
+    specializations: List[str]
+    load: int
+    capacity: int
+    rating: float
+    service_level: int
+    version: int = 0
+
+    @property
+    def available(self) -> bool:
+        return self.load < self.capacity
+
+    def priority(self, penalty: float = 0.0) -> Tuple[float, float, int]:
+        return self.load / self.capacity + penalty, -(self.rating or 0.0), -(self.service_level or 0)
+
+
+class FactoryLoadIndex:
+    """Кучи фабрик по специализациям с ленивым удалением устаревших записей.
+
+    Запись кучи — (приоритет, версия, id); при изменении загрузки версия
+    фабрики растёт и в кучу кладётся новая запись, а старые отбрасываются
+    при извлечении. Методы синхронные, поэтому в asyncio атомарны.
+
+    Штраф penalty(factory_id) учитывается в записи при её добавлении, а
+    отобранные кандидаты переупорядочиваются по текущему штрафу.
+
+    Пример использования:
+         index.rebuild(rows)
+         for factory_id in index.candidates("banner"):
+             ...
+         index.set_load(factory_id, new_load)
+    """
+
+    def __init__(self, penalty: Optional[Callable[[UUID], float]] = None):
+        self.penalty = penalty or (lambda factory_id: 0.0)
+        self._factories: Dict[UUID, FactoryLoad] = {}
+        self._heaps: Dict[str, List[Tuple[Tuple[float, float, int], int, UUID]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def rebuild(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Заменяет содержимое индекса снимком из БД (см. FactoryRepository.load_snapshot)."""
+        factories: Dict[UUID, FactoryLoad] = {}
+        heaps: Dict[str, list] = {}
+        for factory_id, specialization, load, capacity, rating, service_level, *_ in rows:
+            factory = FactoryLoad(
+                factory_id, specializations(specialization), load or 0, capacity, rating, service_level
+            )
+            factories[factory_id] = factory
+            if factory.available:
+                for spec in factory.specializations:
+                    heaps.setdefault(spec, []).append((self._priority(factory), 0, factory_id))
+        for heap in heaps.values():
+            heapq.heapify(heap)
+        self._factories, self._heaps = factories, heaps
+
+    def candidates(self, product_type: str, limit: int = MAX_CANDIDATES) -> List[UUID]:
+        """До limit фабрик со свободной мощностью, лучшие первыми."""
+        heap = self._heaps.get(product_type.lower())
+        if not heap:
+            return []
+        taken = []
+        while heap and len(taken) < limit:
+            entry = heapq.heappop(heap)
+            if self._is_current(entry):
+                taken.append(entry)
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return sorted(
+            (factory_id for _, _, factory_id in taken),
+            key=lambda factory_id: self._priority(self._factories[factory_id])
+        )
+
+    def is_available(self, factory_id: UUID) -> bool:
+        """Есть ли у фабрики свободная мощность."""
+        factory = self._factories.get(factory_id)
+        return factory is not None and factory.available
+
+    def set_load(self, factory_id: UUID, load: int) -> None:
+        """Обновляет загрузку фабрики после резервирования или освобождения."""
+        factory = self._factories.get(factory_id)
+        if factory is None:
+            return
+        factory.load = load
+        factory.version += 1
+        if factory.available:
+            for spec in factory.specializations:
+                heapq.heappush(
+                    self._heaps.setdefault(spec, []),
+                    (self._priority(factory), factory.version, factory_id)
+                )
+
+    def mark_full(self, factory_id: UUID) -> None:
+        """Убирает фабрику из кандидатов до следующего обновления из БД."""
+        factory = self._factories.get(factory_id)
+        if factory is not None:
+            self.set_load(factory_id, factory.capacity)
+
+    def _priority(self, factory: FactoryLoad) -> Tuple[float, float, int]:
+        return factory.priority(self.penalty(factory.id))
+
+    def _is_current(self, entry: Tuple[Any, int, UUID]) -> bool:
+        _, version, factory_id = entry
+        factory = self._factories.get(factory_id)
+        return factory is not None and factory.version == version and factory.available
+
+
+class FactoryAssignmentEngine:
+    """Подбор фабрики и резервирование её мощности (по одному на процесс)."""
+
+    def __init__(self):
+        self.index = FactoryLoadIndex(penalty=factory_health.penalty)
+        self.geo = FactoryGeoIndex()
+        self._loaded = False
+
+    async def refresh(self, repo: FactoryRepository) -> None:
+        """Перечитывает загрузку и координаты фабрик из БД.
+
+        Деревья FactoryGeoIndex перестраиваются только для специализаций,
+        в которых что-то изменилось.
+        """
+        rows = await repo.load_snapshot()
+        self.index.rebuild(rows)
+        self.geo.update({
+            row[0]: (specializations(row[1]), resolve(*row[6:9]))
+            for row in rows
+        })
+        self._loaded = True
+
+    def candidates(self, product_type: str, near: Optional[Coordinates] = None) -> List[UUID]:
+        """Кандидаты на заказ: ближайшие к near (с учётом здоровья API) или наименее загруженные."""
+        if near is not None:
+            nearest = self.geo.nearest(product_type, near, MAX_CANDIDATES, self.index.is_available)
+            if nearest:
+                nearest.sort(key=lambda item: item[1] + HEALTH_PENALTY_KM * factory_health.penalty(item[0]))
+                return [factory_id for factory_id, _ in nearest]
+        return self.index.candidates(product_type)
+
+    async def reserve(
+            self,
+            repo: FactoryRepository,
+            product_type: str,
+            near: Optional[Coordinates] = None
+    ) -> Optional[UUID]:
+        """Находит фабрику для типа продукта и занимает единицу её мощности.
+
+        Резервирование выполняется в транзакции repo: при её откате загрузка
+        в индексе расходится с БД до следующего refresh.
+
+        Args:
+            repo: Репозиторий фабрик текущей транзакции
+            product_type: Тип продукта (специализация фабрики)
+            near: Координаты доставки; без них выбирается наименее загруженная фабрика
+
+        Returns:
+            Optional[UUID]: ID фабрики или None, если свободных фабрик нет
+        """
+        if not self._loaded:
+            await self.refresh(repo)
+
+        for attempt in range(2):
+            for factory_id in self.candidates(product_type, near):
+                load = await repo.reserve_capacity(factory_id)
+                if load is None:
+                    FACTORY_METRICS['reservations'].labels(result='conflict').inc()
+                    self.index.mark_full(factory_id)
+                    continue
+                FACTORY_METRICS['reservations'].labels(result='reserved').inc()
+                self.index.set_load(factory_id, load)
+                return factory_id
+            # Индекс мог устареть: фабрики освободились или добавлены после refresh
+            if attempt == 0:
+                await self.refresh(repo)
+
+        FACTORY_METRICS['reservations'].labels(result='exhausted').inc()
+        return None
+
+    async def release(self, repo: FactoryRepository, factory_id: UUID, count: int = 1) -> None:
+        """Возвращает count единиц мощности фабрики (заказы ушли из производства).
+
+        Загрузка пишется в транзакции repo, индекс обновляется после её COMMIT.
+        """
+        load = await repo.release_capacity(factory_id, count)
+        if load is None:
+            return
+
+        async def after_commit() -> None:
+            self.index.set_load(factory_id, load)
+
+        repo.uow.on_commit(after_commit)
+
+
+assignment_engine = FactoryAssignmentEngine()
+
+
+async def refresh_factory_loads() -> None:
+    """Периодическая задача: сверка индекса загрузки фабрик с БД."""
+    async with async_session() as session, UnitOfWork.of(session):
+        await assignment_engine.refresh(FactoryRepository(session))
+    logger.debug(f"Factory load index refreshed: {len(assignment_engine.index)} factories")
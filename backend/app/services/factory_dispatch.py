@@ -0,0 +1,282 @@
+"""
+Очередь отправки производственных заданий на фабрики.
+
+Задания копятся по фабрикам и уходят пачкой, когда набралось
+FACTORY_DISPATCH_BATCH_SIZE заказов или прошло FACTORY_DISPATCH_MAX_DELAY
+с первого из них. Пачка отправляется одним запросом на /orders/batch;
+фабрики без пакетного эндпоинта запоминаются и получают заказы по одному.
+
+Число одновременных запросов к одной фабрике ограничено
+(FACTORY_DISPATCH_MAX_IN_FLIGHT); неудачные запросы повторяются с
+экспоненциальной задержкой, слот на время ожидания освобождается.
+Повторяются только сетевые ошибки и ответы 5xx; повторы пачки несут тот
+же заголовок Idempotency-Key. Каждый запрос записывается в реестр здоровья
+фабрик (ответ 4xx — не сбой фабрики); пока цепь фабрики разомкнута,
+задания не отправляются и сразу завершаются CircuitOpenError, повторы
+после размыкания цепи прекращаются.
+
+Заказы, задания по которым так и не дошли до фабрики, помечаются в БД
+(production_status = dispatch_failed, см. mark_dispatch_failed) и
+отправляются снова периодической задачей redeliver_failed_dispatches.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from uuid import UUID, uuid4
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.factory_client import BatchNotSupportedError, FactoryAPIClient, FactoryAPIError
+from app.core.logger.logger import logger
+from app.core.monitoring.monitoring import FACTORY_METRICS
+from app.core.retry import RetryManager
+from app.core.unit_of_work import UnitOfWork
+from app.repositories.order import OrderRepository
+from app.services.factory_health import CircuitOpenError, FactoryHealthRegistry, factory_health
+from app.models.factory import Factory
+
+# Ответ post_batch, означающий «пакетной отправки нет» (не повторяется)
+_NO_BATCH = object()
+
+
+@dataclass(frozen=True)
+class FactoryEndpoint:
+    """Реквизиты API фабрики, не привязанные к сессии БД."""
+    id: UUID
+    api_url: str
+    api_key: Optional[str] = None
+
+    @classmethod
+    def of(cls, factory: Factory) -> "FactoryEndpoint":
+        return cls(factory.id, factory.api_url, factory.api_key)
+
+
+@dataclass
+class _Pending:
+    payload: dict
+    future: asyncio.Future
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class _Lane:
+    """Очередь и ограничения одной фабрики."""
+
+    def __init__(self, endpoint: FactoryEndpoint, max_in_flight: int):
+        self.endpoint = endpoint
+        self.pending: List[_Pending] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.batch_supported = True
+
+
+class FactoryDispatchQueue:
+    """
+    Пакетная отправка заказов на фабрики (по одному экземпляру на процесс).
+
+    Пример использования:
+         result = await dispatch_queue.submit(factory, order_payload(order))
+         ...
+         await dispatch_queue.close()  # при остановке приложения
+    """
+
+    def __init__(
+            self,
+            client: Optional[FactoryAPIClient] = None,
+            batch_size: int = settings.FACTORY_DISPATCH_BATCH_SIZE,
+            max_delay: float = settings.FACTORY_DISPATCH_MAX_DELAY,
+            max_in_flight: int = settings.FACTORY_DISPATCH_MAX_IN_FLIGHT,
+            retry: Optional[RetryManager] = None,
+            health: Optional[FactoryHealthRegistry] = None,
+            on_failure: Optional[Callable[[List[UUID]], Awaitable[Any]]] = None
+    ):
+        self.client = client or FactoryAPIClient()
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_in_flight = max_in_flight
+        self.retry = retry or RetryManager(max_retries=3, delay=1.0, backoff=2.0)
+        self.health = health or factory_health
+        # Сохранение недоставленных заказов для повторной отправки
+        self.on_failure = on_failure
+        self._lanes: Dict[UUID, _Lane] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, factory: Factory | FactoryEndpoint, payload: dict) -> asyncio.Future:
+        """Ставит задание в очередь фабрики.
+
+        Returns:
+            asyncio.Future: Ответ фабрики по заказу; ждать его не обязательно —
+                ошибки доставки логируются, а заказы передаются в on_failure
+
+        Raises:
+            ValueError: Если у фабрики не настроен API
+        """
+        endpoint = factory if isinstance(factory, FactoryEndpoint) else FactoryEndpoint.of(factory)
+        if not endpoint.api_url:
+            raise ValueError("Factory API URL not configured")
+
+        lane = self._lanes.get(endpoint.id)
+        if lane is None:
+            lane = self._lanes[endpoint.id] = _Lane(endpoint, self.max_in_flight)
+        elif lane.endpoint != endpoint:
+            # Сменились URL или ключ: новые реквизиты действуют для следующих пачек
+            self._flush(lane)
+            lane.endpoint, lane.batch_supported = endpoint, True
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        lane.pending.append(_Pending(payload, future))
+
+        if len(lane.pending) >= self.batch_size:
+            self._flush(lane)
+        elif lane.timer is None:
+            lane.timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush, lane)
+        return future
+
+    async def close(self) -> None:
+        """Отправляет накопленное, дожидается доставки и закрывает пул соединений."""
+        for lane in self._lanes.values():
+            self._flush(lane)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.client.close()
+
+    def _flush(self, lane: _Lane) -> None:
+        if lane.timer is not None:
+            lane.timer.cancel()
+            lane.timer = None
+        while lane.pending:
+            batch, lane.pending = lane.pending[:self.batch_size], lane.pending[self.batch_size:]
+            task = asyncio.create_task(self._deliver(lane, lane.endpoint, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _deliver(self, lane: _Lane, endpoint: FactoryEndpoint, batch: List[_Pending]) -> None:
+        FACTORY_METRICS['dispatch_batch_size'].observe(len(batch))
+        if len(batch) > 1 and lane.batch_supported:
+            try:
+                # Ключ один на пачку: повтор после обрыва не создаст заказы дважды
+                post_batch = partial(self.client.post_batch, idempotency_key=str(uuid4()))
+                results = await self._send(lane, endpoint, post_batch, [item.payload for item in batch])
+            except Exception as e:
+                await self._fail(endpoint, batch, e, "batch")
+                return
+            if results is not _NO_BATCH:
+                for item, result in zip(batch, results):
+                    self._resolve(item, result, "batch")
+                return
+            lane.batch_supported = False
+            logger.info(f"Factory {endpoint.id} has no batch endpoint, sending orders one by one")
+
+        await asyncio.gather(*(self._deliver_one(lane, endpoint, item) for item in batch))
+
+    async def _deliver_one(self, lane: _Lane, endpoint: FactoryEndpoint, item: _Pending) -> None:
+        try:
+            result = await self._send(lane, endpoint, self.client.post_order, item.payload)
+        except Exception as e:
+            await self._fail(endpoint, [item], e, "single")
+        else:
+            self._resolve(item, result, "single")
+
+    async def _send(
+            self,
+            lane: _Lane,
+            endpoint: FactoryEndpoint,
+            call: Callable[[str, Optional[str], Any], Awaitable[Any]],
+            payload: Any
+    ) -> Any:
+        """Запрос к фабрике с повторами; слот in-flight занят только на время запроса.
+
+        Повторяются сетевые ошибки и 5xx, пока цепь фабрики замкнута.
+
+        Raises:
+            CircuitOpenError: Если цепь фабрики разомкнута до первой попытки
+            FactoryAPIError: Если фабрика отклонила запрос (4xx) или повторы исчерпаны
+        """
+        gauge = FACTORY_METRICS['in_flight'].labels(factory=str(endpoint.id))
+        if not self.health.allow_request(endpoint.id):
+            raise CircuitOpenError(endpoint.id)
+        attempts = 0
+
+        async def attempt():
+            nonlocal attempts
+            # Первую попытку уже разрешила проверка выше (в half-open — единственный пробный вызов)
+            attempts += 1
+            if attempts > 1 and not self.health.allow_request(endpoint.id):
+                raise CircuitOpenError(endpoint.id)
+            recorded = False
+            try:
+                async with lane.slots:
+                    gauge.inc()
+                    started = time.monotonic()
+                    try:
+                        result = await call(endpoint.api_url, endpoint.api_key, payload)
+                    except BatchNotSupportedError:
+                        # Фабрика ответила: для здоровья это успешный вызов
+                        result = _NO_BATCH
+                    except FactoryAPIError as e:
+                        # 4xx — фабрика жива и отклонила запрос, это не её сбой
+                        recorded = True
+                        if e.retryable:
+                            self.health.record_failure(endpoint.id, time.monotonic() - started)
+                        else:
+                            self.health.record_success(endpoint.id, time.monotonic() - started)
+                        raise
+                    except Exception:
+                        recorded = True
+                        self.health.record_failure(endpoint.id, time.monotonic() - started)
+                        raise
+                    finally:
+                        gauge.dec()
+                    recorded = True
+                    self.health.record_success(endpoint.id, time.monotonic() - started)
+                    return result
+            finally:
+                if not recorded:
+                    # Отменённый (в т.ч. пробный half-open) вызов не должен держать цепь занятой
+                    self.health.release_probe(endpoint.id)
+
+        def retryable(error: Exception) -> bool:
+            # Повторяем только сетевые ошибки и 5xx и только пока цепь замкнута
+            if self.health.is_open(endpoint.id):
+                return False
+            return isinstance(error, FactoryAPIError) and error.retryable
+
+        return await self.retry.execute_with_retry(attempt, retry_if=retryable)
+
+    @staticmethod
+    def _resolve(item: _Pending, result: Any, mode: str) -> None:
+        FACTORY_METRICS['dispatch_latency'].labels(mode=mode).observe(time.monotonic() - item.queued_at)
+        if not item.future.done():
+            item.future.set_result(result)
+
+    async def _fail(self, endpoint: FactoryEndpoint, batch: List[_Pending], error: Exception, mode: str) -> None:
+        FACTORY_METRICS['dispatch_failures'].labels(mode=mode).inc(len(batch))
+        order_ids = [item.payload.get("order_id") for item in batch]
+        logger.error(
+            f"Factory {endpoint.id} dispatch failed for {len(batch)} orders: {error}",
+            extra={"order_ids": order_ids}
+        )
+        for item in batch:
+            if not item.future.done():
+                item.future.set_exception(error)
+        if self.on_failure is not None:
+            try:
+                await self.on_failure([UUID(order_id) for order_id in order_ids if order_id])
+            except Exception as e:
+                logger.error(f"Failed to record undelivered orders {order_ids}: {e}", exc_info=True)
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Ошибка уже залогирована в _fail; без этого asyncio ругается на неполученное исключение
+    if not future.cancelled():
+        future.exception()
+
+
+async def mark_dispatch_failed(order_ids: List[UUID]) -> None:
+    """Помечает заказы с недоставленным заданием (см. OrderRepository.mark_dispatch_failed)."""
+    async with async_session() as session, UnitOfWork.of(session):
+        await OrderRepository(session).mark_dispatch_failed(order_ids)
+
+
+dispatch_queue = FactoryDispatchQueue(on_failure=mark_dispatch_failed)
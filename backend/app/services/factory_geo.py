@@ -0,0 +1,111 @@
+"""
+Пространственный индекс фабрик: ближайшие фабрики нужной специализации.
+
+На каждую специализацию строится KD-дерево (scipy cKDTree) по точкам
+фабрик на единичной сфере; запрос k ближайших — O(log n). Дерево
+неизменяемо, поэтому при обновлении перестраиваются только деревья тех
+специализаций, в которых фабрика появилась, исчезла или переехала.
+Загрузка фабрик в индексе не хранится: наличие свободной мощности
+проверяется при запросе (см. FactoryLoadIndex.is_available).
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from app.core.geo import Coordinates, chord_to_km, unit_vectors
+
+
+class _SpecTree:
+    """KD-дерево фабрик одной специализации."""
+
+    def __init__(self, ids: List[UUID], points: List[Coordinates]):
+        self.ids = ids
+        self.tree = cKDTree(unit_vectors(points))
+
+
+class FactoryGeoIndex:
+    """
+    Ближайшие фабрики по специализации.
+
+    Пример использования:
+         geo.update({factory_id: (["banner"], (55.75, 37.61)), ...})
+         for factory_id, km in geo.nearest("banner", (59.93, 30.33), 5, index.is_available):
+             ...
+    """
+
+    def __init__(self):
+        self._factories: Dict[UUID, Tuple[Tuple[str, ...], Coordinates]] = {}
+        self._trees: Dict[str, _SpecTree] = {}
+        self._dirty: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def update(self, factories: Dict[UUID, Tuple[Iterable[str], Optional[Coordinates]]]) -> Set[str]:
+        """Заменяет набор фабрик, помечая изменившиеся специализации.
+
+        Args:
+            factories: id -> (специализации, координаты); фабрики без
+                координат в индекс не попадают
+
+        Returns:
+            Set[str]: Специализации, деревья которых будут перестроены
+        """
+        current = {
+            factory_id: (tuple(specs), position)
+            for factory_id, (specs, position) in factories.items()
+            if position is not None
+        }
+        for factory_id in self._factories.keys() | current.keys():
+            old, new = self._factories.get(factory_id), current.get(factory_id)
+            if old != new:
+                self._dirty.update(old[0] if old else ())
+                self._dirty.update(new[0] if new else ())
+        self._factories = current
+        return set(self._dirty)
+
+    def nearest(
+            self,
+            spec: str,
+            position: Coordinates,
+            limit: int,
+            available: Callable[[UUID], bool] = lambda factory_id: True
+    ) -> List[Tuple[UUID, float]]:
+        """До limit ближайших фабрик специализации, прошедших фильтр available.
+
+        Запрашивается вдвое больше соседей, пока не наберётся limit
+        подходящих или не кончатся фабрики.
+
+        Returns:
+            List[Tuple[UUID, float]]: (id фабрики, расстояние в км), ближайшие первыми
+        """
+        spec = spec.lower()
+        tree = self._tree(spec)
+        if tree is None or limit <= 0:
+            return []
+        point = unit_vectors([position])[0]
+        size, k = len(tree.ids), limit
+        while True:
+            k = min(k, size)
+            distances, indices = tree.tree.query(point, k=k)
+            found = [
+                (tree.ids[i], float(km))
+                for i, km in zip(np.atleast_1d(indices), np.atleast_1d(chord_to_km(distances)))
+                if available(tree.ids[i])
+            ]
+            if len(found) >= limit or k == size:
+                return found[:limit]
+            k *= 2
+
+    def _tree(self, spec: str) -> Optional[_SpecTree]:
+        if spec in self._dirty:
+            self._dirty.discard(spec)
+            members = [(i, position) for i, (specs, position) in self._factories.items() if spec in specs]
+            if members:
+                ids, points = zip(*members)
+                self._trees[spec] = _SpecTree(list(ids), list(points))
+            else:
+                self._trees.pop(spec, None)
+        return self._trees.get(spec)
@@ -0,0 +1,154 @@
+"""
+Здоровье API фабрик: EWMA задержки и доли ошибок, circuit breaker.
+
+Каждый исходящий вызов фабрики записывается в реестр (по Factory.id).
+После FACTORY_CIRCUIT_FAILURES ошибок подряд цепь фабрики размыкается:
+вызовы не выполняются FACTORY_CIRCUIT_COOLDOWN секунд, затем пропускается
+один пробный вызов (half-open), успех замыкает цепь, ошибка — снова
+размыкает.
+
+Штраф здоровья (penalty) добавляется к рангу фабрики при подборе
+(FactoryLoadIndex, планировщик производства): медленные и сбоящие
+фабрики получают заказы в последнюю очередь, но не исключаются.
+"""
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.monitoring.monitoring import FACTORY_METRICS
+
+# Вес нового наблюдения в EWMA
+EWMA_ALPHA = 0.2
+# Задержка, при которой штраф за медленность достигает максимума (сек)
+LATENCY_BUDGET = 5.0
+LATENCY_PENALTY = 0.5
+# Штраф разомкнутой цепи: фабрика уходит за все исправные с той же загрузкой
+OPEN_PENALTY = 1.0
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Цепь фабрики разомкнута: вызов не выполняется."""
+
+
+@dataclass
+class FactoryHealth:
+    """Состояние одной фабрики."""
+    latency: Optional[float] = None
+    error_rate: float = 0.0
+    last_success: Optional[float] = None
+    consecutive_failures: int = 0
+    state: str = CLOSED
+    opened_at: float = 0.0
+    probing: bool = False
+
+    def penalty(self) -> float:
+        """Штраф к рангу: доля ошибок + медленность (+ OPEN_PENALTY при разомкнутой цепи)."""
+        slowness = min(1.0, (self.latency or 0.0) / LATENCY_BUDGET) * LATENCY_PENALTY
+        return self.error_rate + slowness + (OPEN_PENALTY if self.state != CLOSED else 0.0)
+
+
+class FactoryHealthRegistry:
+    """
+    Реестр здоровья фабрик (по одному на процесс).
+
+    Пример использования:
+         if not factory_health.allow_request(factory_id):
+             raise CircuitOpenError(factory_id)
+         started = time.monotonic()
+         try:
+             await call()
+         except Exception:
+             factory_health.record_failure(factory_id, time.monotonic() - started)
+             raise
+         factory_health.record_success(factory_id, time.monotonic() - started)
+    """
+
+    def __init__(
+            self,
+            failure_threshold: int = settings.FACTORY_CIRCUIT_FAILURES,
+            cooldown: float = settings.FACTORY_CIRCUIT_COOLDOWN
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._factories: Dict[UUID, FactoryHealth] = {}
+
+    def get(self, factory_id: UUID) -> FactoryHealth:
+        health = self._factories.get(factory_id)
+        if health is None:
+            health = self._factories[factory_id] = FactoryHealth()
+        return health
+
+    def penalty(self, factory_id: UUID) -> float:
+        """Штраф фабрики; 0 для фабрик без вызовов."""
+        health = self._factories.get(factory_id)
+        return health.penalty() if health is not None else 0.0
+
+    def allow_request(self, factory_id: UUID, now: Optional[float] = None) -> bool:
+        """Можно ли вызывать фабрику; после cooldown пропускает один пробный вызов."""
+        health = self._factories.get(factory_id)
+        if health is None or health.state == CLOSED:
+            return True
+        now = time.monotonic() if now is None else now
+        if health.state == OPEN and now - health.opened_at >= self.cooldown:
+            health.state, health.probing = HALF_OPEN, False
+        if health.state == HALF_OPEN and not health.probing:
+            health.probing = True
+            self._export(factory_id, health)
+            return True
+        return False
+
+    def is_open(self, factory_id: UUID) -> bool:
+        """Разомкнута ли цепь фабрики (без перехода в half-open)."""
+        health = self._factories.get(factory_id)
+        return health is not None and health.state == OPEN
+
+    def release_probe(self, factory_id: UUID) -> None:
+        """Снимает пробный вызов half-open, завершившийся без результата (отмена).
+
+        Без этого цепь осталась бы в half-open с занятым probing навсегда.
+        """
+        health = self._factories.get(factory_id)
+        if health is not None and health.state == HALF_OPEN:
+            health.probing = False
+
+    def record_success(self, factory_id: UUID, latency: float) -> None:
+        health = self.get(factory_id)
+        self._observe(health, latency, failed=False)
+        health.last_success = time.time()
+        health.consecutive_failures = 0
+        health.state, health.probing = CLOSED, False
+        self._export(factory_id, health)
+
+    def record_failure(self, factory_id: UUID, latency: float, now: Optional[float] = None) -> None:
+        health = self.get(factory_id)
+        self._observe(health, latency, failed=True)
+        health.consecutive_failures += 1
+        if health.state == HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+            health.state, health.probing = OPEN, False
+            health.opened_at = time.monotonic() if now is None else now
+        self._export(factory_id, health)
+
+    @staticmethod
+    def _observe(health: FactoryHealth, latency: float, failed: bool) -> None:
+        health.latency = latency if health.latency is None else (
+            EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * health.latency
+        )
+        health.error_rate = EWMA_ALPHA * failed + (1 - EWMA_ALPHA) * health.error_rate
+
+    @staticmethod
+    def _export(factory_id: UUID, health: FactoryHealth) -> None:
+        factory = str(factory_id)
+        FACTORY_METRICS['health_latency'].labels(factory=factory).set(health.latency or 0.0)
+        FACTORY_METRICS['health_error_rate'].labels(factory=factory).set(health.error_rate)
+        FACTORY_METRICS['health_penalty'].labels(factory=factory).set(health.penalty())
+        FACTORY_METRICS['circuit_state'].labels(factory=factory).set(_STATE_VALUES[health.state])
+        if health.last_success is not None:
+            FACTORY_METRICS['last_success'].labels(factory=factory).set(health.last_success)
+
+
+factory_health = FactoryHealthRegistry()
@@ -161,8 +161,7 @@ class GenerationService:
             user_id: uuid.UUID,
             limit: int = 100
     ) -> List[GenerationResponse]:
-        generations = await self.generation_repo.get_by_user(user_id, limit=limit)
-        return [GenerationResponse.model_validate(g) for g in generations]
+        return await self.generation_repo.get_user_generations(user_id, limit=limit)
 
     async def cancel_generation(
             self,
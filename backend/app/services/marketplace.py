@@ -1,14 +1,75 @@
 from __future__ import annotations
 
-from typing import List
-from uuid import UUID
+import hashlib
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
 
+from app.core.cache import catalog_cache
+from app.core.database import async_session
+from app.core.logger.logger import logger
+from app.core.order_status import OrderStatus
+from app.core.popularity import popularity_tracker
+from app.core.pagination import InvalidCursorError, encode_cursor, optional_cursor, split_page
 from app.core.storage import S3Storage
-from app.repositories.marketplace import MarketplaceRepository
+from app.core.unit_of_work import UnitOfWork
+from app.repositories.cart import CartRepository
+from app.repositories.marketplace import MarketplaceRepository, item_card_tags, page_cache_tags
+from app.repositories.notification import NotificationRepository
+from app.repositories.order import OrderRepository
+from app.repositories.payment import PaymentRepository
+from app.repositories.review import ReviewRepository
 from app.repositories.user import UserRepository
-from app.schemas.marketplace import MarketItem, MarketFilters, CartItem
+from app.schemas.marketplace import (
+    CartItem,
+    CheckoutResponse,
+    ImportReport,
+    ImportRowError,
+    MarketFilters,
+    MarketItemDetails,
+    MarketItemImport,
+    MarketItemPage,
+)
+from app.schemas.pagination import CursorPage
+from app.schemas.review import ReviewResponse
+from app.services.catalog_import import (
+    IMPORT_CHUNK_SIZE,
+    MAX_IMPORT_ERRORS,
+    format_validation_error,
+    iter_records,
+)
+from app.services.notifications import NotificationService
+from app.services.payment import PaymentService
+from app.services.recommendations import get_similar_item_ids
+
+# Тип ключа сортировки в курсоре
+SORT_KEY_TYPES = {
+    "relevance": float,
+    "newest": datetime,
+    "price_asc": int,
+    "price_desc": int,
+    "rating": float,
+    "popularity": float,
+}
+
+# Первые страницы, прогреваемые при старте и затем раз в CATALOG_CACHE_WARM_INTERVAL
+WARM_QUERIES = (
+    *(MarketFilters(sort=sort) for sort in ("newest", "popularity", "rating", "price_asc")),
+    *(MarketFilters(item_type=t) for t in ("banner", "standee", "billboard", "digital")),
+)
+
+# Отзывов на странице (первая страница входит в карточку товара)
+REVIEW_PAGE_SIZE = 10
+
+_PAGE_ADAPTER = TypeAdapter(MarketItemPage)
+_ITEM_ADAPTER = TypeAdapter(MarketItemDetails)
+
+
+def _page_cache_key(filters: MarketFilters) -> str:
+    return f"page:{hashlib.sha1(filters.model_dump_json().encode()).hexdigest()}"
 
 
 class MarketplaceService:
@@ -16,40 +77,156 @@ class MarketplaceService:
     Сервис для работы с маркетплейсом дизайнов.
     Включает:
     - Поиск и фильтрацию товаров
-    - Работу с корзиной
+    - Работу с корзиной (Redis) и её оформление
     - Создание заказов из товаров
     """
 
-    def __init__(self, repo: MarketplaceRepository, user_repo: UserRepository):
+    def __init__(
+            self,
+            repo: MarketplaceRepository,
+            user_repo: UserRepository,
+            review_repo: ReviewRepository,
+            order_repo: OrderRepository,
+            cart_repo: CartRepository
+    ):
         self.repo = repo
         self.user_repo = user_repo
+        self.review_repo = review_repo
+        self.order_repo = order_repo
+        self.cart_repo = cart_repo
         self.storage = S3Storage()
 
-    async def get_items(self, filters: MarketFilters) -> List[MarketItem]:
-        """Получение отфильтрованных товаров."""
-        items = await self.repo.get_filtered_items(
-            item_type=filters.item_type,
+    async def get_items(self, filters: MarketFilters) -> MarketItemPage:
+        """Страница каталога с фильтрами, сортировкой и фасетами.
+
+        Фасеты считаются только для первой страницы (без курсора). Первые
+        страницы кэшируются в Redis (catalog_cache) и сбрасываются при
+        записи товаров их типа; страницы по курсору всегда читаются из БД.
+
+        Raises:
+            ValueError: Если сортировка relevance запрошена без поиска
+            InvalidCursorError: Если курсор повреждён или выдан для другой сортировки
+        """
+        if filters.cursor:
+            return await self._load_items(filters)
+
+        return await catalog_cache.get_or_load(
+            _page_cache_key(filters),
+            _PAGE_ADAPTER,
+            lambda: self._load_items(filters),
+            tags=page_cache_tags(filters.item_type)
+        )
+
+    async def refresh_items(self, filters: MarketFilters) -> MarketItemPage:
+        """Перечитывает первую страницу каталога из БД и обновляет её в кэше."""
+        return await catalog_cache.refresh(
+            _page_cache_key(filters),
+            _PAGE_ADAPTER,
+            lambda: self._load_items(filters),
+            tags=page_cache_tags(filters.item_type)
+        )
+
+    async def _load_items(self, filters: MarketFilters) -> MarketItemPage:
+        """Читает страницу каталога из БД."""
+        sort = filters.sort or ("relevance" if filters.search else "newest")
+        criteria = dict(
+            item_type=filters.item_type.upper() if filters.item_type else None,
             min_price=filters.min_price,
             max_price=filters.max_price,
             rating=filters.min_rating,
-            search=filters.search
+            search=filters.search,
+            specs=filters.spec
         )
-        return [MarketItem.from_orm(item) for item in items]
+        if sort == "popularity" and all(value is None for value in criteria.values()):
+            return await self._load_popular(filters, criteria)
 
-    async def add_to_cart(self, user_id: UUID, item_id: UUID, quantity: int):
-        item = await self.repo.get_item(item_id)
-        if not item:
-            raise HTTPException(404, "Item not found")
+        after = optional_cursor(filters.cursor, (str, SORT_KEY_TYPES[sort], UUID))
+        if after and after[0] != sort:
+            raise InvalidCursorError("Cursor was issued for another sort order")
+
+        items, next_key = await self.repo.browse_items(
+            sort, limit=filters.limit, after=after[1:] if after else None, **criteria
+        )
+        return MarketItemPage(
+            items=items,
+            next_cursor=encode_cursor(sort, *next_key) if next_key else None,
+            facets=None if filters.cursor else await self.repo.item_facets(**criteria)
+        )
+
+    async def _load_popular(self, filters: MarketFilters, criteria: dict) -> MarketItemPage:
+        """Каталог по популярности без фильтров — живой рейтинг из Redis (ZREVRANGE).
+
+        Сначала идут товары с недавней активностью (рейтинг Redis, курсор —
+        позиция в рейтинге), за ними товары вне снимка популярности в БД
+        (popularity = 0, keyset по id). Рейтинг и снимок усекаются одной
+        задачей (snapshot_popularity), поэтому хвост не пересекается с
+        рейтингом, кроме товаров с активностью после снимка — они
+        отсеиваются проверкой страницы по рейтингу, без выгрузки всего ZSET.
+        С фильтрами сортировка идёт только по снимку.
+        """
+        cursor = optional_cursor(filters.cursor, (str, int, UUID))
+        if cursor and cursor[0] != "popularity":
+            raise InvalidCursorError("Cursor was issued for another sort order")
+        start, after = (cursor[1], cursor[2]) if cursor else (0, None)
+
+        # Курсор с id означает, что рейтинг Redis уже пройден
+        item_ids = [] if after else await popularity_tracker.top(limit=filters.limit + 1, offset=start)
+        ranked_count = len(item_ids)
+        if len(item_ids) <= filters.limit:
+            item_ids += await self._unranked_ids(filters.limit + 1 - len(item_ids), after)
+        page_ids, has_more = split_page(item_ids, filters.limit)
+        if has_more and len(page_ids) > ranked_count:
+            after = page_ids[-1]
+        return MarketItemPage(
+            items=await self.repo.get_cards(page_ids),
+            next_cursor=encode_cursor("popularity", start + filters.limit, after) if has_more else None,
+            facets=None if filters.cursor else await self.repo.item_facets(**criteria)
+        )
+
+    async def _unranked_ids(self, limit: int, after: Optional[UUID]) -> List[UUID]:
+        """До limit товаров хвоста каталога (вне рейтинга Redis) после after."""
+        item_ids = []
+        while len(item_ids) < limit:
+            need = limit - len(item_ids)
+            batch = await self.repo.get_unranked_ids(need, after)
+            ranked = await popularity_tracker.ranked(batch)
+            item_ids += [item_id for item_id in batch if item_id not in ranked]
+            if len(batch) < need:
+                break
+            after = batch[-1]
+        return item_ids
+
+    async def get_top_items(self, limit: int = 20) -> List[MarketItem]:
+        """Самые популярные товары сейчас (затухающий рейтинг просмотров, корзин и заказов)."""
+        return await self.repo.get_cards(await popularity_tracker.top(limit=limit))
+
+    async def get_similar_items(self, item_id: UUID, limit: int = 8) -> List[MarketItem]:
+        """Похожие товары из предрассчитанного индекса рекомендаций."""
+        return await self.repo.get_cards(await get_similar_item_ids(item_id, limit))
+
+    async def view_item(self, item_id: UUID) -> MarketItemDetails:
+        """Карточка товара для покупателя; просмотр учитывается в популярности."""
+        item = await self.get_item_details(item_id)
+        await popularity_tracker.bump(item_id, "view")
+        return item
+
+    async def add_to_cart(self, user_id: UUID, item_id: UUID, quantity: int) -> CartItem:
+        """Добавляет товар в корзину (Redis); возвращает новое количество позиции."""
+        await self.get_item_details(item_id)  # 404, если товара нет (карточка из кэша)
 
         user = await self.user_repo.get(user_id)
         if not user:
             raise HTTPException(404, "User not found")
 
-        return await self.repo.add_to_user_cart(user_id, item_id, quantity)
+        new_quantity = await self.cart_repo.add(user_id, item_id, quantity)
+        if quantity > 0:
+            await popularity_tracker.bump(item_id, "cart", quantity)
+        return CartItem(item_id=item_id, quantity=new_quantity)
 
     async def get_cart(self, user_id: UUID) -> List[CartItem]:
         """Получение содержимого корзины."""
-        return await self.repo.get_user_cart(user_id)
+        cart = await self.cart_repo.get(user_id)
+        return [CartItem(item_id=item_id, quantity=quantity) for item_id, quantity in cart.items()]
 
     async def remove_from_cart(self, user_id: UUID, item_id: UUID) -> None:
         """Удаление товара из корзины пользователя
@@ -61,14 +238,133 @@ class MarketplaceService:
         Raises:
             HTTPException: Если товар не найден в корзине
         """
-        cart_item = await self.repo.get_cart_item(user_id, item_id)
-        if not cart_item:
+        if not await self.cart_repo.remove(user_id, item_id):
             raise HTTPException(
                 status_code=404,
                 detail="Item not found in cart"
             )
 
-        await self.repo.remove_from_cart(user_id, item_id)
+    async def checkout(self, user_id: UUID) -> CheckoutResponse:
+        """Оформляет корзину: все заказы и один общий платёж.
+
+        Платёж ЮKassa создаётся на общую сумму до записи заказов (ID заказов
+        выдаются заранее), поэтому во время HTTP-запроса не держатся
+        блокировки строк. Транзакция запроса (get_db) при этом уже открыта,
+        и соединение на время запроса к ЮKassa остаётся занятым. Затем
+        заказы (один многострочный INSERT), запись платежа и привязка к нему
+        всех заказов фиксируются одним COMMIT. После COMMIT из корзины
+        атомарно списываются оформленные количества (добавленное во время
+        оформления остаётся в корзине).
+
+        Args:
+            user_id: UUID покупателя
+
+        Returns:
+            CheckoutResponse: Созданные заказы и платёж
+
+        Raises:
+            ValueError: Если корзина пуста или товары больше недоступны
+        """
+        cart = await self.cart_repo.get(user_id)
+        if not cart:
+            raise ValueError("Cart is empty")
+
+        async with self.repo.uow:
+            items = await self.repo.get_items_by_ids(list(cart))
+        missing = cart.keys() - items.keys()
+        if missing:
+            raise ValueError(f"Items no longer available: {', '.join(map(str, missing))}")
+
+        rows = [
+            {
+                "id": uuid4(),
+                "user_id": user_id,
+                "market_item_id": item_id,
+                "amount": items[item_id].price * quantity,
+                "design_specs": {**(items[item_id].specs or {}), "quantity": quantity},
+                "status": OrderStatus.CREATED,
+            }
+            for item_id, quantity in cart.items()
+        ]
+        order_ids = [row["id"] for row in rows]
+        total = sum(row["amount"] for row in rows)
+        description = f"Checkout of {len(order_ids)} items"
+
+        payment_service = self.repo.payment_service
+        yoo_payment = await payment_service.start_checkout_payment(order_ids, total, description)
+
+        async with self.repo.uow as uow:
+            await self.order_repo.bulk_create(rows, returning=False)
+            payment, payment_url = await payment_service.save_checkout_payment(
+                yoo_payment, order_ids, total, description
+            )
+            uow.on_commit(lambda: self.cart_repo.discard(user_id, cart))
+            uow.on_commit(lambda: self._bump_ordered(cart))
+
+        return CheckoutResponse(
+            order_ids=order_ids,
+            payment_id=payment.id,
+            amount=total,
+            payment_url=payment_url
+        )
+
+    async def import_items(
+            self,
+            designer_id: UUID,
+            chunks: AsyncIterator[bytes],
+            fmt: str
+    ) -> ImportReport:
+        """Пакетная загрузка товаров из потока NDJSON или CSV.
+
+        Строки проверяются по одной и пачками по IMPORT_CHUNK_SIZE уходят
+        COPY в staging-таблицу; в market_items они попадают одним
+        INSERT ... SELECT. Строки с ошибками пропускаются и попадают в отчёт.
+
+        Args:
+            designer_id: Автор товаров
+            chunks: Тело запроса
+            fmt: Формат (ndjson или csv)
+
+        Returns:
+            ImportReport: Количество загруженных строк и ошибки по строкам
+
+        Raises:
+            ValueError: Если строка файла превышает допустимую длину
+        """
+        report = ImportReport()
+        batch: List[MarketItemImport] = []
+        staged = 0
+        async for row, data, error in iter_records(chunks, fmt):
+            report.received += 1
+            if error is None:
+                try:
+                    item = MarketItemImport.model_validate(data)
+                except ValidationError as e:
+                    error = format_validation_error(e)
+            if error is not None:
+                report.failed += 1
+                if len(report.errors) < MAX_IMPORT_ERRORS:
+                    report.errors.append(ImportRowError(row=row, error=error))
+                else:
+                    report.errors_truncated = True
+                continue
+
+            batch.append(item)
+            if len(batch) >= IMPORT_CHUNK_SIZE:
+                await self.repo.stage_import(designer_id, batch)
+                staged += len(batch)
+                batch = []
+
+        if batch:
+            await self.repo.stage_import(designer_id, batch)
+            staged += len(batch)
+        if staged:
+            report.imported = await self.repo.merge_import()
+
+        logger.info(
+            f"Catalog import by {designer_id}: {report.imported} imported, {report.failed} failed"
+        )
+        return report
 
     async def create_order_from_item(
             self,
@@ -87,6 +383,9 @@ class MarketplaceService:
                 detail="Invalid item specifications"
             )
 
+        # Позиция уходит из корзины только если заказ зафиксирован
+        self.repo.uow.on_commit(lambda: self.cart_repo.remove(user_id, item_id))
+        self.repo.uow.on_commit(lambda: popularity_tracker.bump(item_id, "order"))
         return await self.repo.create_order(
             user_id=user_id,
             item_id=item_id,
@@ -94,31 +393,93 @@ class MarketplaceService:
             specs=item.specs
         )
 
-    async def get_item_details(self, item_id: UUID) -> MarketItem:
-        """Получение полной информации о товаре включая отзывы и рейтинг
+    @staticmethod
+    async def _bump_ordered(cart: dict) -> None:
+        for item_id, quantity in cart.items():
+            await popularity_tracker.bump(item_id, "order", quantity)
+
+    async def get_item_details(self, item_id: UUID) -> MarketItemDetails:
+        """Карточка товара с агрегатами рейтинга и первой страницей отзывов.
+
+        Рейтинг предрассчитан (см. ReviewRepository); карточка кэшируется
+        и сбрасывается при изменении товара или его отзывов.
 
         Args:
             item_id: UUID товара
 
         Returns:
-            MarketItem: Полная информация о товаре
+            MarketItemDetails: Информация о товаре
 
         Raises:
             HTTPException: Если товар не найден
         """
-        item = await self.repo.get_item_with_details(item_id)
+        return await catalog_cache.get_or_load(
+            f"item:{item_id}",
+            _ITEM_ADAPTER,
+            lambda: self._load_item(item_id),
+            tags=item_card_tags(item_id)
+        )
+
+    async def get_item_reviews(
+            self,
+            item_id: UUID,
+            limit: int = REVIEW_PAGE_SIZE,
+            cursor: str = None
+    ) -> CursorPage[ReviewResponse]:
+        """Страница отзывов товара, от новых к старым.
+
+        Raises:
+            InvalidCursorError: Если курсор повреждён
+        """
+        after = optional_cursor(cursor, (datetime, UUID))
+        rows = await self.review_repo.get_item_page(item_id, limit=limit, after=after)
+        page, has_more = split_page(rows, limit)
+        return CursorPage[ReviewResponse](
+            items=page,
+            next_cursor=encode_cursor(page[-1].created_at, page[-1].id) if has_more else None
+        )
+
+    async def _load_item(self, item_id: UUID) -> MarketItemDetails:
+        item = await self.repo.get_item_details(item_id)
         if not item:
             raise HTTPException(status_code=404, detail="Item not found")
+        item.reviews = await self.get_item_reviews(item_id)
+        return item
 
-        # Получаем отзывы
-        reviews = await self.repo.get_item_reviews(item_id)
+async def warm_catalog_cache() -> None:
+    """Периодическая задача: refresh-ahead популярных первых страниц каталога.
 
-        # Рассчитываем средний рейтинг
-        avg_rating = sum(r.rating for r in reviews) / len(reviews) if reviews else 0
+    Страницы перечитываются из БД и перезаписываются до истечения TTL
+    (CATALOG_CACHE_WARM_INTERVAL < CATALOG_CACHE_TTL), поэтому не остывают.
+    """
+    async with async_session() as session, UnitOfWork.of(session):
+        repo = MarketplaceRepository(
+            session,
+            PaymentService(PaymentRepository(session)),
+            NotificationService(NotificationRepository(session))
+        )
+        service = MarketplaceService(
+            repo,
+            UserRepository(session),
+            ReviewRepository(session),
+            OrderRepository(session),
+            CartRepository()
+        )
+        for filters in WARM_QUERIES:
+            await service.refresh_items(filters)
+
+    logger.info(f"Catalog cache warmed: {len(WARM_QUERIES)} pages")
 
-        return MarketItem(
-            **item.dict(),
-            reviews=reviews,
-            average_rating=round(avg_rating, 1),
-            review_count=len(reviews)
+
+async def snapshot_popularity() -> None:
+    """Периодическая задача: сохраняет затухший рейтинг популярности в market_items."""
+    scores = await popularity_tracker.snapshot()
+    async with async_session() as session, UnitOfWork.of(session):
+        repo = MarketplaceRepository(
+            session,
+            PaymentService(PaymentRepository(session)),
+            NotificationService(NotificationRepository(session))
         )
+        updated = await repo.save_popularity(scores)
+
+    logger.info(f"Popularity snapshot saved: {len(scores)} ranked, {updated} rows updated")
@@ -1,9 +1,18 @@
+import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Sequence
 from uuid import UUID
 
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.logger.logger import logger
+from app.core.monitoring.monitoring import NOTIFICATION_METRICS
+from app.core.notification_bus import publish_many
+from app.core.unit_of_work import UnitOfWork
 from app.repositories.notification import NotificationRepository
+from app.repositories.user import UserRepository
 from app.schemas.notifications import (
+    NotificationBase,
     NotificationType,
     NotificationResponse
 )
@@ -13,7 +22,8 @@ class NotificationService:
     """
     Сервис для работы с уведомлениями пользователей.
     Обеспечивает:
-    - Отправку уведомлений
+    - Отправку уведомлений (по одному и пачкой — одним INSERT/COPY)
+    - Push-доставку через Redis после COMMIT (см. app.core.notification_bus)
     - Пометку прочитанных
     - Получение списка уведомлений
     """
@@ -39,7 +49,52 @@ class NotificationService:
         }
 
         notification = await self.repository.create(notification_data)
-        return NotificationResponse.from_orm(notification)
+        response = NotificationResponse.from_orm(notification)
+        NOTIFICATION_METRICS['created'].labels(notification_type).inc()
+        self._publish_on_commit([response])
+        return response
+
+    async def send_many(self, notifications: Sequence[NotificationBase]) -> int:
+        """Отправляет уведомления нескольким получателям одной вставкой.
+
+        Строки пишутся многострочным INSERT (от COPY_THRESHOLD — через COPY),
+        id и created_at проставляются заранее, чтобы после COMMIT опубликовать
+        уведомления без RETURNING.
+
+        Args:
+            notifications: Уведомления (получатель, тип, текст, payload)
+
+        Returns:
+            int: Количество созданных уведомлений
+        """
+        if not notifications:
+            return 0
+        now = datetime.now()
+        responses = [
+            NotificationResponse(
+                id=uuid.uuid4(),
+                created_at=now,
+                **n.model_dump(exclude={"payload"}),
+                payload=n.payload or {}
+            )
+            for n in notifications
+        ]
+        await self.repository.bulk_create(
+            [r.model_dump(exclude={"read_at"}) for r in responses],
+            returning=False
+        )
+        for notification_type in {r.type for r in responses}:
+            NOTIFICATION_METRICS['created'].labels(notification_type).inc(
+                sum(r.type == notification_type for r in responses)
+            )
+        self._publish_on_commit(responses)
+        return len(responses)
+
+    def _publish_on_commit(self, responses: Sequence[NotificationResponse]) -> None:
+        async def publish() -> None:
+            await publish_many((r.user_id, r.model_dump_json()) for r in responses)
+
+        self.repository.uow.on_commit(publish)
 
     async def mark_as_read(self, notification_id: UUID, user_id: UUID) -> bool:
         """Помечает уведомление как прочитанное."""
@@ -72,3 +127,41 @@ class NotificationService:
             limit=limit
         )
         return [NotificationResponse.from_orm(n) for n in notifications]
+
+
+async def announce(
+        title: str,
+        message: str,
+        notification_type: NotificationType = "system",
+        payload: Optional[dict] = None,
+        role: Optional[str] = None,
+        chunk_size: int = settings.NOTIFICATION_ANNOUNCE_CHUNK_SIZE
+) -> int:
+    """Рассылка всем пользователям (или пользователям роли) потоком пачек.
+
+    Получатели читаются keyset-методом по id; каждая пачка — отдельная
+    транзакция с одной вставкой и публикацией после COMMIT, поэтому память
+    и длительность транзакции не зависят от числа пользователей.
+
+    Returns:
+        int: Количество отправленных уведомлений
+    """
+    sent, after = 0, None
+    while True:
+        async with async_session() as session, UnitOfWork.of(session):
+            user_ids = await UserRepository(session).get_ids_after(after, chunk_size, role=role)
+            sent += await NotificationService(NotificationRepository(session)).send_many([
+                NotificationBase(
+                    user_id=user_id,
+                    type=notification_type,
+                    title=title,
+                    message=message,
+                    payload=payload
+                )
+                for user_id in user_ids
+            ])
+        if len(user_ids) < chunk_size:
+            break
+        after = user_ids[-1]
+    logger.info(f"Announcement '{title}' sent to {sent} users")
+    return sent
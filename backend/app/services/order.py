@@ -10,12 +10,20 @@ from fastapi import HTTPException, status
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy import select, Row, RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.geo import geocode
+from app.core.unit_of_work import UnitOfWork
 from app.models.user import User 
 from app.repositories.chat import ChatRepository
+from app.repositories.factory import FactoryRepository
 from app.repositories.generation import GenerationRepository
+from app.repositories.load_profiles import MESSAGE_WITH_ORDER, ORDER_DETAIL
 from app.repositories.order import OrderRepository
 from app.schemas.order import OrderCreate, OrderResponse, ChatMessageSchema, OrderUpdate
+from app.schemas.pagination import CursorPage
+from app.core.pagination import encode_cursor, optional_cursor, split_page
+from app.services.factory_assignment import assignment_engine, holds_capacity
 from app.services.payment import PaymentService, logger
+from app.services.sla_monitor import sla_monitor
 from ..core.monitoring.monitoring import ORDER_METRICS
 from ..models import Order
 from app.core.order_status import (
@@ -75,11 +83,14 @@ class OrderService:
             user_id: UUID,
             order_in: OrderCreate
     ) -> Order:
+        position = geocode(order_in.delivery_city)
         order_data = {
             **order_in.model_dump(),
             "user_id": user_id,
             "status": OrderStatus.CREATED,
-            "amount": _calculate_amount(order_in)
+            "amount": _calculate_amount(order_in),
+            "latitude": position[0] if position else None,
+            "longitude": position[1] if position else None
         }
         return await self.order_repo.create(order_data)
 
@@ -120,7 +131,7 @@ class OrderService:
                     'payment': <Payment...>
                  }
         """
-        async with self.session.begin():
+        async with UnitOfWork.of(self.session):
             order = await self.create_order(user_id, order_in)
             payment = await self.payment_service.create_payment(
                 order_id=order.id,
@@ -139,7 +150,7 @@ class OrderService:
             user_id: Optional[UUID] = None
     ) -> Order:
         """Безопасное обновление статуса заказа"""
-        async with self.session.begin():
+        async with UnitOfWork.of(self.session):
             order = await self.order_repo.get(order_id)
 
             if user_id and order.user_id != user_id:
@@ -248,30 +259,55 @@ class OrderService:
     async def get_user_orders(
             self,
             user_id: UUID,
-            status: Optional[str] = None
-    ) -> Sequence[Row[Any] | RowMapping | Any]:
-        """Получение заказов пользователя с фильтром по статусу"""
-        query = select(Order).where(Order.user_id == user_id)
+            status: Optional[str] = None,
+            limit: int = 20,
+            cursor: Optional[str] = None
+    ) -> CursorPage[OrderResponse]:
+        """Получение страницы заказов пользователя с фильтром по статусу.
 
-        if status:
-            if status not in StatusValues.__args__:
-                raise ValueError(f"Invalid status: {status}")
-            query = query.where(Order.status == status)
+        Args:
+            user_id: ID пользователя
+            status: Статус заказа для фильтрации (опционально)
+            limit: Размер страницы
+            cursor: Курсор из next_cursor предыдущей страницы
 
-        result = await self.session.execute(query)
-        return result.scalars().all()
-        
+        Returns:
+            CursorPage[OrderResponse]: Заказы (новые первыми) и курсор следующей страницы
+
+        Raises:
+            ValueError: Если статус недопустим
+            InvalidCursorError: Если курсор повреждён
+        """
+        if status and status not in StatusValues.__args__:
+            raise ValueError(f"Invalid status: {status}")
+
+        after = optional_cursor(cursor, (datetime, UUID))
+        rows = await self.order_repo.get_by_user_page(
+            user_id,
+            limit=limit,
+            after=tuple(after) if after else None,
+            status=status
+        )
+        orders, has_more = split_page(rows, limit)
+
+        return CursorPage[OrderResponse](
+            items=[OrderResponse.model_validate(order) for order in orders],
+            next_cursor=encode_cursor(orders[-1].created_at, orders[-1].id) if has_more else None
+        )
 
     async def get_order_with_messages(self, order_id: UUID) -> Order:
-        """Get order details (messages can be loaded separately if needed)"""
-        order = await self.get_order(order_id)
-        # Пока просто возвращаем заказ, сообщения можно добавить позже по требованию
-        return order
+        """Get order details with payment and chat messages preloaded"""
+        return await self.get_order(order_id, options=ORDER_DETAIL)
         
 
-    async def get_order(self, order_id: UUID) -> Order:
-        """Получение заказа по ID"""
-        order = await self.order_repo.get(order_id)
+    async def get_order(self, order_id: UUID, options: Sequence = ()) -> Order:
+        """Получение заказа по ID
+
+        Args:
+            order_id: ID заказа
+            options: Профиль загрузки связей (по умолчанию связи не загружаются)
+        """
+        order = await self.order_repo.get(order_id, options=options)
         if not order:
             raise ValueError("Order not found")
         return order
@@ -295,7 +331,7 @@ class OrderService:
             ValueError: Если заказ не найден или не может быть назначен
             PermissionError: Если пользователь не имеет прав
         """
-        async with self.session.begin():
+        async with UnitOfWork.of(self.session):
             order = await self.get_order(order_id)
 
             # Проверка статуса заказа
@@ -332,7 +368,7 @@ class OrderService:
             ValueError: Если заказ не найден или не может быть завершен
             PermissionError: Если пользователь не имеет прав
         """
-        async with self.session.begin():
+        async with UnitOfWork.of(self.session):
             order = await self.get_order(order_id)
 
             if user_id and order.user_id != user_id:
@@ -341,12 +377,9 @@ class OrderService:
             if order.status != OrderStatus.SHIPPED:
                 raise ValueError("Only SHIPPED orders can be completed")
             
+            # Время перехода записывает order_status_events (см. OrderRepository.update)
             updated_order = await self.order_repo.update(
-                order_id,
-                {
-                    "status": OrderStatus.COMPLETED, 
-                    "completed_at": datetime.now()
-                }
+                order_id, {"status": OrderStatus.COMPLETED}
             )
     
 
@@ -359,7 +392,7 @@ class OrderService:
             reason: Optional[str] = None
     ) -> Order:
         """
-        Отменяет заказ.
+        Отменяет заказ: возврат оплаты и освобождение мощности фабрики.
 
         Параметры:
             order_id: UUID заказа
@@ -376,34 +409,33 @@ class OrderService:
         """
             Отменяет заказ с возвратом платежа при необходимости.
             """
-        async with self.session.begin():
-            order = await self.get_order(order_id)
+        async with UnitOfWork.of(self.session):
+            order = await self.get_order(order_id, options=ORDER_DETAIL)
 
             if user_id and order.user_id != user_id:
                 raise PermissionError("User can only cancel own orders")
             
-            if order.status not in {OrderStatus.CREATED, OrderStatus.PAID}:
-                raise ValueError("Only CREATED or PAID orders can be cancelled")
+            # created, paid и production (см. OrderStatusHelper.TRANSITIONS)
+            OrderStatusHelper.validate_transition(order.status, OrderStatus.CANCELLED)
 
-            updates = {
-                "status": OrderStatus.CANCELLED,
-                "cancelled_at": datetime.now()
-            }
-            
+            updates = {"status": OrderStatus.CANCELLED}
             if reason:
                 updates["cancellation_reason"] = reason
 
-            if order.status == "paid" and order.payment:
+            if order.status in {OrderStatus.PAID, OrderStatus.PRODUCTION} and order.payment:
                 try:
-                    await self.payment_service.refund_payment(order.payment.id)
-                    ORDER_METRICS['transitions'].labels(
-                        from_status=order.status,
-                        to_status="cancelled"
-                    ).inc()
+                    # Платёж может оплачивать несколько заказов корзины
+                    await self.payment_service.refund_payment(
+                        order.payment.id, order.amount, idempotency_key=f"refund-order:{order.id}"
+                    )
                 except HTTPException as e:
                     logger.error(f"Refund failed: {str(e)}")
                     raise ValueError("Failed to process refund")
 
+            if holds_capacity(order):
+                await assignment_engine.release(FactoryRepository(self.session), order.factory_id)
+
+            ORDER_METRICS['transitions'].labels(order.status, OrderStatus.CANCELLED).inc()
             return await self.order_repo.update(order_id, updates)
 
     async def update_order(
@@ -412,22 +444,42 @@ class OrderService:
             update_data: OrderUpdate,
             user_id: Optional[UUID] = None
     ) -> Order:
-        """Обновление данных заказа"""
-        async with self.session.begin():
+        """Обновление данных заказа; новый production_deadline ставится на контроль SLA после COMMIT"""
+        async with UnitOfWork.of(self.session):
             order = await self.get_order(order_id)
 
             if user_id and order.user_id != user_id:
                 raise PermissionError("User can only update own orders")
 
-            for field, value in update_data.model_dump(exclude_unset=True).items():
+            changes = update_data.model_dump(exclude_unset=True)
+            new_status = changes.pop("status", None)
+            if new_status == OrderStatus.CANCELLED:
+                # Отмена — с возвратом платежа и освобождением мощности фабрики
+                order = await self.cancel_order(order_id, user_id)
+            elif new_status and new_status != order.status:
+                OrderStatusHelper.validate_transition(order.status, new_status)
+                if holds_capacity(order) and new_status != OrderStatus.PRODUCTION:
+                    await assignment_engine.release(FactoryRepository(self.session), order.factory_id)
+                order = await self.order_repo.update(order_id, {"status": new_status})
+
+            if "production_deadline" in changes:
+                # Новый срок — новые SLA-события: таймеры переставляются после COMMIT
+                changes["sla_state"] = None
+                deadline = changes["production_deadline"]
+
+                async def track_deadline() -> None:
+                    sla_monitor.track(order_id, deadline)
+
+                UnitOfWork.of(self.session).on_commit(track_deadline)
+
+            for field, value in changes.items():
                 setattr(order, field, value)
 
-            await self.session.commit()
             return order
 
     async def delete_order(self, order_id: UUID, user_id: Optional[UUID] = None) -> None:
         """Удаление заказа"""
-        async with self.session.begin():
+        async with UnitOfWork.of(self.session):
             order = await self.get_order(order_id)
 
             if user_id and order.user_id != user_id:
@@ -445,7 +497,7 @@ class OrderService:
                 status_code=status.HTTP_501_NOT_IMPLEMENTED,
                 detail="Chat functionality not implemented"
             )
-        message = await self.chat_repo.get(message_id)
+        message = await self.chat_repo.get(message_id, options=MESSAGE_WITH_ORDER)
         if not message:
             raise HTTPException(status_code=404, detail="Message not found")
 
@@ -550,7 +602,7 @@ async def handle_order_webhook(order_data: dict, signature: Optional[str] = None
         )
         
         # Use retry logic for database operations
-        async with async_session() as session:
+        async with async_session() as session, UnitOfWork.of(session) as uow:
             order_repo = OrderRepository(session)
             
             # Retry the database operation
@@ -569,14 +621,16 @@ async def handle_order_webhook(order_data: dict, signature: Optional[str] = None
                     from app.services.notifications import NotificationService
                     notification_service = NotificationService(session)
                     
-                    await retry_manager.execute_with_retry(
-                        notification_service.send,
-                        user_id=order.user_id,
-                        title="Order Status Updated",
-                        message=f"Your order #{order_id} status changed to {new_status}",
-                        notification_type="order_update",
-                        payload={"order_id": str(order_id), "new_status": new_status}
-                    )
+                    # Ошибка уведомления не должна откатывать смену статуса
+                    async with uow.savepoint():
+                        await retry_manager.execute_with_retry(
+                            notification_service.send,
+                            user_id=order.user_id,
+                            title="Order Status Updated",
+                            message=f"Your order #{order_id} status changed to {new_status}",
+                            notification_type="order_update",
+                            payload={"order_id": str(order_id), "new_status": new_status}
+                        )
                     
                     logger.info(f"Notification sent for order {order_id}")
                 except ImportError:
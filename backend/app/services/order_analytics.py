@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import List, Optional
+from uuid import UUID
+
+from app.core.database import async_session
+from app.core.unit_of_work import UnitOfWork
+from app.core.logger import get_logger
+from app.repositories.order_status_event import OrderStatusEventRepository
+from app.schemas.admin import (
+    OrderStatusEventResponse,
+    StatusDurationDailyStats,
+    StatusDurationStats
+)
+
+logger = get_logger(__name__)
+
+
+class OrderAnalyticsService:
+    """
+    Аналитика жизненного цикла заказов по истории статусов.
+
+    Обеспечивает:
+    - Таймлайн переходов заказа
+    - Перцентили времени в статусе за произвольный период (сырые события)
+    - Дневные агрегаты для админ-панели (rollup-таблица)
+    """
+
+    def __init__(self, event_repo: OrderStatusEventRepository):
+        self.event_repo = event_repo
+
+    async def get_order_timeline(self, order_id: UUID) -> List[OrderStatusEventResponse]:
+        """Возвращает историю переходов статусов заказа."""
+        events = await self.event_repo.get_order_history(order_id)
+        return [OrderStatusEventResponse.model_validate(e) for e in events]
+
+    async def get_time_in_status(
+            self,
+            since: datetime,
+            until: datetime,
+            status: Optional[str] = None,
+            factory_id: Optional[UUID] = None
+    ) -> List[StatusDurationStats]:
+        """Точные перцентили времени в статусе за период [since, until).
+
+        Raises:
+            ValueError: Если период задан некорректно
+        """
+        if since >= until:
+            raise ValueError("'since' must be earlier than 'until'")
+
+        rows = await self.event_repo.time_in_status_percentiles(
+            since, until, status=status, factory_id=factory_id
+        )
+        return [StatusDurationStats.model_validate(dict(r)) for r in rows]
+
+    async def get_daily_stats(
+            self,
+            since: date,
+            until: date,
+            status: Optional[str] = None,
+            factory_id: Optional[UUID] = None
+    ) -> List[StatusDurationDailyStats]:
+        """Дневные агрегаты для дашборда (без сканирования сырых событий)."""
+        if since > until:
+            raise ValueError("'since' must not be later than 'until'")
+
+        rollups = await self.event_repo.get_rollups(
+            since, until, status=status, factory_id=factory_id
+        )
+        return [StatusDurationDailyStats.model_validate(r) for r in rollups]
+
+    async def refresh_rollups(self) -> Optional[int]:
+        """Пересчитывает агрегаты с последнего водяного знака."""
+        await self.event_repo.ensure_partitions()
+        return await self.event_repo.refresh_rollups()
+
+
+async def refresh_order_status_rollups() -> None:
+    """Периодическая задача: партиции + инкрементальный пересчёт агрегатов."""
+    async with async_session() as session, UnitOfWork.of(session):
+        service = OrderAnalyticsService(OrderStatusEventRepository(session))
+        written = await service.refresh_rollups()
+
+    if written is None:
+        logger.info("Order status rollup refresh skipped: locked by another worker")
+    else:
+        logger.info(f"Order status rollups refreshed: {written} rows")
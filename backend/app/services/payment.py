@@ -7,12 +7,17 @@ from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from yookassa import Configuration
 from yookassa import Payment as YooPayment
+from yookassa.domain.response import PaymentResponse as YooPaymentResponse
 
 from app.core.monitoring.monitoring import PAYMENT_METRICS
-from app.core.order_status import OrderStatus
+from app.core.order_status import OrderStatus, OrderStatusHelper
+from app.core.unit_of_work import UnitOfWork
+from app.models.payment import Payment
 from app.services.yookassa_adapter import YooKassaAdapter, PaymentError
 from app.core.config import settings
 from app.core.logger import get_logger
+from app.repositories.load_profiles import PAYMENT_WITH_ORDERS
+from app.repositories.order import OrderRepository
 from app.repositories.payment import PaymentRepository
 from app.schemas.payment import PaymentResponse
 
@@ -70,6 +75,7 @@ class PaymentService:
                 }
             )
 
+            await self.repository.link_orders(db_payment.id, [order_id])
             logger.info(f"Created payment {payment.id} for order {order_id}")
             return PaymentResponse.model_validate(db_payment)
 
@@ -77,6 +83,93 @@ class PaymentService:
             logger.error(f"Payment creation failed: {str(e)}")
             raise HTTPException(500, "Payment processing failed")
 
+    async def start_checkout_payment(
+            self,
+            order_ids: List[UUID],
+            amount: int,
+            description: str = ""
+    ) -> YooPaymentResponse:
+        """Создаёт в ЮKassa один платёж на все заказы оформления корзины.
+
+        Вызывается до записи заказов: HTTP-запрос к ЮKassa не держит
+        блокировок строк (но в транзакции запроса соединение остаётся
+        занятым). Запись платежа и привязку заказов делает
+        save_checkout_payment; если транзакция не зафиксируется, платёж
+        останется неоплаченным (URL оплаты покупатель не получит) и истечёт.
+
+        Args:
+            order_ids: Заказы, оплачиваемые платежом (ID выданы заранее)
+            amount: Общая сумма в копейках
+            description: Описание платежа
+
+        Returns:
+            YooPaymentResponse: Платёж ЮKassa
+
+        Raises:
+            HTTPException: При некорректной сумме или ошибке ЮKassa
+        """
+        if amount <= 0:
+            raise HTTPException(400, "Amount must be positive")
+        if amount > 1_000_000:  # Лимит 1 млн руб
+            raise HTTPException(400, "Amount exceeds maximum limit")
+
+        PAYMENT_METRICS['amounts'].observe(amount)
+
+        try:
+            return await self.yookassa.create_payment(
+                amount=amount,
+                order_id=str(order_ids[0]),
+                description=description,
+                return_url=settings.YOOKASSA_RETURN_URL,
+                metadata={"order_id": str(order_ids[0]), "order_count": str(len(order_ids))}
+            )
+        except PaymentError as e:
+            PAYMENT_METRICS['errors'].labels(type="create_error").inc()
+            logger.error(f"Checkout payment creation failed: {str(e)}")
+            raise HTTPException(500, "Payment processing failed")
+
+    async def save_checkout_payment(
+            self,
+            payment: YooPaymentResponse,
+            order_ids: List[UUID],
+            amount: int,
+            description: str = ""
+    ) -> tuple[PaymentResponse, Optional[str]]:
+        """Сохраняет платёж оформления корзины и привязывает к нему все заказы.
+
+        Args:
+            payment: Платёж ЮKassa (см. start_checkout_payment)
+            order_ids: Заказы, оплачиваемые платежом
+            amount: Общая сумма в копейках
+            description: Описание платежа
+
+        Returns:
+            tuple: Платёж и URL страницы оплаты
+        """
+        db_payment = await self.repository.create(self.repository.session, {
+            "order_id": order_ids[0],
+            "external_id": payment.id,
+            "amount": amount,
+            "status": payment.status,
+            "description": description,
+            "payment_metadata": {"order_ids": [str(order_id) for order_id in order_ids]}
+        })
+        await self.repository.link_orders(db_payment.id, order_ids)
+        logger.info(f"Created payment {payment.id} for {len(order_ids)} orders")
+
+        # Base.metadata у ORM-объекта — это MetaData таблиц, поэтому поле задаём явно
+        response = PaymentResponse(
+            id=db_payment.id,
+            order_id=db_payment.order_id,
+            amount=db_payment.amount,
+            external_id=db_payment.external_id,
+            status=db_payment.status,
+            created_at=db_payment.created_at,
+            metadata=db_payment.payment_metadata
+        )
+        confirmation = getattr(payment, "confirmation", None)
+        return response, getattr(confirmation, "confirmation_url", None)
+
     async def find_payment(self, payment_id: str) -> Optional[dict]:
         """Поиск платежа в ЮKassa"""
         try:
@@ -98,44 +191,54 @@ class PaymentService:
             raise HTTPException(401, "Invalid signature")
 
         if payload.get('event') == 'payment.succeeded':
-            await self._process_successful_payment(session, payment_data)
+            async with UnitOfWork.of(session):
+                await self._process_successful_payment(payment_data.id)
             return True
 
         logger.info(f"Received webhook: {payload.get('event')}")
         return False
 
-    async def _process_successful_payment(
-            self,
-            session: AsyncSession,
-            payment: dict
-    ) -> None:
-        """Обработка успешного платежа"""
-        try:
-            await self.repository.update_by_external_id(
-                session,
-                payment.id,
-                {
-                    "status": payment.status,
-                    "captured_at": datetime.now()
-                }
+    async def _process_successful_payment(self, external_id: str) -> None:
+        """Обработка успешного платежа: все его заказы переходят в paid.
+
+        Заказы, отменённые до оплаты, в paid не переходят — их сумма
+        возвращается. Повторное уведомление о том же платеже ничего не меняет.
+
+        Возврат создаётся внутри транзакции вебхука с ключом идемпотентности
+        платежа: если COMMIT не пройдёт, повтор вебхука получит от ЮKassa
+        тот же возврат, а не второй.
+        """
+        payment = await self.repository.mark_succeeded(external_id)
+        if payment is None:
+            logger.info(f"Payment {external_id} already processed")
+            return
+
+        paid = await OrderRepository(self.repository.session).mark_paid(payment.id)
+        PAYMENT_METRICS['status_changes'].labels(status="succeeded").inc()
+        logger.info(f"Payment {external_id} succeeded, {len(paid)} orders paid")
+
+        cancelled = await self.repository.get_orders_amount(payment.id, OrderStatus.CANCELLED)
+        if cancelled:
+            await self.refund_payment(
+                payment.id, cancelled, idempotency_key=f"refund-cancelled:{payment.id}"
             )
-            logger.info(f"Payment {payment.id} processed successfully")
-        except Exception as e:
-            logger.error(f"Failed to process payment: {str(e)}")
-            raise
 
     async def confirm_payment(self, payment_id: UUID):
-        payment = await self.repository.get(payment_id)
+        payment = await self.repository.get(payment_id, options=PAYMENT_WITH_ORDERS)
         if not payment:
             raise HTTPException(404, "Payment not found")
 
         try:
-            OrderStatus.validate_transition(payment.order.status, OrderStatus.PAID)
-            await self._process_payment(payment_id)
+            for order in payment.orders:
+                if order.status != OrderStatus.CANCELLED:
+                    OrderStatusHelper.validate_transition(order.status, OrderStatus.PAID)
         except ValueError as e:
             await self._cancel_payment(payment_id)
             raise HTTPException(400, str(e))
 
+        async with UnitOfWork.of(self.repository.session):
+            await self._process_payment(payment)
+
     async def check_payment_status(
             self,
             session: AsyncSession,
@@ -153,7 +256,9 @@ class PaymentService:
     ):
         if not self.verify_signature(notification):
             raise HTTPException(status_code=401)
-        # Add webhook processing logic here
+        if notification.get("event") == "payment.succeeded":
+            async with UnitOfWork.of(session):
+                await self._process_successful_payment(notification["object"]["id"])
         return {"status": "processed"}
 
     async def cancel_payment(self, payment_id: UUID) -> bool:
@@ -174,7 +279,7 @@ class PaymentService:
         if not payment:
             raise HTTPException(404, "Payment not found")
 
-        if payment.status not in [OrderStatus.PENDING, "waiting_for_capture"]:
+        if payment.status not in ["pending", "waiting_for_capture"]:
             return False
 
         try:
@@ -204,14 +309,23 @@ class PaymentService:
         Returns:
             List[PaymentResponse]: Список платежей пользователя
         """
-        payments = await self.repository.get_by_user(user_id, limit=limit)
-        return [PaymentResponse.model_validate(p) for p in payments]
+        return await self.repository.get_history(user_id, limit=limit)
 
-    async def refund_payment(self, payment_id: UUID) -> bool:
+    async def refund_payment(
+            self,
+            payment_id: UUID,
+            amount: Optional[int] = None,
+            idempotency_key: Optional[str] = None
+    ) -> bool:
         """Оформление возврата платежа через ЮKassa.
 
+        Платёж оформления корзины оплачивает несколько заказов, поэтому
+        при отмене одного заказа возвращается только его сумма.
+
         Args:
             payment_id: UUID платежа в нашей системе
+            amount: Сумма возврата в копейках (по умолчанию — весь платёж)
+            idempotency_key: Ключ идемпотентности ЮKassa (по умолчанию — новый)
 
         Returns:
             bool: True если возврат успешно инициирован
@@ -223,28 +337,26 @@ class PaymentService:
         if not payment:
             raise HTTPException(404, "Payment not found")
 
-        if payment.status != OrderStatus.SUCCEEDED: 
+        if payment.status != "succeeded":
             raise HTTPException(400, "Only succeeded payments can be refunded")
 
-        try:
-            refund = YooPayment.refund.create({
-                "payment_id": payment.external_id,
-                "amount": {"value": payment.amount, "currency": "RUB"}
-            })
+        amount = payment.amount if amount is None else amount
+        if not 0 < amount <= payment.amount:
+            raise HTTPException(400, "Invalid refund amount")
 
-            await self.repository.update(
-                payment_id,
-                {
-                    "status": "refunded",
-                    "refunded_at": datetime.now(),
-                    "refund_id": refund.id
-                }
+        try:
+            refund = await self.yookassa.create_refund(
+                payment.external_id, amount / 100, idempotency_key=idempotency_key
             )
-            return True
         except Exception as e:
+            PAYMENT_METRICS['errors'].labels(type="refund_error").inc()
             logger.error(f"Refund failed: {str(e)}")
             raise HTTPException(500, "Refund processing failed")
 
+        PAYMENT_METRICS['status_changes'].labels(status="refunded").inc()
+        logger.info(f"Refund {refund.id} of {amount} for payment {payment.external_id}")
+        return True
+
     @staticmethod
     def verify_signature(notification: dict) -> bool:
         """Проверка подписи уведомления от ЮKassa.
@@ -282,30 +394,17 @@ class PaymentService:
             logger.error(f"Signature verification failed: {str(e)}")
             return False
 
-    async def _process_payment(self, payment_id: UUID) -> None:
-        """Обработка успешного платежа и подтверждение заказа"""
-        payment = await self.repository.get_by_id(payment_id)
-        if not payment:
-            raise HTTPException(404, "Payment not found")
-
+    async def _process_payment(self, payment: Payment) -> None:
+        """Подтверждение платежа в ЮKassa и перевод его заказов в paid"""
         try:
-            # Подтверждаем платеж в ЮKassa
-            yoo_payment = YooPayment.capture(payment.external_id)
-
-            # Обновляем статус платежа в БД
-            await self.repository.update(
-                payment_id,
-                {
-                    "status": yoo_payment.status,
-                    
-                    "captured_at": datetime.now()
-                }
-            )
-            logger.info(f"Payment {payment_id} processed successfully")
+            yoo_payment = await self.yookassa.capture_payment(payment.external_id)
         except Exception as e:
             logger.error(f"Payment processing failed: {str(e)}")
             raise HTTPException(500, "Payment processing failed")
 
+        if yoo_payment.status == "succeeded":
+            await self._process_successful_payment(payment.external_id)
+
     async def _cancel_payment(self, payment_id: UUID) -> None:
         """Отмена платежа с полным возвратом"""
         payment = await self.repository.get_by_id(payment_id)
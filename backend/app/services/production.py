@@ -1,22 +1,40 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
-import httpx
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase
-from tenacity import stop_after_attempt, wait_exponential, retry
 
+from app.core.factory_client import order_payload
 from app.core.monitoring.monitoring import ORDER_METRICS
+from app.core.database import async_session
+from app.core.geo import Coordinates, resolve
+from app.core.unit_of_work import UnitOfWork
 from app.models.factory import Factory
 from app.core.logger import get_logger
 from app.models.order import OrderStatus, Order
+from app.core.order_status import OrderStatusHelper
 from app.repositories.factory import FactoryRepository
+from app.repositories.notification import NotificationRepository
 from app.repositories.order import OrderRepository
+from app.schemas.notifications import NotificationBase
 from app.schemas.order import OrderResponse
+from app.schemas.production import (
+    ProductionPlanResult,
+    ProductionStatusBatchResult,
+    ProductionStatusResult,
+    ProductionStatusUpdate
+)
+from app.services.factory_assignment import RELEASED_PRODUCTION_STATUSES, assignment_engine, holds_capacity
+from app.services.factory_dispatch import FactoryEndpoint, dispatch_queue
+from app.services.factory_health import factory_health
+from app.services.notifications import NotificationService
+from app.services.sla_monitor import sla_monitor
+from app.services.production_planner import MAX_PLAN_ORDERS, PlanFactory, plan_assignments, plan_order
 from app.core.errors import (
     NotFoundError, 
     PermissionDeniedError,
@@ -26,6 +44,68 @@ from app.schemas.errors import ErrorResponse
 
 logger = get_logger(__name__)
 
+# Заказов с недоставленным заданием за один прогон redeliver_failed_dispatches
+MAX_REDELIVERY_ORDERS = 500
+
+
+def _position(order: Order) -> Optional[Coordinates]:
+    """Координаты доставки заказа: сохранённые или по городу доставки."""
+    return resolve(order.latitude, order.longitude, order.delivery_city)
+
+
+def _local(timestamp: datetime) -> datetime:
+    """Время фабрики в локальном naive-формате, как остальные datetime.now() сервиса."""
+    return timestamp.astimezone().replace(tzinfo=None) if timestamp.tzinfo else timestamp
+
+
+def check_status_updates(
+        current: Dict[UUID, str],
+        updates: Sequence[ProductionStatusUpdate],
+        now: datetime
+) -> Tuple[List[ProductionStatusResult], List[Tuple[UUID, str, str, datetime]]]:
+    """Проверяет пакет обновлений статусов по OrderStatusHelper.TRANSITIONS.
+
+    Обновления одного заказа применяются по порядку timestamp, поэтому
+    цепочка production -> shipped -> completed в одном пакете допустима.
+    Повтор уже установленного статуса считается применённым без перехода.
+    Отмена фабрикой отклоняется: она требует возврата оплаты и уведомления
+    заказчика и выполняется только через OrderService.cancel_order.
+
+    Args:
+        current: Текущие статусы заказов фабрики
+        updates: Обновления в порядке запроса
+        now: Верхняя граница времени перехода (будущие timestamp обрезаются)
+
+    Returns:
+        Tuple: Результаты в порядке запроса и переходы (order_id, from, to, at)
+    """
+    statuses = dict(current)
+    results: List[Optional[ProductionStatusResult]] = [None] * len(updates)
+    transitions = []
+    for i in sorted(range(len(updates)), key=lambda i: _local(updates[i].timestamp)):
+        update = updates[i]
+        from_status = statuses.get(update.order_id)
+        result = ProductionStatusResult(
+            order_id=update.order_id,
+            status=update.status,
+            applied=False,
+            from_status=from_status
+        )
+        if from_status is None:
+            result.error = "Order not found or not assigned to this factory"
+        elif from_status == update.status:
+            result.applied = True
+        elif update.status == OrderStatus.CANCELLED:
+            result.error = "Factories cannot cancel orders, request a cancellation instead"
+        elif update.status not in OrderStatusHelper.TRANSITIONS.get(from_status, []):
+            result.error = f"Invalid transition from {from_status} to {update.status}"
+        else:
+            result.applied = True
+            statuses[update.order_id] = update.status
+            transitions.append((update.order_id, from_status, update.status, min(_local(update.timestamp), now)))
+        results[i] = result
+    return results, transitions
+
 
 class ProductionService:
     """
@@ -58,7 +138,7 @@ class ProductionService:
         Позволяет:
         - Явно указать фабрику для назначения (через factory_id)
         - Автоматически подобрать фабрику по типу продукта из заказа
-        - Уведомить фабрику через API (если указан api_url)
+        - Уведомить фабрику через API после COMMIT (если указан api_url)
         - Обновить статус и сроки производства заказа
 
         Args:
@@ -74,12 +154,12 @@ class ProductionService:
                 - 400: Если не указан тип продукта или нет подходящих фабрик
                 - 500: При внутренних ошибках сервера
         """
-        async with self.session.begin():
+        async with UnitOfWork.of(self.session):
             try:
                 order = await self._validate_order(order_id)
                 factory = await self._get_factory(order, factory_id)
                 updated_order = await self._update_order_status(order_id, factory)
-                await self._notify_factory_if_needed(factory, order_id)
+                self._notify_factory_if_needed(factory, updated_order)
                 return OrderResponse.model_validate(updated_order)
             except NotFoundError as e:
                 raise HTTPException(
@@ -106,84 +186,75 @@ class ProductionService:
         return await self._find_available_factory(order)
 
     async def _get_specific_factory(self, factory_id: UUID) -> DeclarativeBase:
-        """Получает конкретную фабрику по ID."""
+        """Получает конкретную фабрику по ID и занимает единицу её мощности."""
         factory = await self.factory_repo.get(factory_id)
         if not factory:
             raise HTTPException(status_code=404, detail="Factory not found")
+
+        load = await self.factory_repo.reserve_capacity(factory_id)
+        if load is None:
+            raise HTTPException(
+                status_code=429,
+                detail="Factory is at full capacity"
+            )
+        assignment_engine.index.set_load(factory_id, load)
         return factory
 
     async def _find_available_factory(self, order: Order) -> Factory:
-        """Улучшенный алгоритм поиска фабрики."""
-        product_type = order.design_specs.get("product_type")
+        """Подбирает фабрику по типу продукта и атомарно занимает её мощность.
+
+        Кандидаты берутся из индекса загрузки, а для заказов с адресом
+        доставки — ближайшие (см. FactoryAssignmentEngine), при конфликте
+        резервирования — следующая фабрика.
+        """
+        product_type = order.product_type
         if not product_type:
             raise HTTPException(
                 status_code=400,
                 detail="Product type not specified in design specs"
             )
 
-        # Ищем фабрику по специализации
-        factory = await self.factory_repo.find_by_specialization(product_type)
-        if not factory:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No available factories for product type: {product_type}"
-            )
-
-        # Проверяем загрузку фабрики
-        if factory.current_load >= factory.production_capacity:
+        factory_id = await assignment_engine.reserve(self.factory_repo, product_type, near=_position(order))
+        if factory_id is None:
             raise HTTPException(
                 status_code=429,
-                detail="Factory is at full capacity"
+                detail=f"No factory with free capacity for product type: {product_type}"
             )
-
-        return factory
+        return await self.factory_repo.get(factory_id)
 
     async def _update_order_status(self, order_id: UUID, factory: Factory) -> Order:
-        """Обновляет статус заказа после назначения фабрики."""
-        return await self.order_repo.update(
+        """Обновляет статус заказа после назначения фабрики; срок ставится на контроль после COMMIT."""
+        deadline = datetime.now() + timedelta(days=7)
+        order = await self.order_repo.update(
             order_id,
             {
                 "factory_id": factory.id,
-                "status": OrderStatus.PRODUCTION.value,
-                "production_deadline": datetime.now() + timedelta(days=7),
-                "production_status": "pending"
+                "status": OrderStatus.PRODUCTION,
+                "production_deadline": deadline,
+                "production_status": "pending",
+                "sla_state": None
             }
         )
 
-    async def _notify_factory(self, factory: Factory, order_id: UUID) -> bool:
-        """Улучшенная реализация уведомления фабрики."""
-        if not factory.api_url:
-            return False
+        async def track_deadline() -> None:
+            sla_monitor.track(order_id, deadline)
 
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{factory.api_url}/api/orders",
-                    json={
-                        "order_id": str(order_id),
-                        "factory_id": str(factory.id),
-                        "details": {
-                            "assigned_at": datetime.now().isoformat(),
-                            "expected_deadline": (datetime.now() + timedelta(days=7)).isoformat()
-                        }
-                    },
-                    headers={"Authorization": f"Bearer {factory.api_key}"} if factory.api_key else None
-                )
-                response.raise_for_status()
-                return True
-        except httpx.HTTPError as e:
-            raise HTTPException(
-                status_code=502,
-                detail=f"Failed to notify factory: {str(e)}"
-            )
+        UnitOfWork.of(self.session).on_commit(track_deadline)
+        return order
 
-    async def _notify_factory_if_needed(self, factory: Factory, order_id: UUID) -> None:
-        """Отправляет уведомление фабрике, если настроен API."""
-        if getattr(factory, 'api_url', None):
-            try:
-                await self._notify_factory(factory, order_id)
-            except Exception as e:
-                logger.warning(f"Factory notification failed: {str(e)}")
+    def _notify_factory_if_needed(self, factory: Factory, order: Order) -> None:
+        """Ставит задание в очередь отправки на фабрику после COMMIT, если настроен API.
+
+        Ошибки доставки логирует очередь (см. FactoryDispatchQueue).
+        """
+        if not getattr(factory, 'api_url', None):
+            return
+        endpoint, payload = FactoryEndpoint.of(factory), order_payload(order)
+
+        async def dispatch() -> None:
+            dispatch_queue.submit(endpoint, payload)
+
+        UnitOfWork.of(self.session).on_commit(dispatch)
 
     async def update_production_status(
             self,
@@ -204,26 +275,102 @@ class ProductionService:
         Raises:
             ValueError: Если заказ не найден или статус невалиден
         """
-        order = await self.order_repo.get(order_id)
-        if not order:
-            raise ValueError("Order not found")
-
         valid_statuses = ["in_progress", "completed", "failed", "shipped"]
         if status not in valid_statuses:
             raise ValueError(f"Invalid status. Allowed: {valid_statuses}")
 
-        updates = {"production_status": status}
-        if notes:
-            updates["production_notes"] = notes
+        async with UnitOfWork.of(self.session):
+            order = await self.order_repo.get(order_id)
+            if not order:
+                raise ValueError("Order not found")
+
+            updates = {"production_status": status}
+            if notes:
+                updates["production_notes"] = notes
 
-        if status == "completed":
-            updates["completed_at"] = datetime.now()
-        elif status == "failed":
-            updates["failed_at"] = datetime.now()
+            # Завершённое (или сорванное) производство освобождает мощность фабрики
+            if status in RELEASED_PRODUCTION_STATUSES and holds_capacity(order):
+                await assignment_engine.release(self.factory_repo, order.factory_id)
 
-        await self.order_repo.update(order_id, updates)
+            await self.order_repo.update(order_id, updates)
         return True
 
+    async def update_statuses_batch(
+            self,
+            factory_id: UUID,
+            updates: Sequence[ProductionStatusUpdate]
+    ) -> ProductionStatusBatchResult:
+        """Пакетное обновление статусов заказов фабрики.
+
+        Заказы блокируются одним SELECT ... FOR UPDATE, новые статусы
+        записываются одним UPDATE ... FROM (VALUES ...), события истории и
+        уведомления владельцам заказов — массовыми INSERT. Заказы, ушедшие
+        из производства, освобождают мощность фабрики.
+
+        Args:
+            factory_id: UUID фабрики-отправителя
+            updates: Обновления (см. check_status_updates)
+
+        Returns:
+            ProductionStatusBatchResult: Результаты по каждому обновлению
+        """
+        now = datetime.now()
+        async with UnitOfWork.of(self.session):
+            rows = await self.order_repo.lock_factory_orders(factory_id, list({u.order_id for u in updates}))
+            owners = {row.id: row.user_id for row in rows}
+            holding = {row.id for row in rows if holds_capacity(row)}
+            results, transitions = check_status_updates(
+                {row.id: row.status for row in rows}, updates, now
+            )
+
+            # Цепочка переходов заказа сворачивается в один (первый from -> последний to)
+            changes: Dict[UUID, List[str]] = {}
+            for order_id, from_status, to_status, _ in transitions:
+                changes.setdefault(order_id, [from_status])[1:] = [to_status]
+            await self.order_repo.set_factory_statuses(
+                factory_id, [(order_id, first, last) for order_id, (first, last) in changes.items()]
+            )
+            await self.order_repo.status_events.bulk_create([
+                {
+                    "order_id": order_id,
+                    "from_status": from_status,
+                    "to_status": to_status,
+                    "factory_id": factory_id,
+                    "created_at": at
+                }
+                for order_id, from_status, to_status, at in transitions
+            ], returning=False)
+            await NotificationService(NotificationRepository(self.session)).send_many([
+                NotificationBase(
+                    user_id=owners[order_id],
+                    type="order",
+                    title="Статус заказа обновлён",
+                    message=f"Заказ {order_id}: {last}",
+                    payload={"order_id": str(order_id), "status": last}
+                )
+                for order_id, (_, last) in changes.items()
+            ])
+
+            released = sum(
+                order_id in holding and last != OrderStatus.PRODUCTION
+                for order_id, (_, last) in changes.items()
+            )
+            if released:
+                await assignment_engine.release(self.factory_repo, factory_id, released)
+
+        for _, from_status, to_status, _ in transitions:
+            ORDER_METRICS['transitions'].labels(from_status, to_status).inc()
+        applied = sum(result.applied for result in results)
+        return ProductionStatusBatchResult(
+            applied=applied,
+            rejected=len(results) - applied,
+            results=results
+        )
+
+    async def get_assignment_queue(self, product_type: str, limit: int = 100) -> List[OrderResponse]:
+        """Оплаченные заказы типа продукта, ожидающие назначения на фабрику."""
+        return await self.order_repo.list_awaiting_assignment(product_type, limit)
+
     async def get_factory_orders(
             self,
             factory_id: UUID,
@@ -238,8 +385,7 @@ class ProductionService:
         Returns:
             List[OrderResponse]: Список заказов фабрики
         """
-        orders = await self.order_repo.get_by_factory(factory_id, status)
-        return [OrderResponse.model_validate(o) for o in orders]
+        return await self.order_repo.list_by_factory(factory_id, status)
 
     async def _handle_assign_error(self, order_id: UUID, error: Exception) -> None:
         """Обрабатывает ошибки при назначении заказа на фабрику.
@@ -266,16 +412,15 @@ class ProductionService:
             }
         )
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        reraise=True
-    )
     async def submit_to_factory(self, order: Order):
-        """Отправка заказа на фабрику с автоматическими повторами"""
+        """Отправка заказа на фабрику через очередь пакетной отправки.
+
+        Повторы и ограничение параллельных запросов к фабрике — на стороне
+        очереди (см. FactoryDispatchQueue).
+        """
         try:
             factory = await self._get_factory_for_order(order)
-            result = await self._call_factory_api(factory, order)
+            result = await dispatch_queue.submit(factory, order_payload(order))
 
             ORDER_METRICS.labels(
                 from_status=order.status,
@@ -288,43 +433,146 @@ class ProductionService:
             raise
 
     async def _get_factory_for_order(self, order: Order) -> Factory:
-        """Находит подходящую фабрику для заказа с учетом типа продукта и загрузки."""
-        if not order.design_specs or not order.design_specs.get("product_type"):
+        """Фабрика заказа: назначенная ранее или подобранная с резервированием мощности."""
+        if order.factory_id:
+            return await self.factory_repo.get(order.factory_id)
+
+        product_type = order.product_type
+        if not product_type:
             raise ValueError("Order missing product type specification")
 
-        product_type = order.design_specs["product_type"]
-        factories = await self.factory_repo.find_by_specialization(product_type)
-
-        if not factories:
-            raise ValueError(f"No factories found for product type: {product_type}")
-
-        # Выбираем фабрику с наименьшей загрузкой
-        return min(factories, key=lambda f: f.current_load / f.production_capacity)
-
-    async def _call_factory_api(self, factory: Factory, order: Order) -> dict:
-        """Вызывает API фабрики для создания производственного задания."""
-        if not factory.api_url:
-            raise ValueError("Factory API URL not configured")
-
-        payload = {
-            "order_id": str(order.id),
-            "product_type": order.design_specs["product_type"],
-            "specifications": order.design_specs,
-            "deadline": order.production_deadline.isoformat() if order.production_deadline else None,
-            "priority": "high" if order.design_specs.get("urgent", False) else "normal"
-        }
-
-        headers = {"Content-Type": "application/json"}
-        if factory.api_key:
-            headers["Authorization"] = f"Bearer {factory.api_key}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{factory.api_url}/orders",
-                json=payload,
-                headers=headers,
-                timeout=10.0
+        factory_id = await assignment_engine.reserve(self.factory_repo, product_type, near=_position(order))
+        if factory_id is None:
+            raise ValueError(f"No factory with free capacity for product type: {product_type}")
+        return await self.factory_repo.get(factory_id)
+
+    async def plan_production(self) -> ProductionPlanResult:
+        """Пакетно назначает оплаченные заказы без фабрики (см. production_planner).
+
+        Заказы блокируются на время прогона, фабрики — только те, что вошли
+        в план, и только на время записи: загрузка перечитывается под
+        блокировкой, назначения сверх оставшейся мощности отбрасываются.
+        План применяется одним UPDATE заказов и одним UPDATE загрузки фабрик.
+        Фабрики с API получают задания через очередь отправки после COMMIT.
+
+        Returns:
+            ProductionPlanResult: Сколько заказов рассмотрено, назначено и с опозданием
+        """
+        now = datetime.now()
+        async with UnitOfWork.of(self.session):
+            rows = await self.order_repo.get_plannable(limit=MAX_PLAN_ORDERS)
+            orders = [
+                o for o in (
+                    plan_order(order_id, specs, created_at, deadline, now, resolve(latitude, longitude, city))
+                    for order_id, specs, created_at, deadline, latitude, longitude, city in rows
+                ) if o is not None
+            ]
+            factories = await self.factory_repo.get_for_planning()
+            plan = [PlanFactory.of(f, factory_health.penalty(f.id)) for f in factories]
+
+            pairs = await asyncio.to_thread(plan_assignments, orders, plan) if orders else []
+
+            planned = {}
+            for order_index, factory_index in pairs:
+                planned.setdefault(plan[factory_index].id, []).append(
+                    (orders[order_index], plan[factory_index])
+                )
+
+            locked = await self.factory_repo.lock_loads(sorted(planned)) if planned else []
+            assignments, loads, late = [], {}, 0
+            for factory_id, load, capacity in locked:
+                # Мощность могли занять одиночные назначения, пока решался план:
+                # оставляем заказы с самым близким сроком
+                taken = sorted(planned[factory_id], key=lambda pair: pair[0].due_in_days)
+                taken = taken[:max(0, capacity - (load or 0))]
+                for order, factory in taken:
+                    late += factory.lead_time_days > order.due_in_days
+                    assignments.append((order.id, factory_id, now + timedelta(days=factory.lead_time_days)))
+                if taken:
+                    loads[factory_id] = (load or 0) + len(taken)
+
+            if assignments:
+                await self.order_repo.bulk_assign(assignments)
+                await self.factory_repo.bulk_update(
+                    [{"id": factory_id, "current_load": load} for factory_id, load in loads.items()]
+                )
+                await self._dispatch_planned(factories, assignments, loads)
+
+        return ProductionPlanResult(
+            planned=len(rows),
+            assigned=len(assignments),
+            unassigned=len(rows) - len(assignments),
+            late=late
+        )
+
+    async def redeliver_failed_dispatches(self, limit: int = MAX_REDELIVERY_ORDERS) -> int:
+        """Снова ставит в очередь задания заказов с production_status = dispatch_failed.
+
+        Заказы возвращаются в pending в текущей транзакции и уходят в
+        очередь после COMMIT; новая неудача доставки (в т.ч. пока цепь
+        фабрики разомкнута) снова пометит их dispatch_failed.
+
+        Returns:
+            int: Количество заказов, отправленных повторно
+        """
+        orders = await self.order_repo.claim_failed_dispatches(limit)
+        endpoints = {}
+        for factory_id in {order.factory_id for order in orders}:
+            factory = await self.factory_repo.get(factory_id)
+            if factory is not None and factory.api_url:
+                endpoints[factory_id] = FactoryEndpoint.of(factory)
+        dispatched = [
+            (endpoints[order.factory_id], order_payload(order))
+            for order in orders if order.factory_id in endpoints
+        ]
+
+        async def after_commit() -> None:
+            for endpoint, payload in dispatched:
+                dispatch_queue.submit(endpoint, payload)
+
+        UnitOfWork.of(self.session).on_commit(after_commit)
+        return len(dispatched)
+
+    async def _dispatch_planned(
+            self,
+            factories: List[Factory],
+            assignments: List[tuple],
+            loads: dict
+    ) -> None:
+        """После COMMIT: задания фабрикам с API, новая загрузка в индекс назначений и сроки в SLA-монитор."""
+        endpoints = {f.id: FactoryEndpoint.of(f) for f in factories if f.api_url}
+        factory_of = {order_id: factory_id for order_id, factory_id, _ in assignments}
+        dispatched = [
+            (endpoints[factory_of[order.id]], order_payload(order))
+            for order in await self.order_repo.get_by_ids(
+                [order_id for order_id, factory_id, _ in assignments if factory_id in endpoints]
             )
-            response.raise_for_status()
-            return response.json()
-        
\ No newline at end of file
+        ] if endpoints else []
+
+        async def after_commit() -> None:
+            for factory_id, load in loads.items():
+                assignment_engine.index.set_load(factory_id, load)
+            for endpoint, payload in dispatched:
+                dispatch_queue.submit(endpoint, payload)
+            for order_id, _, deadline in assignments:
+                sla_monitor.track(order_id, deadline)
+
+        UnitOfWork.of(self.session).on_commit(after_commit)
+
+
+async def redeliver_failed_dispatches() -> None:
+    """Периодическая задача: повторная отправка заданий, не дошедших до фабрик."""
+    async with async_session() as session, UnitOfWork.of(session):
+        service = ProductionService(session, OrderRepository(session), FactoryRepository(session))
+        redelivered = await service.redeliver_failed_dispatches()
+    if redelivered:
+        logger.info(f"Redelivering {redelivered} undelivered factory orders")
+
+
+async def run_production_planner() -> None:
+    """Периодическая задача: пакетное назначение оплаченных заказов на фабрики."""
+    async with async_session() as session, UnitOfWork.of(session):
+        service = ProductionService(session, OrderRepository(session), FactoryRepository(session))
+        result = await service.plan_production()
+    if result.planned:
+        logger.info(f"Production plan applied: {result.model_dump()}")
@@ -0,0 +1,186 @@
+"""
+Пакетное планирование производства: все оплаченные заказы × все фабрики.
+
+Назначение решается как задача о назначениях минимальной стоимости
+(scipy.optimize.linear_sum_assignment). Столбцы матрицы — свободные
+слоты мощности фабрик: k-й слот фабрики стоит дороже (k + 1)-й единицы
+загрузки, поэтому заказы распределяются, а не скапливаются на лучшей.
+
+Стоимость пары (заказ, слот), меньше — лучше:
+    LATE_WEIGHT  * дни опоздания (lead_time - запас до дедлайна) * срочность
+  + LEAD_WEIGHT  * lead_time_days * срочность
+  + LOAD_WEIGHT  * доля загрузки фабрики после назначения
+  + HEALTH_WEIGHT * штраф здоровья API фабрики (см. factory_health)
+  + DISTANCE_WEIGHT * расстояние доставки в тыс. км (если известны обе точки)
+  - RATING_WEIGHT * рейтинг - SERVICE_WEIGHT * service_level
+Несовместимые по специализации пары получают INFEASIBLE и отбрасываются.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from app.core.geo import Coordinates, chord_to_km, resolve, unit_vectors
+from app.services.factory_assignment import specializations
+
+LATE_WEIGHT = 10.0
+LEAD_WEIGHT = 1.0
+LOAD_WEIGHT = 2.0
+RATING_WEIGHT = 0.5
+SERVICE_WEIGHT = 0.5
+HEALTH_WEIGHT = 2.0
+DISTANCE_WEIGHT = 1.0
+# Множитель опоздания и срока производства для срочных заказов
+URGENT_FACTOR = 3.0
+INFEASIBLE = 1e9
+
+# Срок заказа без production_deadline и design_specs.deadline_days
+DEFAULT_DEADLINE_DAYS = 14
+# Заказы с меньшим сроком считаются срочными (как наценка в OrderService)
+URGENT_DEADLINE_DAYS = 7
+# Заказов за один прогон: матрица стоимостей растёт как заказы × слоты
+MAX_PLAN_ORDERS = 1000
+
+_DAY = 24 * 3600
+
+
+@dataclass
+class PlanOrder:
+    """Заказ для планирования."""
+    id: UUID
+    product_type: str
+    due_in_days: float
+    urgent: bool = False
+    position: Optional[Coordinates] = None
+
+
+@dataclass
+class PlanFactory:
+    """Фабрика для планирования."""
+    id: UUID
+    specializations: List[str]
+    lead_time_days: int
+    load: int
+    capacity: int
+    rating: float = 0.0
+    service_level: int = 1
+    penalty: float = 0.0
+    position: Optional[Coordinates] = None
+
+    @classmethod
+    def of(cls, factory, penalty: float = 0.0) -> "PlanFactory":
+        return cls(
+            factory.id,
+            specializations(factory.specialization),
+            factory.lead_time_days or 0,
+            factory.current_load or 0,
+            factory.production_capacity,
+            factory.rating or 0.0,
+            factory.service_level or 0,
+            penalty,
+            resolve(factory.latitude, factory.longitude, factory.location)
+        )
+
+
+def plan_assignments(
+        orders: Sequence[PlanOrder],
+        factories: Sequence[PlanFactory]
+) -> List[Tuple[int, int]]:
+    """Оптимальное назначение заказов на фабрики.
+
+    Returns:
+        List[Tuple[int, int]]: Пары (индекс заказа, индекс фабрики); заказы,
+            для которых нет совместимой свободной фабрики, не назначаются
+    """
+    if not len(orders) or not len(factories):
+        return []
+
+    types = sorted({o.product_type for o in orders})
+    type_index = {t: i for i, t in enumerate(types)}
+    serves = np.array([[t in f.specializations for f in factories] for t in types], dtype=bool)
+    order_types = [type_index[o.product_type] for o in orders]
+
+    # Слотов у фабрики не больше, чем совместимых с ней заказов:
+    # иначе большие мощности раздувают матрицу без пользы для решения
+    demand = serves[order_types].sum(axis=0)
+    capacity_left = np.array([max(0, f.capacity - f.load) for f in factories], dtype=np.int64)
+    free = np.minimum(capacity_left, demand).astype(np.int64)
+    if not free.sum():
+        return []
+
+    # Столбцы — слоты: номер фабрики и порядковый номер слота на ней
+    slot_factory = np.repeat(np.arange(len(factories)), free)
+    slot_rank = np.arange(len(slot_factory)) - np.repeat(np.cumsum(free) - free, free)
+
+    lead = np.array([f.lead_time_days or 0 for f in factories], dtype=np.float64)[slot_factory]
+    load = np.array([f.load for f in factories], dtype=np.float64)[slot_factory]
+    capacity = np.array([f.capacity for f in factories], dtype=np.float64)[slot_factory]
+    quality = np.array(
+        [
+            RATING_WEIGHT * (f.rating or 0.0) + SERVICE_WEIGHT * (f.service_level or 0)
+            - HEALTH_WEIGHT * f.penalty
+            for f in factories
+        ]
+    )[slot_factory]
+
+    compatible = serves[order_types][:, slot_factory]
+
+    due = np.array([o.due_in_days for o in orders], dtype=np.float64)[:, None]
+    urgency = np.where([o.urgent for o in orders], URGENT_FACTOR, 1.0)[:, None]
+    lateness = np.maximum(0.0, lead[None, :] - due)
+
+    cost = (
+        (LATE_WEIGHT * lateness + LEAD_WEIGHT * lead[None, :]) * urgency
+        + LOAD_WEIGHT * ((load + slot_rank + 1) / capacity)[None, :]
+        - quality[None, :]
+    )
+    distance = _distances_km(orders, factories)
+    if distance is not None:
+        cost += DISTANCE_WEIGHT * distance[:, slot_factory] / 1000
+    cost[~compatible] = INFEASIBLE
+
+    rows, cols = linear_sum_assignment(cost)
+    feasible = cost[rows, cols] < INFEASIBLE
+    return [(int(r), int(slot_factory[c])) for r, c in zip(rows[feasible], cols[feasible])]
+
+
+def _distances_km(orders: Sequence[PlanOrder], factories: Sequence[PlanFactory]) -> Optional[np.ndarray]:
+    """Матрица расстояний заказ × фабрика (км); 0, где точка неизвестна."""
+    located_orders = [i for i, o in enumerate(orders) if o.position is not None]
+    located_factories = [j for j, f in enumerate(factories) if f.position is not None]
+    if not located_orders or not located_factories:
+        return None
+    a = unit_vectors(orders[i].position for i in located_orders)
+    b = unit_vectors(factories[j].position for j in located_factories)
+    distance = np.zeros((len(orders), len(factories)))
+    distance[np.ix_(located_orders, located_factories)] = chord_to_km(
+        np.linalg.norm(a[:, None, :] - b[None, :, :], axis=2)
+    )
+    return distance
+
+
+def plan_order(
+        order_id: UUID,
+        design_specs: Optional[dict],
+        created_at: datetime,
+        production_deadline: Optional[datetime],
+        now: datetime,
+        position: Optional[Coordinates] = None
+) -> Optional[PlanOrder]:
+    """PlanOrder из строки заказа (None — тип продукта не указан)."""
+    specs = design_specs or {}
+    product_type = specs.get("product_type")
+    if not product_type:
+        return None
+    deadline_days = specs.get("deadline_days") or DEFAULT_DEADLINE_DAYS
+    deadline = production_deadline or created_at + timedelta(days=deadline_days)
+    return PlanOrder(
+        id=order_id,
+        product_type=str(product_type).lower(),
+        due_in_days=(deadline - now).total_seconds() / _DAY,
+        urgent=bool(specs.get("urgent")) or deadline_days < URGENT_DEADLINE_DAYS,
+        position=position
+    )
@@ -0,0 +1,263 @@
+"""
+Рекомендации «похожие товары» маркетплейса.
+
+Каждый товар описывается вектором признаков, разложенных хешированием
+(feature hashing) по фиксированному числу измерений:
+
+- контент: тип товара, ключи и значения specs, ценовой диапазон, дизайнер;
+- совместные покупки: покупатели товара (косинус таких векторов —
+  нормированное число общих покупателей).
+
+Соседи — top-k по косинусу, считаются в NumPy блочным умножением матриц и
+хранятся в Redis (hash recs:similar) для выборки за O(1).
+
+Пересчёт инкрементальный: по отпечаткам векторов определяются изменённые
+и новые товары; полностью пересчитываются только их строки и строки,
+в чьих списках были изменённые/удалённые товары; остальные списки лишь
+объединяются со сходством к изменённым товарам. Вычисления идут в
+отдельном процессе и не блокируют event loop.
+"""
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.database import async_session
+from app.core.logger.logger import logger
+from app.core.process_pool import run_cpu
+from app.core.redis import redis_client
+from app.models.marketplace import MarketItem
+from app.models.order import Order
+from app.repositories.marketplace import PRICE_BANDS, PRICE_BAND_TOP
+
+CONTENT_DIM = 256
+BUYER_DIM = 256
+# Доля контента и совместных покупок в векторе (сумма квадратов = 1)
+CONTENT_WEIGHT = 0.8
+BUYER_WEIGHT = 0.6
+
+TOP_K = 12
+# Строк в одном блоке умножения: BATCH_SIZE x n float32 в памяти
+BATCH_SIZE = 256
+
+SIMILAR_KEY = "recs:similar"
+FINGERPRINT_KEY = "recs:fingerprints"
+_WRITE_CHUNK = 5000
+
+Neighbours = List[Tuple[str, float]]
+
+
+def _bucket(feature: str, dim: int) -> int:
+    # crc32, а не hash(): значения должны совпадать между процессами и запусками
+    return zlib.crc32(feature.encode()) % dim
+
+
+def _price_band(price: int) -> str:
+    for upper, label in PRICE_BANDS:
+        if price < upper:
+            return label
+    return PRICE_BAND_TOP
+
+
+def content_features(item_type: str, specs: Optional[dict], price: int, designer_id: Any) -> Dict[str, float]:
+    """Признаки товара с весами."""
+    features = {
+        f"type:{item_type}": 1.0,
+        f"price:{_price_band(price)}": 1.0,
+        f"designer:{designer_id}": 1.0,
+    }
+    for key, value in (specs or {}).items():
+        features[f"spec:{key}"] = 0.5
+        if isinstance(value, (str, int, float, bool)):
+            features[f"spec:{key}={value}"] = 1.0
+    return features
+
+
+def build_vectors(
+        items: Sequence[Tuple[str, str, Optional[dict], int, Any]],
+        buyers: Dict[str, Iterable[str]]
+) -> np.ndarray:
+    """Нормированные векторы товаров (n x (CONTENT_DIM + BUYER_DIM), float32).
+
+    Args:
+        items: Строки (id, item_type, specs, price, designer_id)
+        buyers: Покупатели каждого товара
+    """
+    content = np.zeros((len(items), CONTENT_DIM), dtype=np.float32)
+    purchases = np.zeros((len(items), BUYER_DIM), dtype=np.float32)
+    for row, (item_id, item_type, specs, price, designer_id) in enumerate(items):
+        for feature, weight in content_features(item_type, specs, price, designer_id).items():
+            content[row, _bucket(feature, CONTENT_DIM)] += weight
+        for user_id in buyers.get(item_id, ()):
+            purchases[row, _bucket(user_id, BUYER_DIM)] = 1.0
+
+    vectors = np.hstack([
+        CONTENT_WEIGHT * _normalize(content),
+        BUYER_WEIGHT * _normalize(purchases),
+    ])
+    return _normalize(vectors)
+
+
+def fingerprints(vectors: np.ndarray) -> List[str]:
+    """Отпечатки векторов для поиска изменившихся товаров."""
+    return [hashlib.blake2b(row.tobytes(), digest_size=8).hexdigest() for row in vectors]
+
+
+def update_neighbours(
+        vectors: np.ndarray,
+        ids: Sequence[str],
+        changed: np.ndarray,
+        previous: Dict[str, Neighbours],
+        k: int = TOP_K,
+        batch_size: int = BATCH_SIZE
+) -> Dict[str, Neighbours]:
+    """Инкрементально пересчитывает top-k соседей.
+
+    Args:
+        vectors: Нормированные векторы всех товаров
+        ids: ID товаров (строки vectors)
+        changed: Маска изменённых и новых товаров
+        previous: Сохранённые списки соседей
+        k: Количество соседей
+        batch_size: Строк в блоке умножения
+
+    Returns:
+        Dict[str, Neighbours]: Новые списки для товаров, у которых они изменились
+    """
+    index = {item_id: row for row, item_id in enumerate(ids)}
+    changed_rows = np.flatnonzero(changed)
+
+    full_rows, merge_rows = list(changed_rows), []
+    for row in np.flatnonzero(~changed):
+        stored = previous.get(ids[row])
+        # Сосед из списка изменился или удалён — его место мог занять кто угодно
+        if stored is None or any(j not in index or changed[index[j]] for j, _ in stored):
+            full_rows.append(row)
+        else:
+            merge_rows.append(row)
+
+    result: Dict[str, Neighbours] = {}
+    for start in range(0, len(full_rows), batch_size):
+        rows = np.asarray(full_rows[start:start + batch_size])
+        scores = vectors[rows] @ vectors.T
+        scores[np.arange(len(rows)), rows] = -np.inf
+        top, top_scores = _top_k(scores, k)
+        for row, cols, values in zip(rows, top, top_scores):
+            result[ids[row]] = _neighbours(ids, cols, values)
+
+    if len(changed_rows) and merge_rows:
+        for start in range(0, len(merge_rows), batch_size):
+            rows = np.asarray(merge_rows[start:start + batch_size])
+            prev_cols = np.full((len(rows), k), -1)
+            prev_scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+            for i, row in enumerate(rows):
+                for j, (item_id, score) in enumerate(previous[ids[row]][:k]):
+                    prev_cols[i, j] = index[item_id]
+                    prev_scores[i, j] = score
+
+            scores = np.hstack([prev_scores, vectors[rows] @ vectors[changed_rows].T])
+            cols = np.hstack([prev_cols, np.broadcast_to(changed_rows, (len(rows), len(changed_rows)))])
+            top, top_scores = _top_k(scores, k)
+            for i, row in enumerate(rows):
+                neighbours = _neighbours(ids, np.take(cols[i], top[i]), top_scores[i])
+                if neighbours != previous[ids[row]]:
+                    result[ids[row]] = neighbours
+    return result
+
+
+def rebuild_index(
+        items: Sequence[Tuple[str, str, Optional[dict], int, Any]],
+        buyers: Dict[str, List[str]],
+        previous_fingerprints: Dict[str, str],
+        previous: Dict[str, Neighbours]
+) -> Tuple[Dict[str, Neighbours], Dict[str, str]]:
+    """Полный шаг пересчёта (выполняется в отдельном процессе).
+
+    Returns:
+        tuple: Изменившиеся списки соседей и отпечатки всех товаров
+    """
+    ids = [item[0] for item in items]
+    vectors = build_vectors(items, buyers)
+    prints = dict(zip(ids, fingerprints(vectors)))
+    changed = np.array([previous_fingerprints.get(i) != prints[i] for i in ids], dtype=bool)
+    return update_neighbours(vectors, ids, changed, previous), prints
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Индексы и значения k наибольших в каждой строке, по убыванию."""
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+def _neighbours(ids: Sequence[str], cols: np.ndarray, scores: np.ndarray) -> Neighbours:
+    # Без общих признаков (косинус 0) товар не считается похожим
+    return [(ids[c], round(float(s), 4)) for c, s in zip(cols, scores) if c >= 0 and s > 0]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+async def get_similar_item_ids(item_id: UUID, limit: int = TOP_K) -> List[UUID]:
+    """Похожие товары из предрассчитанного индекса (один HGET)."""
+    raw = await redis_client.client.hget(SIMILAR_KEY, str(item_id))
+    if not raw:
+        return []
+    return [UUID(neighbour) for neighbour, _ in json.loads(raw)[:limit]]
+
+
+async def rebuild_recommendations() -> None:
+    """Периодическая задача: инкрементальный пересчёт индекса похожих товаров.
+
+    Регистрируется как exclusive: за интервал индекс пересчитывает один
+    процесс, остальные пропускают запуск.
+    """
+    async with async_session() as session:
+        items = (await session.execute(
+            select(MarketItem.id, MarketItem.item_type, MarketItem.specs, MarketItem.price, MarketItem.designer_id)
+        )).all()
+        purchases = (await session.execute(
+            select(Order.market_item_id, Order.user_id)
+            .where(Order.market_item_id.is_not(None))
+            .distinct()
+        )).all()
+
+    items = [(str(i), t, specs, price, str(designer)) for i, t, specs, price, designer in items]
+    buyers: Dict[str, List[str]] = {}
+    for item_id, user_id in purchases:
+        buyers.setdefault(str(item_id), []).append(str(user_id))
+
+    client = redis_client.client
+    previous_fingerprints = await client.hgetall(FINGERPRINT_KEY)
+    previous = {
+        item_id: [tuple(n) for n in json.loads(raw)]
+        for item_id, raw in (await client.hgetall(SIMILAR_KEY)).items()
+    }
+
+    updated, prints = await run_cpu(rebuild_index, items, buyers, previous_fingerprints, previous)
+
+    removed = list(previous_fingerprints.keys() - prints.keys())
+    async with client.pipeline(transaction=False) as pipe:
+        if removed:
+            pipe.hdel(SIMILAR_KEY, *removed)
+            pipe.hdel(FINGERPRINT_KEY, *removed)
+        entries = [(k, json.dumps(v)) for k, v in updated.items()]
+        for start in range(0, len(entries), _WRITE_CHUNK):
+            pipe.hset(SIMILAR_KEY, mapping=dict(entries[start:start + _WRITE_CHUNK]))
+        changed_prints = [(k, v) for k, v in prints.items() if previous_fingerprints.get(k) != v]
+        for start in range(0, len(changed_prints), _WRITE_CHUNK):
+            pipe.hset(FINGERPRINT_KEY, mapping=dict(changed_prints[start:start + _WRITE_CHUNK]))
+        await pipe.execute()
+
+    logger.info(
+        f"Recommendations rebuilt: {len(items)} items, "
+        f"{len(updated)} lists updated, {len(removed)} removed"
+    )
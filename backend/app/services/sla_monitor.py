@@ -0,0 +1,125 @@
+"""
+Контроль сроков производства (SLA) на колесе таймеров.
+
+Для каждого заказа в производстве ставятся два таймера: "at_risk" за
+SLA_AT_RISK_HOURS до production_deadline и "overdue" в момент дедлайна.
+Между срабатываниями монитор не обращается к БД: тик только продвигает
+колесо (см. TimerWheel).
+
+Колесо пополняется инкрементально:
+- при назначении заказа на фабрику (хук после COMMIT, см. ProductionService);
+- периодическим запросом по индексу ix_orders_production_deadline, который
+  каждый раз читает только следующее окно дедлайнов.
+
+Событие фиксируется условным UPDATE orders.sla_state: в нескольких
+процессах таймеры одинаковые, но уведомление отправляет только тот, чей
+UPDATE изменил строку. Ушедшие из производства или получившие новый срок
+заказы UPDATE не затрагивает.
+"""
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.logger.logger import logger
+from app.core.monitoring.monitoring import ORDER_METRICS
+from app.core.timer_wheel import TimerWheel
+from app.core.unit_of_work import UnitOfWork
+from app.repositories.notification import NotificationRepository
+from app.repositories.order import OrderRepository
+from app.schemas.notifications import NotificationBase
+from app.services.notifications import NotificationService
+
+AT_RISK, OVERDUE = "at_risk", "overdue"
+
+_MESSAGES = {
+    AT_RISK: ("Срок производства под угрозой", "Заказ {order_id} может не успеть к {deadline:%d.%m.%Y %H:%M}"),
+    OVERDUE: ("Срок производства истёк", "Заказ {order_id} не изготовлен к {deadline:%d.%m.%Y %H:%M}"),
+}
+
+
+class SLAMonitor:
+    """
+    Таймеры дедлайнов заказов (по одному на процесс).
+
+    Пример использования:
+         sla_monitor.track(order_id, deadline)  # после назначения фабрики
+         await sla_monitor.refill()             # периодически, SLA_REFILL_INTERVAL
+         await sla_monitor.tick()               # каждые SLA_TICK_INTERVAL
+    """
+
+    def __init__(
+            self,
+            at_risk_before: timedelta = timedelta(hours=settings.SLA_AT_RISK_HOURS),
+            resolution: float = settings.SLA_TICK_INTERVAL,
+            refill_interval: float = settings.SLA_REFILL_INTERVAL
+    ):
+        self.at_risk_before = at_risk_before
+        # Окно пополнения с запасом: таймеры попадают в колесо заранее
+        self.horizon = timedelta(seconds=2 * refill_interval)
+        self.wheel = TimerWheel(resolution, start=time.time())
+        self._loaded_until: Optional[datetime] = None
+
+    def track(self, order_id: UUID, deadline: Optional[datetime], at_risk: bool = True) -> None:
+        """Ставит (или переставляет) таймеры заказа; deadline=None снимает их."""
+        if deadline is None:
+            self.wheel.cancel((AT_RISK, order_id))
+            self.wheel.cancel((OVERDUE, order_id))
+            return
+        if at_risk:
+            self.wheel.schedule((AT_RISK, order_id), (deadline - self.at_risk_before).timestamp(), deadline)
+        self.wheel.schedule((OVERDUE, order_id), deadline.timestamp(), deadline)
+
+    async def refill(self) -> int:
+        """Загружает дедлайны следующего окна (при первом запуске — все ближайшие и просроченные)."""
+        until = datetime.now() + self.horizon + self.at_risk_before
+        async with async_session() as session, UnitOfWork.of(session):
+            rows = await OrderRepository(session).get_production_deadlines(self._loaded_until, until)
+        for order_id, deadline, sla_state in rows:
+            self.track(order_id, deadline, at_risk=sla_state is None)
+        self._loaded_until = until
+        return len(rows)
+
+    async def tick(self) -> None:
+        """Продвигает колесо и фиксирует сработавшие события; без событий БД не трогает."""
+        fired = self.wheel.advance(time.time())
+        if not fired:
+            return
+
+        by_kind: Dict[str, List[UUID]] = defaultdict(list)
+        for (kind, order_id), _ in fired:
+            by_kind[kind].append(order_id)
+
+        now = datetime.now()
+        thresholds = {AT_RISK: now + self.at_risk_before, OVERDUE: now}
+        async with async_session() as session, UnitOfWork.of(session):
+            orders = OrderRepository(session)
+            notifications = []
+            for kind, order_ids in by_kind.items():
+                rows = await orders.mark_sla_state(order_ids, kind, thresholds[kind])
+                ORDER_METRICS['sla_events'].labels(kind=kind).inc(len(rows))
+                title, message = _MESSAGES[kind]
+                notifications.extend(
+                    NotificationBase(
+                        user_id=user_id,
+                        type="order",
+                        title=title,
+                        message=message.format(order_id=order_id, deadline=deadline),
+                        payload={
+                            "order_id": str(order_id),
+                            "factory_id": str(factory_id) if factory_id else None,
+                            "sla": kind,
+                            "deadline": deadline.isoformat()
+                        }
+                    )
+                    for order_id, user_id, factory_id, deadline in rows
+                )
+                if rows:
+                    logger.warning(f"SLA {kind}: {len(rows)} orders", extra={"order_ids": [str(r[0]) for r in rows]})
+            await NotificationService(NotificationRepository(session)).send_many(notifications)
+
+
+sla_monitor = SLAMonitor()
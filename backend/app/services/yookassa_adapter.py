@@ -2,7 +2,7 @@
 from typing import Optional, Dict, Any
 from uuid import uuid4
 
-from yookassa import Configuration, Payment as YooPayment
+from yookassa import Configuration, Payment as YooPayment, Refund as YooRefund
 from yookassa.domain.exceptions import BadRequestError, NotFoundError
 from yookassa.domain.notification import WebhookNotification
 from yookassa.domain.response import (
@@ -106,7 +106,8 @@ class YooKassaAdapter:
             self,
             payment_id: str,
             amount: float,
-            reason: str = ""
+            reason: str = "",
+            idempotency_key: Optional[str] = None
     ) -> YooRefundResponse:
         """
         Создание возврата платежа.
@@ -115,6 +116,8 @@ class YooKassaAdapter:
             payment_id: Идентификатор исходного платежа
             amount: Сумма возврата
             reason: Причина возврата
+            idempotency_key: Ключ идемпотентности (повтор с тем же ключом
+                возвращает уже созданный возврат)
 
         Returns:
             Объект возврата
@@ -126,7 +129,7 @@ class YooKassaAdapter:
         }
 
         try:
-            return YooPayment.refund.create(params, str(uuid4()))
+            return YooRefund.create(params, idempotency_key or str(uuid4()))
         except BadRequestError as e:
             raise PaymentError(f"Invalid refund request: {str(e)}")
 
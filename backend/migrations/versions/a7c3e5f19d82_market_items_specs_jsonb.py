@@ -0,0 +1,50 @@
+"""market items specs jsonb
+
+Revision ID: a7c3e5f19d82
+Revises: f5a2b8d61c04
+Create Date: 2025-09-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5f19d82'
+down_revision: Union[str, Sequence[str], None] = 'f5a2b8d61c04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'market_items',
+        'specs',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using='specs::jsonb'
+    )
+    # jsonb_path_ops: компактнее jsonb_ops и обслуживает только @>, чего достаточно каталогу
+    op.create_index(
+        'ix_market_items_specs',
+        'market_items',
+        ['specs'],
+        postgresql_using='gin',
+        postgresql_ops={'specs': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_market_items_specs', table_name='market_items')
+    op.alter_column(
+        'market_items',
+        'specs',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using='specs::json'
+    )
@@ -0,0 +1,37 @@
+"""factory and order coordinates
+
+Revision ID: b4e9d27c6a31
+Revises: a7c3e5f19d82
+Create Date: 2025-09-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e9d27c6a31'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e5f19d82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Без координат фабрика геокодируется по location при загрузке индекса
+    op.add_column('factories', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('factories', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('orders', sa.Column('delivery_city', sa.String(length=200), nullable=True))
+    op.add_column('orders', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('orders', sa.Column('longitude', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('orders', 'longitude')
+    op.drop_column('orders', 'latitude')
+    op.drop_column('orders', 'delivery_city')
+    op.drop_column('factories', 'longitude')
+    op.drop_column('factories', 'latitude')
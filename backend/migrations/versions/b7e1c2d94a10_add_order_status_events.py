@@ -0,0 +1,120 @@
+"""add order status events
+
+Revision ID: b7e1c2d94a10
+Revises: 24_08_2025_add_auth_fields
+Create Date: 2025-09-01 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e1c2d94a10'
+down_revision: Union[str, Sequence[str], None] = '24_08_2025_add_auth_fields'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Append-only журнал, партиционированный по месяцам
+    op.create_table('order_status_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('order_id', sa.UUID(), nullable=False),
+    sa.Column('factory_id', sa.UUID(), nullable=True),
+    sa.Column('from_status', sa.String(length=50), nullable=True),
+    sa.Column('to_status', sa.String(length=50), nullable=False),
+    sa.Column('backfilled', sa.Boolean(), server_default=sa.false(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index(
+        'ix_order_status_events_order_created',
+        'order_status_events', ['order_id', 'created_at']
+    )
+    op.create_index(
+        'ix_order_status_events_factory_created',
+        'order_status_events', ['factory_id', 'created_at'],
+        postgresql_where=sa.text('factory_id IS NOT NULL')
+    )
+
+    # Создание месячной партиции по требованию (вызывается планировщиком)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION order_status_events_ensure_partition(month_start date)
+        RETURNS void AS $$
+        DECLARE
+            lower_bound date := date_trunc('month', month_start)::date;
+            upper_bound date := (date_trunc('month', month_start) + interval '1 month')::date;
+            partition_name text := 'order_status_events_' || to_char(lower_bound, 'YYYY_MM');
+        BEGIN
+            IF to_regclass(partition_name) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF order_status_events FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, lower_bound, upper_bound
+                );
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute(
+        "CREATE TABLE order_status_events_default PARTITION OF order_status_events DEFAULT"
+    )
+    op.execute("""
+        SELECT order_status_events_ensure_partition(
+            (date_trunc('month', now()) + make_interval(months => m))::date
+        )
+        FROM generate_series(-1, 12) AS m
+    """)
+
+    # Начальная история для существующих заказов. Момент перехода в текущий
+    # статус неизвестен: событие помечается backfilled, и его интервал не
+    # попадает в перцентили и агрегаты
+    op.execute("""
+        INSERT INTO order_status_events (id, created_at, order_id, factory_id, from_status, to_status, backfilled)
+        SELECT gen_random_uuid(), created_at, id, factory_id, NULL, status, true
+        FROM orders
+    """)
+
+    op.create_table('order_status_duration_rollups',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('factory_id', sa.UUID(), nullable=True),
+    sa.Column('transitions', sa.Integer(), nullable=False),
+    sa.Column('avg_seconds', sa.Float(), nullable=False),
+    sa.Column('p50_seconds', sa.Float(), nullable=False),
+    sa.Column('p90_seconds', sa.Float(), nullable=False),
+    sa.Column('p95_seconds', sa.Float(), nullable=False),
+    sa.Column('max_seconds', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_order_status_duration_rollups_day_status',
+        'order_status_duration_rollups', ['day', 'status']
+    )
+    op.create_index(
+        'ix_order_status_duration_rollups_factory_day',
+        'order_status_duration_rollups', ['factory_id', 'day']
+    )
+
+    op.create_table('order_status_rollup_state',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('watermark', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute(
+        "INSERT INTO order_status_rollup_state (name, watermark) "
+        "VALUES ('order_status_durations', NULL)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('order_status_rollup_state')
+    op.drop_index('ix_order_status_duration_rollups_factory_day', table_name='order_status_duration_rollups')
+    op.drop_index('ix_order_status_duration_rollups_day_status', table_name='order_status_duration_rollups')
+    op.drop_table('order_status_duration_rollups')
+    op.execute("DROP TABLE order_status_events CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS order_status_events_ensure_partition(date)")
@@ -0,0 +1,42 @@
+"""order keyset pagination indexes
+
+Revision ID: c3d8f0a51e27
+Revises: b7e1c2d94a10
+Create Date: 2025-09-03 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8f0a51e27'
+down_revision: Union[str, Sequence[str], None] = 'b7e1c2d94a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Модель и схемы уже используют design_specs, а колонки в БД не было
+    op.execute(
+        "ALTER TABLE orders ADD COLUMN IF NOT EXISTS design_specs JSON NOT NULL DEFAULT '{}'"
+    )
+
+    # Индексы строятся без блокировки записи в orders
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_user_created_id "
+            "ON orders (user_id, created_at DESC, id DESC)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_user_status_created_id "
+            "ON orders (user_id, status, created_at DESC, id DESC)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_orders_user_status_created_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_orders_user_created_id")
+    op.drop_column('orders', 'design_specs')
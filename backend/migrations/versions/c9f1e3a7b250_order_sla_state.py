@@ -0,0 +1,36 @@
+"""order sla state and production deadline index
+
+Revision ID: c9f1e3a7b250
+Revises: b4e9d27c6a31
+Create Date: 2025-09-21 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f1e3a7b250'
+down_revision: Union[str, Sequence[str], None] = 'b4e9d27c6a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('sla_state', sa.String(length=20), nullable=True))
+    # Частичный: SLA-монитор читает окна дедлайнов только заказов в производстве
+    op.create_index(
+        'ix_orders_production_deadline',
+        'orders',
+        ['production_deadline'],
+        postgresql_where=sa.text("status = 'production'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_production_deadline', table_name='orders')
+    op.drop_column('orders', 'sla_state')
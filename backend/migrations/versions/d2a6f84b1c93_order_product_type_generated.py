@@ -0,0 +1,57 @@
+"""order design_specs jsonb and generated product_type
+
+Revision ID: d2a6f84b1c93
+Revises: c9f1e3a7b250
+Create Date: 2025-09-22 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6f84b1c93'
+down_revision: Union[str, Sequence[str], None] = 'c9f1e3a7b250'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'orders',
+        'design_specs',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using='design_specs::jsonb'
+    )
+    # STORED: значение пишется при INSERT/UPDATE и индексируется как обычная колонка;
+    # left() обрезает длинное значение вместо ошибки "value too long"
+    op.add_column(
+        'orders',
+        sa.Column(
+            'product_type',
+            sa.String(length=100),
+            sa.Computed("left(lower(design_specs ->> 'product_type'), 100)", persisted=True),
+            nullable=True
+        )
+    )
+    op.create_index('ix_orders_product_type_status', 'orders', ['product_type', 'status'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_product_type_status', table_name='orders')
+    op.drop_column('orders', 'product_type')
+    op.alter_column(
+        'orders',
+        'design_specs',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using='design_specs::json'
+    )
@@ -0,0 +1,49 @@
+"""market items full-text and trigram search
+
+Revision ID: d91a4c7e2f60
+Revises: c3d8f0a51e27
+Create Date: 2025-09-05 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91a4c7e2f60'
+down_revision: Union[str, Sequence[str], None] = 'c3d8f0a51e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Название (A) и описание (B) в русской и английской конфигурациях
+    op.execute("""
+        ALTER TABLE market_items ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('russian', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_market_items_search_vector "
+            "ON market_items USING gin (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_market_items_title_trgm "
+            "ON market_items USING gin (title gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_market_items_title_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_market_items_search_vector")
+    op.drop_column('market_items', 'search_vector')
@@ -0,0 +1,47 @@
+"""market items browse sort columns and keyset indexes
+
+Revision ID: e47f0b9c3a18
+Revises: d91a4c7e2f60
+Create Date: 2025-09-08 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e47f0b9c3a18'
+down_revision: Union[str, Sequence[str], None] = 'd91a4c7e2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_market_items_price_id", "(price, id)"),
+    ("ix_market_items_rating_id", "(rating DESC, id DESC)"),
+    ("ix_market_items_created_id", "(created_at DESC, id DESC)"),
+    ("ix_market_items_popularity_id", "(popularity DESC, id DESC)"),
+    ("ix_market_items_type_created_id", "(item_type, created_at DESC, id DESC)"),
+)
+
+
+def upgrade() -> None:
+    op.add_column('market_items', sa.Column(
+        'created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False
+    ))
+    op.add_column('market_items', sa.Column(
+        'popularity', sa.Float(), server_default='0', nullable=False
+    ))
+
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON market_items {columns}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.drop_column('market_items', 'popularity')
+    op.drop_column('market_items', 'created_at')
@@ -0,0 +1,37 @@
+"""order payment link
+
+Revision ID: e8b3c5a71d46
+Revises: d2a6f84b1c93
+Create Date: 2025-09-24 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3c5a71d46'
+down_revision: Union[str, Sequence[str], None] = 'd2a6f84b1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Один платёж оформления корзины оплачивает несколько заказов
+    op.add_column('orders', sa.Column('payment_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('fk_orders_payment_id', 'orders', 'payments', ['payment_id'], ['id'])
+    op.create_index('ix_orders_payment_id', 'orders', ['payment_id'])
+    op.execute(
+        "UPDATE orders SET payment_id = payments.id "
+        "FROM payments WHERE payments.order_id = orders.id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_payment_id', table_name='orders')
+    op.drop_constraint('fk_orders_payment_id', 'orders', type_='foreignkey')
+    op.drop_column('orders', 'payment_id')
@@ -0,0 +1,32 @@
+"""order production status, notes and cancellation reason
+
+Revision ID: f19c7a2e5b83
+Revises: e8b3c5a71d46
+Create Date: 2025-09-25 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f19c7a2e5b83'
+down_revision: Union[str, Sequence[str], None] = 'e8b3c5a71d46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('production_status', sa.String(length=50), nullable=True))
+    op.add_column('orders', sa.Column('production_notes', sa.String(), nullable=True))
+    op.add_column('orders', sa.Column('cancellation_reason', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('orders', 'cancellation_reason')
+    op.drop_column('orders', 'production_notes')
+    op.drop_column('orders', 'production_status')
@@ -0,0 +1,73 @@
+"""market items rating aggregates
+
+Revision ID: f5a2b8d61c04
+Revises: e47f0b9c3a18
+Create Date: 2025-09-10 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a2b8d61c04'
+down_revision: Union[str, Sequence[str], None] = 'e47f0b9c3a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Разовый пересчёт агрегатов по существующим отзывам; дальше их ведёт ReviewRepository
+BACKFILL_SQL = """
+UPDATE market_items AS m
+SET rating_sum = a.rating_sum,
+    rating_count = a.rating_count,
+    rating_histogram = a.rating_histogram,
+    rating = a.rating_sum::float / a.rating_count
+FROM (
+    SELECT o.market_item_id,
+           sum(r.rating) AS rating_sum,
+           count(*) AS rating_count,
+           ARRAY[
+               count(*) FILTER (WHERE r.rating = 1),
+               count(*) FILTER (WHERE r.rating = 2),
+               count(*) FILTER (WHERE r.rating = 3),
+               count(*) FILTER (WHERE r.rating = 4),
+               count(*) FILTER (WHERE r.rating = 5)
+           ]::integer[] AS rating_histogram
+    FROM reviews AS r
+    JOIN orders AS o ON o.id = r.order_id
+    WHERE o.market_item_id IS NOT NULL
+    GROUP BY o.market_item_id
+) AS a
+WHERE m.id = a.market_item_id
+"""
+
+
+def upgrade() -> None:
+    op.add_column('market_items', sa.Column(
+        'rating_sum', sa.Integer(), server_default='0', nullable=False
+    ))
+    op.add_column('market_items', sa.Column(
+        'rating_count', sa.Integer(), server_default='0', nullable=False
+    ))
+    op.add_column('market_items', sa.Column(
+        'rating_histogram', postgresql.ARRAY(sa.Integer()),
+        server_default='{0,0,0,0,0}', nullable=False
+    ))
+    op.execute(BACKFILL_SQL)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_market_item_id "
+            "ON orders (market_item_id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_orders_market_item_id")
+    op.drop_column('market_items', 'rating_histogram')
+    op.drop_column('market_items', 'rating_count')
+    op.drop_column('market_items', 'rating_sum')
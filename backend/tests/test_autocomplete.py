@@ -0,0 +1,60 @@
+from uuid import uuid4
+
+from app.services import autocomplete as ac
+from app.services.autocomplete import AutocompleteIndex
+
+
+def _rows(titles_scores, tags=None):
+    return [(uuid4(), title, {"tags": tags or []}, score) for title, score in titles_scores]
+
+
+def test_matches_any_word_and_ranks_by_popularity():
+    index = AutocompleteIndex.build(_rows([
+        ("Летний баннер", 1.0),
+        ("Баннер для кафе", 5.0),
+        ("Ёлочный стенд", 3.0),
+    ]))
+
+    assert [e.text for e in index.suggest("БАН")] == ["Баннер для кафе", "Летний баннер"]
+    assert [e.text for e in index.suggest("елоч")] == ["Ёлочный стенд"]
+    assert index.suggest("баннер для к")[0].text == "Баннер для кафе"
+    assert index.suggest("нет такого") == []
+    assert index.suggest("  ") == []
+
+
+def test_tags_are_merged_across_items():
+    index = AutocompleteIndex.build(
+        _rows([("Стенд", 2.0), ("Плакат", 4.0)], tags=["Outdoor"])
+    )
+
+    tags = [e for e in index.suggest("out") if e.kind == "tag"]
+    assert [(e.text, e.score) for e in tags] == [("Outdoor", 8.0)]
+
+
+def test_heavy_prefix_top_k_matches_scan(monkeypatch):
+    monkeypatch.setattr(ac, "HEAVY_PREFIX", 5)
+    index = AutocompleteIndex.build(_rows([(f"баннер {i}", float(i % 7)) for i in range(30)]))
+
+    assert "бан" in index.top
+    expected = sorted(index.entries, key=lambda e: -e.score)[:ac.TOP_K]
+    assert [e.score for e in index.suggest("бан")] == [e.score for e in expected]
+
+
+def test_heavy_prefixes_match_prefix_counts(monkeypatch):
+    monkeypatch.setattr(ac, "HEAVY_PREFIX", 3)
+    index = AutocompleteIndex.build(_rows(
+        [(f"стенд {i}", 1.0) for i in range(5)] + [("стол", 1.0), ("баннер", 2.0)]
+    ))
+
+    counts = {}
+    for key in index.keys:
+        for length in range(1, len(key) + 1):
+            counts[key[:length]] = counts.get(key[:length], 0) + 1
+    assert set(index.top) == {prefix for prefix, count in counts.items() if count > 3}
+
+
+def test_long_query_is_truncated_to_key_length():
+    title = "Баннер " + "очень длинное название " * 3
+    index = AutocompleteIndex.build(_rows([(title, 1.0)]))
+
+    assert [e.text for e in index.suggest(title + "и ещё")] == [title]
@@ -0,0 +1,120 @@
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import JSON, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.repositories import base
+from app.repositories.base import BaseRepository
+from app.repositories.order import OrderRepository
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Widget(_Base):
+    """Модель, у которой имена атрибутов и колонок расходятся."""
+    __tablename__ = "widgets"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    sku: Mapped[str] = mapped_column("widget_sku", String(50), unique=True)
+    meta: Mapped[Optional[dict]] = mapped_column("metadata", JSON, nullable=True)
+    status: Mapped[str] = mapped_column(String(20), default="new")
+    created_at: Mapped[datetime] = mapped_column(default=datetime.now)
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.info = {}
+    session.execute = AsyncMock(return_value=MagicMock(rowcount=2))
+    session.scalars = AsyncMock(return_value=MagicMock())
+    return session
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.asyncpg.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_maps_attributes_to_columns(session, monkeypatch):
+    monkeypatch.setattr(base, "BULK_CHUNK_SIZE", 2)
+    rows = [{"id": uuid.uuid4(), "sku": f"s{i}", "meta": {"i": i}} for i in range(3)]
+
+    updated = await BaseRepository(Widget, session).bulk_update(rows)
+
+    assert updated == 4
+    assert session.execute.await_count == 2
+    sql = _sql(session.execute.await_args_list[0].args[0])
+    assert "SET widget_sku=data.widget_sku, metadata=data.metadata" in sql
+    assert "WHERE widgets.id = data.id" in sql
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_returning_uses_single_insert(session):
+    rows = [{"sku": "a"}, {"sku": "b"}]
+
+    await BaseRepository(Widget, session).bulk_create(rows)
+
+    statement, params = session.scalars.await_args.args
+    assert params == rows
+    assert "RETURNING" in _sql(statement)
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_copies_large_batches_with_defaults(session, monkeypatch):
+    monkeypatch.setattr(base, "COPY_THRESHOLD", 2)
+    driver = MagicMock(copy_records_to_table=AsyncMock())
+    connection = MagicMock(get_raw_connection=AsyncMock(return_value=MagicMock(driver_connection=driver)))
+    session.connection = AsyncMock(return_value=connection)
+    rows = [{"sku": "a", "meta": {"k": 1}}, {"sku": "b", "meta": None}]
+
+    assert await BaseRepository(Widget, session).bulk_create(rows, returning=False) == []
+
+    session.execute.assert_not_awaited()
+    table, = driver.copy_records_to_table.await_args.args
+    kwargs = driver.copy_records_to_table.await_args.kwargs
+    assert table == "widgets"
+    assert kwargs["columns"] == ["id", "widget_sku", "metadata", "status", "created_at"]
+    records = kwargs["records"]
+    assert [r[1:4] for r in records] == [("a", json.dumps({"k": 1}), "new"), ("b", None, "new")]
+    assert all(isinstance(r[0], uuid.UUID) and isinstance(r[4], datetime) for r in records)
+
+
+@pytest.mark.asyncio
+async def test_order_bulk_create_without_returning_skips_hydration(session):
+    order_id = uuid.uuid4()
+    rows = [{"id": order_id, "user_id": uuid.uuid4(), "amount": 100, "design_specs": {}}]
+
+    assert await OrderRepository(session).bulk_create(rows, returning=False) == []
+
+    session.scalars.assert_not_awaited()
+    (orders, order_rows), (events, event_rows) = [call.args for call in session.execute.await_args_list]
+    assert "RETURNING" not in _sql(orders) and "RETURNING" not in _sql(events)
+    assert order_rows[0]["status"] == "created"
+    assert [(e["order_id"], e["from_status"], e["to_status"]) for e in event_rows] == [(order_id, None, "created")]
+
+
+@pytest.mark.asyncio
+async def test_upsert_updates_non_conflict_columns(session):
+    await BaseRepository(Widget, session).upsert([{"sku": "a", "meta": {}}], conflict_columns=["sku"])
+
+    sql = _sql(session.scalars.await_args.args[0])
+    assert "ON CONFLICT (widget_sku) DO UPDATE SET metadata = excluded.metadata" in sql
+    assert "RETURNING" in sql
+
+
+@pytest.mark.asyncio
+async def test_update_returning_refreshes_identity_map(session):
+    await BaseRepository(Widget, session).update_returning(Widget.sku == "a", {"status": "done"})
+
+    statement = session.scalars.await_args.args[0]
+    assert statement.get_execution_options()["populate_existing"] is True
+    sql = _sql(statement)
+    assert sql.startswith("UPDATE widgets SET status=") and "RETURNING" in sql
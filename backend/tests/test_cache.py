@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from pydantic import TypeAdapter
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.core.cache import TaggedCache
+from app.core.redis import redis_client
+from app.repositories.marketplace import item_cache_tags, item_card_tags, page_cache_tags
+
+ADAPTER = TypeAdapter(dict)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(redis_client, "_client", fakeredis.FakeAsyncRedis(decode_responses=True))
+    return TaggedCache("test", ttl=60, lock_timeout=0.2)
+
+
+def _loader(calls, value):
+    async def load():
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+    return load
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once_then_hit(cache):
+    calls = []
+    load = _loader(calls, {"v": 1})
+
+    results = await asyncio.gather(*(cache.get_or_load("k", ADAPTER, load, tags=["t"]) for _ in range(5)))
+    assert results == [{"v": 1}] * 5
+    assert await cache.get_or_load("k", ADAPTER, _loader(calls, {"v": 2}), tags=["t"]) == {"v": 1}
+    assert calls == [{"v": 1}]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_only_tagged_entries(cache):
+    calls = []
+    await cache.get_or_load("a", ADAPTER, _loader(calls, {"a": 1}), tags=["item:1", "type:x"])
+    await cache.get_or_load("b", ADAPTER, _loader(calls, {"b": 1}), tags=["type:y"])
+
+    assert await cache.invalidate("type:x") == 1
+
+    assert await cache.get_or_load("a", ADAPTER, _loader(calls, {"a": 2}), tags=["item:1", "type:x"]) == {"a": 2}
+    assert await cache.get_or_load("b", ADAPTER, _loader(calls, {"b": 2}), tags=["type:y"]) == {"b": 1}
+    # Перезагруженная запись снова помечена всеми своими тегами
+    assert await cache.invalidate("item:1") == 1
+    assert await cache.invalidate("item:1") == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_discards_stale_value(cache):
+    async def load():
+        await cache.invalidate("t")
+        return {"v": "stale"}
+
+    assert await cache.get_or_load("k", ADAPTER, load, tags=["t"]) == {"v": "stale"}
+    assert await redis_client.client.get(cache._key("k")) is None
+    assert await redis_client.client.get(cache._version_key("t")) == "1"
+
+
+@pytest.mark.asyncio
+async def test_refresh_overwrites_live_entry(cache):
+    calls = []
+    await cache.get_or_load("k", ADAPTER, _loader(calls, {"v": 1}), tags=["t"])
+
+    assert await cache.refresh("k", ADAPTER, _loader(calls, {"v": 2}), tags=["t"]) == {"v": 2}
+    assert await cache.get_or_load("k", ADAPTER, _loader(calls, {"v": 3})) == {"v": 2}
+    assert calls == [{"v": 1}, {"v": 2}]
+    assert 0 < await redis_client.client.ttl(cache._key("k")) <= 60
+
+
+@pytest.mark.asyncio
+async def test_item_write_keeps_other_item_cards(cache):
+    calls = []
+    await cache.get_or_load("item:1", ADAPTER, _loader(calls, {"i": 1}), tags=item_card_tags(1))
+    await cache.get_or_load("item:2", ADAPTER, _loader(calls, {"i": 2}), tags=item_card_tags(2))
+    await cache.get_or_load("all", ADAPTER, _loader(calls, {"p": 1}), tags=page_cache_tags(None))
+    await cache.get_or_load("banner", ADAPTER, _loader(calls, {"p": 2}), tags=page_cache_tags("banner"))
+
+    # Карточка товара 1 и страницы с ним; карточка товара 2 остаётся в кэше
+    assert await cache.invalidate(*item_cache_tags(1, "banner")) == 3
+    assert await redis_client.client.get(cache._key("item:2")) is not None
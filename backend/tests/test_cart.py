@@ -0,0 +1,129 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.core.order_status import OrderStatus
+from app.core.redis import redis_client
+from app.core.unit_of_work import UnitOfWork
+from app.repositories.cart import MAX_ITEM_QUANTITY, CartRepository
+from app.repositories.marketplace import MarketplaceRepository
+from app.repositories.order import OrderRepository
+from app.services import marketplace
+from app.services.marketplace import MarketplaceService
+from app.services.payment import PaymentService
+
+
+@pytest.fixture
+def cart_repo(monkeypatch):
+    monkeypatch.setattr(redis_client, "_client", fakeredis.FakeAsyncRedis(decode_responses=True))
+    return CartRepository(ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_add_clamps_quantity_and_extends_ttl(cart_repo):
+    user_id, item_id = uuid4(), uuid4()
+
+    assert await cart_repo.add(user_id, item_id, 3) == 3
+    assert await cart_repo.add(user_id, item_id, 100) == MAX_ITEM_QUANTITY
+    assert 0 < await redis_client.client.ttl(cart_repo._key(user_id)) <= 60
+    assert await cart_repo.add(user_id, item_id, -50) == 0
+    assert await cart_repo.get(user_id) == {}
+
+
+@pytest.mark.asyncio
+async def test_discard_keeps_quantities_added_after_snapshot(cart_repo):
+    user_id, kept, bought = uuid4(), uuid4(), uuid4()
+    await cart_repo.add(user_id, kept, 2)
+    await cart_repo.add(user_id, bought, 1)
+    snapshot = await cart_repo.get(user_id)
+
+    await cart_repo.add(user_id, kept, 3)
+
+    assert await cart_repo.discard(user_id, snapshot) == 1
+    assert await cart_repo.get(user_id) == {kept: 3}
+
+
+@pytest.mark.asyncio
+async def test_checkout_creates_payment_before_writing_orders(cart_repo, monkeypatch):
+    monkeypatch.setattr(marketplace, "S3Storage", MagicMock())
+    session = MagicMock(info={}, commit=AsyncMock(), rollback=AsyncMock())
+    uow = UnitOfWork.of(session)
+    user_id, first, second = uuid4(), uuid4(), uuid4()
+    await cart_repo.add(user_id, first, 2)
+    await cart_repo.add(user_id, second, 1)
+
+    async def start_payment(order_ids, amount, description):
+        # Во время HTTP-запроса к ЮKassa заказы ещё не вставлены и строки не заблокированы
+        order_repo.bulk_create.assert_not_awaited()
+        return SimpleNamespace(id="yoo-1")
+
+    payment_service = MagicMock(
+        start_checkout_payment=AsyncMock(side_effect=start_payment),
+        save_checkout_payment=AsyncMock(return_value=(SimpleNamespace(id=uuid4()), "https://pay")),
+    )
+    repo = MagicMock(
+        uow=uow,
+        payment_service=payment_service,
+        get_items_by_ids=AsyncMock(return_value={
+            first: SimpleNamespace(price=100, specs={}),
+            second: SimpleNamespace(price=250, specs=None),
+        }),
+    )
+    order_repo = MagicMock(bulk_create=AsyncMock())
+    service = MarketplaceService(repo, MagicMock(), MagicMock(), order_repo, cart_repo)
+
+    result = await service.checkout(user_id)
+
+    rows = order_repo.bulk_create.await_args.args[0]
+    assert result.order_ids == [row["id"] for row in rows]
+    assert result.amount == 450 and result.payment_url == "https://pay"
+    yoo_payment, order_ids, amount, _ = payment_service.save_checkout_payment.await_args.args
+    assert yoo_payment.id == "yoo-1" and order_ids == result.order_ids and amount == 450
+    assert await cart_repo.get(user_id) == {}
+
+
+@pytest.mark.asyncio
+async def test_successful_payment_pays_all_orders_and_refunds_cancelled(monkeypatch):
+    payment = SimpleNamespace(id=uuid4())
+    repository = MagicMock(
+        session=MagicMock(),
+        mark_succeeded=AsyncMock(side_effect=[payment, None]),
+        get_orders_amount=AsyncMock(return_value=250),
+    )
+    mark_paid = AsyncMock(return_value=[uuid4(), uuid4()])
+    monkeypatch.setattr(OrderRepository, "mark_paid", mark_paid)
+    service = PaymentService(repository)
+    service.refund_payment = AsyncMock()
+
+    await service._process_successful_payment("yoo-1")
+    await service._process_successful_payment("yoo-1")
+
+    mark_paid.assert_awaited_once_with(payment.id)
+    repository.get_orders_amount.assert_awaited_once_with(payment.id, OrderStatus.CANCELLED)
+    service.refund_payment.assert_awaited_once_with(
+        payment.id, 250, idempotency_key=f"refund-cancelled:{payment.id}"
+    )
+
+
+@pytest.mark.asyncio
+async def test_cancel_unpaid_order_sends_only_cancellation(monkeypatch):
+    update = AsyncMock()
+    monkeypatch.setattr(OrderRepository, "update", update)
+    user_id = uuid4()
+    order = SimpleNamespace(id=uuid4(), user_id=user_id, status=OrderStatus.CREATED)
+    session = MagicMock(info={}, commit=AsyncMock(), rollback=AsyncMock(), flush=AsyncMock(),
+                        get=AsyncMock(return_value=order))
+    notifications = MagicMock(send=AsyncMock(), send_many=AsyncMock())
+    repo = MarketplaceRepository(session, MagicMock(), notifications)
+
+    await repo.cancel_order(order.id, user_id)
+
+    # Переход идёт через OrderRepository.update — с записью в историю статусов
+    update.assert_awaited_once_with(order.id, {"status": OrderStatus.CANCELLED})
+    notifications.send.assert_awaited_once()
+    assert notifications.send.await_args.kwargs["title"] == "Order canceled"
+    notifications.send_many.assert_not_awaited()
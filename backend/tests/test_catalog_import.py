@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.marketplace import MAX_PRODUCT_TYPE_LENGTH, CartItemAdd, MarketItemImport
+from app.services import catalog_import
+from app.services.catalog_import import iter_records
+
+
+async def _chunks(data: bytes, size: int = 5):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _records(data: bytes, fmt: str):
+    async def collect():
+        return [record async for record in iter_records(_chunks(data), fmt)]
+    return asyncio.run(collect())
+
+
+def test_ndjson_rows_and_errors():
+    data = '{"title": "Баннер"}\n\n[1]\n{oops\r\n{"title": "b"}'.encode()
+
+    records = _records(data, "ndjson")
+
+    assert records[0] == (1, {"title": "Баннер"}, None)
+    assert records[1][:2] == (3, None) and "object" in records[1][2]
+    assert records[2][:2] == (4, None) and records[2][2].startswith("Invalid JSON")
+    assert records[3] == (5, {"title": "b"}, None)
+
+
+def test_csv_quoted_newlines_and_column_mismatch():
+    data = (
+        '﻿title,price,specs\r\n'
+        '"Two\nlines",100,"{""size"": ""3x6""}"\r\n'
+        'short,1\n'
+        'empty,,\n'
+    ).encode()
+
+    records = _records(data, "csv")
+
+    assert records[0] == (1, {"title": "Two\nlines", "price": "100", "specs": '{"size": "3x6"}'}, None)
+    assert records[1] == (2, None, "Expected 3 columns, got 2")
+    assert records[2] == (3, {"title": "empty"}, None)
+
+
+def test_line_length_is_bounded(monkeypatch):
+    monkeypatch.setattr(catalog_import, "MAX_LINE_LENGTH", 10)
+
+    with pytest.raises(ValueError):
+        _records(b'{"title": "' + b"x" * 50, "ndjson")
+
+
+def test_long_product_type_is_rejected():
+    row = {"title": "Баннер", "item_type": "banner", "price": 100, "preview_url": "https://x"}
+    too_long = {"product_type": "b" * (MAX_PRODUCT_TYPE_LENGTH + 1)}
+
+    assert MarketItemImport(**row, specs={"product_type": "banner"}).specs == {"product_type": "banner"}
+    with pytest.raises(ValidationError):
+        MarketItemImport(**row, specs=too_long)
+    with pytest.raises(ValidationError):
+        CartItemAdd(item_id="a1b2c3d4-5678-9012-3456-789012345678", specs=too_long)
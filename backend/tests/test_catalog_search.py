@@ -0,0 +1,88 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.marketplace import SEARCH_CONFIGS
+from app.repositories import catalog_search
+from app.repositories.catalog_search import search_condition, search_rank
+from app.repositories.marketplace import MarketplaceRepository
+
+
+def _compile(element):
+    return element.compile(dialect=postgresql.asyncpg.dialect())
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.info = {}
+    session.execute = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+    return session
+
+
+def test_condition_matches_every_config_or_title_trigram():
+    compiled = _compile(search_condition("банер"))
+    sql = str(compiled)
+
+    assert "market_items.search_vector @@" in sql
+    assert sql.count("websearch_to_tsquery") == len(SEARCH_CONFIGS)
+    # Опечатка не совпадает лексемой — её ловит триграммный оператор по названию
+    assert " OR (market_items.title % " in sql
+    params = list(compiled.params.values())
+    assert all(config in params for config in SEARCH_CONFIGS)
+    assert params.count("банер") == len(SEARCH_CONFIGS) + 1
+
+
+def test_rank_blends_text_trigram_and_rating():
+    compiled = _compile(search_rank("баннер"))
+    sql = str(compiled)
+
+    assert sql.index("ts_rank(market_items.search_vector") < sql.index("similarity(market_items.title")
+    assert "market_items.rating /" in sql
+    params = compiled.params.values()
+    for weight in (
+        catalog_search.TEXT_RANK_WEIGHT,
+        catalog_search.TRIGRAM_RANK_WEIGHT,
+        catalog_search.RATING_RANK_WEIGHT,
+    ):
+        assert weight in params
+    assert sum((
+        catalog_search.TEXT_RANK_WEIGHT,
+        catalog_search.TRIGRAM_RANK_WEIGHT,
+        catalog_search.RATING_RANK_WEIGHT,
+    )) == pytest.approx(1)
+
+
+@pytest.mark.asyncio
+async def test_list_items_orders_search_results_by_rank(session):
+    repo = MarketplaceRepository(session, MagicMock(), MagicMock())
+
+    assert await repo.list_items(item_type="banner", search="баннер") == []
+
+    sql = str(_compile(session.execute.await_args.args[0]))
+    where, order_by = sql.split("ORDER BY")
+    assert "market_items.item_type = " in where
+    assert "market_items.title % " in where
+    assert order_by.strip().startswith("ts_rank(")
+    assert order_by.strip().endswith("DESC")
+
+
+@pytest.mark.asyncio
+async def test_list_items_without_search_is_not_ranked(session):
+    repo = MarketplaceRepository(session, MagicMock(), MagicMock())
+
+    await repo.list_items(item_type="banner")
+
+    sql = str(_compile(session.execute.await_args.args[0]))
+    assert "ts_rank" not in sql
+    assert "similarity" not in sql
+
+
+def test_relevance_sort_requires_search():
+    with pytest.raises(ValueError):
+        MarketplaceRepository._sort_key("relevance", None)
+
+    key, ascending = MarketplaceRepository._sort_key("relevance", "баннер")
+    assert "ts_rank" in str(_compile(key))
+    assert ascending is False
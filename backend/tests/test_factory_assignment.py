@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.order_status import OrderStatus
+from app.core.unit_of_work import UnitOfWork
+from app.services import order as order_module
+from app.services.factory_assignment import FactoryAssignmentEngine, FactoryLoadIndex, specializations
+from app.services.order import OrderService
+
+
+def _index(*factories):
+    index = FactoryLoadIndex()
+    index.rebuild(factories)
+    return index
+
+
+def test_specializations_are_tokenized():
+    assert specializations("Banner, standee/ billboard") == ["banner", "standee", "billboard"]
+    assert specializations(None) == []
+
+
+def test_candidates_ordered_by_load_ratio_then_rating():
+    idle, busy, idle_better = uuid4(), uuid4(), uuid4()
+    index = _index(
+        (idle, "banner", 0, 10, 4.0, 1),
+        (busy, "banner, standee", 5, 10, 5.0, 3),
+        (idle_better, "banner", 0, 4, 4.8, 1),
+    )
+
+    assert index.candidates("Banner") == [idle_better, idle, busy]
+    assert index.candidates("standee") == [busy]
+    assert index.candidates("digital") == []
+
+
+def test_set_load_reorders_and_full_factories_drop_out():
+    first, second = uuid4(), uuid4()
+    index = _index((first, "banner", 0, 2, 5.0, 1), (second, "banner", 1, 4, 1.0, 1))
+
+    index.set_load(first, 1)
+    assert index.candidates("banner") == [second, first]
+
+    index.set_load(first, 2)
+    assert index.candidates("banner") == [second]
+
+    index.mark_full(second)
+    assert index.candidates("banner") == []
+
+    index.set_load(first, 0)
+    assert index.candidates("banner", limit=1) == [first]
+
+
+class _FactoryRepo:
+    """Мощность фабрик в памяти вместо UPDATE ... RETURNING."""
+
+    def __init__(self, session, rows):
+        self.uow = UnitOfWork.of(session)
+        self.rows = rows
+        self.loads = {row[0]: row[2] for row in rows}
+        self.capacity = {row[0]: row[3] for row in rows}
+
+    async def load_snapshot(self):
+        return [(factory_id, spec, self.loads[factory_id], *rest) for factory_id, spec, _, *rest in self.rows]
+
+    async def reserve_capacity(self, factory_id):
+        if self.loads[factory_id] >= self.capacity[factory_id]:
+            return None
+        self.loads[factory_id] += 1
+        return self.loads[factory_id]
+
+    async def release_capacity(self, factory_id, count=1):
+        if not self.loads[factory_id]:
+            return None
+        self.loads[factory_id] = max(self.loads[factory_id] - count, 0)
+        return self.loads[factory_id]
+
+
+@pytest.mark.asyncio
+async def test_cancelling_production_order_restores_capacity(monkeypatch):
+    session = MagicMock(info={}, commit=AsyncMock(), rollback=AsyncMock())
+    factory_id = uuid4()
+    repo = _FactoryRepo(session, [(factory_id, "banner", 0, 1, 5.0, 1, None, None, None)])
+    engine = FactoryAssignmentEngine()
+    monkeypatch.setattr(order_module, "assignment_engine", engine)
+    monkeypatch.setattr(order_module, "FactoryRepository", lambda _: repo)
+
+    assert await engine.reserve(repo, "banner") == factory_id
+    assert await engine.reserve(repo, "banner") is None
+
+    order = SimpleNamespace(
+        id=uuid4(), user_id=uuid4(), status=OrderStatus.PRODUCTION, factory_id=factory_id,
+        production_status="in_progress", amount=1000, payment=SimpleNamespace(id=uuid4())
+    )
+    order_repo = MagicMock(get=AsyncMock(return_value=order), update=AsyncMock(return_value=order))
+    payment_service = MagicMock(refund_payment=AsyncMock())
+    service = OrderService(session, MagicMock(), order_repo, payment_service)
+
+    await service.cancel_order(order.id, order.user_id)
+
+    assert repo.loads[factory_id] == 0
+    assert engine.index.candidates("banner") == [factory_id]
+    payment_service.refund_payment.assert_awaited_once_with(
+        order.payment.id, 1000, idempotency_key=f"refund-order:{order.id}"
+    )
+    assert order_repo.update.await_args.args[1]["status"] == OrderStatus.CANCELLED
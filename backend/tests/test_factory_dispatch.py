@@ -0,0 +1,195 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.factory_client import BatchNotSupportedError, FactoryAPIError
+from app.core.retry import RetryManager
+from app.core.unit_of_work import UnitOfWork
+from app.services import production
+from app.services.factory_dispatch import FactoryDispatchQueue, FactoryEndpoint
+from app.services.factory_health import HALF_OPEN, CircuitOpenError, FactoryHealthRegistry
+from app.services.production import ProductionService
+
+
+class FakeClient:
+    def __init__(self, batch=True):
+        self.batch = batch
+        self.calls = []
+
+    async def post_batch(self, api_url, api_key, payloads, idempotency_key=None):
+        self.calls.append(("batch", len(payloads)))
+        if not self.batch:
+            raise BatchNotSupportedError(api_url)
+        return [{"accepted": p["order_id"]} for p in payloads]
+
+    async def post_order(self, api_url, api_key, payload):
+        self.calls.append(("single", 1))
+        return {"accepted": payload["order_id"]}
+
+    async def close(self):
+        pass
+
+
+class FlakyClient(FakeClient):
+    """Отвечает ошибками из errors, затем принимает пачку."""
+
+    def __init__(self, *errors):
+        super().__init__()
+        self.errors = list(errors)
+        self.keys = []
+
+    async def post_batch(self, api_url, api_key, payloads, idempotency_key=None):
+        self.keys.append(idempotency_key)
+        if self.errors:
+            raise self.errors.pop(0)
+        return await super().post_batch(api_url, api_key, payloads)
+
+
+def _queue(client, **kwargs):
+    kwargs.setdefault("health", FactoryHealthRegistry(failure_threshold=3, cooldown=10))
+    return FactoryDispatchQueue(client, retry=RetryManager(max_retries=1, delay=0), **kwargs)
+
+
+def test_orders_are_grouped_by_batch_size_and_delay():
+    async def scenario():
+        client = FakeClient()
+        queue = _queue(client, batch_size=3, max_delay=0.01)
+        factory = FactoryEndpoint(uuid4(), "http://factory")
+
+        futures = [queue.submit(factory, {"order_id": str(i)}) for i in range(4)]
+        results = await asyncio.gather(*futures)
+        return client.calls, results
+
+    calls, results = asyncio.run(scenario())
+
+    assert calls == [("batch", 3), ("single", 1)]
+    assert [r["accepted"] for r in results] == ["0", "1", "2", "3"]
+
+
+def test_falls_back_to_single_orders_without_batch_endpoint():
+    async def scenario():
+        client = FakeClient(batch=False)
+        queue = _queue(client, batch_size=2, max_delay=0.01)
+        factory = FactoryEndpoint(uuid4(), "http://factory")
+
+        first = [queue.submit(factory, {"order_id": str(i)}) for i in range(2)]
+        await asyncio.gather(*first)
+        second = [queue.submit(factory, {"order_id": str(i)}) for i in range(2, 4)]
+        await asyncio.gather(*second)
+        return client.calls
+
+    # Пакетный эндпоинт пробуется один раз, дальше — только по одному заказу
+    assert asyncio.run(scenario()) == [("batch", 2)] + [("single", 1)] * 4
+
+
+def test_factory_without_api_is_rejected():
+    async def scenario():
+        _queue(FakeClient()).submit(FactoryEndpoint(uuid4(), ""), {"order_id": "1"})
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
+
+
+def test_server_errors_are_retried_with_the_same_idempotency_key():
+    async def scenario():
+        client = FlakyClient(FactoryAPIError("unavailable", 503))
+        queue = _queue(client, batch_size=2, max_delay=0.01)
+        factory = FactoryEndpoint(uuid4(), "http://factory")
+        await asyncio.gather(*(queue.submit(factory, {"order_id": str(i)}) for i in range(2)))
+        return client.keys
+
+    keys = asyncio.run(scenario())
+    assert len(keys) == 2 and keys[0] is not None and keys[0] == keys[1]
+
+
+def test_client_errors_are_not_retried_nor_counted_as_failures():
+    async def scenario():
+        client = FlakyClient(FactoryAPIError("bad request", 422))
+        queue = _queue(client, batch_size=2, max_delay=0.01)
+        factory = FactoryEndpoint(uuid4(), "http://factory")
+        futures = [queue.submit(factory, {"order_id": str(i)}) for i in range(2)]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return client.keys, results, queue.health.get(factory.id)
+
+    keys, results, health = asyncio.run(scenario())
+    assert len(keys) == 1
+    assert all(isinstance(r, FactoryAPIError) for r in results)
+    assert health.consecutive_failures == 0 and health.error_rate == 0
+
+
+def test_cancelled_probe_releases_half_open_circuit():
+    async def scenario():
+        health = FactoryHealthRegistry(failure_threshold=1, cooldown=0)
+        factory = FactoryEndpoint(uuid4(), "http://factory")
+        health.record_failure(factory.id, 0.1, now=0)
+        started = asyncio.Event()
+
+        class HangingClient(FakeClient):
+            async def post_order(self, api_url, api_key, payload):
+                started.set()
+                await asyncio.sleep(10)
+
+        queue = _queue(HangingClient(), health=health, batch_size=1, max_delay=0)
+        future = queue.submit(factory, {"order_id": "1"})
+        await started.wait()
+        assert health.get(factory.id).state == HALF_OPEN
+        for task in list(queue._tasks):
+            task.cancel()
+        await asyncio.gather(*queue._tasks, return_exceptions=True)
+        future.cancel()
+        # Пробный вызов снят: следующий запрос снова может стать пробным
+        return health.allow_request(factory.id)
+
+    assert asyncio.run(scenario())
+
+
+def test_undelivered_orders_are_handed_to_on_failure():
+    async def scenario():
+        health = FactoryHealthRegistry(failure_threshold=1, cooldown=10)
+        factory = FactoryEndpoint(uuid4(), "http://factory")
+        health.record_failure(factory.id, 0.1)
+        failed = []
+
+        async def on_failure(order_ids):
+            failed.extend(order_ids)
+
+        queue = _queue(FakeClient(), health=health, batch_size=2, max_delay=0.01, on_failure=on_failure)
+        order_ids = [uuid4(), uuid4()]
+        futures = [queue.submit(factory, {"order_id": str(order_id)}) for order_id in order_ids]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        await queue.close()
+        return order_ids, failed, results, queue.client.calls
+
+    order_ids, failed, results, calls = asyncio.run(scenario())
+    # Цепь разомкнута: на фабрику ничего не ушло, заказы сохранены для повторной отправки
+    assert calls == []
+    assert all(isinstance(r, CircuitOpenError) for r in results)
+    assert failed == order_ids
+
+
+@pytest.mark.asyncio
+async def test_failed_dispatches_are_resubmitted_after_commit(monkeypatch):
+    session = MagicMock(info={}, commit=AsyncMock(), rollback=AsyncMock())
+    with_api = SimpleNamespace(id=uuid4(), api_url="http://factory", api_key=None)
+    without_api = SimpleNamespace(id=uuid4(), api_url=None, api_key=None)
+    orders = [
+        SimpleNamespace(id=uuid4(), factory_id=factory.id, design_specs={}, production_deadline=None)
+        for factory in (with_api, without_api)
+    ]
+    factories = {f.id: f for f in (with_api, without_api)}
+    order_repo = MagicMock(claim_failed_dispatches=AsyncMock(return_value=orders))
+    factory_repo = MagicMock(get=AsyncMock(side_effect=factories.get))
+    queue = MagicMock()
+    monkeypatch.setattr(production, "dispatch_queue", queue)
+
+    async with UnitOfWork.of(session):
+        service = ProductionService(session, order_repo, factory_repo)
+        assert await service.redeliver_failed_dispatches() == 1
+        queue.submit.assert_not_called()
+
+    endpoint, payload = queue.submit.call_args.args
+    assert endpoint == FactoryEndpoint.of(with_api)
+    assert payload["order_id"] == str(orders[0].id)
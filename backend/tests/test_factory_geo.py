@@ -0,0 +1,46 @@
+from uuid import uuid4
+
+from app.core.geo import CITIES, distance_km, geocode
+from app.services.factory_geo import FactoryGeoIndex
+
+
+def test_geocode_finds_city_in_free_text():
+    assert geocode("г. Нижний Новгород, ул. Рождественская 1") == CITIES["нижний новгород"]
+    assert geocode("Ростов-на-Дону") == CITIES["ростов-на-дону"]
+    assert geocode("Saint Petersburg, Nevsky 1") == CITIES["санкт-петербург"]
+    assert geocode("Орёл") == CITIES["орел"]
+    assert geocode("ул. Ленина 5") is None
+    assert geocode(None) is None
+
+
+def test_distance_between_moscow_and_saint_petersburg():
+    assert 620 < distance_km(CITIES["москва"], CITIES["санкт-петербург"]) < 650
+
+
+def test_nearest_skips_full_factories_and_other_specializations():
+    moscow, tver, kazan, tula = uuid4(), uuid4(), uuid4(), uuid4()
+    index = FactoryGeoIndex()
+    index.update({
+        moscow: (["banner"], CITIES["москва"]),
+        tver: (["banner"], CITIES["тверь"]),
+        kazan: (["banner"], CITIES["казань"]),
+        tula: (["standee"], CITIES["тула"]),
+    })
+
+    nearest = index.nearest("banner", CITIES["санкт-петербург"], 2, lambda f: f != tver)
+
+    assert [factory_id for factory_id, _ in nearest] == [moscow, kazan]
+    assert 620 < nearest[0][1] < 650
+
+
+def test_update_rebuilds_only_changed_specializations():
+    banner, standee = uuid4(), uuid4()
+    index = FactoryGeoIndex()
+    index.update({banner: (["banner"], CITIES["москва"]), standee: (["standee"], CITIES["тула"])})
+    index.nearest("banner", CITIES["москва"], 1)
+    index.nearest("standee", CITIES["москва"], 1)
+
+    dirty = index.update({banner: (["banner"], CITIES["москва"]), standee: (["standee"], CITIES["казань"])})
+
+    assert dirty == {"standee"}
+    assert index.nearest("standee", CITIES["казань"], 1)[0][1] < 1
@@ -0,0 +1,54 @@
+from uuid import uuid4
+
+from app.services.factory_assignment import FactoryLoadIndex
+from app.services.factory_health import CLOSED, HALF_OPEN, OPEN, FactoryHealthRegistry
+
+
+def test_circuit_opens_after_repeated_failures_and_probes_after_cooldown():
+    registry = FactoryHealthRegistry(failure_threshold=3, cooldown=10)
+    factory_id = uuid4()
+
+    for _ in range(3):
+        assert registry.allow_request(factory_id, now=0)
+        registry.record_failure(factory_id, 0.1, now=0)
+
+    assert registry.get(factory_id).state == OPEN
+    assert not registry.allow_request(factory_id, now=5)
+
+    # После cooldown пропускается ровно один пробный вызов
+    assert registry.allow_request(factory_id, now=10)
+    assert registry.get(factory_id).state == HALF_OPEN
+    assert not registry.allow_request(factory_id, now=10)
+
+    registry.record_success(factory_id, 0.1)
+    assert registry.get(factory_id).state == CLOSED
+    assert registry.get(factory_id).last_success is not None
+
+
+def test_failed_probe_reopens_circuit():
+    registry = FactoryHealthRegistry(failure_threshold=1, cooldown=10)
+    factory_id = uuid4()
+
+    registry.record_failure(factory_id, 0.1, now=0)
+    assert registry.allow_request(factory_id, now=10)
+    registry.record_failure(factory_id, 0.1, now=10)
+
+    assert registry.get(factory_id).state == OPEN
+    assert not registry.allow_request(factory_id, now=15)
+
+
+def test_unhealthy_factory_ranks_after_healthy_one():
+    registry = FactoryHealthRegistry(failure_threshold=5, cooldown=10)
+    healthy, flaky = uuid4(), uuid4()
+    registry.record_success(healthy, 0.2)
+    for _ in range(2):
+        registry.record_failure(flaky, 0.2)
+
+    index = FactoryLoadIndex(penalty=registry.penalty)
+    # flaky загружена меньше, но штраф за ошибки перевешивает
+    index.rebuild([
+        (healthy, "banner", 5, 10, 4.0, 1),
+        (flaky, "banner", 3, 10, 4.0, 1),
+    ])
+
+    assert index.candidates("banner") == [healthy, flaky]
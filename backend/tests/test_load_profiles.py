@@ -0,0 +1,48 @@
+import re
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects import postgresql
+
+from app.models.order import Order, OrderStatus
+from app.repositories.load_profiles import ORDER_LIST
+from app.schemas.order import OrderResponse
+
+SAMPLE = {
+    "id": uuid4(),
+    "user_id": uuid4(),
+    "status": OrderStatus.PAID,
+    "amount": 150000,
+    "design_specs": {"product_type": "banner"},
+    "created_at": datetime(2025, 9, 1),
+    "delivery_city": "Казань",
+}
+
+
+class _LoadedOrder:
+    """Заказ, загруженный с профилем: обращение к незагруженной колонке — ошибка (как MissingGreenlet)."""
+
+    def __init__(self, loaded):
+        self._loaded = loaded
+
+    def __getattr__(self, name):
+        if name in self._loaded:
+            return SAMPLE.get(name)
+        if name in inspect(Order).attrs:
+            raise AssertionError(f"Order.{name} is not loaded by ORDER_LIST")
+        raise AttributeError(name)
+
+
+def test_order_list_profile_serialises_order_response():
+    sql = str(select(Order).options(*ORDER_LIST).compile(dialect=postgresql.dialect()))
+    select_clause = sql.split(" FROM ")[0]
+    loaded = {
+        column.key for column in inspect(Order).columns
+        if re.search(rf"\borders\.{column.name}\b", select_clause)
+    }
+
+    response = OrderResponse.model_validate(_LoadedOrder(loaded))
+
+    assert response.delivery_city == "Казань"
+    assert "design_specs" in loaded and "payment_id" not in loaded
@@ -0,0 +1,127 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.notification_bus import NotificationHub, user_channel
+from app.core.unit_of_work import UnitOfWork
+from app.repositories import base
+from app.repositories.notification import NotificationRepository
+from app.schemas.notifications import NotificationBase
+from app.services import notifications
+from app.services.notifications import NotificationService, announce
+
+
+def test_hub_fans_out_and_drops_oldest_for_slow_clients():
+    hub = NotificationHub(queue_size=2)
+    channel = user_channel(uuid4())
+    first, fast = hub._attach(channel)
+    second, slow = hub._attach(channel)
+    assert first and not second
+
+    hub._deliver(channel, "1")
+    assert fast.get_nowait() == "1"
+    hub._deliver(channel, "2")
+    hub._deliver(channel, "3")
+    hub._deliver(user_channel(uuid4()), "other")
+
+    assert [slow.get_nowait() for _ in range(slow.qsize())] == ["2", "3"]
+    assert not hub._detach(channel, fast)
+    assert hub._detach(channel, slow)
+    assert not hub._detach(channel, slow)
+
+
+@pytest.fixture
+def session():
+    session = MagicMock(info={}, commit=AsyncMock(), rollback=AsyncMock())
+    session.execute = AsyncMock()
+    driver = MagicMock(copy_records_to_table=AsyncMock())
+    connection = MagicMock(get_raw_connection=AsyncMock(return_value=MagicMock(driver_connection=driver)))
+    session.connection = AsyncMock(return_value=connection)
+    session.copy = driver.copy_records_to_table
+    return session
+
+
+def _notifications(count):
+    return [NotificationBase(user_id=uuid4(), title="Привет", message="Текст") for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_send_many_inserts_once_and_publishes_after_commit(session, monkeypatch):
+    publish = AsyncMock()
+    monkeypatch.setattr(notifications, "publish_many", publish)
+    batch = _notifications(3)
+
+    async with UnitOfWork.of(session):
+        sent = await NotificationService(NotificationRepository(session)).send_many(batch)
+        publish.assert_not_awaited()
+
+    assert sent == 3
+    session.copy.assert_not_awaited()
+    statement, rows = session.execute.await_args.args
+    assert "RETURNING" not in str(statement)
+    assert [row["user_id"] for row in rows] == [n.user_id for n in batch]
+    assert all(row["id"] and row["created_at"] for row in rows)
+
+    published = list(publish.await_args.args[0])
+    assert [user_id for user_id, _ in published] == [n.user_id for n in batch]
+    assert [json.loads(message)["id"] for _, message in published] == [str(row["id"]) for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_send_many_copies_large_batches(session, monkeypatch):
+    monkeypatch.setattr(base, "COPY_THRESHOLD", 3)
+    monkeypatch.setattr(notifications, "publish_many", AsyncMock())
+
+    async with UnitOfWork.of(session):
+        assert await NotificationService(NotificationRepository(session)).send_many(_notifications(3)) == 3
+
+    session.execute.assert_not_awaited()
+    table, = session.copy.await_args.args
+    assert table == "notifications"
+    assert len(session.copy.await_args.kwargs["records"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_send_many_rollback_publishes_nothing(session, monkeypatch):
+    publish = AsyncMock()
+    monkeypatch.setattr(notifications, "publish_many", publish)
+
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork.of(session):
+            await NotificationService(NotificationRepository(session)).send_many(_notifications(2))
+            raise RuntimeError("boom")
+
+    publish.assert_not_awaited()
+    session.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_announce_pages_recipients_by_keyset(monkeypatch):
+    users = sorted(uuid4() for _ in range(5))
+    calls, sent = [], []
+
+    async def get_ids_after(self, after, limit, role=None):
+        calls.append((after, limit, role))
+        tail = [u for u in users if after is None or u > after]
+        return tail[:limit]
+
+    async def send_many(self, batch):
+        sent.append([n.user_id for n in batch])
+        return len(batch)
+
+    def session_factory():
+        session = MagicMock(info={}, commit=AsyncMock(), rollback=AsyncMock())
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        return session
+
+    monkeypatch.setattr(notifications, "async_session", session_factory)
+    monkeypatch.setattr(notifications.UserRepository, "get_ids_after", get_ids_after)
+    monkeypatch.setattr(NotificationService, "send_many", send_many)
+
+    assert await announce("Привет", "Текст", role="designer", chunk_size=2) == 5
+
+    assert calls == [(None, 2, "designer"), (users[1], 2, "designer"), (users[3], 2, "designer")]
+    assert sent == [users[:2], users[2:4], users[4:]]
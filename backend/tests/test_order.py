@@ -1,4 +1,13 @@
-from app.schemas.order import OrderCreate, OrderResponse
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from app.core.unit_of_work import UnitOfWork
+from app.models.order import Order
+from app.schemas.order import OrderCreate, OrderResponse, OrderUpdate
+from app.services import order as order_module
+from app.services.order import OrderService
 from pydantic import ValidationError
 import pytest
 
@@ -11,4 +20,35 @@ def test_order_links():
     )
     
     assert "/orders/a1b2c3d4-5678-9012-3456-789012345678" in order.links["self"]["href"]
-    assert "pay" in order.links  # Verify action link exists for "created" status
\ No newline at end of file
+    assert "pay" in order.links  # Verify action link exists for "created" status
+
+@pytest.mark.asyncio
+async def test_deadline_update_is_tracked_after_commit(monkeypatch):
+    session = MagicMock(info={}, commit=AsyncMock(), rollback=AsyncMock())
+    UnitOfWork.of(session)
+    order = SimpleNamespace(id=uuid4(), user_id=uuid4(), status="production", sla_state="at_risk")
+    order_repo = MagicMock(get=AsyncMock(return_value=order))
+    tracked = []
+    monkeypatch.setattr(order_module.sla_monitor, "track", lambda order_id, deadline: tracked.append((order_id, deadline)))
+    deadline = datetime.now() + timedelta(days=3)
+
+    service = OrderService(session, MagicMock(), order_repo, MagicMock())
+    await service.update_order(order.id, OrderUpdate(production_deadline=deadline), order.user_id)
+
+    assert order.production_deadline == deadline and order.sla_state is None
+    assert tracked == [(order.id, deadline)]
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_complete_order_updates_only_existing_columns():
+    session = MagicMock(info={}, commit=AsyncMock(), rollback=AsyncMock())
+    order = SimpleNamespace(id=uuid4(), user_id=uuid4(), status="shipped")
+    order_repo = MagicMock(get=AsyncMock(return_value=order), update=AsyncMock(return_value=order))
+
+    service = OrderService(session, MagicMock(), order_repo, MagicMock())
+    await service.complete_order(order.id, order.user_id)
+
+    values = order_repo.update.await_args.args[1]
+    assert values == {"status": "completed"}
+    assert values.keys() <= set(Order.__table__.columns.keys())
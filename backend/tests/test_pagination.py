@@ -0,0 +1,27 @@
+from datetime import datetime
+from uuid import UUID
+
+import pytest
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor, split_page
+
+
+def test_cursor_roundtrip():
+    created_at = datetime(2025, 1, 1, 12, 30, 15, 123456)
+    order_id = UUID("a1b2c3d4-5678-9012-3456-789012345678")
+
+    cursor = encode_cursor(created_at, order_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, (datetime, UUID)) == [created_at, order_id]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(1), encode_cursor("x", "y")])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, (datetime, UUID))
+
+
+def test_split_page():
+    assert split_page([1, 2, 3], 2) == ([1, 2], True)
+    assert split_page([1, 2], 2) == ([1, 2], False)
@@ -0,0 +1,97 @@
+import math
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.popularity import EPOCH, PopularityTracker, decay_rate, decayed_score, event_log_score
+from app.core.redis import redis_client
+from app.schemas.marketplace import MarketFilters
+from app.services import marketplace
+from app.services.marketplace import MarketplaceService
+
+DAY = 24 * 3600
+
+
+def log_add(a: float, b: float) -> float:
+    """То же, что Lua-скрипт PopularityTracker: log(e^a + e^b)."""
+    hi, lo = max(a, b), min(a, b)
+    return hi + math.log1p(math.exp(lo - hi))
+
+
+def test_score_halves_after_half_life():
+    rate = decay_rate(7 * DAY)
+    at = EPOCH + 100 * DAY
+
+    score = event_log_score(10.0, at, rate)
+
+    assert decayed_score(score, at, rate) == pytest.approx(10.0)
+    assert decayed_score(score, at + 7 * DAY, rate) == pytest.approx(5.0)
+
+
+def test_accumulated_log_score_equals_decayed_sum():
+    rate = decay_rate(DAY)
+    events = [(1.0, EPOCH + 3000 * DAY), (3.0, EPOCH + 3000.5 * DAY), (10.0, EPOCH + 3001 * DAY)]
+    now = EPOCH + 3002 * DAY
+
+    score = event_log_score(*events[0], rate)
+    for weight, at in events[1:]:
+        score = log_add(score, event_log_score(weight, at, rate))
+
+    expected = sum(w * math.exp(-rate * (now - at)) for w, at in events)
+    assert decayed_score(score, now, rate) == pytest.approx(expected)
+
+
+def test_recent_activity_outranks_old():
+    rate = decay_rate(7 * DAY)
+    old = event_log_score(10.0, EPOCH + 30 * DAY, rate)
+    recent = event_log_score(1.0, EPOCH + 60 * DAY, rate)
+
+    assert recent > old
+
+
+@pytest.mark.asyncio
+async def test_popular_catalog_continues_with_db_snapshot(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    monkeypatch.setattr(redis_client, "_client", fakeredis.FakeAsyncRedis(decode_responses=True))
+    tracker = PopularityTracker(half_life=DAY)
+    monkeypatch.setattr(marketplace, "popularity_tracker", tracker)
+    monkeypatch.setattr(marketplace, "S3Storage", MagicMock())
+    hot, cold = [uuid4(), uuid4()], [uuid4(), uuid4(), uuid4()]
+    for count, item_id in enumerate(hot, 1):
+        await tracker.bump(item_id, "view", count)
+    # Активность после снимка: товар ещё с popularity = 0, но уже в рейтинге
+    await tracker.bump(cold[0], "view", 1)
+
+    async def unranked(limit, after=None):
+        tail = sorted([hot[0], *cold], key=str)
+        if after:
+            tail = [item_id for item_id in tail if str(item_id) > str(after)]
+        return tail[:limit]
+
+    repo = MagicMock(
+        get_unranked_ids=AsyncMock(side_effect=unranked),
+        get_cards=AsyncMock(return_value=[]),
+        item_facets=AsyncMock(return_value=None),
+        browse_items=AsyncMock(return_value=([], None)),
+    )
+    service = MarketplaceService(repo, MagicMock(), MagicMock(), MagicMock(), MagicMock())
+    ranked = await tracker.top(limit=10)
+    assert set(ranked) == {*hot, cold[0]}
+
+    seen, cursor = [], None
+    while True:
+        page = await service._load_items(MarketFilters(sort="popularity", limit=2, cursor=cursor))
+        seen += repo.get_cards.await_args.args[0]
+        cursor = page.next_cursor
+        if not cursor:
+            break
+
+    tail = sorted(cold[1:], key=str)
+    assert seen == ranked + tail
+    # Хвост читается keyset-методом, без списка исключений
+    assert all(call.args[0] <= 3 for call in repo.get_unranked_ids.await_args_list)
+
+    # Фильтр min_price=0 задан — сортировка по снимку в БД
+    await service._load_items(MarketFilters(sort="popularity", min_price=0))
+    repo.browse_items.assert_awaited_once()
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.core.unit_of_work import UnitOfWork
+from app.services.production import ProductionService
+from app.services.production_planner import PlanFactory, PlanOrder, plan_assignments, plan_order
+
+
+def _factory(spec="banner", lead=7, load=0, capacity=10, rating=4.0, service=1):
+    return PlanFactory(uuid4(), [spec], lead, load, capacity, rating, service)
+
+
+def _order(due, urgent=False, product_type="banner"):
+    return PlanOrder(uuid4(), product_type, due, urgent)
+
+
+def test_tight_deadline_gets_fast_factory():
+    slow, fast = _factory(lead=10), _factory(lead=2, capacity=1)
+    relaxed, tight = _order(due=30), _order(due=3)
+
+    pairs = dict(plan_assignments([relaxed, tight], [slow, fast]))
+
+    assert pairs == {0: 0, 1: 1}
+
+
+def test_capacity_and_specialization_are_respected():
+    factories = [_factory(capacity=3, load=1), _factory(spec="standee", capacity=5)]
+    orders = [_order(due=10) for _ in range(4)] + [_order(due=10, product_type="digital")]
+
+    pairs = plan_assignments(orders, factories)
+
+    # Два свободных слота у единственной фабрики баннеров
+    assert len(pairs) == 2
+    assert all(factory == 0 for _, factory in pairs)
+    assert 4 not in {order for order, _ in pairs}
+
+
+def test_load_is_spread_between_equal_factories():
+    factories = [_factory(), _factory()]
+    pairs = plan_assignments([_order(due=10) for _ in range(4)], factories)
+
+    assert sorted(f for _, f in pairs) == [0, 0, 1, 1]
+
+
+def test_plan_order_deadline_and_urgency():
+    now = datetime(2025, 9, 1)
+
+    order = plan_order(uuid4(), {"product_type": "Banner", "deadline_days": 5}, now - timedelta(days=1), None, now)
+
+    assert order.product_type == "banner"
+    assert order.due_in_days == 4
+    assert order.urgent
+    assert plan_order(uuid4(), {}, now, None, now) is None
+
+
+def test_slots_are_capped_by_compatible_orders(monkeypatch):
+    from app.services import production_planner
+
+    shapes = []
+    solve = production_planner.linear_sum_assignment
+
+    def spy(cost):
+        shapes.append(cost.shape)
+        return solve(cost)
+
+    monkeypatch.setattr(production_planner, "linear_sum_assignment", spy)
+    factories = [_factory(capacity=1000), _factory(spec="standee", capacity=1000)]
+    orders = [_order(due=10) for _ in range(3)] + [_order(due=10, product_type="standee")]
+
+    pairs = plan_assignments(orders, factories)
+
+    assert len(pairs) == 4
+    assert shapes == [(4, 4)]
+
+
+@pytest.mark.asyncio
+async def test_plan_locks_only_planned_factories_and_respects_current_load():
+    session = MagicMock(info={}, commit=AsyncMock(), rollback=AsyncMock())
+    now = datetime.now()
+    busy = SimpleNamespace(
+        id=uuid4(), specialization="banner", lead_time_days=3, current_load=0, production_capacity=2,
+        rating=4.0, service_level=1, latitude=None, longitude=None, location=None, api_url=None
+    )
+    idle = SimpleNamespace(**{**vars(busy), "id": uuid4(), "specialization": "standee"})
+    rows = [(uuid4(), {"product_type": "banner"}, now, None, None, None, None) for _ in range(2)]
+    order_repo = MagicMock(get_plannable=AsyncMock(return_value=rows), bulk_assign=AsyncMock())
+    factory_repo = MagicMock(
+        get_for_planning=AsyncMock(return_value=[busy, idle]),
+        # Пока решался план, одиночное назначение заняло слот
+        lock_loads=AsyncMock(return_value=[(busy.id, 1, 2)]),
+        bulk_update=AsyncMock()
+    )
+    UnitOfWork.of(session)
+
+    result = await ProductionService(session, order_repo, factory_repo).plan_production()
+
+    factory_repo.lock_loads.assert_awaited_once_with([busy.id])
+    assert result.assigned == 1 and result.unassigned == 1
+    assert factory_repo.bulk_update.await_args.args[0] == [{"id": busy.id, "current_load": 2}]
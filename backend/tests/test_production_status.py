@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.schemas.production import ProductionStatusUpdate
+from app.services.production import check_status_updates
+
+
+def test_status_updates_follow_transitions_in_timestamp_order():
+    now = datetime(2025, 9, 20, 12, 0)
+    shipped_then_completed, foreign, invalid, repeated = uuid4(), uuid4(), uuid4(), uuid4()
+    current = {
+        shipped_then_completed: "production",
+        invalid: "production",
+        repeated: "shipped",
+    }
+    updates = [
+        # Пришло раньше по порядку, но позже по времени
+        ProductionStatusUpdate(order_id=shipped_then_completed, status="completed", timestamp=now - timedelta(hours=1)),
+        ProductionStatusUpdate(order_id=shipped_then_completed, status="shipped", timestamp=now - timedelta(hours=2)),
+        ProductionStatusUpdate(order_id=foreign, status="shipped", timestamp=now),
+        ProductionStatusUpdate(order_id=invalid, status="completed", timestamp=now),
+        ProductionStatusUpdate(order_id=repeated, status="shipped", timestamp=now),
+    ]
+
+    results, transitions = check_status_updates(current, updates, now)
+
+    assert [r.applied for r in results] == [True, True, False, False, True]
+    assert results[0].from_status == "shipped"
+    assert results[3].error == "Invalid transition from production to completed"
+    assert [(order_id, a, b) for order_id, a, b, _ in transitions] == [
+        (shipped_then_completed, "production", "shipped"),
+        (shipped_then_completed, "shipped", "completed"),
+    ]
+
+
+def test_future_and_aware_timestamps_are_normalized():
+    now = datetime(2025, 9, 20, 12, 0)
+    order_id = uuid4()
+    future = datetime.now(timezone.utc) + timedelta(days=365 * 10)
+
+    _, transitions = check_status_updates(
+        {order_id: "production"},
+        [ProductionStatusUpdate(order_id=order_id, status="shipped", timestamp=future)],
+        now
+    )
+
+    assert transitions[0][3] == now
+
+
+def test_factory_cannot_cancel_orders():
+    order_id = uuid4()
+    now = datetime(2025, 9, 20, 12, 0)
+
+    results, transitions = check_status_updates(
+        {order_id: "production"},
+        [ProductionStatusUpdate(order_id=order_id, status="cancelled", timestamp=now)],
+        now
+    )
+
+    # Отмена с возвратом оплаты идёт только через OrderService.cancel_order
+    assert not results[0].applied and results[0].error
+    assert transitions == []
@@ -0,0 +1,58 @@
+import numpy as np
+
+from app.services.recommendations import build_vectors, update_neighbours
+
+
+def _items(n, seed=0):
+    rng = np.random.default_rng(seed)
+    types = ["BANNER", "STANDEE", "BILLBOARD", "DIGITAL"]
+    return [
+        (
+            f"item-{i}",
+            types[rng.integers(4)],
+            {"size": f"A{rng.integers(1, 5)}", "material": ["glossy", "matte"][rng.integers(2)]},
+            int(rng.integers(10_000, 3_000_000)),
+            f"designer-{rng.integers(10)}",
+        )
+        for i in range(n)
+    ]
+
+
+def _full(vectors, ids, k=5):
+    return update_neighbours(vectors, ids, np.ones(len(ids), dtype=bool), {}, k=k, batch_size=7)
+
+
+def test_full_build_excludes_self_and_sorts():
+    items = _items(40)
+    ids = [item[0] for item in items]
+    result = _full(build_vectors(items, {}), ids)
+
+    for item_id, neighbours in result.items():
+        assert item_id not in [n for n, _ in neighbours]
+        scores = [s for _, s in neighbours]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_incremental_update_matches_full_rebuild():
+    items = _items(60)
+    ids = [item[0] for item in items]
+    buyers = {"item-1": ["u1", "u2"], "item-2": ["u2"]}
+    previous = _full(build_vectors(items, buyers), ids)
+
+    # Меняем несколько товаров и добавляем покупку
+    items[3] = (items[3][0], "DIGITAL", {"size": "A9"}, 5_000_000, "designer-42")
+    items[10] = (items[10][0], items[1][1], items[1][2], items[1][3], items[1][4])
+    buyers["item-10"] = ["u1"]
+    changed = np.zeros(len(ids), dtype=bool)
+    changed[[3, 10]] = True
+    vectors = build_vectors(items, buyers)
+
+    updated = update_neighbours(vectors, ids, changed, previous, k=5, batch_size=7)
+
+    expected = _full(vectors, ids)
+    merged = {**previous, **updated}
+    # При равных оценках на границе top-k допустим любой из товаров
+    assert {i: [s for _, s in n] for i, n in merged.items()} == \
+           {i: [s for _, s in n] for i, n in expected.items()}
+    # item-10 стал копией item-1 с общим покупателем
+    assert merged["item-1"][0][0] == "item-10"
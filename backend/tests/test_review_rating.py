@@ -0,0 +1,115 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.unit_of_work import UnitOfWork
+from app.repositories import review as review_module
+from app.repositories.review import ReviewRepository
+
+ITEM_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.info = {}
+    item = SimpleNamespace(id=ITEM_ID, item_type="banner")
+    session.execute = AsyncMock(
+        return_value=MagicMock(one_or_none=MagicMock(return_value=item))
+    )
+    return session
+
+
+def _rating_update(session) -> str:
+    statement = session.execute.await_args.args[0]
+    return str(statement.compile(
+        dialect=postgresql.asyncpg.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+
+
+def _review(rating: int):
+    return SimpleNamespace(id=uuid.uuid4(), order_id=uuid.uuid4(), rating=rating)
+
+
+@pytest.mark.asyncio
+async def test_create_adds_rating_to_aggregates(session):
+    session.scalars = AsyncMock(return_value=MagicMock(one=MagicMock(return_value=_review(4))))
+
+    await ReviewRepository(session).create({"order_id": uuid.uuid4(), "rating": 4})
+
+    sql = _rating_update(session)
+    assert "rating_sum=(market_items.rating_sum + 4)" in sql
+    assert "rating_count=(market_items.rating_count + 1)" in sql
+    assert "(market_items.rating_histogram[4] + 1)" in sql
+    assert "rating_histogram[2]" not in sql
+    # Средний рейтинг пересчитывается из новых значений в том же UPDATE
+    assert "CAST(market_items.rating_sum + 4 AS FLOAT)" in sql
+    assert "nullif(market_items.rating_count + 1, 0)" in sql
+
+
+@pytest.mark.asyncio
+async def test_changed_rating_moves_between_histogram_buckets(session):
+    review = _review(2)
+    session.scalar = AsyncMock(return_value=5)
+    session.scalars = AsyncMock(return_value=MagicMock(first=MagicMock(return_value=review)))
+
+    assert await ReviewRepository(session).update(review.id, {"rating": 2}) is review
+
+    sql = _rating_update(session)
+    assert "rating_sum=(market_items.rating_sum + -3)" in sql
+    assert "rating_count=(market_items.rating_count + 0)" in sql
+    assert "(market_items.rating_histogram[2] + 1)" in sql
+    assert "(market_items.rating_histogram[5] + -1)" in sql
+
+
+@pytest.mark.asyncio
+async def test_unchanged_rating_skips_aggregates(session):
+    review = _review(3)
+    session.scalar = AsyncMock(return_value=3)
+    session.scalars = AsyncMock(return_value=MagicMock(first=MagicMock(return_value=review)))
+
+    await ReviewRepository(session).update(review.id, {"rating": 3, "comment": "ок"})
+
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_rating_from_aggregates(session):
+    row = SimpleNamespace(order_id=uuid.uuid4(), rating=1)
+    deleted = MagicMock(one_or_none=MagicMock(return_value=row))
+    session.execute.side_effect = [deleted, session.execute.return_value]
+
+    assert await ReviewRepository(session).delete(uuid.uuid4()) is True
+
+    sql = _rating_update(session)
+    assert "rating_sum=(market_items.rating_sum + -1)" in sql
+    assert "rating_count=(market_items.rating_count + -1)" in sql
+    assert "(market_items.rating_histogram[1] + -1)" in sql
+
+
+@pytest.mark.asyncio
+async def test_rating_change_invalidates_item_cache_after_commit(session, monkeypatch):
+    invalidate = AsyncMock()
+    monkeypatch.setattr(review_module.catalog_cache, "invalidate", invalidate)
+    session.commit = AsyncMock()
+    uow = UnitOfWork.of(session)
+
+    async with uow:
+        await ReviewRepository(session)._apply_rating(uuid.uuid4(), added=5)
+        invalidate.assert_not_awaited()
+
+    invalidate.assert_awaited_once()
+    assert f"item:{ITEM_ID}" in invalidate.await_args.args
+
+
+@pytest.mark.asyncio
+async def test_order_without_market_item_registers_nothing(session):
+    session.execute.return_value = MagicMock(one_or_none=MagicMock(return_value=None))
+    repo = ReviewRepository(session)
+
+    await repo._apply_rating(uuid.uuid4(), added=5)
+
+    assert repo.uow._on_commit == []
@@ -0,0 +1,21 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.marketplace import spec_condition
+
+
+def _params(predicates):
+    compiled = spec_condition(predicates).compile(dialect=postgresql.asyncpg.dialect())
+    return list(compiled.params.values())
+
+
+def test_numeric_value_matches_string_and_number():
+    assert _params(["size:3"]) == [{"size": "3"}, {"size": ["3"]}, {"size": 3}, {"size": [3]}]
+
+
+@pytest.mark.parametrize("raw", ["NaN", "Infinity", "-Infinity", "1e999"])
+def test_non_finite_numbers_compare_as_strings(raw):
+    assert _params([f"print.width:{raw}"]) == [
+        {"print": {"width": raw}},
+        {"print": {"width": [raw]}},
+    ]
@@ -0,0 +1,34 @@
+from app.core.timer_wheel import TimerWheel
+
+
+def test_timers_fire_once_in_time_order_across_levels():
+    wheel = TimerWheel(resolution=1.0, sizes=(4, 3, 2), start=0)
+    wheel.schedule("soon", 2)
+    wheel.schedule("next_level", 7)
+    wheel.schedule("top_level", 20)
+    wheel.schedule("overflow", 30)
+
+    assert wheel.advance(1) == []
+    assert [key for key, _ in wheel.advance(7)] == ["soon", "next_level"]
+    assert [key for key, _ in wheel.advance(25)] == ["top_level"]
+    assert [key for key, _ in wheel.advance(40)] == ["overflow"]
+    assert len(wheel) == 0
+
+
+def test_reschedule_and_cancel():
+    wheel = TimerWheel(resolution=1.0, sizes=(4, 3), start=0)
+    wheel.schedule("order", 5, payload="first")
+    wheel.schedule("order", 9, payload="second")
+    wheel.schedule("cancelled", 3)
+
+    assert wheel.cancel("cancelled")
+    assert not wheel.cancel("missing")
+    assert wheel.advance(8) == []
+    assert wheel.advance(9) == [("order", "second")]
+
+
+def test_past_timer_fires_on_next_advance():
+    wheel = TimerWheel(resolution=1.0, start=100)
+    wheel.schedule("overdue", 50, payload=1)
+
+    assert wheel.advance(100) == [("overdue", 1)]
@@ -0,0 +1,97 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+from app.core.unit_of_work import UnitOfWork
+from app.models.order_status_event import OrderStatusEvent
+from app.repositories.order_status_event import OrderStatusEventRepository
+
+
+@pytest.fixture
+def session(mock_db_session):
+    mock_db_session.info = {}
+    mock_db_session.add = MagicMock()
+    return mock_db_session
+
+
+@pytest.mark.asyncio
+async def test_nested_blocks_commit_once(session):
+    callback = AsyncMock()
+
+    async with UnitOfWork.of(session) as uow:
+        async with UnitOfWork.of(session):
+            uow.on_commit(callback)
+        session.commit.assert_not_awaited()
+
+    session.commit.assert_awaited_once()
+    callback.assert_awaited_once()
+    # Вложенный блок не стоит лишних запросов
+    session.begin_nested.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_error_rolls_back_and_drops_callbacks(session):
+    callback = AsyncMock()
+
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork.of(session) as uow:
+            uow.on_commit(callback)
+            async with UnitOfWork.of(session):
+                raise RuntimeError("boom")
+
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
+    callback.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_caught_error_drops_only_nested_callbacks(session):
+    outer_callback, inner_callback = AsyncMock(), AsyncMock()
+
+    async with UnitOfWork.of(session) as uow:
+        uow.on_commit(outer_callback)
+        try:
+            async with UnitOfWork.of(session):
+                uow.on_commit(inner_callback)
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+    session.commit.assert_awaited_once()
+    outer_callback.assert_awaited_once()
+    inner_callback.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_savepoint_rolls_back_only_its_block(session):
+    outer_callback, inner_callback = AsyncMock(), AsyncMock()
+    savepoint = MagicMock(__aenter__=AsyncMock(), __aexit__=AsyncMock(return_value=False))
+    session.begin_nested = MagicMock(return_value=savepoint)
+
+    async with UnitOfWork.of(session) as uow:
+        uow.on_commit(outer_callback)
+        with pytest.raises(RuntimeError):
+            async with uow.savepoint():
+                uow.on_commit(inner_callback)
+                raise RuntimeError("boom")
+
+    assert savepoint.__aexit__.await_args.args[0] is RuntimeError
+    session.commit.assert_awaited_once()
+    outer_callback.assert_awaited_once()
+    inner_callback.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_deferred_flush_fills_ids_and_flushes_once_on_exit(session):
+    uow = UnitOfWork.of(session)
+    repo = OrderStatusEventRepository(session)
+
+    async with uow.deferred_flush():
+        first = await repo.create({"order_id": UUID(int=1), "to_status": "created"})
+        second = await repo.create({"order_id": UUID(int=2), "to_status": "created"})
+        await uow.flush()
+        session.flush.assert_not_awaited()
+
+    session.flush.assert_awaited_once()
+    assert isinstance(first, OrderStatusEvent) and session.add.call_count == 2
+    assert first.id is not None and first.id != second.id and first.backfilled is False